@@ -0,0 +1,93 @@
+"""Add embedding cache table
+
+Revision ID: 018
+Revises: 017
+Create Date: 2026-10-16
+
+Creates a content-addressed cache of provider embeddings so identical
+text (re-uploaded documents, repeated RAG queries, boilerplate chunks) is
+only embedded once.
+
+Tables created:
+- embedding_cache: Packed float16/float32 vectors keyed by hash(model, text)
+
+Target Database: socrates_specs
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = '018'
+down_revision = '017'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create embedding_cache table."""
+
+    op.create_table(
+        'embedding_cache',
+        sa.Column(
+            'id',
+            sa.String(64),
+            primary_key=True,
+            nullable=False,
+            comment='SHA-256 of model and normalised text'
+        ),
+        sa.Column(
+            'model',
+            sa.String(100),
+            nullable=False,
+            comment='Embedding model name'
+        ),
+        sa.Column(
+            'dim',
+            sa.Integer(),
+            nullable=False,
+            comment='Vector dimension'
+        ),
+        sa.Column(
+            'dtype',
+            sa.String(16),
+            nullable=False,
+            comment='Blob element type (float16, float32)'
+        ),
+        sa.Column(
+            'vector',
+            sa.LargeBinary(),
+            nullable=False,
+            comment='Packed little-endian vector bytes'
+        ),
+        sa.Column(
+            'token_count',
+            sa.Integer(),
+            nullable=False,
+            server_default='0',
+            comment='Estimated provider tokens for the text'
+        ),
+        sa.Column(
+            'created_at',
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+            comment='Timestamp when record was created'
+        ),
+        sa.Column(
+            'updated_at',
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+            comment='Timestamp when record was last updated'
+        ),
+    )
+
+    op.create_index('ix_embedding_cache_model', 'embedding_cache', ['model'])
+
+
+def downgrade() -> None:
+    """Drop embedding_cache table."""
+
+    op.drop_index('ix_embedding_cache_model', table_name='embedding_cache')
+    op.drop_table('embedding_cache')
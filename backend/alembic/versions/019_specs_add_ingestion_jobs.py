@@ -0,0 +1,144 @@
+"""Add ingestion jobs table
+
+Revision ID: 019
+Revises: 018
+Create Date: 2026-10-16
+
+Tracks background document ingestion (parse, chunk, embed, insert) so
+uploads return immediately and clients poll for progress.
+
+Tables created:
+- ingestion_jobs: One row per uploaded document being processed
+
+Target Database: socrates_specs
+"""
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+revision = '019'
+down_revision = '018'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create ingestion_jobs table."""
+
+    op.create_table(
+        'ingestion_jobs',
+        sa.Column(
+            'id',
+            postgresql.UUID(as_uuid=True),
+            primary_key=True,
+            server_default=sa.text('gen_random_uuid()'),
+            nullable=False,
+            comment='Ingestion job identifier (UUID)'
+        ),
+        sa.Column(
+            'project_id',
+            postgresql.UUID(as_uuid=True),
+            nullable=False,
+            comment='Project the document is uploaded to'
+        ),
+        sa.Column(
+            'user_id',
+            postgresql.UUID(as_uuid=True),
+            nullable=False,
+            comment='Uploading user'
+        ),
+        sa.Column(
+            'document_id',
+            postgresql.UUID(as_uuid=True),
+            nullable=True,
+            comment='Created knowledge_base_documents.id'
+        ),
+        sa.Column(
+            'filename',
+            sa.String(255),
+            nullable=False,
+            comment='Original filename'
+        ),
+        sa.Column(
+            'file_size',
+            sa.Integer(),
+            nullable=False,
+            server_default='0',
+            comment='Upload size in bytes'
+        ),
+        sa.Column(
+            'status',
+            sa.String(20),
+            nullable=False,
+            server_default='queued',
+            comment='queued, processing, completed, failed'
+        ),
+        sa.Column(
+            'chunks_processed',
+            sa.Integer(),
+            nullable=False,
+            server_default='0',
+            comment='Chunks stored so far'
+        ),
+        sa.Column(
+            'chunks_embedded',
+            sa.Integer(),
+            nullable=False,
+            server_default='0',
+            comment='Stored chunks with an embedding'
+        ),
+        sa.Column(
+            'embedding_status',
+            sa.String(20),
+            nullable=False,
+            server_default='pending',
+            comment='pending, completed, partial, failed'
+        ),
+        sa.Column(
+            'error',
+            sa.Text(),
+            nullable=True,
+            comment='Failure reason'
+        ),
+        sa.Column(
+            'started_at',
+            sa.DateTime(timezone=True),
+            nullable=True,
+            comment='When a worker picked the job up'
+        ),
+        sa.Column(
+            'completed_at',
+            sa.DateTime(timezone=True),
+            nullable=True,
+            comment='When the job finished'
+        ),
+        sa.Column(
+            'created_at',
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+            comment='Timestamp when record was created'
+        ),
+        sa.Column(
+            'updated_at',
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+            comment='Timestamp when record was last updated'
+        ),
+    )
+
+    op.create_index('ix_ingestion_jobs_project_id', 'ingestion_jobs', ['project_id'])
+    op.create_index('ix_ingestion_jobs_user_id', 'ingestion_jobs', ['user_id'])
+    op.create_index('ix_ingestion_jobs_status', 'ingestion_jobs', ['status'])
+
+
+def downgrade() -> None:
+    """Drop ingestion_jobs table."""
+
+    op.drop_index('ix_ingestion_jobs_status', table_name='ingestion_jobs')
+    op.drop_index('ix_ingestion_jobs_user_id', table_name='ingestion_jobs')
+    op.drop_index('ix_ingestion_jobs_project_id', table_name='ingestion_jobs')
+    op.drop_table('ingestion_jobs')
@@ -0,0 +1,40 @@
+"""Add chunking_config column to projects table
+
+Revision ID: 020
+Revises: 019
+Create Date: 2026-10-16
+
+Stores per-project document chunking overrides (strategy, token budget,
+overlap). NULL means the server defaults (CHUNK_* settings) apply.
+
+Target Database: socrates_specs
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = '020'
+down_revision = '019'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Add chunking_config column to projects table"""
+
+    op.add_column(
+        'projects',
+        sa.Column(
+            'chunking_config',
+            sa.JSON(),
+            nullable=True,
+            comment='Document chunking overrides (strategy, max_tokens, overlap_tokens, ...); NULL = server defaults'
+        )
+    )
+
+
+def downgrade() -> None:
+    """Remove chunking_config column from projects table"""
+
+    op.drop_column('projects', 'chunking_config')
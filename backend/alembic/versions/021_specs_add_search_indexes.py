@@ -0,0 +1,62 @@
+"""Add full-text search indexes
+
+Revision ID: 021
+Revises: 020
+Create Date: 2026-10-16
+
+GIN indexes on weighted tsvector expressions for /api/v1/search. Titles
+(project name, category) get weight A and body text weight B. The
+expressions must match app/services/search_index.py exactly or the
+planner will not use the indexes.
+
+Indexes created (PostgreSQL only; SQLite builds an FTS5 index on first use):
+- idx_projects_search
+- idx_specifications_search
+- idx_questions_search
+
+Target Database: socrates_specs
+"""
+
+from alembic import op
+
+revision = '021'
+down_revision = '020'
+branch_labels = None
+depends_on = None
+
+
+SEARCH_INDEXES = {
+    'idx_projects_search': (
+        'projects',
+        "setweight(to_tsvector('english', coalesce(name, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(description, '')), 'B')"
+    ),
+    'idx_specifications_search': (
+        'specifications',
+        "setweight(to_tsvector('english', coalesce(category, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(content, '')), 'B')"
+    ),
+    'idx_questions_search': (
+        'questions',
+        "setweight(to_tsvector('english', coalesce(category, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(text, '')), 'B')"
+    ),
+}
+
+
+def upgrade() -> None:
+    """Create GIN full-text indexes."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    for name, (table, expression) in SEARCH_INDEXES.items():
+        op.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} USING gin (({expression}))")
+
+
+def downgrade() -> None:
+    """Drop GIN full-text indexes."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    for name in SEARCH_INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {name}")
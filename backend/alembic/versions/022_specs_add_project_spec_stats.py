@@ -0,0 +1,108 @@
+"""Add per-project specification aggregates
+
+Revision ID: 022
+Revises: 021
+Create Date: 2026-10-16
+
+Count and confidence sum of current specifications per project and
+category, maintained on every specification write, so maturity scoring
+reads O(categories) rows instead of every specification. The table is
+backfilled here with one GROUP BY pass (the rebuild_spec_stats
+maintenance job does the same later).
+
+Tables created:
+- project_spec_stats: One row per (project, category)
+
+Target Database: socrates_specs
+"""
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+revision = '022'
+down_revision = '021'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create and backfill project_spec_stats table."""
+
+    op.create_table(
+        'project_spec_stats',
+        sa.Column(
+            'id',
+            postgresql.UUID(as_uuid=True),
+            primary_key=True,
+            server_default=sa.text('gen_random_uuid()'),
+            nullable=False,
+            comment='Primary key (UUID)'
+        ),
+        sa.Column(
+            'project_id',
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey('projects.id', ondelete='CASCADE'),
+            nullable=False,
+            comment='Foreign key to projects table'
+        ),
+        sa.Column(
+            'category',
+            sa.String(100),
+            nullable=False,
+            comment='Specification category'
+        ),
+        sa.Column(
+            'spec_count',
+            sa.Integer(),
+            nullable=False,
+            server_default='0',
+            comment='Number of current specifications in this category'
+        ),
+        sa.Column(
+            'confidence_sum',
+            sa.Numeric(12, 2),
+            nullable=False,
+            server_default='0',
+            comment='Sum of confidence of current specifications (missing confidence counts as 0.90)'
+        ),
+        sa.Column(
+            'created_at',
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+            comment='Timestamp when record was created'
+        ),
+        sa.Column(
+            'updated_at',
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+            comment='Timestamp when record was last updated'
+        ),
+        sa.UniqueConstraint('project_id', 'category', name='uq_project_spec_stats_project_category'),
+    )
+
+    op.create_index('idx_project_spec_stats_project_id', 'project_spec_stats', ['project_id'])
+
+    op.execute(
+        """
+        INSERT INTO project_spec_stats (project_id, category, spec_count, confidence_sum)
+        SELECT
+            project_id,
+            category,
+            count(*),
+            sum(CASE WHEN coalesce(confidence, 0) = 0 THEN 0.90 ELSE confidence END)
+        FROM specifications
+        WHERE is_current = true
+        GROUP BY project_id, category
+        """
+    )
+
+
+def downgrade() -> None:
+    """Drop project_spec_stats table."""
+
+    op.drop_index('idx_project_spec_stats_project_id', table_name='project_spec_stats')
+    op.drop_table('project_spec_stats')
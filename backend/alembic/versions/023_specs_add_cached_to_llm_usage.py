@@ -0,0 +1,42 @@
+"""Add cached column to llm_usage_tracking table
+
+Revision ID: 023
+Revises: 022
+Create Date: 2026-10-16
+
+Marks usage rows served from the LLM response cache. Such rows have
+zero tokens and zero cost; counting them shows how many provider calls
+the cache saved.
+
+Target Database: socrates_specs
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = '023'
+down_revision = '022'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Add cached column to llm_usage_tracking table"""
+
+    op.add_column(
+        'llm_usage_tracking',
+        sa.Column(
+            'cached',
+            sa.Boolean(),
+            nullable=False,
+            server_default=sa.false(),
+            comment='Served from the LLM response cache'
+        )
+    )
+
+
+def downgrade() -> None:
+    """Remove cached column from llm_usage_tracking table"""
+
+    op.drop_column('llm_usage_tracking', 'cached')
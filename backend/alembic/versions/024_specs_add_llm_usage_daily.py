@@ -0,0 +1,136 @@
+"""Add per-user daily LLM usage rollups
+
+Revision ID: 024
+Revises: 023
+Create Date: 2026-10-16
+
+Token, cost and call totals per user, UTC day, provider and model,
+maintained by the batched usage writer in the same transaction as the
+llm_usage_tracking insert. Usage statistics are a range query on
+(user_id, day) instead of a scan over every recorded call. The table is
+backfilled here with one GROUP BY pass over llm_usage_tracking.
+
+Tables created:
+- llm_usage_daily: One row per (user, day, provider, model)
+
+Target Database: socrates_specs
+"""
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+revision = '024'
+down_revision = '023'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create and backfill llm_usage_daily table."""
+
+    op.create_table(
+        'llm_usage_daily',
+        sa.Column(
+            'id',
+            postgresql.UUID(as_uuid=True),
+            primary_key=True,
+            server_default=sa.text('gen_random_uuid()'),
+            nullable=False,
+            comment='Primary key (UUID)'
+        ),
+        sa.Column(
+            'user_id',
+            postgresql.UUID(as_uuid=True),
+            nullable=False,
+            comment='References users.id in socrates_auth database'
+        ),
+        sa.Column(
+            'day',
+            sa.Date(),
+            nullable=False,
+            comment='UTC date of the calls'
+        ),
+        sa.Column(
+            'provider',
+            sa.String(50),
+            nullable=False,
+            comment='LLM provider used'
+        ),
+        sa.Column(
+            'model',
+            sa.String(100),
+            nullable=False,
+            comment='Model name'
+        ),
+        sa.Column(
+            'request_count',
+            sa.Integer(),
+            nullable=False,
+            server_default='0',
+            comment='Number of calls'
+        ),
+        sa.Column(
+            'tokens_input',
+            sa.Integer(),
+            nullable=False,
+            server_default='0',
+            comment='Input tokens used'
+        ),
+        sa.Column(
+            'tokens_output',
+            sa.Integer(),
+            nullable=False,
+            server_default='0',
+            comment='Output tokens generated'
+        ),
+        sa.Column(
+            'cost_usd',
+            sa.Numeric(14, 6),
+            nullable=False,
+            server_default='0',
+            comment='Cost in USD'
+        ),
+        sa.Column(
+            'created_at',
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+            comment='Timestamp when record was created'
+        ),
+        sa.Column(
+            'updated_at',
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+            comment='Timestamp when record was last updated'
+        ),
+        sa.UniqueConstraint('user_id', 'day', 'provider', 'model', name='uq_llm_usage_daily_user_day_model'),
+    )
+
+    op.create_index('idx_llm_usage_daily_day', 'llm_usage_daily', ['day'])
+
+    op.execute(
+        """
+        INSERT INTO llm_usage_daily (user_id, day, provider, model, request_count, tokens_input, tokens_output, cost_usd)
+        SELECT
+            user_id,
+            (timestamp AT TIME ZONE 'UTC')::date,
+            provider,
+            model,
+            count(*),
+            coalesce(sum(tokens_input), 0),
+            coalesce(sum(tokens_output), 0),
+            coalesce(sum(cost_usd), 0)
+        FROM llm_usage_tracking
+        GROUP BY user_id, (timestamp AT TIME ZONE 'UTC')::date, provider, model
+        """
+    )
+
+
+def downgrade() -> None:
+    """Drop llm_usage_daily table."""
+
+    op.drop_index('idx_llm_usage_daily_day', table_name='llm_usage_daily')
+    op.drop_table('llm_usage_daily')
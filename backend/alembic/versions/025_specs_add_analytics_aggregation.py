@@ -0,0 +1,178 @@
+"""Add analytics event, daily project metrics and job watermark tables
+
+Revision ID: 025
+Revises: 024
+Create Date: 2026-10-16
+
+The daily analytics job aggregates analytics_events into project_metrics
+with one GROUP BY/upsert statement per UTC day and records its progress
+in job_watermarks, so catch-up runs resume where they stopped.
+
+project_metrics is keyed by (project_id, date), the upsert conflict
+target. Databases created by the archived analytics migration have an
+older project_metrics (UUID id, no user_id/sessions_created); it only
+holds derived data, so it is replaced, and the job rebuilds it from
+analytics_events on its first run (no watermark yet).
+
+Tables created:
+- analytics_events: Raw user action events (kept if it already exists)
+- project_metrics: One row per (project, day)
+- job_watermarks: Progress of windowed background jobs
+
+Target Database: socrates_specs
+"""
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+revision = '025'
+down_revision = '024'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create analytics aggregation tables."""
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if 'analytics_events' not in existing:
+        op.create_table(
+            'analytics_events',
+            sa.Column(
+                'id',
+                postgresql.UUID(as_uuid=True),
+                primary_key=True,
+                server_default=sa.text('gen_random_uuid()'),
+                nullable=False,
+                comment='Event ID (UUID)'
+            ),
+            sa.Column(
+                'user_id',
+                postgresql.UUID(as_uuid=True),
+                nullable=False,
+                comment='User who triggered the event'
+            ),
+            sa.Column(
+                'event_type',
+                sa.String(50),
+                nullable=False,
+                comment='Event type: project_created, spec_added, analysis_run, conflict_resolved, etc.'
+            ),
+            sa.Column(
+                'event_data',
+                postgresql.JSONB(astext_type=sa.Text()),
+                nullable=True,
+                comment='Event context data as JSON (project_id, spec_id, etc.)'
+            ),
+            sa.Column(
+                'timestamp',
+                sa.DateTime(timezone=True),
+                server_default=sa.func.now(),
+                nullable=False,
+                comment='Event timestamp'
+            ),
+        )
+        op.create_index('idx_analytics_events_timestamp', 'analytics_events', ['timestamp'])
+        op.create_index('idx_analytics_events_user_id', 'analytics_events', ['user_id'])
+        op.create_index('idx_analytics_events_event_type', 'analytics_events', ['event_type'])
+
+    if 'project_metrics' in existing:
+        op.drop_table('project_metrics')
+
+    op.create_table(
+        'project_metrics',
+        sa.Column(
+            'project_id',
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey('projects.id', ondelete='CASCADE'),
+            nullable=False,
+            comment='Project ID'
+        ),
+        sa.Column(
+            'date',
+            sa.Date(),
+            nullable=False,
+            comment='Date of the metric (UTC)'
+        ),
+        sa.Column(
+            'user_id',
+            postgresql.UUID(as_uuid=True),
+            nullable=True,
+            comment='Project owner'
+        ),
+        sa.Column(
+            'analyses_count',
+            sa.Integer(),
+            nullable=False,
+            server_default='0',
+            comment='Number of analyses run this day'
+        ),
+        sa.Column(
+            'specs_added',
+            sa.Integer(),
+            nullable=False,
+            server_default='0',
+            comment='Number of specifications added this day'
+        ),
+        sa.Column(
+            'conflicts_resolved',
+            sa.Integer(),
+            nullable=False,
+            server_default='0',
+            comment='Number of conflicts resolved this day'
+        ),
+        sa.Column(
+            'sessions_created',
+            sa.Integer(),
+            nullable=False,
+            server_default='0',
+            comment='Number of sessions created this day'
+        ),
+        sa.Column(
+            'updated_at',
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+            comment='When the row was last recomputed'
+        ),
+        sa.PrimaryKeyConstraint('project_id', 'date', name='pk_project_metrics'),
+    )
+    op.create_index('idx_project_metrics_date', 'project_metrics', ['date'])
+
+    op.create_table(
+        'job_watermarks',
+        sa.Column(
+            'job_name',
+            sa.String(100),
+            primary_key=True,
+            nullable=False,
+            comment='Job identifier'
+        ),
+        sa.Column(
+            'watermark',
+            sa.DateTime(timezone=True),
+            nullable=False,
+            comment='End (exclusive) of the last processed window'
+        ),
+        sa.Column(
+            'updated_at',
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+            comment='When the watermark last moved'
+        ),
+    )
+
+
+def downgrade() -> None:
+    """Drop analytics aggregation tables."""
+
+    op.drop_table('job_watermarks')
+    op.drop_index('idx_project_metrics_date', table_name='project_metrics')
+    op.drop_table('project_metrics')
+    op.drop_index('idx_analytics_events_event_type', table_name='analytics_events')
+    op.drop_index('idx_analytics_events_user_id', table_name='analytics_events')
+    op.drop_index('idx_analytics_events_timestamp', table_name='analytics_events')
+    op.drop_table('analytics_events')
@@ -0,0 +1,43 @@
+"""Add spec_revision column to projects table
+
+Revision ID: 026
+Revises: 025
+Create Date: 2026-10-16
+
+Counter incremented (with updated_at) on every flush that inserts,
+changes or deletes a specification of the project. Export artifacts and
+ETags are keyed on it, so checking whether an export changed is a
+primary key lookup on projects. Existing projects start at 0.
+
+Target Database: socrates_specs
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = '026'
+down_revision = '025'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Add spec_revision column to projects table"""
+
+    op.add_column(
+        'projects',
+        sa.Column(
+            'spec_revision',
+            sa.Integer(),
+            nullable=False,
+            server_default='0',
+            comment="Incremented on every flush that changes the project's specifications"
+        )
+    )
+
+
+def downgrade() -> None:
+    """Remove spec_revision column from projects table"""
+
+    op.drop_column('projects', 'spec_revision')
@@ -7,9 +7,10 @@ Provides:
 - Built-in error handling
 - Statistics tracking
 """
+import threading
 from abc import ABC, abstractmethod
 from datetime import datetime, timezone
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, List
 
 from ..core.dependencies import ServiceContainer
 
@@ -180,6 +181,25 @@ class BaseAgent(ABC):
                 'action': action
             }
 
+    def _run_detached(self, name: str, target: Callable[[], Any]) -> None:
+        """
+        Run work that must outlive the caller on a daemon thread.
+
+        Used to finish a streamed request whose client disconnected: the
+        generator is closed from the server's thread, which must not block.
+
+        Args:
+            name: Short description for the thread name and log messages
+            target: Callable to run; exceptions are logged
+        """
+        def run():
+            try:
+                target()
+            except Exception as e:
+                self.logger.error(f"Detached {name} failed: {e}", exc_info=True)
+
+        threading.Thread(target=run, name=f"{self.agent_id}-{name}", daemon=True).start()
+
     def get_stats(self) -> Dict[str, Any]:
         """
         Get agent statistics.
@@ -223,9 +223,10 @@ class CodeGeneratorAgent(BaseAgent):
                 )
                 claude_client = self.services.get_claude_client()
                 response = claude_client.messages.create(
-                    model="claude-sonnet-4-5-20250929",
+                    model=self.services.get_default_model(),
                     max_tokens=16000,
-                    messages=[{"role": "user", "content": prompt}]
+                    messages=[{"role": "user", "content": prompt}],
+                    usage_context={'user_id': data.get('user_id'), 'project_id': project_id}
                 )
 
                 # Extract generated code
@@ -20,6 +20,7 @@ from uuid import UUID
 from socrates import ConflictDetectionEngine, SpecificationData, specs_db_to_data
 
 from ..core.action_logger import log_conflict
+from ..core.conflict_prefilter import ConflictIndex, get_rule_predicates
 from ..models.conflict import Conflict, ConflictSeverity, ConflictStatus, ConflictType
 from ..models.specification import Specification
 from .base import BaseAgent
@@ -49,6 +50,9 @@ class ConflictDetectorAgent(BaseAgent):
         """Initialize agent with conflict detection engine"""
         super().__init__(agent_id, name, services)
         self.conflict_engine = ConflictDetectionEngine(self.logger)
+        # Detection calls answered locally vs sent to Claude (see conflict_prefilter)
+        self.stats['conflict_checks_skipped'] = 0
+        self.stats['conflict_checks_escalated'] = 0
 
     def get_capabilities(self) -> List[str]:
         """Return list of capabilities."""
@@ -66,10 +70,17 @@ class ConflictDetectorAgent(BaseAgent):
         REFACTORED: Database connection released BEFORE Claude API call
         to prevent connection pool exhaustion during 10-15 second conflict detection.
 
+        A local pre-filter (same category and normalised key, or matching
+        the same domain conflict rule) selects candidate pairs first; only
+        the specs in those pairs are sent to Claude, and the call is skipped
+        when there are none.
+
         Args:
             data: {
                 'project_id': str,
                 'new_specs': List[Dict],  # Extracted specs not yet saved
+                'existing_specs': List[Dict],  # Optional, already-loaded specs
+                                               # (skips the database query)
                 'source_id': str  # question_id or message_id
             }
 
@@ -97,18 +108,35 @@ class ConflictDetectorAgent(BaseAgent):
         db = None
 
         try:
-            # PHASE 1: Load all data from database (quick operation)
-            db = self.services.get_database_specs()
-
-            # Load existing specifications
-            existing_specs = db.query(Specification).filter(
-                Specification.project_id == project_id
-            ).limit(100).all()
+            # PHASE 1: Load existing specs, unless the caller already has them
+            if 'existing_specs' in data:
+                existing_specs_data = [
+                    SpecificationData(
+                        id=spec_dict.get('id', ''),
+                        project_id=project_id,
+                        category=spec_dict.get('category', 'unknown'),
+                        key=spec_dict.get('key', ''),
+                        value=spec_dict.get('value', ''),
+                        confidence=spec_dict.get('confidence', 0.8),
+                        source=spec_dict.get('source', 'user_input'),
+                        created_at=spec_dict.get('created_at')
+                    )
+                    for spec_dict in data['existing_specs']
+                ]
+            else:
+                db = self.services.get_database_specs()
+                existing_specs_data = specs_db_to_data(
+                    db.query(Specification).filter(
+                        Specification.project_id == project_id
+                    ).limit(100).all()
+                )
+                # CRITICAL: Close DB connection BEFORE Claude API call
+                db.close()
 
-            if not existing_specs:
+            if not existing_specs_data:
                 # No existing specs, no conflicts possible
                 self.logger.debug(f"No existing specs for project {project_id}, no conflicts possible")
-                db.close()
+                self.stats['conflict_checks_skipped'] += 1
                 return {
                     'success': True,
                     'conflicts_detected': False,
@@ -129,8 +157,29 @@ class ConflictDetectorAgent(BaseAgent):
                     confidence=spec_dict.get('confidence', 0.8)
                 ))
 
-            # Convert existing specs to SpecificationData
-            existing_specs_data = specs_db_to_data(existing_specs)
+            # Keep only pairs that could conflict; skip Claude when none can
+            candidates = ConflictIndex(existing_specs_data, get_rule_predicates()).find_candidates(new_specs_data)
+            if not candidates:
+                self.logger.debug(
+                    f"No conflict candidates among {len(new_specs_data)} new and "
+                    f"{len(existing_specs_data)} existing specs for project {project_id}, skipping Claude"
+                )
+                self.stats['conflict_checks_skipped'] += 1
+                log_conflict("No conflicts detected", count=0, success=True)
+                return {
+                    'success': True,
+                    'conflicts_detected': False,
+                    'conflicts': [],
+                    'safe_to_save': True
+                }
+
+            self.stats['conflict_checks_escalated'] += 1
+            self.logger.debug(
+                f"Escalating {len(candidates.pairs)} candidate pairs "
+                f"({len(candidates.new_specs)} new, {len(candidates.existing_specs)} existing specs) to Claude"
+            )
+            new_specs_data = candidates.new_specs
+            existing_specs_data = candidates.existing_specs
 
             # Build prompt using engine
             prompt = self.conflict_engine.build_conflict_detection_prompt(
@@ -138,19 +187,17 @@ class ConflictDetectorAgent(BaseAgent):
                 existing_specs_data
             )
 
-            # CRITICAL: Close DB connection BEFORE Claude API call
-            db.close()
-            self.logger.debug(f"Database connection closed before Claude API call")
-
             # PHASE 2: Call Claude API (NO DATABASE CONNECTION HELD!)
             conflict_analysis = {}
             try:
                 self.logger.debug(f"Calling Claude API to detect conflicts for project {project_id} (DB released)")
                 claude_client = self.services.get_claude_client()
                 response = claude_client.messages.create(
-                    model="claude-sonnet-4-5-20250929",
+                    model=self.services.get_default_model(),
                     max_tokens=2000,
-                    messages=[{"role": "user", "content": prompt}]
+                    messages=[{"role": "user", "content": prompt}],
+                    usage_context={'user_id': data.get('user_id'), 'project_id': project_id},
+                    cache=True  # Unchanged spec sets get the same verdict
                 )
 
                 # Extract and parse response using ConflictDetectionEngine
@@ -2,8 +2,10 @@
 ContextAnalyzerAgent - Extracts specifications from user answers.
 """
 import json
+import uuid
+from dataclasses import dataclass, field
 from decimal import Decimal
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Tuple
 
 from sqlalchemy import and_
 
@@ -12,6 +14,7 @@ from ..models.project import Project
 from ..models.question import Question
 from ..models.session import Session
 from ..models.specification import Specification
+from ..services.spec_stats import get_category_stats
 from .base import BaseAgent
 
 # Target spec count per category for 100% maturity
@@ -29,6 +32,99 @@ CATEGORY_TARGETS = {
 }
 
 
+
+def maturity_from_category_scores(category_scores: Dict[str, float]) -> int:
+    """
+    Maturity (0-100) from confidence-weighted scores per category.
+
+    Each category contributes at most its CATEGORY_TARGETS value.
+
+    Args:
+        category_scores: {category: sum of spec confidence}
+
+    Returns:
+        Maturity score (0-100)
+    """
+    total_weight = sum(CATEGORY_TARGETS.values())  # 90
+    total_score = 0
+
+    for category, max_score in CATEGORY_TARGETS.items():
+        score = min(category_scores.get(category, 0), max_score)
+        total_score += score
+
+    maturity = (total_score / total_weight) * 100
+    return round(maturity)
+
+
+# Existing specs loaded per answer (prompt context and conflict baseline)
+EXISTING_SPECS_LIMIT = 100
+
+
+@dataclass
+class AnswerContext:
+    """
+    Everything needed to process one answer, loaded once.
+
+    Shared by the agents that handle the answer (extraction, conflict
+    detection) so none of them re-queries the session, question, project
+    or existing specs. Holds plain values only, so it stays valid after
+    the loading DB session is closed and can be passed between threads.
+    """
+
+    session_id: uuid.UUID
+    project_id: uuid.UUID
+    project_name: str
+    question_id: uuid.UUID
+    question_text: str
+    question_category: str
+    existing_specs: List[Dict[str, Any]] = field(default_factory=list)
+
+    @classmethod
+    def from_models(cls, db, session: Session, project: Project, question: Question) -> "AnswerContext":
+        """
+        Build a context from already-loaded rows.
+
+        Only the existing specs are queried (newest current specs first).
+
+        Args:
+            db: Database session
+            session: Session the answer belongs to
+            project: The session's project
+            question: Question being answered
+
+        Returns:
+            AnswerContext
+        """
+        specs = db.query(Specification).filter(
+            and_(
+                Specification.project_id == project.id,
+                Specification.is_current == True
+            )
+        ).order_by(Specification.created_at.desc()).limit(EXISTING_SPECS_LIMIT).all()
+
+        return cls(
+            session_id=session.id,
+            project_id=project.id,
+            project_name=project.name,
+            question_id=question.id,
+            question_text=question.text,
+            question_category=question.category,
+            existing_specs=[
+                {
+                    'id': str(spec.id),
+                    'category': spec.category,
+                    'key': spec.key,
+                    'value': spec.value,
+                    'content': spec.content,
+                    'confidence': float(spec.confidence) if spec.confidence is not None else 0.9,
+                    'source': spec.source,
+                    'created_at': spec.created_at.isoformat() if spec.created_at else None
+                }
+                for spec in specs
+            ]
+        )
+
+
 class ContextAnalyzerAgent(BaseAgent):
     """
     ContextAnalyzerAgent - Extracts specifications from user answers.
@@ -57,7 +153,9 @@ class ContextAnalyzerAgent(BaseAgent):
                 'session_id': str (UUID),
                 'question_id': str (UUID),
                 'answer': str,
-                'user_id': str (UUID) - for audit
+                'user_id': str (UUID) - for audit,
+                'context': AnswerContext (optional) - skips reloading
+                    the session, question, project and existing specs
             }
 
         Returns:
@@ -84,82 +182,33 @@ class ContextAnalyzerAgent(BaseAgent):
         db = None
 
         try:
-            # PHASE 1: Load all data from database (quick operation)
-            db = self.services.get_database_specs()
-
-            # Load context
-            session = db.query(Session).filter(Session.id == session_id).first()
-            if not session:
-                self.logger.warning(f"Session not found: {session_id}")
-                db.close()
-                return {
-                    'success': False,
-                    'error': f'Session not found: {session_id}',
-                    'error_code': 'SESSION_NOT_FOUND'
-                }
-
-            question = db.query(Question).filter(Question.id == question_id).first()
-            if not question:
-                self.logger.warning(f"Question not found: {question_id}")
+            # PHASE 1: Use the caller's context, or load it (quick operation)
+            context = data.get('context')
+            if context is None:
+                db = self.services.get_database_specs()
+                context, error = self._load_context(db, session_id, question_id)
+                # CRITICAL: Close DB connection BEFORE Claude API call
                 db.close()
-                return {
-                    'success': False,
-                    'error': f'Question not found: {question_id}',
-                    'error_code': 'QUESTION_NOT_FOUND'
-                }
-
-            project = db.query(Project).filter(Project.id == session.project_id).first()
-            if not project:
-                self.logger.warning(f"Project not found: {session.project_id}")
-                db.close()
-                return {
-                    'success': False,
-                    'error': f'Project not found: {session.project_id}',
-                    'error_code': 'PROJECT_NOT_FOUND'
-                }
-
-            # Load existing specs (limit to recent for performance)
-            existing_specs = db.query(Specification).filter(
-                and_(
-                    Specification.project_id == project.id,
-                    Specification.is_current == True
-                )
-            ).order_by(Specification.created_at.desc()).limit(100).all()
-
-            # Convert to dicts for use after DB closes
-            project_data = {
-                'id': str(project.id),
-                'name': project.name,
-                'maturity_score': project.maturity_score
-            }
-            question_data = {
-                'id': str(question.id),
-                'text': question.text,
-                'category': question.category
-            }
-            existing_specs_data = [
-                {
-                    'category': spec.category,
-                    'content': spec.content
-                }
-                for spec in existing_specs
-            ]
+                self.logger.debug("Database connection closed before Claude API call for extraction")
+                if error:
+                    return error
 
             # Build extraction prompt
-            prompt = self._build_extraction_prompt(question, answer, existing_specs)
-
-            # CRITICAL: Close DB connection BEFORE Claude API call
-            db.close()
-            self.logger.debug(f"Database connection closed before Claude API call for extraction")
+            prompt = self._build_extraction_prompt(context, answer)
 
             # PHASE 2: Call Claude API (NO DATABASE CONNECTION HELD!)
             extracted_specs = []
             try:
                 self.logger.debug(f"Calling Claude API to extract specs from answer (question: {question_id})")
                 response = self.services.get_claude_client().messages.create(
-                    model="claude-sonnet-4-5-20250929",
+                    model=self.services.get_default_model(),
                     max_tokens=2000,
-                    messages=[{"role": "user", "content": prompt}]
+                    messages=[{"role": "user", "content": prompt}],
+                    usage_context={
+                        'user_id': data.get('user_id'),
+                        'project_id': context.project_id,
+                        'session_id': session_id
+                    }
                 )
 
                 # Extract text from response
@@ -222,7 +271,7 @@ class ContextAnalyzerAgent(BaseAgent):
                     conflict_value = conflict_value or content
 
                 specs_for_conflict_check.append({
-                    'category': spec_data.get('category', question_data['category']),
+                    'category': spec_data.get('category', context.question_category),
                     'key': conflict_key,
                     'value': conflict_value,
                     'confidence': spec_data.get('confidence', 0.9)
@@ -238,8 +287,9 @@ class ContextAnalyzerAgent(BaseAgent):
                     agent_id='conflict',
                     action='detect_conflicts',
                     data={
-                        'project_id': str(project_data['id']),
+                        'project_id': str(context.project_id),
                         'new_specs': specs_for_conflict_check,
+                        'existing_specs': context.existing_specs,
                         'source_id': str(question_id)
                     }
                 )
@@ -247,7 +297,7 @@ class ContextAnalyzerAgent(BaseAgent):
                 # If conflicts detected, return them without saving
                 if conflict_result.get('conflicts_detected'):
                     self.logger.warning(
-                        f"Conflicts detected for project {project_data['id']}: "
+                        f"Conflicts detected for project {context.project_id}: "
                         f"{len(conflict_result.get('conflicts', []))} conflicts"
                     )
                     conflicts_detected = True
@@ -280,11 +330,11 @@ class ContextAnalyzerAgent(BaseAgent):
                     # Generate key from first few words
                     key_words = content[:50].lower().replace(' ', '_')
                     key_words = ''.join(c for c in key_words if c.isalnum() or c == '_')
-                    spec_key = spec_key or key_words or f"spec_{question_data['category']}"
+                    spec_key = spec_key or key_words or f"spec_{context.question_category}"
                     spec_value = spec_value or content or spec_key
 
                 processed_specs.append({
-                    'category': spec_data.get('category', question_data['category']),
+                    'category': spec_data.get('category', context.question_category),
                     'key': spec_key,
                     'value': spec_value,
                     'content': spec_data.get('content'),
@@ -298,8 +348,7 @@ class ContextAnalyzerAgent(BaseAgent):
             saved_specs = []
             for spec_data in processed_specs:
                 spec = Specification(
-                    project_id=project_data['id'],
-                    session_id=session_id,
+                    project_id=context.project_id,
                     category=spec_data['category'],
                     key=spec_data['key'],
                     value=spec_data['value'],
@@ -308,6 +357,7 @@ class ContextAnalyzerAgent(BaseAgent):
                     confidence=Decimal(str(spec_data['confidence'])),
                     is_current=True,
                     spec_metadata={
+                        'session_id': str(session_id),
                         'question_id': str(question_id),
                         'reasoning': spec_data['reasoning']
                     }
@@ -324,17 +374,18 @@ class ContextAnalyzerAgent(BaseAgent):
                 "Specifications extracted and saved",
                 count=len(saved_specs),
                 success=True,
-                question_category=question_data['category']
+                question_category=context.question_category
             )
 
-            # Refresh to get IDs
+            # Refresh to get IDs, and serialize before the next commit expires them
             for spec in saved_specs:
                 db.refresh(spec)
+            saved_specs_data = [spec.to_dict() for spec in saved_specs]
 
             # Update maturity score (need fresh project query)
-            project = db.query(Project).filter(Project.id == project_data['id']).first()
+            project = db.query(Project).filter(Project.id == context.project_id).first()
             old_maturity = project.maturity_score
-            new_maturity = self._calculate_maturity(project_data['id'], db)
+            new_maturity = self._calculate_maturity(context.project_id, db)
             project.maturity_score = new_maturity
             db.commit()
             db.close()
@@ -354,7 +405,7 @@ class ContextAnalyzerAgent(BaseAgent):
             return {
                 'success': True,
                 'specs_extracted': len(saved_specs),
-                'specifications': [s.to_dict() for s in saved_specs],
+                'specifications': saved_specs_data,
                 'maturity_score': float(new_maturity)
             }
 
@@ -407,19 +458,59 @@ class ContextAnalyzerAgent(BaseAgent):
             }
         }
 
-    def _build_extraction_prompt(
+    def _load_context(
         self,
-        question: Question,
-        answer: str,
-        existing_specs: List[Specification]
-    ) -> str:
+        db,
+        session_id: str,
+        question_id: str
+    ) -> Tuple[Optional[AnswerContext], Optional[Dict[str, Any]]]:
+        """
+        Load the answer context when the caller did not provide one.
+
+        Args:
+            db: Database session
+            session_id: Session UUID
+            question_id: Question UUID
+
+        Returns:
+            (context, None) on success, (None, error response) otherwise
+        """
+        session = db.query(Session).filter(Session.id == session_id).first()
+        if not session:
+            self.logger.warning(f"Session not found: {session_id}")
+            return None, {
+                'success': False,
+                'error': f'Session not found: {session_id}',
+                'error_code': 'SESSION_NOT_FOUND'
+            }
+
+        question = db.query(Question).filter(Question.id == question_id).first()
+        if not question:
+            self.logger.warning(f"Question not found: {question_id}")
+            return None, {
+                'success': False,
+                'error': f'Question not found: {question_id}',
+                'error_code': 'QUESTION_NOT_FOUND'
+            }
+
+        project = db.query(Project).filter(Project.id == session.project_id).first()
+        if not project:
+            self.logger.warning(f"Project not found: {session.project_id}")
+            return None, {
+                'success': False,
+                'error': f'Project not found: {session.project_id}',
+                'error_code': 'PROJECT_NOT_FOUND'
+            }
+
+        return AnswerContext.from_models(db, session, project, question), None
+
+    def _build_extraction_prompt(self, context: AnswerContext, answer: str) -> str:
         """
         Build prompt for specification extraction.
 
         Args:
-            question: Question instance
+            context: Loaded answer context (question and existing specs)
             answer: User's answer
-            existing_specs: List of existing specifications
 
         Returns:
             Prompt string for Claude API
@@ -427,15 +518,15 @@ class ContextAnalyzerAgent(BaseAgent):
         prompt = f"""Extract structured specifications from the user's answer to a question.
 
 QUESTION ASKED:
-"{question.text}"
+"{context.question_text}"
 
-QUESTION CATEGORY: {question.category}
+QUESTION CATEGORY: {context.question_category}
 
 USER ANSWER:
 "{answer}"
 
 EXISTING SPECIFICATIONS:
-{self._format_existing_specs(existing_specs[:30])}
+{self._format_existing_specs(context.existing_specs[:30])}
 
 TASK:
 Extract ALL specifications mentioned in the answer. Be thorough - extract:
@@ -488,12 +579,12 @@ IMPORTANT:
 
         return prompt
 
-    def _format_existing_specs(self, specs: List[Specification]) -> str:
+    def _format_existing_specs(self, specs: List[Dict[str, Any]]) -> str:
         """
         Format existing specifications for prompt.
 
         Args:
-            specs: List of specifications
+            specs: Specification dicts from AnswerContext.existing_specs
 
         Returns:
             Formatted string
@@ -503,7 +594,7 @@ IMPORTANT:
 
         lines = []
         for spec in specs:
-            lines.append(f"- [{spec.category}] {spec.content}")
+            lines.append(f"- [{spec['category']}] {spec['content']}")
 
         return "\n".join(lines)
 
@@ -511,6 +602,9 @@ IMPORTANT:
         """
         Calculate project maturity based on specification coverage.
 
+        Reads the per-category aggregates (project_spec_stats), so the cost
+        does not grow with the number of specifications.
+
         Args:
             project_id: Project UUID
             db: Database session
@@ -518,29 +612,10 @@ IMPORTANT:
         Returns:
             Maturity score (0-100)
         """
-        specs = db.query(Specification).filter(
-            Specification.project_id == project_id,
-            Specification.is_current == True
-        ).all()
-
-        # Count per category with confidence weighting
-        category_scores = {}
-        for spec in specs:
-            category = spec.category
-            if category not in category_scores:
-                category_scores[category] = 0
-
-            # Add confidence-weighted score
-            confidence = float(spec.confidence) if spec.confidence else 0.9
-            category_scores[category] += confidence
-
-        # Calculate weighted maturity
-        total_weight = sum(CATEGORY_TARGETS.values())  # 90
-        total_score = 0
-
-        for category, max_score in CATEGORY_TARGETS.items():
-            score = min(category_scores.get(category, 0), max_score)
-            total_score += score
+        # Confidence-weighted score per category
+        category_scores = {
+            category: stats['confidence_sum']
+            for category, stats in get_category_stats(db, project_id).items()
+        }
 
-        maturity = (total_score / total_weight) * 100
-        return round(maturity)
+        return maturity_from_category_scores(category_scores)
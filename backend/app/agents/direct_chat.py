@@ -9,8 +9,9 @@ This agent enables natural conversation mode alongside Socratic questioning:
 """
 import logging
 from datetime import datetime, timezone
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
+from ..core.llm_streaming import StreamLatency, StreamTimer
 from ..models import ConversationHistory, Project, Session, Specification
 from .base import BaseAgent
 
@@ -30,6 +31,7 @@ class DirectChatAgent(BaseAgent):
         """Initialize Direct Chat Agent"""
         super().__init__(agent_id, name, services)
         self.logger = logging.getLogger(__name__)
+        self.stream_latency = StreamLatency()
 
     def get_capabilities(self) -> List[str]:
         """Return list of capabilities this agent provides"""
@@ -65,6 +67,106 @@ class DirectChatAgent(BaseAgent):
                 'maturity_score': int
             }
         """
+        turn, error = self._prepare_chat_turn(data)
+        if error:
+            return error
+
+        if turn['response'] is None:
+            # Handle as conversational chat using NLU chat method (with released DB)
+            turn['response'] = self.services.get_nlu_service().chat(
+                turn['message'],
+                system_prompt=turn['system_prompt'],
+                conversation_context=turn['conversation_messages'],
+                usage_context=turn['usage_context']
+            )
+
+        return self._finish_chat_turn(turn)
+
+    def stream_chat_message(self, data: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """
+        Streaming variant of process_chat_message for the SSE chat endpoint.
+
+        The reply is streamed from Claude as it is generated; specification
+        extraction and history persistence run once the Claude stream has
+        closed, and their result is sent as the final event. If the client
+        disconnects first, the reply as far as it was streamed is still
+        persisted, on a detached thread.
+
+        Args:
+            data: Same as _process_chat_message
+
+        Yields:
+            {'event': 'token', 'text': str} for each piece of the reply, then
+            {'event': 'done', ...result of _process_chat_message, 'timing': {...}}
+            or {'event': 'error', 'error': str}
+        """
+        self.stats['requests_processed'] += 1
+        self.stats['last_activity'] = datetime.now(timezone.utc).isoformat()
+
+        turn = None
+        pieces = []
+        finished = False
+        try:
+            turn, error = self._prepare_chat_turn(data)
+            if error:
+                self.stats['requests_failed'] += 1
+                yield {'event': 'error', **error}
+                return
+
+            timer = StreamTimer("Chat response streamed", model=self.services.get_nlu_service().current_model)
+            if turn['response'] is not None:
+                # Operation results are not generated text; send them whole
+                timer.mark()
+                yield {'event': 'token', 'text': turn['response']}
+            else:
+                for text in self.services.get_nlu_service().chat_stream(
+                    turn['message'],
+                    system_prompt=turn['system_prompt'],
+                    conversation_context=turn['conversation_messages'],
+                    usage_context=turn['usage_context']
+                ):
+                    timer.mark()
+                    pieces.append(text)
+                    yield {'event': 'token', 'text': text}
+                turn['response'] = "".join(pieces)
+            timing = timer.finish(self.stream_latency)
+            self.stats['streaming'] = self.stream_latency.summary()
+
+            result = self._finish_chat_turn(turn)
+            finished = True
+            self.stats['requests_succeeded'] += 1
+            yield {'event': 'done', **result, 'timing': timing}
+
+        except GeneratorExit:
+            # Client disconnected mid-reply: keep the turn as far as it got
+            if turn is not None and not finished:
+                if turn['response'] is None:
+                    turn['response'] = "".join(pieces)
+                if turn['response']:
+                    self.logger.info(f"Chat stream closed early; saving {len(turn['response'])} chars of reply")
+                    self._run_detached("chat-finish", lambda: self._finish_chat_turn(turn))
+            raise
+
+        except Exception as e:
+            self.logger.error(f"Error streaming chat message: {e}", exc_info=True)
+            self.stats['requests_failed'] += 1
+            self.stats['errors_encountered'] += 1
+            yield {'event': 'error', 'success': False, 'error': str(e)}
+
+    def _prepare_chat_turn(self, data: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """
+        Load context and parse intent for one chat message.
+
+        Operation requests are executed here; conversational messages are
+        left for the caller to answer (blocking or streamed).
+
+        Args:
+            data: See _process_chat_message
+
+        Returns:
+            (turn, None) or (None, error result). turn['response'] is the
+            operation result text, or None when a chat reply is still needed.
+        """
         session_id = data['session_id']
         user_id = data['user_id']
         message = data['message']
@@ -77,7 +179,7 @@ class DirectChatAgent(BaseAgent):
         session = specs_session.query(Session).get(session_id)
         if not session:
             specs_session.close()
-            return {'success': False, 'error': 'Session not found'}
+            return None, {'success': False, 'error': 'Session not found'}
 
         # Get project_id from session if not provided
         if not project_id:
@@ -85,7 +187,7 @@ class DirectChatAgent(BaseAgent):
 
         if session.mode != 'direct_chat':
             specs_session.close()
-            return {
+            return None, {
                 'success': False,
                 'error': f'Session is in {session.mode} mode, not direct_chat mode'
             }
@@ -111,11 +213,23 @@ class DirectChatAgent(BaseAgent):
             'current_session': str(session_id)
         }
 
-        # Parse user intent using NLU (no DB connection held)
-        intent = nlu_service.parse_intent(message, nlu_context)
+        # LLM usage of this turn is recorded against the user, project and session
+        usage_context = {'user_id': user_id, 'project_id': project_id, 'session_id': session_id}
 
-        # Determine response based on intent type
-        chat_response = ""
+        # Parse user intent using NLU (no DB connection held)
+        intent = nlu_service.parse_intent(message, nlu_context, usage_context=usage_context)
+
+        turn = {
+            'session_id': session_id,
+            'user_id': user_id,
+            'message': message,
+            'project_id': project_id,
+            'usage_context': usage_context,
+            'initial_maturity_score': initial_maturity_score,
+            'response': None,
+            'system_prompt': None,
+            'conversation_messages': None
+        }
 
         if intent.is_operation:
             # Handle as operation request (with released DB)
@@ -139,10 +253,10 @@ class DirectChatAgent(BaseAgent):
                     chat_response += f"Details: {result['details']}"
             else:
                 chat_response = f"Could not complete that operation: {result.get('error', 'Unknown error')}"
+            turn['response'] = chat_response
         else:
-            # Handle as conversational chat using NLU chat method (with released DB)
             # Build system prompt with project context
-            system_prompt = f"""You are Socrates, an AI assistant helping with specification gathering.
+            turn['system_prompt'] = f"""You are Socrates, an AI assistant helping with specification gathering.
 
 Project context:
 - Project ID: {project_id}
@@ -153,14 +267,28 @@ You help users refine their specifications through conversation. When you identi
 
 Be conversational, helpful, and guide the user toward complete specifications."""
 
-            # Get conversational response using NLU chat method
             # Extract the message list from context dict
             conversation_messages = context.get('recent_messages', []) if isinstance(context, dict) else context
-            chat_response = nlu_service.chat(
-                message,
-                system_prompt=system_prompt,
-                conversation_context=conversation_messages if conversation_messages else None
-            )
+            turn['conversation_messages'] = conversation_messages if conversation_messages else None
+
+        return turn, None
+
+    def _finish_chat_turn(self, turn: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Extract specifications and persist the turn once the reply is complete.
+
+        Args:
+            turn: Prepared turn (see _prepare_chat_turn) with 'response' set
+
+        Returns:
+            Result of _process_chat_message
+        """
+        session_id = turn['session_id']
+        user_id = turn['user_id']
+        message = turn['message']
+        project_id = turn['project_id']
+        initial_maturity_score = turn['initial_maturity_score']
+        chat_response = turn['response']
 
         # PHASE 3: Extract specifications from conversation (with released DB)
         specs_extracted = 0
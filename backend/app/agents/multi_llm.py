@@ -19,7 +19,7 @@ class MultiLLMManager(BaseAgent):
     - add_api_key: Add encrypted API key for provider
     - get_usage_stats: Get LLM usage statistics
     - set_project_llm: Set default LLM for project (placeholder)
-    - call_llm: Call specified LLM provider (placeholder)
+    - call_llm: Call an LLM provider through the LLM gateway
     """
 
     def __init__(self, agent_id: str, name: str, services: ServiceContainer):
@@ -293,14 +293,19 @@ class MultiLLMManager(BaseAgent):
 
     def _call_llm(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """
-        Call specified LLM provider (placeholder).
+        Call an LLM provider through the LLM gateway.
+
+        The gateway picks the provider from the model name (claude-* ->
+        anthropic, gpt-* -> openai) unless 'provider' names one, and records
+        token usage for user_id in llm_usage_tracking.
 
         Args:
             data: {
-                'provider': str ('claude' | 'openai' | 'gemini' | 'ollama'),
-                'model': str,
+                'provider': str (optional: 'anthropic' | 'openai' | 'fake'),
+                'model': str (optional, default LLM_DEFAULT_MODEL),
                 'prompt': str,
-                'max_tokens': int,
+                'system': str (optional),
+                'max_tokens': int (optional, default 1024),
                 'user_id': UUID,
                 'project_id': UUID (optional)
             }
@@ -309,23 +314,71 @@ class MultiLLMManager(BaseAgent):
             {
                 'success': bool,
                 'response': str,
+                'model': str,
+                'provider': str,
                 'tokens_used': int,
                 'cost': float
             }
         """
-        # TODO: Implement actual LLM provider calls
-        # This would:
-        # 1. Get user's API key for provider (if needed)
-        # 2. Call appropriate provider API
-        # 3. Track usage in LLMUsageTracking table
-        # 4. Return response
+        from ..services.llm_gateway import LLMGatewayError, estimate_cost
+
+        prompt = data.get('prompt')
+        user_id = data.get('user_id')
+
+        if not prompt or not user_id:
+            return {
+                'success': False,
+                'error': 'prompt and user_id are required',
+                'error_code': 'VALIDATION_ERROR'
+            }
+
+        request = {
+            'model': data.get('model') or self.services.get_default_model(),
+            'max_tokens': data.get('max_tokens', 1024),
+            'messages': [{'role': 'user', 'content': prompt}]
+        }
+        if data.get('system'):
+            request['system'] = data['system']
+
+        provider = data.get('provider')
+        if provider == 'claude':
+            provider = 'anthropic'
 
-        provider = data.get('provider', 'claude')
+        try:
+            result = self.services.get_llm_gateway().complete(
+                provider=provider,
+                usage_context={'user_id': user_id, 'project_id': data.get('project_id')},
+                **request
+            )
+        except ValueError as e:
+            return {
+                'success': False,
+                'error': str(e),
+                'error_code': 'VALIDATION_ERROR'
+            }
+        except LLMGatewayError as e:
+            return {
+                'success': False,
+                'error': str(e),
+                'error_code': 'API_ERROR'
+            }
+        except Exception as e:
+            self.logger.error(f"LLM call failed: {e}", exc_info=True)
+            return {
+                'success': False,
+                'error': f'LLM call failed: {str(e)}',
+                'error_code': 'API_ERROR'
+            }
 
+        cost = estimate_cost(result.model, result.tokens_input, result.tokens_output)
         return {
             'success': True,
-            'message': f'LLM call to {provider} not yet implemented',
-            'note': 'Use SocraticCounselorAgent for Claude interactions'
+            'response': result.text,
+            'model': result.model,
+            'provider': result.provider,
+            'tokens_used': result.tokens_input + result.tokens_output,
+            'cost': float(cost) if cost is not None else None,
+            'latency_ms': result.latency_ms
         }
 
     def _encrypt_api_key(self, api_key: str) -> str:
@@ -12,11 +12,14 @@ is handled by the QuestionGenerator in the Socrates library.
 This separation enables testing without database and library extraction.
 """
 import json
+import uuid
+from datetime import datetime, timezone
 from decimal import Decimal
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 # Import from Socrates library instead of local core
 from socrates import (
+    BiasDetectionEngine,
     QuestionGenerator,
     UserBehaviorData,
     project_db_to_data,
@@ -27,7 +30,9 @@ from sqlalchemy import and_
 
 from ..core.action_logger import log_question
 from ..core.dependencies import ServiceContainer
+from ..core.llm_streaming import JsonStringFieldStream, StreamLatency, StreamTimer, stream_text
 from ..models.project import Project
+from ..models.quality_metric import QualityMetric
 from ..models.question import Question
 from ..models.session import Session
 from ..models.specification import Specification
@@ -40,7 +45,7 @@ class SocraticCounselorAgent(BaseAgent):
 
     Capabilities:
     - generate_question: Generate next question based on project context
-    - generate_questions_batch: Generate multiple questions at once
+    - generate_questions_batch: Generate multiple questions in one Claude call
 
     Architecture:
     - This agent handles: Database I/O, API orchestration, validation, persistence
@@ -48,10 +53,17 @@ class SocraticCounselorAgent(BaseAgent):
     - Clear separation enables testing without database and library extraction
     """
 
+    # Largest batch generated in one Claude call
+    MAX_BATCH_QUESTIONS = 10
+    # Output budget per question of a batch (text + context + JSON framing)
+    BATCH_TOKENS_PER_QUESTION = 250
+
     def __init__(self, agent_id: str = 'socratic', name: str = 'Socratic Counselor', services: ServiceContainer = None):
-        """Initialize agent with question generator"""
+        """Initialize agent with question generator and bias detection engine"""
         super().__init__(agent_id, name, services)
         self.question_generator = QuestionGenerator(self.logger)
+        self.bias_engine = BiasDetectionEngine(self.logger)
+        self.stream_latency = StreamLatency()
 
     def get_capabilities(self) -> List[str]:
         """Return list of capabilities"""
@@ -76,13 +88,163 @@ class SocraticCounselorAgent(BaseAgent):
         Returns:
             {'success': bool, 'question': dict, 'question_id': str}
         """
+        prepared, error = self._prepare_question(data)
+        if error:
+            return error
+
+        # PHASE 3: Call Claude API (NO DATABASE CONNECTION HELD!)
+        try:
+            self.logger.debug(
+                f"Calling Claude API to generate question for project {prepared['project_id']}, "
+                f"category: {prepared['next_category']} (DB released)"
+            )
+            # Same coverage state and history -> same prompt: reuse the answer
+            response = self.services.get_claude_client().messages.create(
+                **self._question_request(prepared), cache=True
+            )
+            response_text = response.content[0].text
+            self.logger.debug(f"Claude API response received: {len(response_text)} chars (DB still released)")
+        except Exception as e:
+            self.logger.error(f"Claude API error: {e}", exc_info=True)
+            return {
+                'success': False,
+                'error': f'Claude API error: {str(e)}',
+                'error_code': 'API_ERROR'
+            }
+
+        return self._finish_question(prepared, response_text)
+
+    def stream_question(self, data: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """
+        Streaming variant of generate_question for the SSE next-question endpoint.
+
+        Claude returns the question as JSON; the "text" field is decoded
+        while it is generated and streamed. The bias check and saving run
+        after the Claude stream has closed, so a streamed question can
+        still be rejected by the final event. If the client disconnects
+        first, the rest of the (JSON) response is read and the question
+        saved on a detached thread, since a partial response cannot be
+        parsed.
+
+        Args:
+            data: Same as _generate_question
+
+        Yields:
+            {'event': 'token', 'text': str} for each piece of the question
+            text, then {'event': 'done', ...result of _generate_question,
+            'timing': {...}} or {'event': 'error', ...error result}
+        """
+        self.stats['requests_processed'] += 1
+        self.stats['last_activity'] = datetime.now(timezone.utc).isoformat()
+
+        prepared, error = self._prepare_question(data)
+        if error:
+            self.stats['requests_failed'] += 1
+            yield {'event': 'error', **error}
+            return
+
+        request = self._question_request(prepared)
+        timer = StreamTimer("Question streamed", model=request['model'])
+        question_text = JsonStringFieldStream('text')
+        pieces = []
+        try:
+            deltas = stream_text(self.services.get_claude_client(), **request)
+            for delta in deltas:
+                pieces.append(delta)
+                visible = question_text.feed(delta)
+                if visible:
+                    # TTFT counts from the first character the user can see
+                    timer.mark()
+                    yield {'event': 'token', 'text': visible}
+        except GeneratorExit:
+            def finish():
+                pieces.extend(deltas)
+                self._finish_question(prepared, "".join(pieces))
+
+            self.logger.info("Question stream closed early; finishing it detached")
+            self._run_detached("question-finish", finish)
+            raise
+        except Exception as e:
+            self.logger.error(f"Claude API error: {e}", exc_info=True)
+            self.stats['requests_failed'] += 1
+            self.stats['errors_encountered'] += 1
+            yield {'event': 'error', 'success': False, 'error': f'Claude API error: {str(e)}', 'error_code': 'API_ERROR'}
+            return
+        timing = timer.finish(self.stream_latency)
+        self.stats['streaming'] = self.stream_latency.summary()
+
+        result = self._finish_question(prepared, "".join(pieces))
+        if result.get('success'):
+            self.stats['requests_succeeded'] += 1
+            yield {'event': 'done', **result, 'timing': timing}
+        else:
+            self.stats['requests_failed'] += 1
+            yield {'event': 'error', **result}
+
+    def _question_request(self, prepared: Dict[str, Any]) -> Dict[str, Any]:
+        """Messages API arguments for generating the prepared question."""
+        return {
+            'model': self.services.get_default_model(),
+            'max_tokens': 500,
+            'messages': [{"role": "user", "content": prepared['prompt']}],
+            'usage_context': {
+                'user_id': prepared.get('user_id'),
+                'project_id': prepared['project_id'],
+                'session_id': prepared['session_id']
+            }
+        }
+
+    def _prepare_question(self, data: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """
+        Load project context and build the question prompt.
+
+        Args:
+            data: See _generate_question
+
+        Returns:
+            (prepared, None) with project_id, session_id, next_category and
+            prompt, or (None, error result)
+        """
+        context, error = self._load_question_context(data)
+        if error:
+            return None, error
+
+        # Identify next category to focus on (lowest coverage)
+        next_category = self.question_generator.identify_next_category(context['coverage'])
+
+        # Build prompt for Claude using QuestionGenerator (no DB needed)
+        prompt = self.question_generator.build_question_generation_prompt(
+            context['project_data'], context['specs_data'], context['questions_data'],
+            next_category, context['user_behavior']
+        )
+
+        return {
+            'project_id': context['project_id'],
+            'session_id': context['session_id'],
+            'user_id': context['user_id'],
+            'next_category': next_category,
+            'prompt': prompt
+        }, None
+
+    def _load_question_context(self, data: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """
+        Load everything question prompts are built from, in one DB session.
+
+        Args:
+            data: {'project_id': str (UUID), 'session_id': str (UUID)}
+
+        Returns:
+            (context, None) with project_id, session_id, user_id,
+            project_data, specs_data, questions_data, coverage and
+            user_behavior, or (None, error result)
+        """
         project_id = data.get('project_id')
         session_id = data.get('session_id')
 
         # Validate
         if not project_id or not session_id:
             self.logger.warning("Validation error: missing project_id or session_id")
-            return {
+            return None, {
                 'success': False,
                 'error': 'project_id and session_id are required',
                 'error_code': 'VALIDATION_ERROR'
@@ -99,7 +261,7 @@ class SocraticCounselorAgent(BaseAgent):
             if not project:
                 self.logger.warning(f"Project not found: {project_id}")
                 db.close()
-                return {
+                return None, {
                     'success': False,
                     'error': f'Project not found: {project_id}',
                     'error_code': 'PROJECT_NOT_FOUND'
@@ -110,7 +272,7 @@ class SocraticCounselorAgent(BaseAgent):
             if not session:
                 self.logger.warning(f"Session not found: {session_id}")
                 db.close()
-                return {
+                return None, {
                     'success': False,
                     'error': f'Session not found: {session_id}',
                     'error_code': 'SESSION_NOT_FOUND'
@@ -135,17 +297,6 @@ class SocraticCounselorAgent(BaseAgent):
             specs_data = specs_db_to_data(existing_specs)
             questions_data = questions_db_to_data(previous_questions)
 
-            # Calculate coverage per category
-            coverage = self.question_generator.calculate_coverage(specs_data)
-
-            # Identify next category to focus on (lowest coverage)
-            next_category = self.question_generator.identify_next_category(coverage)
-
-            # Build prompt for Claude using QuestionGenerator (no DB needed)
-            prompt = self.question_generator.build_question_generation_prompt(
-                project_data, specs_data, questions_data, next_category, None  # User behavior fetched after DB closes
-            )
-
             # CRITICAL: Close DB connection BEFORE external API calls
             db.close()
             self.logger.debug(f"Database connection closed before external API calls")
@@ -173,52 +324,62 @@ class SocraticCounselorAgent(BaseAgent):
                 self.logger.warning(f"Could not retrieve user learning profile: {e}")
                 user_behavior = None
 
-            # Rebuild prompt with user behavior (if available)
-            if user_behavior:
-                prompt = self.question_generator.build_question_generation_prompt(
-                    project_data, specs_data, questions_data, next_category, user_behavior
-                )
+            return {
+                'project_id': project_id,
+                'session_id': session_id,
+                'user_id': project_user_id,
+                'project_data': project_data,
+                'specs_data': specs_data,
+                'questions_data': questions_data,
+                # Calculate coverage per category
+                'coverage': self.question_generator.calculate_coverage(specs_data),
+                'user_behavior': user_behavior
+            }, None
 
-            # PHASE 3: Call Claude API (NO DATABASE CONNECTION HELD!)
-            question_data = None
-            try:
-                self.logger.debug(f"Calling Claude API to generate question for project {project_id}, category: {next_category} (DB released)")
-                model_name = "claude-sonnet-4-5-20250929"
-                response = self.services.get_claude_client().messages.create(
-                    model=model_name,
-                    max_tokens=500,
-                    messages=[{"role": "user", "content": prompt}]
-                )
+        except Exception as e:
+            self.logger.error(f"Error generating question: {e}", exc_info=True)
+            self._cleanup_db(db)
+            return None, {
+                'success': False,
+                'error': f'Failed to generate question: {str(e)}',
+                'error_code': 'DATABASE_ERROR'
+            }
 
-                # Extract and parse response using QuestionGenerator
-                response_text = response.content[0].text
-                self.logger.debug(f"Claude API response received: {len(response_text)} chars (DB still released)")
+    def _finish_question(self, prepared: Dict[str, Any], response_text: str) -> Dict[str, Any]:
+        """
+        Parse, bias-check and save a generated question.
 
-                # Use QuestionGenerator to parse response (handles markdown stripping, JSON parsing)
-                question_data = self.question_generator.parse_question_response(response_text, next_category)
+        Args:
+            prepared: Result of _prepare_question
+            response_text: Full Claude response
 
-            except json.JSONDecodeError as e:
-                self.logger.error(f"Failed to parse Claude response as JSON: {e}", exc_info=True)
-                return {
-                    'success': False,
-                    'error': 'Failed to parse question from Claude API',
-                    'error_code': 'PARSE_ERROR'
-                }
-            except ValueError as e:
-                self.logger.error(f"Invalid question data from Claude: {e}", exc_info=True)
-                return {
-                    'success': False,
-                    'error': 'Invalid question data from Claude API',
-                    'error_code': 'PARSE_ERROR'
-                }
-            except Exception as e:
-                self.logger.error(f"Claude API error: {e}", exc_info=True)
-                return {
-                    'success': False,
-                    'error': f'Claude API error: {str(e)}',
-                    'error_code': 'API_ERROR'
-                }
+        Returns:
+            Result of _generate_question
+        """
+        project_id = prepared['project_id']
+        session_id = prepared['session_id']
+
+        # Use QuestionGenerator to parse response (handles markdown stripping, JSON parsing)
+        try:
+            question_data = self.question_generator.parse_question_response(response_text, prepared['next_category'])
+        except json.JSONDecodeError as e:
+            self.logger.error(f"Failed to parse Claude response as JSON: {e}", exc_info=True)
+            return {
+                'success': False,
+                'error': 'Failed to parse question from Claude API',
+                'error_code': 'PARSE_ERROR'
+            }
+        except ValueError as e:
+            self.logger.error(f"Invalid question data from Claude: {e}", exc_info=True)
+            return {
+                'success': False,
+                'error': 'Invalid question data from Claude API',
+                'error_code': 'PARSE_ERROR'
+            }
 
+        db = None
+
+        try:
             # PHASE 4: Analyze question for bias (with released DB)
             quality_check_passed = True
             quality_score = Decimal('1.0')
@@ -288,60 +449,169 @@ class SocraticCounselorAgent(BaseAgent):
 
         except Exception as e:
             self.logger.error(f"Error generating question: {e}", exc_info=True)
-            # Attempt to close DB if still open
-            try:
-                if db and hasattr(db, 'is_active') and db.is_active:
-                    db.rollback()
-                    db.close()
-            except Exception as cleanup_error:
-                self.logger.debug(f"Error during exception cleanup: {cleanup_error}")
-
+            self._cleanup_db(db)
             return {
                 'success': False,
                 'error': f'Failed to generate question: {str(e)}',
                 'error_code': 'DATABASE_ERROR'
             }
 
-        finally:
-            pass  # Session managed by caller/dependency injection
+    def _cleanup_db(self, db) -> None:
+        """Roll back and close a session left open by an error."""
+        try:
+            if db and hasattr(db, 'is_active') and db.is_active:
+                db.rollback()
+                db.close()
+        except Exception as cleanup_error:
+            self.logger.debug(f"Error during exception cleanup: {cleanup_error}")
 
     def _generate_questions_batch(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Generate multiple questions at once.
 
+        Context is loaded once and Claude is asked for all questions in a
+        single structured response, each focused on a different
+        low-coverage category. Every question is checked with
+        BiasDetectionEngine; blocked ones are reported in 'rejected'. The
+        accepted questions and their bias metrics are saved in one commit.
+
         Args:
             data: {
                 'project_id': str (UUID),
                 'session_id': str (UUID),
-                'count': int (default: 5)
+                'count': int (default: 5, max: MAX_BATCH_QUESTIONS)
             }
 
         Returns:
-            {'success': bool, 'questions': list, 'count': int}
+            {'success': bool, 'questions': list, 'count': int, 'rejected': list}
         """
-        project_id = data.get('project_id')
-        session_id = data.get('session_id')
-        count = data.get('count', 5)
-
-        if not project_id or not session_id:
+        try:
+            count = int(data.get('count') or 5)
+        except (TypeError, ValueError):
+            self.logger.warning(f"Validation error: invalid count {data.get('count')!r}")
             return {
                 'success': False,
-                'error': 'project_id and session_id are required',
+                'error': 'count must be an integer',
                 'error_code': 'VALIDATION_ERROR'
             }
+        count = max(1, min(count, self.MAX_BATCH_QUESTIONS))
+
+        context, error = self._load_question_context(data)
+        if error:
+            return error
+        project_id = context['project_id']
+        session_id = context['session_id']
+
+        categories = self.question_generator.select_batch_categories(context['coverage'], count)
+        prompt = self.question_generator.build_batch_question_prompt(
+            context['project_data'], context['specs_data'], context['questions_data'],
+            categories, context['user_behavior']
+        )
+
+        # PHASE 3: One Claude call for the whole batch (NO DATABASE CONNECTION HELD!)
+        # Not cached: a retry after rejected or unsaved questions needs a fresh batch
+        try:
+            self.logger.debug(f"Calling Claude API to generate {count} questions for project {project_id}: {categories}")
+            response = self.services.get_claude_client().messages.create(
+                model=self.services.get_default_model(),
+                max_tokens=self.BATCH_TOKENS_PER_QUESTION * count,
+                messages=[{"role": "user", "content": prompt}],
+                usage_context={'user_id': context['user_id'], 'project_id': project_id, 'session_id': session_id}
+            )
+            response_text = response.content[0].text
+        except Exception as e:
+            self.logger.error(f"Claude API error: {e}", exc_info=True)
+            return {
+                'success': False,
+                'error': f'Claude API error: {str(e)}',
+                'error_code': 'API_ERROR'
+            }
+
+        try:
+            parsed = self.question_generator.parse_batch_question_response(
+                response_text, categories, context['questions_data']
+            )[:count]
+        except (json.JSONDecodeError, ValueError) as e:
+            self.logger.error(f"Failed to parse batch questions from Claude: {e}", exc_info=True)
+            return {
+                'success': False,
+                'error': 'Failed to parse questions from Claude API',
+                'error_code': 'PARSE_ERROR'
+            }
 
-        questions = []
-        for _ in range(count):
-            result = self._generate_question({'project_id': project_id, 'session_id': session_id})
-            if result['success']:
-                questions.append(result['question'])
-            else:
-                # If one fails, return what we have so far
-                break
+        # PHASE 4: Bias check every question (pure logic, no DB)
+        now = datetime.now(timezone.utc)
+        project_uuid = project_id if isinstance(project_id, uuid.UUID) else uuid.UUID(str(project_id))
+        questions, metrics, rejected = [], [], []
+        for question_data in parsed:
+            bias = self.bias_engine.detect_bias_in_question(question_data['text'])
+            metrics.append(QualityMetric(
+                project_id=project_uuid,
+                metric_type='question_bias',
+                metric_value=Decimal(str(bias.bias_score)),
+                threshold=Decimal('0.5'),
+                passed=(bias.bias_score <= 0.5),
+                details={
+                    'question_text': question_data['text'],
+                    'bias_types': bias.bias_types,
+                    'is_blocking': bias.is_blocking
+                },
+                calculated_at=now
+            ))
+            if bias.is_blocking:
+                self.logger.warning(f"Batch question blocked due to bias: {bias.reason}")
+                rejected.append({
+                    'text': question_data['text'],
+                    'category': question_data['category'],
+                    'reason': bias.reason or 'Question has excessive bias',
+                    'suggested_alternatives': bias.suggested_alternatives
+                })
+                continue
+            questions.append(Question(
+                project_id=project_id,
+                session_id=session_id,
+                text=question_data['text'],
+                category=question_data['category'],
+                context=question_data.get('context'),
+                quality_score=Decimal(str(1.0 - bias.bias_score)),
+                created_at=now,
+                updated_at=now
+            ))
+
+        # PHASE 5: Save questions and metrics together (new database connection)
+        db = None
+        try:
+            db = self.services.get_database_specs()
+            db.add_all(questions + metrics)
+            db.flush()
+            # Serialize before commit: committed instances expire and would reload one by one
+            saved = [question.to_dict() for question in questions]
+            db.commit()
+            db.close()
+        except Exception as e:
+            self.logger.error(f"Error saving question batch: {e}", exc_info=True)
+            self._cleanup_db(db)
+            return {
+                'success': False,
+                'error': f'Failed to save questions: {str(e)}',
+                'error_code': 'DATABASE_ERROR'
+            }
+
+        self.logger.info(
+            f"Generated {len(saved)} questions for project {project_id} in one call "
+            f"({len(rejected)} rejected by bias check)"
+        )
+        for question in saved:
+            log_question(
+                "Question generated",
+                category=question['category'],
+                success=True,
+                quality_score=float(question['quality_score'] or 0)
+            )
 
         return {
             'success': True,
-            'questions': questions,
-            'count': len(questions)
+            'questions': saved,
+            'count': len(saved),
+            'rejected': rejected
         }
-
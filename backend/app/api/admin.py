@@ -23,7 +23,10 @@ from ..models.admin_role import AdminRole
 from ..models.admin_user import AdminUser
 from ..models.user import User
 from ..services.analytics_service import AnalyticsService
+from ..services.embedding_service import EmbeddingService
+from ..services.llm_gateway import get_llm_cache_stats, get_llm_gateway_stats
 from ..services.rbac_service import RBACService
+from ..services.usage_writer import get_usage_writer
 
 logger = logging.getLogger(__name__)
 
@@ -107,6 +110,9 @@ def get_stats(
         - Project counts
         - Session counts
         - Agent statistics
+        - Embedding cache hit ratio and saved tokens
+        - LLM gateway calls, retries and circuit state per provider
+        - LLM response cache hit ratio and saved tokens
 
     Example:
         GET /api/v1/admin/stats
@@ -131,7 +137,25 @@ def get_stats(
                 "total_agents": 3,
                 "total_requests": 1234,
                 "agents": [...]
-            }
+            },
+            "embedding_cache": {
+                "hits": 870,
+                "misses": 130,
+                "hit_ratio": 0.87,
+                "saved_tokens": 104400,
+                ...
+            },
+            "llm_gateway": {
+                "anthropic": {"calls": 310, "retries": 4, "in_flight": 2, "circuit": "closed", ...}
+            },
+            "llm_cache": {
+                "hits": 120,
+                "misses": 190,
+                "hit_ratio": 0.3871,
+                "saved_tokens": 412000,
+                ...
+            },
+            "llm_usage_writer": {"added": 310, "written": 300, "batches": 4, "pending": 10, "dropped": 0, ...}
         }
     """
     # Get user counts from auth database
@@ -155,7 +179,11 @@ def get_stats(
             "active": active_users,
             "verified": verified_users
         },
-        "agents": agent_stats
+        "agents": agent_stats,
+        "embedding_cache": EmbeddingService.get_cache_stats(),
+        "llm_gateway": get_llm_gateway_stats(),
+        "llm_cache": get_llm_cache_stats(),
+        "llm_usage_writer": get_usage_writer().get_stats()
     }
 
 
@@ -4,6 +4,7 @@ Handles document upload, listing, deletion, and semantic search
 for knowledge base and RAG integration.
 """
 import logging
+import os
 import uuid
 from typing import Dict, List
 
@@ -13,13 +14,15 @@ from sqlalchemy.orm import Session
 from ..core.database import get_db_auth, get_db_specs
 from ..core.security import get_current_active_user
 from ..models.document_chunk import DocumentChunk
+from ..models.ingestion_job import IngestionJob
 from ..models.knowledge_base_document import KnowledgeBaseDocument
 from ..models.project import Project
 from ..models.user import User
 from ..services.document_parser import DocumentParser
-from ..services.embedding_service import EmbeddingService
+from ..services.ingestion_service import UploadTooLargeError, get_ingestion_queue
 from ..services.rag_service import RAGService
 from ..services.semantic_search_service import SemanticSearchService
+from ..services.vector_index import get_vector_index_manager
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/v1/documents", tags=["documents"])
@@ -29,11 +32,11 @@ router = APIRouter(prefix="/api/v1/documents", tags=["documents"])
 class DocumentUploadResponse:
     """Response for document upload."""
     success: bool
-    document_id: str
+    job_id: str
     filename: str
     file_size: int
-    chunks: int
-    embedding_status: str
+    status: str
+    status_url: str
 
 
 class DocumentResponse:
@@ -75,7 +78,7 @@ class RAGContextResponse:
 
 # ===== Document Upload Endpoints =====
 
-@router.post("/upload")
+@router.post("/upload", status_code=202)
 async def upload_document(
     project_id: str,
     file: UploadFile = File(...),
@@ -83,9 +86,11 @@ async def upload_document(
     db_auth: Session = Depends(get_db_auth),
     db_specs: Session = Depends(get_db_specs)
 ) -> Dict:
-    """Upload and process document for knowledge base.
+    """Upload a document for background processing.
 
-    Parses document, extracts text, creates chunks, and generates embeddings.
+    Spools the file to disk and queues an ingestion job that parses,
+    chunks, embeds and stores the document. Returns immediately; poll
+    GET /api/v1/documents/jobs/{job_id} for progress.
 
     Args:
         project_id: Project ID to associate document with
@@ -95,23 +100,23 @@ async def upload_document(
         db_specs: Specs database session
 
     Returns:
-        Upload status with document ID and chunk count
+        Queued ingestion job
 
     Raises:
-        HTTPException: If project not found, parsing fails, or embedding fails
+        HTTPException: If project not found, file type unsupported, file empty or too large
 
     Example:
         POST /api/v1/documents/upload?project_id=proj_123
         Content-Type: multipart/form-data
 
-        Response:
+        Response (202):
         {
             "success": true,
-            "document_id": "doc_550e8400-e29b-41d4-a716-446655440000",
+            "job_id": "550e8400-e29b-41d4-a716-446655440000",
             "filename": "requirements.pdf",
             "file_size": 102400,
-            "chunks": 45,
-            "embedding_status": "completed"
+            "status": "queued",
+            "status_url": "/api/v1/documents/jobs/550e8400-e29b-41d4-a716-446655440000"
         }
     """
     try:
@@ -124,73 +129,45 @@ async def upload_document(
         if not project:
             raise HTTPException(status_code=404, detail="Project not found")
 
-        # Read file
-        file_bytes = await file.read()
-        if not file_bytes:
-            raise HTTPException(status_code=400, detail="File is empty")
+        filename = file.filename or ""
+        if not DocumentParser.is_supported(filename):
+            raise HTTPException(
+                status_code=400,
+                detail=(
+                    f"Unsupported file type: {DocumentParser.file_extension(filename)}. "
+                    "Supported formats: PDF, DOCX, Markdown, TXT"
+                )
+            )
 
-        # Parse document
+        queue = get_ingestion_queue()
         try:
-            content, chunks = DocumentParser.parse(file.filename, file_bytes)
-        except ValueError as e:
-            raise HTTPException(status_code=400, detail=str(e))
-        except Exception as e:
-            logger.error(f"Document parsing failed: {e}")
-            raise HTTPException(status_code=400, detail=f"Parse error: {str(e)}")
+            path, file_size = await queue.spool(file)
+        except UploadTooLargeError as e:
+            raise HTTPException(status_code=413, detail=str(e))
 
-        if not chunks:
-            raise HTTPException(status_code=400, detail="No text extracted from document")
+        if file_size == 0:
+            os.remove(path)
+            raise HTTPException(status_code=400, detail="File is empty")
 
-        # Generate embeddings
-        embedding_status = "pending"
         try:
-            embeddings = await EmbeddingService.embed_chunks(chunks)
-            embedding_status = "completed"
-        except Exception as e:
-            logger.error(f"Embedding failed: {e}")
-            embeddings = [None] * len(chunks)
-            embedding_status = "failed"
-
-        # Save document to database
-        doc = KnowledgeBaseDocument(
-            project_id=project_id,
-            user_id=current_user.id,
-            filename=file.filename,
-            file_size=len(file_bytes),
-            content_type=file.content_type or "application/octet-stream",
-            content=content
-        )
-        db_specs.add(doc)
-        db_specs.flush()
-
-        # Save chunks with embeddings
-        chunk_records = []
-        for i, (chunk_text, embedding) in enumerate(zip(chunks, embeddings)):
-            chunk_id = str(uuid.uuid4())
-            chunk_record = DocumentChunk(
-                id=chunk_id,
-                document_id=doc.id,
-                chunk_index=i,
-                content=chunk_text,
-                embedding_vector=embedding
-            )
-            db_specs.add(chunk_record)
-            chunk_records.append(chunk_record)
-
-        db_specs.commit()
+            job = queue.create_job(db_specs, project.id, current_user.id, filename, file_size)
+            await queue.submit(job.id, path, filename, file.content_type)
+        except Exception:
+            os.remove(path)
+            raise
 
         logger.info(
-            f"Uploaded document {file.filename} ({len(file_bytes)} bytes) "
-            f"with {len(chunks)} chunks for project {project_id}"
+            f"Queued ingestion job {job.id} for {filename} ({file_size} bytes) "
+            f"in project {project_id}"
         )
 
         return {
             "success": True,
-            "document_id": str(doc.id),
-            "filename": file.filename,
-            "file_size": len(file_bytes),
-            "chunks": len(chunks),
-            "embedding_status": embedding_status
+            "job_id": str(job.id),
+            "filename": filename,
+            "file_size": file_size,
+            "status": job.status,
+            "status_url": f"/api/v1/documents/jobs/{job.id}"
         }
 
     except HTTPException:
@@ -200,6 +177,55 @@ async def upload_document(
         raise HTTPException(status_code=500, detail="Upload failed")
 
 
+@router.get("/jobs/{job_id}")
+async def get_ingestion_job(
+    job_id: str,
+    current_user: User = Depends(get_current_active_user),
+    db_specs: Session = Depends(get_db_specs)
+) -> Dict:
+    """Get progress of a document ingestion job.
+
+    Args:
+        job_id: Ingestion job ID returned by upload
+        current_user: Authenticated user
+        db_specs: Specs database session
+
+    Returns:
+        Job status (queued | processing | completed | failed) and progress
+
+    Raises:
+        HTTPException: If job not found
+
+    Example:
+        GET /api/v1/documents/jobs/550e8400-...
+
+        Response:
+        {
+            "job_id": "550e8400-...",
+            "document_id": "7c9e6679-...",
+            "status": "processing",
+            "chunks_processed": 512,
+            "chunks_embedded": 512,
+            "embedding_status": "pending",
+            ...
+        }
+    """
+    try:
+        job_uuid = uuid.UUID(job_id)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    job = db_specs.query(IngestionJob).filter(
+        IngestionJob.id == job_uuid,
+        IngestionJob.user_id == current_user.id
+    ).first()
+
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    return job.to_dict()
+
+
 # ===== Document Listing & Deletion =====
 
 @router.get("/{project_id}")
@@ -309,9 +335,17 @@ async def delete_document(
             raise HTTPException(status_code=404, detail="Document not found")
 
         filename = doc.filename
+        project_id = str(doc.project_id)
+        document_id = str(doc.id)
         db_specs.delete(doc)
         db_specs.commit()
 
+        try:
+            get_vector_index_manager().remove_document(project_id, document_id, db=db_specs)
+        except Exception as e:
+            logger.error(f"Vector index update failed for project {project_id}: {e}")
+            get_vector_index_manager().invalidate(project_id)
+
         logger.info(f"Deleted document {filename} ({doc_id})")
 
         return {
@@ -559,7 +593,8 @@ async def extract_specs_with_rag(
             answer=answer,
             project_id=project_id,
             spec_type=spec_type,
-            db=db_specs
+            db=db_specs,
+            user_id=str(current_user.id)
         )
 
         return {
@@ -3,17 +3,30 @@
 Handles exporting project specifications in multiple formats (JSON, CSV, Markdown, YAML, HTML).
 """
 import logging
-from typing import Dict
+from typing import Dict, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 from ..core.database import get_db_specs
+from ..core.http_cache import is_not_modified, validator_headers
 from ..core.security import get_current_active_user
 from ..models.project import Project
 from ..models.specification import Specification
 from ..models.user import User
-from ..services.export_service import ExportService
+from ..services.export_cache import (
+    artifact_key,
+    get_export_cache,
+    last_modified,
+)
+from ..services.export_service import (
+    EXPORT_FORMATS,
+    ExportService,
+    iter_project_specifications,
+    stream_project_export,
+)
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/v1/export", tags=["export"])
@@ -85,25 +98,8 @@ async def export_project_specs(
         if not project:
             raise HTTPException(status_code=404, detail="Project not found")
 
-        # Fetch specifications
-        specs_query = db_specs.query(Specification).filter(
-            Specification.project_id == project_id,
-            Specification.is_current == True
-        ).all()
-
-        # Convert to dictionaries for export service
-        specs_data = []
-        for spec in specs_query:
-            specs_data.append({
-                "category": spec.category,
-                "key": spec.key,
-                "value": spec.value,
-                "content": spec.content,
-                "source": spec.source,
-                "confidence": float(spec.confidence) if spec.confidence else None,
-                "created_at": spec.created_at.isoformat() if spec.created_at else None,
-                "updated_at": spec.updated_at.isoformat() if spec.updated_at else None
-            })
+        # Fetch specifications (columns only, in batches)
+        specs_data = list(iter_project_specifications(db_specs, project_id))
 
         # Export using the export service
         exported_content = ExportService.export(
@@ -169,6 +165,107 @@ async def export_project_specs(
         raise HTTPException(status_code=500, detail="Export failed")
 
 
+@router.get("/projects/{project_id}/stream")
+async def stream_project_specs(
+    project_id: str,
+    format: str = Query("json", regex="^(json|csv|markdown|yaml|html)$"),
+    include_metadata: bool = Query(True),
+    group_by_category: bool = Query(True),
+    gzip: bool = Query(False),
+    current_user: User = Depends(get_current_active_user),
+    db_specs: Session = Depends(get_db_specs),
+    if_none_match: Optional[str] = Header(None),
+    if_modified_since: Optional[str] = Header(None)
+) -> Response:
+    """Stream project specifications as a file download.
+
+    The document is written while specification rows are read from the
+    database in batches, so memory use does not grow with project size.
+    With gzip=true the body is compressed on the fly and sent with
+    Content-Encoding: gzip.
+
+    Responses carry an ETag derived from the project's spec revision and
+    the export options. A matching If-None-Match (or a current
+    If-Modified-Since) gets 304 without reading any specification, and
+    an unchanged export is streamed from the artifact cache.
+
+    Args:
+        project_id: Project ID to export
+        format: Export format (json, csv, markdown, yaml, html)
+        include_metadata: Include metadata in export (json, yaml)
+        group_by_category: Group specifications by category (markdown)
+        gzip: Compress the response body
+        current_user: Authenticated user
+        db_specs: Specs database session
+        if_none_match: ETag of a copy the client already has
+        if_modified_since: Last-Modified of a copy the client already has
+
+    Returns:
+        Chunked file download, or 304 if the client's copy is current
+
+    Raises:
+        HTTPException: If project not found
+
+    Example:
+        GET /api/v1/export/projects/proj_123/stream?format=csv&gzip=true
+    """
+    # Verify project ownership
+    project = db_specs.query(Project).filter(
+        Project.id == project_id,
+        Project.user_id == current_user.id
+    ).first()
+
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+
+    key = artifact_key(
+        project, format,
+        include_metadata=include_metadata,
+        group_by_category=group_by_category,
+        gzip=gzip
+    )
+    validators = validator_headers(key.etag, last_modified(project))
+    if is_not_modified(key.etag, last_modified(project), if_none_match, if_modified_since):
+        return Response(status_code=304, headers=validators)
+
+    extension, content_type = EXPORT_FORMATS[format]
+    filename = f"{project.name.replace(' ', '-').lower()}_specs.{extension}"
+    headers = {**validators, "Content-Disposition": f'attachment; filename="{filename}"'}
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+    media_type = f"{content_type}; charset=utf-8"
+
+    cache = get_export_cache()
+    cached = cache.open(key) if cache else None
+    if cached is not None:
+        logger.info(f"Serving cached {format} export of project {project_id}")
+        return StreamingResponse(cache.iter_file(cached), media_type=media_type, headers=headers)
+
+    total = None
+    if format == "html":
+        # The HTML header shows the count before any row is written
+        total = db_specs.query(func.count(Specification.id)).filter(
+            Specification.project_id == project.id,
+            Specification.is_current.is_(True)
+        ).scalar()
+
+    body = stream_project_export(
+        format,
+        project.name,
+        project.id,
+        compress=gzip,
+        include_metadata=include_metadata,
+        group_by_category=group_by_category,
+        total=total
+    )
+    if cache:
+        body = cache.write_through(key, body)
+
+    logger.info(f"Streaming project {project_id} as {format}{' (gzip)' if gzip else ''}")
+
+    return StreamingResponse(body, media_type=media_type, headers=headers)
+
+
 @router.post("/projects/{project_id}/download")
 async def download_project_specs(
     project_id: str,
@@ -213,22 +310,10 @@ async def download_project_specs(
         if not project:
             raise HTTPException(status_code=404, detail="Project not found")
 
-        # Fetch specifications
-        specs_query = db_specs.query(Specification).filter(
-            Specification.project_id == project_id,
-            Specification.is_current == True
-        ).all()
-
-        specs_data = []
-        for spec in specs_query:
-            specs_data.append({
-                "category": spec.category,
-                "key": spec.key,
-                "value": spec.value,
-                "content": spec.content,
-                "source": spec.source,
-                "confidence": float(spec.confidence) if spec.confidence else None,
-            })
+        # Fetch specifications (columns only, in batches)
+        specs_data = list(iter_project_specifications(
+            db_specs, project_id, include_timestamps=False
+        ))
 
         # Generate export
         exported_content = ExportService.export(
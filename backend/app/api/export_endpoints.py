@@ -3,25 +3,111 @@ Export API endpoints.
 
 Provides:
 - Export projects to various formats (Markdown, PDF, JSON, Code)
+
+Markdown and JSON exports carry ETag/Last-Modified validators derived from
+the project's spec revision, answer conditional requests with 304, and
+are served from the export artifact cache while the project is unchanged.
 """
-from typing import Any, Dict
+import uuid
+from typing import Any, Dict, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Path, Response
+from fastapi import APIRouter, Depends, Header, HTTPException, Path, Response
 from sqlalchemy.orm import Session
 
 from ..agents.orchestrator import get_orchestrator
 from ..core.database import get_db_specs
+from ..core.http_cache import is_not_modified, validator_headers
 from ..core.security import get_current_active_user
+from ..models.project import Project
 from ..models.user import User
+from ..services.export_cache import (
+    artifact_key,
+    get_export_cache,
+    last_modified,
+)
 
 router = APIRouter(prefix="/api/v1/projects", tags=["export"])
 
 
+def _cached_agent_export(
+    project_id: str,
+    action: str,
+    media_type: str,
+    filename_suffix: str,
+    db: Session,
+    if_none_match: Optional[str],
+    if_modified_since: Optional[str]
+) -> Response:
+    """
+    Run an ExportAgent action unless the client or the cache has its result.
+
+    Args:
+        project_id: Project ID from the path
+        action: ExportAgent action (export_markdown, export_json)
+        media_type: Response content type
+        filename_suffix: Download name suffix after the project slug (as the agent names it)
+        db: Specs database session
+        if_none_match: If-None-Match header
+        if_modified_since: If-Modified-Since header
+
+    Returns:
+        304, cached artifact, or freshly rendered export
+    """
+    try:
+        project_uuid = uuid.UUID(project_id)
+    except ValueError:
+        raise HTTPException(status_code=404, detail=f"Project not found: {project_id}")
+
+    project = db.query(Project).filter(Project.id == project_uuid).first()
+    if not project:
+        raise HTTPException(status_code=404, detail=f"Project not found: {project_id}")
+
+    key = artifact_key(project, action)
+    headers = validator_headers(key.etag, last_modified(project))
+    if is_not_modified(key.etag, last_modified(project), if_none_match, if_modified_since):
+        return Response(status_code=304, headers=headers)
+
+    cache = get_export_cache()
+    content = cache.read(key) if cache else None
+    filename = f"{project.name.replace(' ', '_').lower()}{filename_suffix}"
+
+    if content is None:
+        orchestrator = get_orchestrator()
+
+        result = orchestrator.route_request(
+            agent_id='export',
+            action=action,
+            data={'project_id': project_id}
+        )
+
+        if not result.get('success'):
+            raise HTTPException(
+                status_code=404 if 'not found' in result.get('error', '').lower() else 400,
+                detail=result.get('error', 'Failed to export project')
+            )
+
+        content = result.get('content', '')
+        filename = result.get('filename', filename)
+        if cache:
+            cache.put(key, content)
+
+    return Response(
+        content=content,
+        media_type=media_type,
+        headers={
+            **headers,
+            "Content-Disposition": f'attachment; filename="{filename}"'
+        }
+    )
+
+
 @router.get("/{project_id}/export/markdown")
 def export_markdown(
     project_id: str = Path(..., description="Project ID"),
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db_specs)
+    db: Session = Depends(get_db_specs),
+    if_none_match: Optional[str] = Header(None),
+    if_modified_since: Optional[str] = Header(None)
 ) -> Response:
     """
     Export project specifications as Markdown.
@@ -30,39 +116,21 @@ def export_markdown(
         project_id: UUID of the project
         current_user: Authenticated user
         db: Database session
+        if_none_match: ETag of a copy the client already has
+        if_modified_since: Last-Modified of a copy the client already has
 
     Returns:
-        Markdown file content
+        Markdown file content, or 304 if the client's copy is current
 
     Example:
         GET /api/v1/projects/abc-123/export/markdown
         Authorization: Bearer <token>
 
-        Response: (Markdown content as text/markdown)
+        Response: (Markdown content as text/markdown, with ETag)
     """
-    orchestrator = get_orchestrator()
-
-    result = orchestrator.route_request(
-        agent_id='export',
-        action='export_markdown',
-        data={'project_id': project_id}
-    )
-
-    if not result.get('success'):
-        raise HTTPException(
-            status_code=404 if 'not found' in result.get('error', '').lower() else 400,
-            detail=result.get('error', 'Failed to export project')
-        )
-
-    content = result.get('content', '')
-    filename = result.get('filename', 'project_specs.md')
-
-    return Response(
-        content=content,
-        media_type="text/markdown",
-        headers={
-            "Content-Disposition": f'attachment; filename="{filename}"'
-        }
+    return _cached_agent_export(
+        project_id, 'export_markdown', "text/markdown", "_specs.md",
+        db, if_none_match, if_modified_since
     )
 
 
@@ -70,7 +138,9 @@ def export_markdown(
 def export_json(
     project_id: str = Path(..., description="Project ID"),
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db_specs)
+    db: Session = Depends(get_db_specs),
+    if_none_match: Optional[str] = Header(None),
+    if_modified_since: Optional[str] = Header(None)
 ) -> Response:
     """
     Export project data as JSON.
@@ -79,39 +149,21 @@ def export_json(
         project_id: UUID of the project
         current_user: Authenticated user
         db: Database session
+        if_none_match: ETag of a copy the client already has
+        if_modified_since: Last-Modified of a copy the client already has
 
     Returns:
-        JSON file content
+        JSON file content, or 304 if the client's copy is current
 
     Example:
         GET /api/v1/projects/abc-123/export/json
         Authorization: Bearer <token>
 
-        Response: (JSON content as application/json)
+        Response: (JSON content as application/json, with ETag)
     """
-    orchestrator = get_orchestrator()
-
-    result = orchestrator.route_request(
-        agent_id='export',
-        action='export_json',
-        data={'project_id': project_id}
-    )
-
-    if not result.get('success'):
-        raise HTTPException(
-            status_code=404 if 'not found' in result.get('error', '').lower() else 400,
-            detail=result.get('error', 'Failed to export project')
-        )
-
-    content = result.get('content', '')
-    filename = result.get('filename', 'project_export.json')
-
-    return Response(
-        content=content,
-        media_type="application/json",
-        headers={
-            "Content-Disposition": f'attachment; filename="{filename}"'
-        }
+    return _cached_agent_export(
+        project_id, 'export_json', "application/json", "_export.json",
+        db, if_none_match, if_modified_since
     )
 
 
@@ -258,7 +258,7 @@ def get_usage_stats(
     Returns usage statistics including token counts, costs, and breakdown by model/provider.
 
     Args:
-        period: Time period for statistics (month, week, day)
+        period: Time period for statistics (day, week, month, year, all)
         current_user: Authenticated user
         db_auth: Auth database session
         db_specs: Specs database session
@@ -300,7 +300,7 @@ def get_usage_stats(
         }
     """
     llm_router = get_llm_router()
-    return llm_router.get_usage_stats(current_user.id, period)
+    return llm_router.get_usage_stats(current_user.id, period, db=db_specs)
 
 
 @router.get("/providers")
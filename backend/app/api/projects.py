@@ -15,12 +15,14 @@ from datetime import datetime
 from typing import Any, Dict, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
 from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
 
 from ..core.database import get_db_auth, get_db_specs
+from ..core.http_cache import content_etag, is_not_modified, validator_headers
 from ..core.security import get_current_active_user
+from ..models.conflict import Conflict
 from ..models.user import User
 from ..repositories import RepositoryService
 from ..services.response_service import ResponseWrapper
@@ -58,6 +60,17 @@ class SetProjectLLMRequest(BaseModel):
     model: str = Field(..., min_length=1)     # claude-3.5-sonnet, gpt-4, etc.
 
 
+class SetProjectChunkingRequest(BaseModel):
+    """Request model for project document chunking overrides (omitted fields use server defaults)."""
+    strategy: Optional[str] = Field(None, pattern="^(sentence|fixed)$")
+    max_tokens: Optional[int] = Field(None, ge=8, le=8192)
+    overlap_tokens: Optional[int] = Field(None, ge=0, le=4096)
+    min_fill: Optional[float] = Field(None, ge=0, le=1)
+    respect_headings: Optional[bool] = None
+    chunk_size: Optional[int] = Field(None, ge=1, le=100000)
+    overlap: Optional[int] = Field(None, ge=0, le=100000)
+
+
 class ProjectResponse(BaseModel):
     """Response model for project data."""
     id: str
@@ -1256,6 +1269,117 @@ def get_project_llm(
     )
 
 
+def _get_owned_project(project_id: str, current_user: User, service: RepositoryService):
+    """Load a project the current user owns, or raise 400/404/403."""
+    try:
+        project_uuid = UUID(project_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid project ID format: {project_id}"
+        )
+
+    project = service.projects.get_by_id(project_uuid)
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Project not found: {project_id}"
+        )
+
+    if str(project.user_id) != str(current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Permission denied: you don't have access to this project"
+        )
+    return project
+
+
+def _chunking_payload(project) -> Dict[str, Any]:
+    from ..services.text_chunker import ChunkingConfig, default_chunking_config
+
+    overrides = project.chunking_config or {}
+    return {
+        "project_id": str(project.id),
+        "overrides": overrides,
+        "effective": ChunkingConfig.from_dict(overrides, base=default_chunking_config()).to_dict(),
+    }
+
+
+@router.get("/{project_id}/chunking")
+def get_project_chunking(
+    project_id: str,
+    current_user: User = Depends(get_current_active_user),
+    service: RepositoryService = Depends(get_repository_service)
+) -> Dict[str, Any]:
+    """
+    Get the document chunking configuration for a project.
+
+    Returns the project's overrides and the effective configuration
+    (overrides applied on top of the server defaults). Applies to
+    documents uploaded after the change; existing chunks are kept.
+
+    Example:
+        GET /api/v1/projects/550e8400-e29b-41d4-a716-446655440000/chunking
+
+        Response:
+        {
+            "success": true,
+            "data": {
+                "project_id": "550e8400-e29b-41d4-a716-446655440000",
+                "overrides": {"max_tokens": 256},
+                "effective": {"strategy": "sentence", "max_tokens": 256, "overlap_tokens": 20, ...}
+            }
+        }
+    """
+    project = _get_owned_project(project_id, current_user, service)
+    return ResponseWrapper.success(
+        data=_chunking_payload(project),
+        message="Project chunking configuration retrieved successfully"
+    )
+
+
+@router.put("/{project_id}/chunking")
+def set_project_chunking(
+    project_id: str,
+    request: SetProjectChunkingRequest,
+    current_user: User = Depends(get_current_active_user),
+    service: RepositoryService = Depends(get_repository_service)
+) -> Dict[str, Any]:
+    """
+    Replace the document chunking overrides for a project.
+
+    Fields left out fall back to the server defaults; an empty body
+    clears all overrides.
+
+    Raises:
+        HTTPException 422: If the combined configuration is invalid
+            (e.g. overlap_tokens >= max_tokens)
+    """
+    from ..services.text_chunker import ChunkingConfig, default_chunking_config
+
+    project = _get_owned_project(project_id, current_user, service)
+    overrides = request.model_dump(exclude_none=True)
+    try:
+        ChunkingConfig.from_dict(overrides, base=default_chunking_config())
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+
+    try:
+        project.chunking_config = overrides or None
+        service.commit_all()
+    except Exception as e:
+        service.rollback_all()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to update project chunking configuration"
+        ) from e
+
+    return ResponseWrapper.success(
+        data=_chunking_payload(project),
+        message="Project chunking configuration updated successfully"
+    )
+
+
 @router.post("/{project_id}/export")
 def export_project(
     project_id: str,
@@ -1331,19 +1455,27 @@ def export_project(
 @router.get("/{project_id}/conflicts")
 def get_project_conflicts(
     project_id: str,
+    response: Response,
     current_user: User = Depends(get_current_active_user),
-    service: RepositoryService = Depends(get_repository_service)
+    service: RepositoryService = Depends(get_repository_service),
+    if_none_match: Optional[str] = Header(None)
 ) -> Dict[str, Any]:
     """
     Get detected conflicts in a project.
 
+    The response carries an ETag of the conflict rows; editors polling
+    with If-None-Match get 304 Not Modified until a conflict is detected,
+    resolved or ignored.
+
     Args:
         project_id: Project UUID
+        response: Response (ETag header)
         current_user: Authenticated user
         service: Repository service
+        if_none_match: If-None-Match header value
 
     Returns:
-        Dict with conflicts list
+        Dict with conflicts list (or 304 Not Modified)
 
     Example:
         GET /api/v1/projects/550e8400-e29b-41d4-a716-446655440000/conflicts
@@ -1386,11 +1518,22 @@ def get_project_conflicts(
             detail="Permission denied"
         )
 
+    conflicts = service.specs_session.query(Conflict).filter(
+        Conflict.project_id == project_uuid
+    ).order_by(Conflict.detected_at.desc(), Conflict.id).all()
+
+    data = {
+        "project_id": str(project_uuid),
+        "conflicts": [conflict.to_dict() for conflict in conflicts]
+    }
+    etag = content_etag(data["conflicts"])
+    headers = validator_headers(etag, None)
+    if is_not_modified(etag, None, if_none_match=if_none_match):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+
     return ResponseWrapper.success(
-        data={
-            "project_id": str(project_uuid),
-            "conflicts": []
-        },
+        data=data,
         message="Project conflicts retrieved successfully"
     )
 
@@ -5,15 +5,12 @@ from typing import Dict, List, Optional
 
 from fastapi import APIRouter, Depends, Query
 from pydantic import BaseModel
-from sqlalchemy import or_
 from sqlalchemy.orm import Session
 
 from ..core.database import get_db_specs
 from ..core.security import get_current_active_user
-from ..models.project import Project
-from ..models.question import Question
-from ..models.specification import Specification
 from ..models.user import User
+from ..services.search_index import get_search_index
 
 router = APIRouter(prefix="/api/v1/search", tags=["search"])
 
@@ -58,7 +55,9 @@ def search(
     - Specification content and categories
     - Question text and categories
 
-    Only returns data for projects owned by the current user.
+    Only returns data for projects owned by the current user. Results are
+    ranked by full-text relevance (title matches first) and paginated in
+    the database; see services/search_index.py.
 
     Args:
         query: Search text (required)
@@ -76,103 +75,21 @@ def search(
         GET /api/v1/search?query=FastAPI&resource_type=projects&skip=0&limit=20
         Authorization: Bearer <token>
     """
-    results = []
-    resource_counts = {"projects": 0, "specifications": 0, "questions": 0}
-
-    # Search Projects (if no type filter or type='projects')
-    if not resource_type or resource_type == "projects":
-        projects_query = db.query(Project).where(
-            Project.user_id == current_user.id,
-            or_(
-                Project.name.ilike(f"%{query}%"),
-                Project.description.ilike(f"%{query}%") if Project.description else False
-            )
-        )
-        total_projects = projects_query.count()
-        resource_counts["projects"] = total_projects
-
-        projects = projects_query.order_by(Project.created_at.desc()).all()
-        for project in projects:
-            results.append(SearchResult(
-                resource_type="project",
-                id=str(project.id),
-                title=project.name,
-                preview=project.description[:200] if project.description else "",
-                category=project.current_phase,
-                project_id=str(project.id),
-                relevance_score=1.0
-            ))
-
-    # Search Specifications (if no type filter or type='specifications')
-    if not resource_type or resource_type == "specifications":
-        specs_query = db.query(Specification).join(Project).where(
-            Project.user_id == current_user.id,
-            or_(
-                Specification.content.ilike(f"%{query}%"),
-                Specification.category.ilike(f"%{query}%") if Specification.category else False
-            )
-        )
-
-        # Optional: Filter by category if provided
-        if category:
-            specs_query = specs_query.where(Specification.category == category)
-
-        total_specs = specs_query.count()
-        resource_counts["specifications"] = total_specs
-
-        specs = specs_query.order_by(Specification.created_at.desc()).all()
-        for spec in specs:
-            results.append(SearchResult(
-                resource_type="specification",
-                id=str(spec.id),
-                title=f"[{spec.category}] {spec.content[:100]}",
-                preview=spec.content[:200],
-                category=spec.category,
-                project_id=str(spec.project_id),
-                relevance_score=1.0
-            ))
-
-    # Search Questions (if no type filter or type='questions')
-    if not resource_type or resource_type == "questions":
-        questions_query = db.query(Question).join(Project).where(
-            Project.user_id == current_user.id,
-            or_(
-                Question.text.ilike(f"%{query}%"),
-                Question.category.ilike(f"%{query}%") if Question.category else False
-            )
-        )
-
-        # Optional: Filter by category if provided
-        if category:
-            questions_query = questions_query.where(Question.category == category)
-
-        total_questions = questions_query.count()
-        resource_counts["questions"] = total_questions
-
-        questions = questions_query.order_by(Question.created_at.desc()).all()
-        for question in questions:
-            results.append(SearchResult(
-                resource_type="question",
-                id=str(question.id),
-                title=f"[{question.category}] {question.text[:100]}",
-                preview=question.text[:200],
-                category=question.category,
-                project_id=str(question.project_id),
-                relevance_score=1.0
-            ))
-
-    # Sort results by recency (can add relevance scoring later)
-    results.sort(key=lambda x: x.relevance_score, reverse=True)
-
-    # Apply pagination to combined results
-    total = len(results)
-    paginated_results = results[skip:skip + limit]
+    results, resource_counts = get_search_index().search(
+        db,
+        current_user.id,
+        query,
+        resource_type=resource_type,
+        category=category,
+        skip=skip,
+        limit=limit,
+    )
 
     return SearchResponse(
         success=True,
         query=query,
-        results=paginated_results,
-        total=total,
+        results=[SearchResult(**result) for result in results],
+        total=sum(resource_counts.values()),
         skip=skip,
         limit=limit,
         resource_counts=resource_counts
@@ -8,11 +8,13 @@ Provides:
 - Get session history
 - End session
 """
+import json
 from datetime import datetime, timezone
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterator, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, Header, HTTPException, status
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
@@ -77,6 +79,31 @@ class SessionListResponse(BaseModel):
     total: int
 
 
+def _wants_event_stream(accept: Optional[str]) -> bool:
+    """True if the client asked for Server-Sent Events (Accept: text/event-stream)."""
+    return bool(accept) and "text/event-stream" in accept
+
+
+def _event_stream_response(events: Iterator[Dict[str, Any]]) -> StreamingResponse:
+    """
+    Send agent stream events as Server-Sent Events.
+
+    Each event dict's 'event' key becomes the SSE event name and the rest
+    is sent as JSON data.
+    """
+    def body():
+        for event in events:
+            payload = dict(event)
+            name = payload.pop('event')
+            yield f"event: {name}\ndata: {json.dumps(payload, default=str)}\n\n"
+
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.get("")
 def list_sessions(
     current_user: User = Depends(get_current_active_user)
@@ -202,7 +229,8 @@ def start_session(
 def get_next_question(
     session_id: str,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db_specs)
+    db: Session = Depends(get_db_specs),
+    accept: Optional[str] = Header(None)
 ) -> Dict[str, Any]:
     """
     Get the next Socratic question for the session.
@@ -210,10 +238,16 @@ def get_next_question(
     REFACTORED: Database connection released BEFORE orchestrator call
     to prevent connection pool exhaustion during question generation.
 
+    With "Accept: text/event-stream" the question text is streamed as it is
+    generated: "token" events ({"text": ...}), then one "done" event with
+    the response below plus "timing" (ttft_ms, total_ms), or an "error"
+    event.
+
     Args:
         session_id: Session UUID
         current_user: Authenticated user
         db: Database session
+        accept: Accept header (selects streaming)
 
     Returns:
         {
@@ -267,6 +301,13 @@ def get_next_question(
         # The refactored socratic agent now releases DB before Claude API calls
         orchestrator = get_orchestrator()
 
+        socratic_agent = orchestrator.get_agent('socratic')
+        if _wants_event_stream(accept) and socratic_agent is not None:
+            return _event_stream_response(socratic_agent.stream_question({
+                'project_id': project_id,
+                'session_id': session_id
+            }))
+
         result = orchestrator.route_request(
             agent_id='socratic',
             action='generate_question',
@@ -296,10 +337,54 @@ def get_next_question(
         )
 
 
+def _track_answer_effectiveness(
+    user_id: str,
+    question_id: str,
+    answer_length: int,
+    specs_extracted: int
+) -> None:
+    """
+    Record how effective a question was (runs after the response is sent).
+
+    Args:
+        user_id: User who answered
+        question_id: Question that was answered
+        answer_length: Length of the answer in characters
+        specs_extracted: Number of specifications extracted from the answer
+    """
+    import logging
+    logger = logging.getLogger(__name__)
+
+    try:
+        # Calculate answer quality (0-1): based on specs extracted and answer length
+        # Quality = 1.0 if specs_extracted > 0, scaled by answer detail
+        answer_quality = min(1.0, (specs_extracted / 5) + (min(answer_length, 500) / 500) * 0.5) if specs_extracted > 0 else 0.3
+
+        learning_result = get_orchestrator().route_request(
+            'learning',
+            'track_question_effectiveness',
+            {
+                'user_id': user_id,
+                'question_template_id': question_id,
+                'role': 'user',  # Default role, can be enhanced later
+                'answer_length': answer_length,
+                'specs_extracted': specs_extracted,
+                'answer_quality': answer_quality
+            }
+        )
+
+        if learning_result.get('success'):
+            logger.debug(f"Tracked question effectiveness for question {question_id}: score={learning_result.get('effectiveness_score', 0):.2f}")
+    except Exception as e:
+        # Log but never fail: the answer has already been processed
+        logger.warning(f"Failed to track question effectiveness: {e}")
+
+
 @router.post("/{session_id}/answer")
 def submit_answer(
     session_id: str,
     request: SubmitAnswerRequest,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db_specs)
 ) -> Dict[str, Any]:
@@ -309,9 +394,15 @@ def submit_answer(
     REFACTORED: Database connection released BEFORE orchestrator calls
     to prevent connection pool exhaustion during cascading agent calls.
 
+    The session, question, project and existing specs are loaded once
+    here and shared with the agents (AnswerContext). Question
+    effectiveness tracking does not affect the response, so it runs as a
+    background task after the response is sent.
+
     Args:
         session_id: Session UUID
         request: Answer details (question_id, answer)
+        background_tasks: Runs effectiveness tracking after the response
         current_user: Authenticated user
         db: Database session
 
@@ -346,6 +437,7 @@ def submit_answer(
             "maturity_score": 12.5
         }
     """
+    from ..agents.context import AnswerContext
     from ..models.conversation_history import ConversationHistory
     from ..models.project import Project
     from ..models.question import Question
@@ -385,6 +477,9 @@ def submit_answer(
         if not question:
             raise HTTPException(status_code=404, detail=f"Question not found: {question_id}")
 
+        # Load the shared context before the commit below expires these rows
+        context = AnswerContext.from_models(db, session, project, question)
+
         # Save to conversation history
         conversation = ConversationHistory(
             session_id=session_id,
@@ -411,7 +506,8 @@ def submit_answer(
                 'session_id': session_id,
                 'question_id': question_id,
                 'answer': request.answer,
-                'user_id': current_user.id
+                'user_id': current_user.id,
+                'context': context
             }
         )
 
@@ -421,37 +517,14 @@ def submit_answer(
                 detail=result.get('error', 'Failed to extract specifications')
             )
 
-        # PHASE 3: Track question effectiveness (still with released DB)
-        try:
-            specs_extracted = result.get('specs_extracted', 0)
-            answer_length = len(request.answer)
-
-            # Calculate answer quality (0-1): based on specs extracted and answer length
-            # Quality = 1.0 if specs_extracted > 0, scaled by answer detail
-            answer_quality = min(1.0, (specs_extracted / 5) + (min(answer_length, 500) / 500) * 0.5) if specs_extracted > 0 else 0.3
-
-            learning_result = orchestrator.route_request(
-                'learning',
-                'track_question_effectiveness',
-                {
-                    'user_id': str(current_user.id),
-                    'question_template_id': str(request.question_id),
-                    'role': 'user',  # Default role, can be enhanced later
-                    'answer_length': answer_length,
-                    'specs_extracted': specs_extracted,
-                    'answer_quality': answer_quality
-                }
-            )
-
-            if learning_result.get('success'):
-                import logging
-                logger = logging.getLogger(__name__)
-                logger.debug(f"Tracked question effectiveness for question {request.question_id}: score={learning_result.get('effectiveness_score', 0):.2f}")
-        except Exception as e:
-            # Log but don't fail the request if learning tracking fails
-            import logging
-            logger = logging.getLogger(__name__)
-            logger.warning(f"Failed to track question effectiveness: {e}")
+        # PHASE 3: Track question effectiveness after the response is sent
+        background_tasks.add_task(
+            _track_answer_effectiveness,
+            str(current_user.id),
+            str(question_id),
+            len(request.answer),
+            result.get('specs_extracted', 0)
+        )
 
         return result
 
@@ -474,7 +547,8 @@ def send_chat_message(
     session_id: str,
     request: ChatMessageRequest,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db_specs)
+    db: Session = Depends(get_db_specs),
+    accept: Optional[str] = Header(None)
 ) -> Dict[str, Any]:
     """
     Send a message in direct chat mode.
@@ -484,11 +558,18 @@ def send_chat_message(
 
     Switches session to direct_chat mode if needed and processes the message.
 
+    With "Accept: text/event-stream" the reply is streamed as it is
+    generated: "token" events ({"text": ...}), then one "done" event with
+    the response below plus "timing" (ttft_ms, total_ms), or an "error"
+    event. Specification extraction and history persistence run after the
+    reply stream has closed, before the "done" event.
+
     Args:
         session_id: Session UUID
         request: Chat message details (message)
         current_user: Authenticated user
         db: Database session
+        accept: Accept header (selects streaming)
 
     Returns:
         {
@@ -554,16 +635,22 @@ def send_chat_message(
                     detail=f"Failed to switch to direct chat mode: {toggle_result.get('error')}"
                 )
 
+        chat_data = {
+            'session_id': session_id,
+            'user_id': user_id,
+            'message': request.message,
+            'project_id': project_id
+        }
+
+        direct_chat_agent = orchestrator.get_agent('direct_chat')
+        if _wants_event_stream(accept) and direct_chat_agent is not None:
+            return _event_stream_response(direct_chat_agent.stream_chat_message(chat_data))
+
         # Process chat message through DirectChatAgent
         result = orchestrator.route_request(
             'direct_chat',
             'process_chat_message',
-            {
-                'session_id': session_id,
-                'user_id': user_id,
-                'message': request.message,
-                'project_id': project_id
-            }
+            chat_data
         )
 
         if not result.get('success'):
@@ -1868,6 +1955,7 @@ def get_question_alt(
 def submit_answer_alt(
     session_id: str,
     request: SubmitAnswerRequest,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db_specs)
 ) -> Dict[str, Any]:
@@ -1880,6 +1968,7 @@ def submit_answer_alt(
     Args:
         session_id: Session UUID
         request: Answer details (question_id, answer)
+        background_tasks: Runs effectiveness tracking after the response
         current_user: Authenticated user
         db: Database session
 
@@ -1915,7 +2004,13 @@ def submit_answer_alt(
         }
     """
     # Delegate to the main submit_answer function
-    return submit_answer(session_id=session_id, request=request, current_user=current_user, db=db)
+    return submit_answer(
+        session_id=session_id,
+        request=request,
+        background_tasks=background_tasks,
+        current_user=current_user,
+        db=db
+    )
 
 
 @router.delete("/{session_id}")
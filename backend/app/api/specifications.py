@@ -11,17 +11,22 @@ Provides:
 
 Uses repository pattern for efficient data access.
 """
+from datetime import datetime, timedelta
 from typing import Any, Dict, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
 from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
 
+from ..core.config import settings
 from ..core.database import get_db_auth, get_db_specs
+from ..core.datetime_utils import as_utc
+from ..core.http_cache import is_not_modified, validator_headers
 from ..core.security import get_current_active_user
 from ..models.user import User
 from ..repositories import RepositoryService
+from ..services.export_cache import artifact_key
 from ..services.response_service import ResponseWrapper
 
 router = APIRouter(prefix="/api/v1/specifications", tags=["specifications"])
@@ -82,6 +87,28 @@ class SpecificationListResponse(BaseModel):
     limit: int
 
 
+def _next_sync_cursor(updated_since: datetime, newest_updated_at: Optional[datetime]) -> datetime:
+    """
+    Delta sync cursor to hand back as synced_at.
+
+    Trails the newest returned change by SPEC_SYNC_CURSOR_OVERLAP_SECONDS and
+    never moves backwards, so it stays put (and the ETag stays valid) while
+    nothing changes.
+
+    Args:
+        updated_since: Cursor of this request
+        newest_updated_at: Newest updated_at returned (None if nothing changed)
+
+    Returns:
+        Next cursor (UTC)
+    """
+    cursor = as_utc(updated_since)
+    if newest_updated_at is not None:
+        overlap = timedelta(seconds=settings.SPEC_SYNC_CURSOR_OVERLAP_SECONDS)
+        cursor = max(cursor, newest_updated_at - overlap)
+    return cursor
+
+
 # ============================================================================
 # 1. List Project Specifications
 # ============================================================================
@@ -89,12 +116,15 @@ class SpecificationListResponse(BaseModel):
 @project_router.get("", response_model=Dict[str, Any])
 def list_project_specifications(
     project_id: str,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     category: Optional[str] = Query(None, description="Filter by category"),
     is_current: bool = Query(True, description="Only return current specifications"),
+    updated_since: Optional[datetime] = Query(None, description="Only return specifications changed since (delta sync)"),
     current_user: User = Depends(get_current_active_user),
-    service: RepositoryService = Depends(get_repository_service)
+    service: RepositoryService = Depends(get_repository_service),
+    if_none_match: Optional[str] = Header(None)
 ) -> Dict[str, Any]:
     """
     List specifications for a specific project.
@@ -102,17 +132,31 @@ def list_project_specifications(
     Provides paginated listing of project specifications with optional category filtering
     and filtering for current (non-superseded) specifications.
 
+    With updated_since, only specifications changed at or after that time
+    are returned (oldest first), together with the IDs of all matching
+    specifications so clients can drop deleted ones, and synced_at to pass
+    as the next updated_since. synced_at trails the newest returned change
+    by SPEC_SYNC_CURSOR_OVERLAP_SECONDS: updated_at is set when the writing
+    transaction starts, so a write committed after this response can carry
+    an older timestamp, and the overlap re-sends it on the next sync
+    (clients replace specifications by ID). Responses carry an ETag of the
+    project's spec revision and the query, including updated_since; a
+    matching If-None-Match gets 304 Not Modified.
+
     Args:
         project_id: Project UUID
+        response: Response (ETag header)
         skip: Number of specifications to skip (pagination)
         limit: Maximum number of specifications to return
         category: Optional category filter
         is_current: Only return current specifications (default: True)
+        updated_since: Optional delta sync cursor
         current_user: Authenticated user
         service: Repository service
+        if_none_match: If-None-Match header value
 
     Returns:
-        Dict with success status and specifications list
+        Dict with success status and specifications list (or 304 Not Modified)
     """
     try:
         # Parse project UUID
@@ -138,6 +182,15 @@ def list_project_specifications(
                 detail="Permission denied: you don't have access to this project"
             )
 
+        key = artifact_key(
+            project, "specifications", skip=skip, limit=limit, category=category, is_current=is_current,
+            updated_since=as_utc(updated_since).isoformat() if updated_since else None
+        )
+        headers = validator_headers(key.etag, None)
+        if is_not_modified(key.etag, None, if_none_match=if_none_match):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        response.headers.update(headers)
+
         # Query specifications with filters
         from ..models.specification import Specification
         query = service.specs_session.query(Specification).filter(
@@ -152,6 +205,14 @@ def list_project_specifications(
         if is_current:
             query = query.filter(Specification.is_current == True)
 
+        current_ids = None
+        if updated_since is not None:
+            # IDs of everything still matching, so clients can drop the rest
+            current_ids = [str(spec_id) for (spec_id,) in query.with_entities(Specification.id)]
+            query = query.filter(Specification.updated_at >= updated_since).order_by(
+                Specification.updated_at, Specification.id
+            )
+
         # Get total count
         total = query.count()
 
@@ -160,7 +221,10 @@ def list_project_specifications(
 
         # PHASE 2: Convert all attributes to primitives WHILE SESSION IS STILL ACTIVE
         specs_data = []
+        newest_updated_at = None
         for spec in specifications:
+            if spec.updated_at and (newest_updated_at is None or as_utc(spec.updated_at) > newest_updated_at):
+                newest_updated_at = as_utc(spec.updated_at)
             try:
                 spec_dict = {
                     "id": str(spec.id),
@@ -198,6 +262,9 @@ def list_project_specifications(
             "skip": skip,
             "limit": limit
         }
+        if current_ids is not None:
+            response_data["current_ids"] = current_ids
+            response_data["synced_at"] = _next_sync_cursor(updated_since, newest_updated_at).isoformat()
 
         # PHASE 6: Return response with released connection
         return ResponseWrapper.success(
@@ -36,6 +36,30 @@ class Settings(BaseSettings):
     ENVIRONMENT: str = "production"  # development | staging | production
     LOG_LEVEL: str = "INFO"  # DEBUG | INFO | WARNING | ERROR
 
+    # ===== LLM GATEWAY =====
+    LLM_PROVIDER: str = "anthropic"  # anthropic | openai | fake (provider for models without a known prefix)
+    LLM_DEFAULT_MODEL: str = "claude-sonnet-4-5-20250929"  # Model used by agents and NLU unless a call names one
+    LLM_MAX_CONCURRENCY: int = 8  # Requests in flight per provider per worker
+    LLM_MAX_CONNECTIONS: int = 20  # Pooled HTTP connections per provider
+    LLM_MAX_RETRIES: int = 3  # Retries of rate-limit/overload/network errors (jittered backoff)
+    LLM_TIMEOUT_SECONDS: float = 120.0  # Deadline per call, including retries
+    LLM_CIRCUIT_FAILURES: int = 5  # Consecutive transient failures that open a provider's circuit
+    LLM_CIRCUIT_RESET_SECONDS: float = 30.0  # How long an open circuit fails fast before a trial call
+    LLM_RECORD_USAGE: bool = True  # Write token usage and cost to llm_usage_tracking
+    LLM_USAGE_BATCH_SIZE: int = 100  # Usage rows per llm_usage_tracking insert (buffered writer)
+    LLM_USAGE_FLUSH_SECONDS: float = 2.0  # Longest a usage row waits in the buffer before it is written
+    LLM_USAGE_MAX_BUFFER: int = 10000  # Usage rows kept while the database is unavailable (oldest dropped)
+
+    # ===== LLM RESPONSE CACHE =====
+    LLM_CACHE_ENABLED: bool = True  # Serve repeated deterministic calls (cache=True call sites) from cache
+    LLM_CACHE_TTL_SECONDS: int = 86400  # Default lifetime of a cached response
+    LLM_CACHE_MAX_ENTRIES: int = 2000  # In-process tier: LRU eviction past this many responses
+    LLM_CACHE_MAX_BYTES: int = 32 * 1024 * 1024  # In-process tier: LRU eviction past this estimated size
+    LLM_CACHE_BACKEND: str = "memory"  # memory (in-process only) | sqlite | redis (adds a shared tier)
+    LLM_CACHE_SQLITE_PATH: str = "data/llm_cache.sqlite3"  # Shared tier file when LLM_CACHE_BACKEND=sqlite
+    LLM_CACHE_SHARED_MAX_ENTRIES: int = 100000  # SQLite tier: LRU eviction past this many rows
+    LLM_CACHE_BYPASS_HEADER: bool = False  # Honour X-LLM-Cache: bypass|refresh request headers (debugging)
+
     # ===== CORS =====
     CORS_ORIGINS: str = "http://localhost:3000,http://localhost:5173"
 
@@ -56,6 +80,55 @@ class Settings(BaseSettings):
     STRIPE_PRICE_PRO_MONTHLY: Optional[str] = None  # Stripe price ID for Pro tier
     STRIPE_PRICE_TEAM_MONTHLY: Optional[str] = None  # Stripe price ID for Team tier
 
+    # ===== CACHE =====
+    CACHE_BACKEND: str = "memory"  # memory | redis
+    CACHE_REDIS_URL: Optional[str] = None  # Required when CACHE_BACKEND=redis
+    CACHE_MAX_ENTRIES: int = 10000  # LRU eviction once this many entries are stored
+    CACHE_MAX_BYTES: int = 64 * 1024 * 1024  # LRU eviction once estimated value size exceeds this
+    CACHE_SWEEP_INTERVAL_SECONDS: float = 30.0  # Background TTL sweep period (0 disables the sweeper)
+
+    # ===== VECTOR SEARCH =====
+    VECTOR_SEARCH_BACKEND: str = "memory"  # memory (in-process NumPy index) | pgvector
+    VECTOR_INDEX_DIR: Optional[str] = "data/vector_index"  # .npy sidecars shared by workers (unset = memory only)
+    VECTOR_INDEX_MAX_PROJECTS: int = 64  # Project indexes kept in memory per worker (LRU)
+    VECTOR_INDEX_PERSIST_DELAY_SECONDS: float = 5.0  # Incremental changes are batched into one sidecar rewrite (0 = rewrite on every change)
+    VECTOR_ANN_MIN_CHUNKS: int = 50000  # Projects this large use IVF approximate search (0 = always exact)
+    VECTOR_ANN_LISTS: Optional[int] = None  # IVF list count (unset = ~sqrt(chunks))
+    VECTOR_ANN_NPROBE: int = 16  # IVF lists scanned per query; higher = better recall, slower
+
+    # ===== EMBEDDINGS =====
+    EMBEDDING_PROVIDER: str = "openai"  # openai | fake (deterministic offline vectors)
+    OPENAI_API_KEY: Optional[str] = None  # Falls back to the openai client's own env lookup
+    EMBEDDING_BATCH_SIZE: int = 100  # Texts per provider request
+    EMBEDDING_MAX_CONCURRENCY: int = 4  # Provider requests in flight per worker
+    EMBEDDING_TOKENS_PER_MINUTE: int = 1000000  # Provider TPM limit used by the token bucket (0 disables)
+    EMBEDDING_MAX_RETRIES: int = 3  # Retries per failed batch (exponential backoff)
+
+    # ===== DOCUMENT INGESTION =====
+    INGESTION_WORKERS: int = 2  # Background ingestion jobs processed concurrently per worker process
+    INGESTION_BATCH_CHUNKS: int = 256  # Chunks embedded and bulk-inserted per batch (bounds memory)
+    INGESTION_SPOOL_DIR: Optional[str] = None  # Where uploads wait for processing (unset = system temp)
+    INGESTION_MAX_UPLOAD_BYTES: int = 100 * 1024 * 1024  # Larger uploads are rejected with 413
+    CHUNK_STRATEGY: str = "sentence"  # sentence (token budget, sentence/heading boundaries) | fixed (500-char windows)
+    CHUNK_MAX_TOKENS: int = 160  # Estimated tokens per chunk; projects can override via /projects/{id}/chunking
+    CHUNK_OVERLAP_TOKENS: int = 20  # Tokens repeated between consecutive chunks
+
+    # ===== EMBEDDING CACHE =====
+    EMBEDDING_CACHE_ENABLED: bool = True  # Reuse embeddings of identical text (embedding_cache table)
+    EMBEDDING_CACHE_DTYPE: str = "float16"  # float16 (half the storage) | float32 (lossless)
+    EMBEDDING_CACHE_MEMORY_TTL_SECONDS: int = 3600  # In-process copy of hot entries (0 disables)
+
+    # ===== ANALYTICS AGGREGATION =====
+    ANALYTICS_LOOKBACK_DAYS: int = 1  # Already aggregated days recomputed each run (late events)
+    ANALYTICS_MAX_WINDOWS_PER_RUN: int = 31  # Days aggregated per job run; catch-up continues next run
+
+    # ===== EXPORT =====
+    EXPORT_STREAM_BATCH_SIZE: int = 500  # Specification rows fetched per round trip by streaming exports
+    EXPORT_CACHE_DIR: Optional[str] = "data/export_cache"  # Rendered exports keyed by project spec revision (unset = render every time)
+
+    # ===== SPECIFICATION SYNC =====
+    SPEC_SYNC_CURSOR_OVERLAP_SECONDS: int = 300  # Delta sync cursor is moved back this far so late commits are re-sent
+
     model_config = ConfigDict(
         env_file=".env",
         case_sensitive=True,
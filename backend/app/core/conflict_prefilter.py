@@ -0,0 +1,306 @@
+"""
+Local conflict pre-filter - Pure Business Logic
+
+Decides which (new, existing) specification pairs could possibly conflict
+before anything is sent to Claude. Two cheap signals are used:
+
+- Key index: specs with the same (category, normalised key) but a
+  different value (identical values are duplicates, not conflicts).
+- Domain rules: each rules.json condition is compiled into operands
+  (e.g. "architecture == monolithic AND required_users > 1000000" gives
+  {architecture} and {user}). A spec matches an operand when all of the
+  operand's terms appear in its category, key or value. A new and an
+  existing spec that match the same rule are a candidate pair.
+
+Existing specs are indexed once per detection call; every new spec is then
+resolved with dictionary lookups, so finding candidates is O(new specs)
+rather than O(new x existing). Only candidates are escalated to the LLM,
+and the LLM call is skipped entirely when there are none.
+
+Like ConflictDetectionEngine this module has no database dependencies.
+"""
+
+import logging
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Words that carry no meaning for matching a rule against a spec. Stored
+# stemmed (see _stem), like the terms they are compared with.
+_STOPWORDS = frozenset({
+    # English
+    "a", "all", "an", "and", "are", "across", "be", "by", "each", "for", "in", "is", "it",
+    "must", "no", "not", "of", "on", "only", "or", "other", "the", "to", "with", "within",
+    # Generic words used in rule conditions
+    "achievable", "align", "compatible", "component", "constraint", "contradict", "defined",
+    "disabled", "handle", "has", "missing", "num", "optional", "performing", "proposed",
+    "require", "required", "requirement", "respected", "scheduled", "setup", "specification",
+    "standard", "strategy", "target", "undefined", "use", "used", "using",
+})
+
+_WORD_PATTERN = re.compile(r"[A-Za-z][A-Za-z0-9_]*")
+_TERM_PATTERN = re.compile(r"[a-z0-9]+")
+_KEY_SEPARATOR_PATTERN = re.compile(r"[^a-z0-9]+")
+
+# Connectives of structured conditions ("a > 1 AND b"), never operands
+_CONDITION_KEYWORDS = frozenset({"AND", "OR", "NOT"})
+
+
+def normalize_key(key: Any) -> str:
+    """
+    Normalise a specification key for index lookups.
+
+    "Response Time", "response-time" and "response_time" all map to
+    "response_time".
+    """
+    return _KEY_SEPARATOR_PATTERN.sub("_", str(key or "").lower()).strip("_")
+
+
+def normalize_value(value: Any) -> str:
+    """Normalise a specification value for equality checks (case and whitespace)."""
+    return " ".join(str(value or "").lower().split())
+
+
+def _stem(term: str) -> str:
+    """Crude plural folding so "users" matches "user" and "strategies" "strategy"."""
+    if len(term) > 4 and term.endswith("ies"):
+        return term[:-3] + "y"
+    if len(term) > 3 and term.endswith("s") and not term.endswith("ss"):
+        return term[:-1]
+    return term
+
+
+def extract_terms(*texts: Any) -> Set[str]:
+    """
+    Matching terms of some text: lowercase alphanumeric runs, plural-folded.
+
+    Underscores split terms, so "required_users" gives {"required", "user"}.
+    """
+    terms = set()
+    for text in texts:
+        if text is None:
+            continue
+        for term in _TERM_PATTERN.findall(str(text).lower()):
+            if not term.isdigit():
+                terms.add(_stem(term))
+    return terms
+
+
+@dataclass(frozen=True)
+class CompiledRule:
+    """A domain conflict rule reduced to operands (sets of required terms)."""
+    rule_id: str
+    operands: Tuple[FrozenSet[str], ...]
+
+
+@dataclass
+class ConflictCandidates:
+    """
+    Result of pre-filtering one detection call.
+
+    Attributes:
+        new_specs: New specs involved in at least one candidate pair
+        existing_specs: Existing specs involved in at least one candidate pair
+        pairs: (new index, existing index, reason) per candidate pair; indexes
+            refer to the lists passed to ConflictIndex/find_candidates
+    """
+    new_specs: List[Any] = field(default_factory=list)
+    existing_specs: List[Any] = field(default_factory=list)
+    pairs: List[Tuple[int, int, str]] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.pairs)
+
+
+def compile_rule(rule_id: str, condition: Optional[str]) -> Optional[CompiledRule]:
+    """
+    Compile a rules.json condition into operands.
+
+    Identifiers ("required_users", "mfa_optional"), acronyms ("GDPR") and
+    plain content words ("database", "caching") each become one operand;
+    connectives, comparison operators, numbers and generic words
+    ("must", "align", "using") are dropped.
+
+    Args:
+        rule_id: Rule identifier
+        condition: Condition text from rules.json
+
+    Returns:
+        CompiledRule, or None if nothing matchable is left
+    """
+    operands = []
+    for word in _WORD_PATTERN.findall(condition or ""):
+        if word in _CONDITION_KEYWORDS:
+            continue
+        terms = frozenset(term for term in extract_terms(word) if term not in _STOPWORDS)
+        if terms and terms not in operands:
+            operands.append(terms)
+
+    if not operands:
+        return None
+    return CompiledRule(rule_id=rule_id, operands=tuple(operands))
+
+
+def compile_rules(rules: Iterable[Any]) -> List[CompiledRule]:
+    """
+    Compile domain ConflictRule objects (or dicts with rule_id/condition).
+
+    Args:
+        rules: Rules from BaseDomain.get_conflict_rules() or rules.json
+
+    Returns:
+        Compiled rules (rules without a usable condition are skipped)
+    """
+    compiled = []
+    for rule in rules:
+        if isinstance(rule, dict):
+            rule_id, condition = rule.get("rule_id"), rule.get("condition")
+        else:
+            rule_id, condition = rule.rule_id, rule.condition
+        compiled_rule = compile_rule(rule_id or "", condition)
+        if compiled_rule:
+            compiled.append(compiled_rule)
+    return compiled
+
+
+def _field(spec: Any, name: str) -> Any:
+    """Read a field from a SpecificationData-like object or a dict."""
+    if isinstance(spec, dict):
+        return spec.get(name)
+    return getattr(spec, name, None)
+
+
+class ConflictRulePredicates:
+    """
+    Compiled rules with an inverted index from term to operand.
+
+    rules_matched() only tests the operands that share a term with the
+    spec, so its cost depends on the spec's size, not on the rule count.
+    """
+
+    def __init__(self, rules: List[CompiledRule]):
+        self.rules = rules
+        self._operands_by_term: Dict[str, List[Tuple[str, FrozenSet[str]]]] = {}
+        for rule in rules:
+            for operand in rule.operands:
+                for term in operand:
+                    self._operands_by_term.setdefault(term, []).append((rule.rule_id, operand))
+
+    def rules_matched(self, spec: Any) -> Set[str]:
+        """
+        IDs of rules with at least one operand the spec satisfies.
+
+        Args:
+            spec: SpecificationData or dict with category/key/value
+
+        Returns:
+            Set of rule IDs
+        """
+        terms = extract_terms(_field(spec, "category"), _field(spec, "key"), _field(spec, "value"))
+        matched = set()
+        for term in terms:
+            for rule_id, operand in self._operands_by_term.get(term, ()):
+                if rule_id not in matched and operand <= terms:
+                    matched.add(rule_id)
+        return matched
+
+
+class ConflictIndex:
+    """
+    Index of a project's existing specs for conflict candidate lookups.
+
+    Usage:
+        index = ConflictIndex(existing_specs, predicates)
+        candidates = index.find_candidates(new_specs)
+        if not candidates:
+            ...  # skip the LLM
+    """
+
+    def __init__(self, existing_specs: List[Any], predicates: Optional[ConflictRulePredicates] = None):
+        self.existing_specs = existing_specs
+        self.predicates = predicates
+        self._by_key: Dict[Tuple[str, str], List[int]] = {}
+        self._by_rule: Dict[str, List[int]] = {}
+
+        for position, spec in enumerate(existing_specs):
+            key = (str(_field(spec, "category") or "").lower(), normalize_key(_field(spec, "key")))
+            self._by_key.setdefault(key, []).append(position)
+            if predicates:
+                for rule_id in predicates.rules_matched(spec):
+                    self._by_rule.setdefault(rule_id, []).append(position)
+
+    def find_candidates(self, new_specs: List[Any]) -> ConflictCandidates:
+        """
+        Find (new, existing) pairs worth sending to the LLM.
+
+        Args:
+            new_specs: Specs about to be saved
+
+        Returns:
+            ConflictCandidates (falsy when there is nothing to check)
+        """
+        pairs: Dict[Tuple[int, int], str] = {}
+
+        for new_position, spec in enumerate(new_specs):
+            key = (str(_field(spec, "category") or "").lower(), normalize_key(_field(spec, "key")))
+            value = normalize_value(_field(spec, "value"))
+            for existing_position in self._by_key.get(key, ()):
+                existing_value = normalize_value(_field(self.existing_specs[existing_position], "value"))
+                if existing_value != value:
+                    pairs.setdefault((new_position, existing_position), f"key:{key[0]}/{key[1]}")
+
+            if self.predicates:
+                for rule_id in sorted(self.predicates.rules_matched(spec)):
+                    for existing_position in self._by_rule.get(rule_id, ()):
+                        pairs.setdefault((new_position, existing_position), f"rule:{rule_id}")
+
+        new_positions = sorted({new_position for new_position, _ in pairs})
+        existing_positions = sorted({existing_position for _, existing_position in pairs})
+        return ConflictCandidates(
+            new_specs=[new_specs[position] for position in new_positions],
+            existing_specs=[self.existing_specs[position] for position in existing_positions],
+            pairs=[(new_position, existing_position, reason) for (new_position, existing_position), reason in pairs.items()],
+        )
+
+
+# Global singleton instance (rules of all registered domains)
+_rule_predicates: Optional[ConflictRulePredicates] = None
+
+
+def get_rule_predicates() -> ConflictRulePredicates:
+    """
+    Get predicates compiled from the conflict rules of every registered domain.
+
+    Compiled once per process. Projects are not tied to a domain, so the
+    rules of all domains apply.
+
+    Returns:
+        ConflictRulePredicates singleton
+    """
+    global _rule_predicates
+    if _rule_predicates is None:
+        # Import here to avoid circular imports
+        from app.domains.registry import get_domain_registry, register_all_domains
+
+        registry = get_domain_registry()
+        if registry.get_domain_count() == 0:
+            register_all_domains()
+
+        rules = []
+        for domain_id, domain in registry.list_domains().items():
+            try:
+                rules.extend(domain.get_conflict_rules())
+            except Exception as e:
+                logger.warning(f"Could not load conflict rules of domain {domain_id}: {e}")
+
+        _rule_predicates = ConflictRulePredicates(compile_rules(rules))
+        logger.info(f"Compiled {len(_rule_predicates.rules)} conflict rules for the pre-filter")
+    return _rule_predicates
+
+
+def reset_rule_predicates() -> None:
+    """Drop the compiled rules (recompiled on next use)."""
+    global _rule_predicates
+    _rule_predicates = None
@@ -0,0 +1,21 @@
+"""
+Datetime helpers shared by services and endpoints.
+
+All timestamps are stored and compared in UTC. PostgreSQL returns aware
+datetimes, SQLite returns naive ones; as_utc() makes them comparable.
+"""
+
+from datetime import datetime, timezone
+
+
+def as_utc(value: datetime) -> datetime:
+    """
+    Treat a naive datetime as UTC.
+
+    Args:
+        value: Aware or naive (assumed UTC) datetime
+
+    Returns:
+        Aware datetime (aware values are returned unchanged)
+    """
+    return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
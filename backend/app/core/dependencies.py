@@ -5,16 +5,15 @@ Provides centralized access to:
 - Database sessions
 - Logging
 - Configuration
-- Claude API client
+- LLM gateway (Claude API client)
 - Agent Orchestrator
 
 ⚠️  NO FALLBACKS - All dependencies are REQUIRED.
 Missing dependencies raise clear errors instead of returning None.
 """
 import logging
-from typing import TYPE_CHECKING, Optional
+from typing import TYPE_CHECKING, Any, Optional
 
-from anthropic import Anthropic
 from sqlalchemy.orm import Session
 
 from .config import settings
@@ -23,6 +22,7 @@ from .nlu_service import NLUService
 
 if TYPE_CHECKING:
     from ..agents.orchestrator import AgentOrchestrator
+    from ..services.llm_gateway import LLMGateway
 
 
 class ServiceContainer:
@@ -44,7 +44,7 @@ class ServiceContainer:
     """
 
     def __init__(self):
-        self._claude_client: Optional[Anthropic] = None
+        self._claude_client: Optional[Any] = None
         self._logger_cache: dict = {}
         self._orchestrator: Optional['AgentOrchestrator'] = None
         self._nlu_service: Optional[NLUService] = None
@@ -168,32 +168,57 @@ class ServiceContainer:
         except Exception as e:
             raise ValueError(f"Failed to get configuration: {e}")
 
-    def get_claude_client(self) -> Anthropic:
+    def get_claude_client(self) -> Any:
         """
         Get Claude API client.
 
+        Returns the LLM gateway's Anthropic-compatible client, so every
+        messages.create()/messages.stream() call shares the gateway's
+        connection pool, concurrency limit, retries and usage tracking.
+
+        For testing: If _claude_client is set (via dependency injection),
+        returns that client instead.
+
         Returns:
-            Anthropic client instance
+            Client exposing the Anthropic messages API
 
         Raises:
             ValueError: If ANTHROPIC_API_KEY not set
-            Exception: If client creation fails
+            RuntimeError: If gateway creation fails
         """
-        if self._claude_client is None:
-            api_key = settings.ANTHROPIC_API_KEY
+        if self._claude_client is not None:
+            return self._claude_client
 
-            if not api_key:
-                raise ValueError(
-                    "ANTHROPIC_API_KEY not set in environment. "
-                    "Please add it to your .env file."
-                )
+        return self.get_llm_gateway().client()
 
-            try:
-                self._claude_client = Anthropic(api_key=api_key)
-            except Exception as e:
-                raise RuntimeError(f"Failed to create Claude API client: {e}")
+    def get_llm_gateway(self) -> 'LLMGateway':
+        """
+        Get the process-wide LLM gateway.
+
+        Returns:
+            LLMGateway instance
 
-        return self._claude_client
+        Raises:
+            ValueError: If ANTHROPIC_API_KEY not set
+            RuntimeError: If gateway creation fails
+        """
+        from ..services.llm_gateway import get_llm_gateway
+
+        try:
+            return get_llm_gateway()
+        except ValueError:
+            raise
+        except Exception as e:
+            raise RuntimeError(f"Failed to create LLM gateway: {e}")
+
+    def get_default_model(self) -> str:
+        """
+        Get the model agents use unless a call names one.
+
+        Returns:
+            Model name (LLM_DEFAULT_MODEL)
+        """
+        return settings.LLM_DEFAULT_MODEL
 
     def get_orchestrator(self) -> 'AgentOrchestrator':
         """
@@ -232,7 +257,7 @@ class ServiceContainer:
             try:
                 claude_client = self.get_claude_client()
                 logger = self.get_logger('nlu')
-                self._nlu_service = NLUService(claude_client, logger)
+                self._nlu_service = NLUService(claude_client, logger, model=self.get_default_model())
             except Exception as e:
                 raise RuntimeError(f"Failed to create NLU service: {e}")
 
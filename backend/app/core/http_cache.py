@@ -0,0 +1,71 @@
+"""
+HTTP validators and conditional GET - Pure Business Logic
+
+Endpoints whose responses are determined by something cheap to read (a
+project's spec_revision, a content hash) send an ETag and answer
+If-None-Match / If-Modified-Since with 304 Not Modified:
+
+- validator_headers(): ETag / Last-Modified / Cache-Control headers
+- is_not_modified(): evaluate the conditional request headers
+- content_etag(): ETag derived from a JSON-serializable value
+
+No database dependencies.
+"""
+
+import hashlib
+import json
+from datetime import datetime
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+from .datetime_utils import as_utc
+
+
+def content_etag(content: Any, length: int = 16) -> str:
+    """Strong ETag of a JSON-serializable value (same content, same ETag)."""
+    encoded = json.dumps(content, sort_keys=True, default=str).encode("utf-8")
+    return f'"{hashlib.sha256(encoded).hexdigest()[:length]}"'
+
+
+def validator_headers(etag: str, modified_at: Optional[datetime]) -> Dict[str, str]:
+    """ETag / Last-Modified headers (clients must revalidate before reuse)."""
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if modified_at is not None:
+        headers["Last-Modified"] = format_datetime(modified_at, usegmt=True)
+    return headers
+
+
+def is_not_modified(
+    etag: str,
+    modified_at: Optional[datetime],
+    if_none_match: Optional[str] = None,
+    if_modified_since: Optional[str] = None
+) -> bool:
+    """
+    Evaluate conditional request headers (RFC 9110 13.2.2).
+
+    If-None-Match takes precedence; If-Modified-Since is only used when
+    the client sent no If-None-Match.
+
+    Args:
+        etag: Current ETag of the resource
+        modified_at: Last modification time of the resource
+        if_none_match: If-None-Match header value
+        if_modified_since: If-Modified-Since header value
+
+    Returns:
+        True if a 304 Not Modified should be sent
+    """
+    if if_none_match:
+        # Weak comparison: W/"x" matches "x"
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or etag in tags
+
+    if if_modified_since and modified_at is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        return modified_at <= as_utc(since)
+
+    return False
@@ -0,0 +1,217 @@
+"""
+Local intent classifier - Pure Business Logic
+
+Fast path in front of NLUService.parse_intent(): compiled regex tables for
+the operations in NLUService.AVAILABLE_OPERATIONS decide, without an API
+call, whether a chat message is an operation request or conversation.
+
+Confidence levels:
+- 0.95: one operation's imperative pattern matches and every parameter it
+  needs could be filled from the text or the caller's context
+- 0.90: no operation cue at all (plain conversation)
+- 0.60: an operation matched but needs parameters only Claude can
+  extract (credentials, conflict IDs, free-text questions)
+- 0.50: several operations matched, or operation words appear without a
+  command form ("the project should create invoices")
+
+NLUService only calls Claude below its confidence threshold (0.85 by
+default), so the ambiguous cases keep the remote parser.
+
+No database dependencies.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Pattern
+
+# Polite/intent prefixes stripped before matching ("please", "can you", ...)
+_PREFIX_PATTERN = re.compile(
+    r"^(?:(?:please|pls|kindly|hey|ok|okay|now|then|so)\s*,?\s+"
+    r"|(?:can|could|would|will)\s+(?:you|i|we)\s+(?:please\s+)?"
+    r"|(?:i|we)\s*(?:'d|would)\s+like\s+to\s+"
+    r"|(?:i|we)\s+(?:want|need)\s+to\s+"
+    r"|let'?s\s+)+"
+)
+
+_EXPORT_FORMATS = {
+    'pdf': 'pdf', 'markdown': 'markdown', 'md': 'markdown', 'json': 'json',
+    'csv': 'csv', 'html': 'html', 'docx': 'docx', 'yaml': 'yaml',
+}
+
+# Words that only signal an operation when they appear together
+_CUE_VERBS = frozenset({
+    'create', 'make', 'list', 'show', 'display', 'start', 'begin', 'export', 'download',
+    'switch', 'toggle', 'change', 'resolve', 'login', 'logout', 'log', 'sign', 'register',
+    'view', 'open', 'ask',
+})
+_CUE_OBJECTS = frozenset({
+    'project', 'projects', 'session', 'sessions', 'conflict', 'conflicts', 'insight',
+    'insights', 'mode', 'account', 'socratic',
+})
+
+# Context keys that can fill operation parameters
+_CONTEXT_PARAMS = {'project_id': 'current_project', 'session_id': 'current_session'}
+
+
+@dataclass
+class IntentPrediction:
+    """Result of local classification."""
+    operation: Optional[str]  # None means conversation
+    confidence: float
+    params: Dict[str, Any] = field(default_factory=dict)
+
+
+def _create_project_params(text: str) -> Dict[str, Any]:
+    quoted = re.search(r"[\"']([^\"']+)[\"']", text)
+    named = re.search(r"\b(?:called|named|titled)\s+(.+)$", text)
+    name = quoted.group(1) if quoted else (named.group(1) if named else None)
+    return {'name': name.strip(' .!?')} if name and name.strip(' .!?') else {}
+
+
+def _export_params(text: str) -> Dict[str, Any]:
+    for word in re.findall(r"[a-z]+", text.lower()):
+        if word in _EXPORT_FORMATS:
+            return {'format': _EXPORT_FORMATS[word]}
+    return {}
+
+
+def _toggle_mode_params(text: str) -> Dict[str, Any]:
+    text = text.lower()
+    if re.search(r"\bsocratic\b", text):
+        return {'mode': 'socratic'}
+    if re.search(r"\bdirect\b|\bchat mode\b", text):
+        return {'mode': 'direct_chat'}
+    return {}
+
+
+@dataclass(frozen=True)
+class _OperationRule:
+    operation: str
+    pattern: Pattern
+    local_params: List[str]  # Parameters that must be filled for a local decision
+    extract: Optional[Callable[[str], Dict[str, Any]]] = None  # Params from the original text
+
+
+# Imperative forms per operation. Short commands are anchored at both ends
+# so sentences that merely start like a command ("show me the risks of
+# using MongoDB") fall through to the remote parser. local_params lists
+# what must be known to act without Claude; None means the operation always
+# needs the remote parser for its parameters (credentials, IDs, free text).
+_THIS_PROJECT = r"(?:\s+(?:for|of|in|on)\s+(?:the|this|my|our|current)\s+project)?"
+
+_OPERATION_TABLE: Dict[str, Any] = {
+    'register_user': (r"^(?:register|sign\s*up|create\s+(?:an?\s+|my\s+)?(?:new\s+)?account)\b", None, None),
+    'login_user': (r"^(?:log\s*in|login|sign\s*in)\b", None, None),
+    'logout_user': (r"^(?:log\s*out|logout|sign\s*out)(?:\s+now)?$", [], None),
+    'create_project': (
+        r"^(?:create|make|start|set\s*up|add)\s+(?:a\s+|an\s+|another\s+)?(?:new\s+)?project"
+        r"(?:$|\s+(?:called|named|titled)\s+\S|\s+[\"'])",
+        ['name'], _create_project_params
+    ),
+    'list_projects': (
+        r"^(?:list|show|display|see|view)\s+(?:me\s+)?(?:all\s+)?(?:of\s+)?(?:my\s+|our\s+|the\s+)?projects$",
+        [], None
+    ),
+    'start_session': (r"^(?:start|begin|open)\s+(?:a\s+|the\s+)?(?:new\s+)?session" + _THIS_PROJECT + "$", ['project_id'], None),
+    'ask_question': (r"^ask\s+(?:me\s+)?(?:a|the|another|the\s+next|next)\s+question\b", None, None),
+    'resolve_conflict': (r"^(?:resolve|fix|settle)\s+(?:the\s+|this\s+|that\s+|a\s+)?conflict", None, None),
+    'view_insights': (
+        r"^(?:show|view|display|see|get|give)\s+(?:me\s+)?(?:the\s+|my\s+|our\s+)?(?:project\s+)?"
+        r"(?:insights|gaps|risks|opportunities)" + _THIS_PROJECT + "$",
+        ['project_id'], None
+    ),
+    'export_project': (
+        r"^(?:export|download)(?:\s+(?:the|this|my|our))?(?:\s+(?:project|specs?|specifications))?"
+        r"(?:\s+(?:as|to|in|into))?(?:\s+(?:a|an))?(?:\s+(?:pdf|markdown|md|json|csv|html|docx|yaml))?"
+        r"(?:\s+(?:file|document|format))?$",
+        ['project_id', 'format'], _export_params
+    ),
+    'ask_socratic': (r"^ask\s+(?:the\s+)?socratic\b", None, None),
+    'toggle_mode': (
+        r"^(?:switch|change|toggle|go)\s+(?:back\s+)?(?:to\s+|into\s+)?(?:the\s+)?"
+        r"(?:socratic|direct(?:\s+chat)?|chat)?(?:\s*mode)?$",
+        ['session_id', 'mode'], _toggle_mode_params
+    ),
+}
+
+
+class IntentClassifier:
+    """
+    Regex-table intent classifier.
+
+    Usage:
+        classifier = IntentClassifier(NLUService.AVAILABLE_OPERATIONS)
+        prediction = classifier.classify("list my projects", context)
+        if prediction.confidence >= 0.85:
+            ...  # use it, no API call
+    """
+
+    HIGH_CONFIDENCE = 0.95
+    CONVERSATION_CONFIDENCE = 0.90
+    MISSING_PARAMS_CONFIDENCE = 0.60
+    AMBIGUOUS_CONFIDENCE = 0.50
+
+    def __init__(self, operations: Dict[str, Dict[str, Any]]):
+        """
+        Compile the rule table for the given operations.
+
+        Operations without a table entry get a generic "<verb> <object>"
+        pattern from their name and always defer to the remote parser.
+
+        Args:
+            operations: NLUService.AVAILABLE_OPERATIONS
+        """
+        self.rules: List[_OperationRule] = []
+        for operation in operations:
+            if operation in _OPERATION_TABLE:
+                pattern, local_params, extract = _OPERATION_TABLE[operation]
+            else:
+                words = operation.split('_')
+                pattern = r"^" + r"\s+(?:\w+\s+){0,2}".join(re.escape(word) for word in words) + r"\b"
+                local_params, extract = None, None
+            self.rules.append(_OperationRule(operation, re.compile(pattern), local_params, extract))
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Lowercase, collapse whitespace and strip polite prefixes."""
+        text = " ".join(text.lower().split()).strip(" .!?")
+        return _PREFIX_PATTERN.sub("", text)
+
+    def classify(self, user_input: str, context: Optional[Dict[str, Any]] = None) -> IntentPrediction:
+        """
+        Classify a message locally.
+
+        Args:
+            user_input: Chat message
+            context: Optional NLU context (current_project, current_session, ...)
+
+        Returns:
+            IntentPrediction (operation None = conversation)
+        """
+        text = self.normalize(user_input)
+        context = context or {}
+
+        matches = [rule for rule in self.rules if rule.pattern.search(text)]
+
+        if len(matches) > 1:
+            return IntentPrediction(None, self.AMBIGUOUS_CONFIDENCE)
+
+        if not matches:
+            words = set(re.findall(r"[a-z]+", text))
+            if words & _CUE_VERBS and words & _CUE_OBJECTS:
+                return IntentPrediction(None, self.AMBIGUOUS_CONFIDENCE)
+            return IntentPrediction(None, self.CONVERSATION_CONFIDENCE)
+
+        rule = matches[0]
+        if rule.local_params is None:
+            return IntentPrediction(rule.operation, self.MISSING_PARAMS_CONFIDENCE)
+
+        params = rule.extract(user_input.strip()) if rule.extract else {}
+        for param, context_key in _CONTEXT_PARAMS.items():
+            # DirectChatAgent passes str(None) when there is no project
+            if param in rule.local_params and context.get(context_key) not in (None, '', 'None'):
+                params[param] = context[context_key]
+
+        if any(param not in params for param in rule.local_params):
+            return IntentPrediction(rule.operation, self.MISSING_PARAMS_CONFIDENCE, params)
+        return IntentPrediction(rule.operation, self.HIGH_CONFIDENCE, params)
@@ -5,13 +5,14 @@ Handles:
 - Provider and model discovery
 - User model selection
 - Cost calculation
-- Usage tracking
+- Usage tracking (batched writes, daily rollups)
 - API key management
 """
 
 from typing import Any, Dict, List, Optional
-from datetime import datetime
-from dataclasses import dataclass, asdict
+from datetime import datetime, timedelta, timezone
+from dataclasses import dataclass
+from decimal import Decimal
 import uuid
 
 
@@ -28,18 +29,38 @@ class LLMModel:
     capabilities: List[str]  # ['text', 'vision', 'code', etc.]
 
 
-@dataclass
-class LLMUsageRecord:
-    """LLM usage tracking record"""
-    id: str
-    user_id: str
-    provider: str
-    model: str
-    input_tokens: int
-    output_tokens: int
-    cost: float
-    session_id: Optional[str] = None
-    timestamp: Optional[str] = None
+# Days covered by each usage stats period (None = all time)
+USAGE_PERIOD_DAYS: Dict[str, Optional[int]] = {
+    "day": 1,
+    "week": 7,
+    "month": 30,
+    "year": 365,
+    "all": None,
+}
+
+
+def _as_uuid(value: Any) -> Optional[uuid.UUID]:
+    """UUID from a UUID or string (None if missing or malformed)."""
+    if value is None or isinstance(value, uuid.UUID):
+        return value
+    try:
+        return uuid.UUID(str(value))
+    except ValueError:
+        return None
+
+
+def _execute_specs(db, query) -> List[Any]:
+    """Run a select on the given specs session, or on a short-lived one."""
+    if db is not None:
+        return db.execute(query).all()
+
+    from .database import SessionLocalSpecs
+
+    session = SessionLocalSpecs()
+    try:
+        return session.execute(query).all()
+    finally:
+        session.close()
 
 
 class LLMRouter:
@@ -160,9 +181,6 @@ class LLMRouter:
     # User selections storage (in production, this would be in database)
     USER_SELECTIONS: Dict[str, Dict[str, str]] = {}  # user_id -> {provider, model}
 
-    # Usage tracking (in production, this would be in database)
-    USAGE_TRACKING: List[LLMUsageRecord] = []
-
     def __init__(self):
         """Initialize LLM router"""
         self.default_provider = "anthropic"
@@ -292,7 +310,15 @@ class LLMRouter:
         output_tokens: int,
         session_id: Optional[str] = None
     ) -> Dict[str, Any]:
-        """Track LLM usage for billing and analytics"""
+        """
+        Track LLM usage for billing and analytics.
+
+        The record is queued on the process-wide UsageWriter, which writes
+        it to llm_usage_tracking (and the daily rollups) in a batch shortly
+        after; the caller never waits for the database.
+        """
+        from ..services.usage_writer import get_usage_writer
+
         models = self.AVAILABLE_MODELS.get(provider.lower(), [])
         model_obj = next((m for m in models if m.name == model), None)
 
@@ -302,110 +328,136 @@ class LLMRouter:
                 "error": f"Model '{model}' not found"
             }
 
+        user_uuid = _as_uuid(user_id)
+        if user_uuid is None:
+            return {
+                "success": False,
+                "error": f"Invalid user_id '{user_id}'"
+            }
+
         # Calculate cost
         input_cost = (input_tokens / 1000) * model_obj.cost_per_1k_input
         output_cost = (output_tokens / 1000) * model_obj.cost_per_1k_output
         total_cost = input_cost + output_cost
 
-        # Record usage (in-memory for now, database in production)
-        record = LLMUsageRecord(
-            id=str(uuid.uuid4()),
-            user_id=user_id,
-            provider=provider.lower(),
-            model=model,
-            input_tokens=input_tokens,
-            output_tokens=output_tokens,
-            cost=total_cost,
-            session_id=session_id,
-            timestamp=datetime.utcnow().isoformat()
-        )
-        self.USAGE_TRACKING.append(record)
+        timestamp = datetime.now(timezone.utc)
+        get_usage_writer().add({
+            "user_id": user_uuid,
+            "project_id": None,
+            "session_id": _as_uuid(session_id),
+            "provider": provider.lower(),
+            "model": model,
+            "tokens_input": input_tokens,
+            "tokens_output": output_tokens,
+            "tokens_total": input_tokens + output_tokens,
+            "cost_usd": Decimal(str(round(total_cost, 6))),
+            "timestamp": timestamp,
+        })
 
         return {
             "success": True,
             "data": {
-                "record_id": record.id,
                 "input_tokens": input_tokens,
                 "output_tokens": output_tokens,
                 "total_tokens": input_tokens + output_tokens,
                 "cost": round(total_cost, 6),
-                "timestamp": record.timestamp
+                "timestamp": timestamp.isoformat()
             }
         }
 
     def get_usage_stats(
         self,
         user_id: str,
-        period: str = "month"
+        period: str = "month",
+        db: Optional[Any] = None
     ) -> Dict[str, Any]:
-        """Get usage statistics for a user"""
-        # Filter records for user
-        user_records = [r for r in self.USAGE_TRACKING if r.user_id == user_id]
+        """
+        Get usage statistics for a user.
+
+        Served from the llm_usage_daily rollups: one indexed range query on
+        (user_id, day) grouped by provider/model, so the cost does not grow
+        with the number of recorded calls. Rows still buffered in the
+        UsageWriter (at most LLM_USAGE_FLUSH_SECONDS old) are not included.
+
+        Args:
+            user_id: User UUID
+            period: day | week | month | year | all
+            db: Specs database session (default: a new session)
+        """
+        from sqlalchemy import func, select
 
-        if not user_records:
+        from ..models.llm_usage_daily import LLMUsageDaily
+
+        if period not in USAGE_PERIOD_DAYS:
             return {
-                "success": True,
-                "data": {
-                    "period": period,
-                    "overall": {
-                        "total_tokens": 0,
-                        "input_tokens": 0,
-                        "output_tokens": 0,
-                        "total_cost": 0.0,
-                        "request_count": 0
-                    },
-                    "by_model": {},
-                    "by_provider": {}
-                }
+                "success": False,
+                "error": f"Unknown period '{period}' (expected one of: {', '.join(USAGE_PERIOD_DAYS)})"
             }
 
-        # Aggregate stats
-        total_input = sum(r.input_tokens for r in user_records)
-        total_output = sum(r.output_tokens for r in user_records)
-        total_cost = sum(r.cost for r in user_records)
-
-        # By model
-        by_model = {}
-        for record in user_records:
-            key = f"{record.provider}/{record.model}"
-            if key not in by_model:
-                by_model[key] = {
-                    "tokens": 0,
-                    "input_tokens": 0,
-                    "output_tokens": 0,
-                    "cost": 0.0,
-                    "calls": 0
-                }
-            by_model[key]["tokens"] += record.input_tokens + record.output_tokens
-            by_model[key]["input_tokens"] += record.input_tokens
-            by_model[key]["output_tokens"] += record.output_tokens
-            by_model[key]["cost"] += record.cost
-            by_model[key]["calls"] += 1
-
-        # By provider
-        by_provider = {}
-        for record in user_records:
-            if record.provider not in by_provider:
-                by_provider[record.provider] = {
-                    "tokens": 0,
-                    "cost": 0.0,
-                    "calls": 0
-                }
-            by_provider[record.provider]["tokens"] += record.input_tokens + record.output_tokens
-            by_provider[record.provider]["cost"] += record.cost
-            by_provider[record.provider]["calls"] += 1
+        overall = {
+            "total_tokens": 0,
+            "input_tokens": 0,
+            "output_tokens": 0,
+            "total_cost": 0.0,
+            "request_count": 0
+        }
+        by_model: Dict[str, Dict[str, Any]] = {}
+        by_provider: Dict[str, Dict[str, Any]] = {}
+
+        user_uuid = _as_uuid(user_id)
+        rows = []
+        if user_uuid is not None:
+            query = select(
+                LLMUsageDaily.provider,
+                LLMUsageDaily.model,
+                func.sum(LLMUsageDaily.request_count),
+                func.sum(LLMUsageDaily.tokens_input),
+                func.sum(LLMUsageDaily.tokens_output),
+                func.sum(LLMUsageDaily.cost_usd)
+            ).where(
+                LLMUsageDaily.user_id == user_uuid
+            ).group_by(
+                LLMUsageDaily.provider,
+                LLMUsageDaily.model
+            )
+            days = USAGE_PERIOD_DAYS[period]
+            if days is not None:
+                since = datetime.now(timezone.utc).date() - timedelta(days=days - 1)
+                query = query.where(LLMUsageDaily.day >= since)
+
+            rows = _execute_specs(db, query)
+
+        total_cost = 0.0
+        for provider, model, calls, input_tokens, output_tokens, cost in rows:
+            calls, input_tokens, output_tokens = int(calls or 0), int(input_tokens or 0), int(output_tokens or 0)
+            cost = float(cost or 0)
+
+            by_model[f"{provider}/{model}"] = {
+                "tokens": input_tokens + output_tokens,
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "cost": cost,
+                "calls": calls
+            }
+
+            provider_stats = by_provider.setdefault(provider, {"tokens": 0, "cost": 0.0, "calls": 0})
+            provider_stats["tokens"] += input_tokens + output_tokens
+            provider_stats["cost"] += cost
+            provider_stats["calls"] += calls
+
+            overall["input_tokens"] += input_tokens
+            overall["output_tokens"] += output_tokens
+            overall["request_count"] += calls
+            total_cost += cost
+
+        overall["total_tokens"] = overall["input_tokens"] + overall["output_tokens"]
+        overall["total_cost"] = round(total_cost, 2)
 
         return {
             "success": True,
             "data": {
                 "period": period,
-                "overall": {
-                    "total_tokens": total_input + total_output,
-                    "input_tokens": total_input,
-                    "output_tokens": total_output,
-                    "total_cost": round(total_cost, 2),
-                    "request_count": len(user_records)
-                },
+                "overall": overall,
                 "by_model": by_model,
                 "by_provider": by_provider
             }
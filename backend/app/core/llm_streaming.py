@@ -0,0 +1,233 @@
+"""
+Streaming helpers for Claude completions - Pure Business Logic
+
+Used by the streaming chat and question endpoints so users see text as it
+is generated instead of waiting 10-20 s for the full completion:
+
+- stream_text(): yield text deltas from the provider streaming API
+- StreamTimer: time-to-first-token (TTFT) and total time of one stream
+- StreamLatency: rolling TTFT/total percentiles (reported in agent stats)
+- JsonStringFieldStream: incrementally decode one string field (e.g.
+  "text") out of a JSON object while it is still being generated
+
+TTFT is the latency users perceive for streamed responses, so it is the
+headline metric logged for every stream.
+
+No database dependencies.
+"""
+
+import logging
+import time
+from collections import deque
+from typing import Any, Dict, Iterator, Optional
+
+from .action_logger import log_llm
+
+logger = logging.getLogger(__name__)
+
+
+def stream_text(client: Any, **kwargs) -> Iterator[str]:
+    """
+    Stream a Claude completion as text deltas.
+
+    Uses client.messages.stream(); clients without streaming support (other
+    providers' adapters, simple test doubles) fall back to one delta with
+    the full messages.create() response.
+
+    Args:
+        client: Anthropic client (or compatible)
+        **kwargs: Arguments for messages.create()/messages.stream()
+
+    Yields:
+        Text deltas in generation order
+    """
+    if not hasattr(client.messages, "stream"):
+        response = client.messages.create(**kwargs)
+        yield response.content[0].text
+        return
+
+    with client.messages.stream(**kwargs) as stream:
+        for text in stream.text_stream:
+            if text:
+                yield text
+
+
+class StreamLatency:
+    """
+    Rolling latency samples of recent streams.
+
+    Usage:
+        latency = StreamLatency()
+        latency.record(ttft_ms=420.0, total_ms=6100.0)
+        latency.summary()  # {'streams': 1, 'ttft_ms_p50': 420.0, ...}
+    """
+
+    def __init__(self, max_samples: int = 500):
+        self.streams = 0
+        self._ttft_ms = deque(maxlen=max_samples)
+        self._total_ms = deque(maxlen=max_samples)
+
+    def record(self, ttft_ms: Optional[float], total_ms: float) -> None:
+        """Add one finished stream (ttft_ms is None when nothing was generated)."""
+        self.streams += 1
+        if ttft_ms is not None:
+            self._ttft_ms.append(ttft_ms)
+        self._total_ms.append(total_ms)
+
+    @staticmethod
+    def _percentile(samples, pct: float) -> Optional[float]:
+        if not samples:
+            return None
+        ordered = sorted(samples)
+        return round(ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))], 1)
+
+    def summary(self) -> Dict[str, Any]:
+        """Stream count and p50/p95 of TTFT and total duration (ms)."""
+        return {
+            'streams': self.streams,
+            'ttft_ms_p50': self._percentile(self._ttft_ms, 50),
+            'ttft_ms_p95': self._percentile(self._ttft_ms, 95),
+            'total_ms_p50': self._percentile(self._total_ms, 50),
+            'total_ms_p95': self._percentile(self._total_ms, 95),
+        }
+
+
+class StreamTimer:
+    """
+    Times one streamed completion.
+
+    Start it right before the provider request; call mark() for every
+    delta and finish() once the stream is closed.
+    """
+
+    def __init__(self, action: str, model: Optional[str] = None):
+        self.action = action
+        self.model = model
+        self.started = time.perf_counter()
+        self.first_token_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.deltas = 0
+
+    def mark(self) -> None:
+        """Record that a delta arrived."""
+        if self.first_token_at is None:
+            self.first_token_at = time.perf_counter()
+        self.deltas += 1
+
+    @property
+    def ttft_ms(self) -> Optional[float]:
+        """Milliseconds until the first delta (None if none arrived)."""
+        if self.first_token_at is None:
+            return None
+        return round((self.first_token_at - self.started) * 1000, 1)
+
+    @property
+    def total_ms(self) -> float:
+        """Milliseconds from start until finish() (or now)."""
+        end = self.finished_at if self.finished_at is not None else time.perf_counter()
+        return round((end - self.started) * 1000, 1)
+
+    def finish(self, latency: Optional[StreamLatency] = None) -> Dict[str, Any]:
+        """
+        Stop the timer, log TTFT and optionally record it.
+
+        Args:
+            latency: Rolling stats to add this stream to
+
+        Returns:
+            {'ttft_ms': float | None, 'total_ms': float}
+        """
+        if self.finished_at is None:
+            self.finished_at = time.perf_counter()
+            if latency is not None:
+                latency.record(self.ttft_ms, self.total_ms)
+            log_llm(self.action, model=self.model, ttft_ms=self.ttft_ms, total_ms=self.total_ms, deltas=self.deltas)
+        return {'ttft_ms': self.ttft_ms, 'total_ms': self.total_ms}
+
+
+_JSON_ESCAPES = {'"': '"', '\\': '\\', '/': '/', 'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r', 't': '\t'}
+
+
+class JsonStringFieldStream:
+    """
+    Decode one top-level string field of a JSON object as it streams in.
+
+    The question generator asks Claude for {"text": ..., "category": ...,
+    "context": ...}; feeding the deltas through this yields the question
+    text while the rest of the JSON is still being generated.
+
+    Usage:
+        field = JsonStringFieldStream("text")
+        for delta in deltas:
+            visible = field.feed(delta)   # '' until "text" starts
+    """
+
+    def __init__(self, field_name: str):
+        self._marker = f'"{field_name}"'
+        self._buffer = ""
+        self._position = 0  # Next unread index of _buffer once the value started
+        self._started = False
+        self.done = False
+
+    def feed(self, delta: str) -> str:
+        """
+        Add a delta and return newly decoded characters of the field value.
+
+        Args:
+            delta: Next piece of the generated JSON
+
+        Returns:
+            Decoded text (may be empty)
+        """
+        if self.done:
+            return ""
+        self._buffer += delta
+
+        if not self._started:
+            start = self._buffer.find(self._marker)
+            if start < 0:
+                return ""
+            index = start + len(self._marker)
+            # Skip whitespace, the colon and the opening quote
+            while index < len(self._buffer) and self._buffer[index] in " \t\r\n:":
+                index += 1
+            if index >= len(self._buffer):
+                return ""
+            if self._buffer[index] != '"':
+                # Not a string value; nothing to stream
+                self.done = True
+                return ""
+            self._started = True
+            self._position = index + 1
+
+        decoded = []
+        buffer = self._buffer
+        index = self._position
+        while index < len(buffer):
+            char = buffer[index]
+            if char == '"':
+                self.done = True
+                index += 1
+                break
+            if char != '\\':
+                decoded.append(char)
+                index += 1
+                continue
+            # Escape sequence: wait until it is complete
+            if index + 1 >= len(buffer):
+                break
+            escape = buffer[index + 1]
+            if escape == 'u':
+                if index + 6 > len(buffer):
+                    break
+                try:
+                    decoded.append(chr(int(buffer[index + 2:index + 6], 16)))
+                except ValueError:
+                    decoded.append(buffer[index:index + 6])
+                index += 6
+            else:
+                decoded.append(_JSON_ESCAPES.get(escape, escape))
+                index += 2
+
+        self._position = index
+        return "".join(decoded)
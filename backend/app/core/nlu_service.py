@@ -8,7 +8,8 @@ Provides natural language interpretation for all user-facing components:
 - Any future conversational interfaces
 
 Features:
-- Intent parsing: Converts user text to structured operations
+- Intent parsing: Converts user text to structured operations (local
+  classifier first, Claude only for ambiguous input)
 - Conversational responses: Handles non-operational queries
 - Context awareness: Uses conversation history for context
 - Model flexibility: Supports different Claude models
@@ -16,12 +17,16 @@ Features:
 
 import json
 import logging
-from collections import deque
+import threading
+from collections import OrderedDict, deque
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional
 
 from anthropic import Anthropic
 
+from .intent_classifier import IntentClassifier
+from .llm_streaming import stream_text
+
 
 @dataclass
 class Intent:
@@ -31,6 +36,8 @@ class Intent:
     params: Optional[Dict[str, Any]] = None  # Operation parameters
     explanation: Optional[str] = None  # Brief explanation of action
     response: Optional[str] = None  # Conversational response (if is_operation=False)
+    confidence: Optional[float] = None  # Local classifier confidence (None for Claude results)
+    source: str = "remote"  # local (IntentClassifier) | remote (Claude)
 
 
 class NLUService:
@@ -104,18 +111,36 @@ class NLUService:
         },
     }
 
-    def __init__(self, claude_client: Anthropic, logger: Optional[logging.Logger] = None):
+    # Local classifications at or above this confidence skip the Claude call
+    LOCAL_INTENT_THRESHOLD = 0.85
+    # Recent parse results remembered per (session, message)
+    INTENT_MEMO_SIZE = 512
+
+    # Used when no model is configured (library usage)
+    DEFAULT_MODEL = "claude-sonnet-4-5-20250929"
+
+    def __init__(
+        self,
+        claude_client: Anthropic,
+        logger: Optional[logging.Logger] = None,
+        model: Optional[str] = None
+    ):
         """
         Initialize NLU service.
 
         Args:
-            claude_client: Anthropic client for API calls
+            claude_client: Anthropic client (or the LLM gateway's compatible client)
             logger: Optional logger instance
+            model: Claude model (default DEFAULT_MODEL)
         """
         self.client = claude_client
         self.logger = logger or logging.getLogger(__name__)
-        self.current_model = "claude-sonnet-4-5-20250929"  # Default model
+        self.current_model = model or self.DEFAULT_MODEL
         self.conversation_history = deque(maxlen=20)  # Auto-maintains last 20 messages
+        self.intent_classifier = IntentClassifier(self.AVAILABLE_OPERATIONS)
+        self._intent_memo: "OrderedDict[tuple, Intent]" = OrderedDict()
+        self._intent_memo_lock = threading.Lock()
+        self.intent_stats = {'local': 0, 'remote': 0, 'memo_hits': 0}
 
     def set_model(self, model_name: str) -> None:
         """Set the Claude model to use"""
@@ -133,11 +158,16 @@ class NLUService:
     def parse_intent(
         self,
         user_input: str,
-        context: Optional[Dict[str, Any]] = None
+        context: Optional[Dict[str, Any]] = None,
+        usage_context: Optional[Dict[str, Any]] = None
     ) -> Intent:
         """
         Parse user input to determine intent (operation vs conversation).
 
+        Tries, in order: the per-session memo of recent results, the local
+        IntentClassifier (no API call), and Claude when the local
+        confidence is below LOCAL_INTENT_THRESHOLD.
+
         Args:
             user_input: User's natural language input
             context: Optional context dict with keys:
@@ -145,10 +175,70 @@ class NLUService:
                 - current_project: Project name
                 - current_session: Session ID
                 - conversation_context: Additional context
+            usage_context: {'user_id', 'project_id', 'session_id'} the Claude call is billed to
 
         Returns:
             Intent object with parsed information
         """
+        memo_key = (
+            str((context or {}).get('current_session') or ''),
+            str((context or {}).get('current_project') or ''),
+            self.intent_classifier.normalize(user_input)
+        )
+        with self._intent_memo_lock:
+            memoized = self._intent_memo.get(memo_key)
+            if memoized is not None:
+                self._intent_memo.move_to_end(memo_key)
+                self.intent_stats['memo_hits'] += 1
+                return memoized
+
+        prediction = self.intent_classifier.classify(user_input, context)
+        if prediction.confidence >= self.LOCAL_INTENT_THRESHOLD:
+            self.intent_stats['local'] += 1
+            if prediction.operation:
+                intent = Intent(
+                    is_operation=True,
+                    operation=prediction.operation,
+                    params=prediction.params,
+                    explanation=self.AVAILABLE_OPERATIONS[prediction.operation]['description'],
+                    confidence=prediction.confidence,
+                    source="local"
+                )
+            else:
+                intent = Intent(is_operation=False, confidence=prediction.confidence, source="local")
+            self.logger.debug(
+                f"Local intent for {user_input[:50]!r}: {prediction.operation or 'conversation'} "
+                f"(confidence {prediction.confidence:.2f})"
+            )
+        else:
+            self.intent_stats['remote'] += 1
+            intent = self._parse_intent_remote(user_input, context, usage_context)
+            if intent is None:
+                # Unparseable Claude response: ask to rephrase, do not remember it
+                return Intent(
+                    is_operation=False,
+                    response="I didn't quite understand that. Could you rephrase your request?"
+                )
+
+        with self._intent_memo_lock:
+            self._intent_memo[memo_key] = intent
+            self._intent_memo.move_to_end(memo_key)
+            while len(self._intent_memo) > self.INTENT_MEMO_SIZE:
+                self._intent_memo.popitem(last=False)
+        return intent
+
+    def _parse_intent_remote(
+        self,
+        user_input: str,
+        context: Optional[Dict[str, Any]] = None,
+        usage_context: Optional[Dict[str, Any]] = None
+    ) -> Optional[Intent]:
+        """
+        Parse intent with Claude (one API call).
+
+        Returns:
+            Intent, or None if Claude's response was not valid JSON
+        """
         try:
             # Build operations list for prompt
             operations_list = "\n".join([
@@ -198,7 +288,8 @@ IMPORTANT: Return ONLY valid JSON, nothing else."""
             response = self.client.messages.create(
                 model=self.current_model,
                 max_tokens=300,
-                messages=[{"role": "user", "content": prompt}]
+                messages=[{"role": "user", "content": prompt}],
+                **self._usage_kwargs(usage_context)
             )
 
             response_text = response.content[0].text.strip()
@@ -225,20 +316,52 @@ IMPORTANT: Return ONLY valid JSON, nothing else."""
 
         except json.JSONDecodeError as e:
             self.logger.warning(f"Failed to parse Claude response as JSON: {e}")
-            # Return conversational intent asking for clarification
-            return Intent(
-                is_operation=False,
-                response="I didn't quite understand that. Could you rephrase your request?"
-            )
+            return None
         except Exception as e:
             self.logger.error(f"Error parsing intent: {e}")
             raise
 
+    DEFAULT_CHAT_SYSTEM_PROMPT = """You are Socrates, an AI assistant for specification gathering.
+You help users create and refine product specifications, identify gaps, resolve conflicts, and generate code.
+Be helpful, concise, and guide users toward useful actions.
+When appropriate, suggest using specific operations."""
+
+    @staticmethod
+    def _usage_kwargs(usage_context: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Gateway usage attribution, omitted when absent (plain Anthropic clients reject it)."""
+        return {'usage_context': usage_context} if usage_context else {}
+
+    def _chat_request(
+        self,
+        user_input: str,
+        system_prompt: Optional[str],
+        conversation_context: Optional[List[Dict[str, str]]],
+        usage_context: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Build the messages API arguments shared by chat() and chat_stream()."""
+        # Use provided history or fall back to internal history
+        if conversation_context:
+            messages = conversation_context
+        else:
+            # Convert deque to list and get last 10 messages
+            messages = list(self.conversation_history)[-10:]
+        messages = list(messages)  # Make a copy
+        messages.append({"role": "user", "content": user_input})
+
+        return {
+            'model': self.current_model,
+            'max_tokens': 500,
+            'system': system_prompt if system_prompt is not None else self.DEFAULT_CHAT_SYSTEM_PROMPT,
+            'messages': messages,
+            **self._usage_kwargs(usage_context)
+        }
+
     def chat(
         self,
         user_input: str,
         system_prompt: Optional[str] = None,
-        conversation_context: Optional[List[Dict[str, str]]] = None
+        conversation_context: Optional[List[Dict[str, str]]] = None,
+        usage_context: Optional[Dict[str, Any]] = None
     ) -> str:
         """
         Have a conversational interaction with Claude.
@@ -247,34 +370,16 @@ IMPORTANT: Return ONLY valid JSON, nothing else."""
             user_input: User's message
             system_prompt: Optional custom system prompt
             conversation_context: Optional conversation history
+            usage_context: {'user_id', 'project_id', 'session_id'} the call is billed to
 
         Returns:
             Claude's response text
         """
-        if system_prompt is None:
-            system_prompt = """You are Socrates, an AI assistant for specification gathering.
-You help users create and refine product specifications, identify gaps, resolve conflicts, and generate code.
-Be helpful, concise, and guide users toward useful actions.
-When appropriate, suggest using specific operations."""
-
         try:
-            # Use provided history or fall back to internal history
-            if conversation_context:
-                messages = conversation_context
-            else:
-                # Convert deque to list and get last 10 messages
-                messages = list(self.conversation_history)[-10:]
-            messages = list(messages)  # Make a copy
-            messages.append({"role": "user", "content": user_input})
+            request = self._chat_request(user_input, system_prompt, conversation_context, usage_context)
+            self.logger.debug(f"Calling Claude chat API with {len(request['messages'])} messages")
 
-            self.logger.debug(f"Calling Claude chat API with {len(messages)} messages")
-
-            response = self.client.messages.create(
-                model=self.current_model,
-                max_tokens=500,
-                system=system_prompt,
-                messages=messages
-            )
+            response = self.client.messages.create(**request)
 
             return response.content[0].text
 
@@ -282,11 +387,41 @@ When appropriate, suggest using specific operations."""
             self.logger.error(f"Error in chat: {e}")
             raise
 
+    def chat_stream(
+        self,
+        user_input: str,
+        system_prompt: Optional[str] = None,
+        conversation_context: Optional[List[Dict[str, str]]] = None,
+        usage_context: Optional[Dict[str, Any]] = None
+    ) -> Iterator[str]:
+        """
+        Streaming variant of chat(): yields the response as it is generated.
+
+        Args:
+            user_input: User's message
+            system_prompt: Optional custom system prompt
+            conversation_context: Optional conversation history
+            usage_context: {'user_id', 'project_id', 'session_id'} the call is billed to
+
+        Yields:
+            Text deltas of Claude's response
+        """
+        try:
+            request = self._chat_request(user_input, system_prompt, conversation_context, usage_context)
+            self.logger.debug(f"Streaming Claude chat API with {len(request['messages'])} messages")
+
+            yield from stream_text(self.client, **request)
+
+        except Exception as e:
+            self.logger.error(f"Error in chat stream: {e}")
+            raise
+
     def extract_parameters(
         self,
         user_input: str,
         operation: str,
-        required_params: List[str]
+        required_params: List[str],
+        usage_context: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """
         Extract operation parameters from user input using Claude.
@@ -295,6 +430,7 @@ When appropriate, suggest using specific operations."""
             user_input: User's natural language input
             operation: Operation name
             required_params: List of required parameter names
+            usage_context: {'user_id', 'project_id', 'session_id'} the call is billed to
 
         Returns:
             Dictionary of extracted parameters
@@ -324,7 +460,8 @@ If parameters are unclear or missing, list them in "missing"."""
             response = self.client.messages.create(
                 model=self.current_model,
                 max_tokens=200,
-                messages=[{"role": "user", "content": prompt}]
+                messages=[{"role": "user", "content": prompt}],
+                **self._usage_kwargs(usage_context)
             )
 
             data = json.loads(response.content[0].text.strip())
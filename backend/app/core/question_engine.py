@@ -13,6 +13,7 @@ This enables:
 
 import json
 import logging
+import re
 from typing import Any, Dict, List, Optional
 
 from .models import ProjectData, QuestionData, SpecificationData, UserBehaviorData
@@ -141,35 +142,7 @@ class QuestionGenerator:
         Returns:
             Prompt string for Claude API
         """
-        # Format user learning context if available
-        user_learning_context = ""
-        if user_behavior:
-            total_q = user_behavior.total_questions_asked
-            quality = user_behavior.overall_response_quality
-            if total_q > 0:
-                user_learning_context = f"""
-USER LEARNING PROFILE:
-- Experience: {total_q} questions answered previously
-- Response quality: {quality:.0%}
-- Known patterns: {len(user_behavior.patterns)} learned behavior patterns
-
-Adapt your question style based on this user's experience level and communication style.
-"""
-
-        prompt = f"""You are a Socratic counselor helping gather requirements for a software project.
-
-PROJECT CONTEXT:
-- Name: {project.name}
-- Description: {project.description or 'None provided yet'}
-- Phase: {project.current_phase}
-- Maturity: {project.maturity_score:.0f}%
-
-EXISTING SPECIFICATIONS:
-{self._format_specs(specs)}
-
-PREVIOUS QUESTIONS ASKED:
-{self._format_questions(previous_questions)}
-{user_learning_context}NEXT FOCUS AREA: {next_category}
+        prompt = f"""{self._prompt_context(project, specs, previous_questions, user_behavior)}NEXT FOCUS AREA: {next_category}
 
 TASK:
 Generate the next question focusing on: {next_category}
@@ -196,6 +169,86 @@ Return ONLY valid JSON in this EXACT format (no additional text):
 
         return prompt
 
+    def select_batch_categories(self, coverage: Dict[str, float], count: int) -> List[str]:
+        """
+        Pick a focus category for each question of a batch.
+
+        Pure logic: categories are taken from lowest to highest coverage,
+        so a batch spreads over the weakest areas instead of asking
+        `count` questions about the same one. Wraps around for batches
+        larger than the number of categories.
+
+        Args:
+            coverage: Dictionary mapping category to coverage percentage
+            count: Number of questions in the batch
+
+        Returns:
+            List of `count` category names
+        """
+        if count <= 0:
+            return []
+        ordered = sorted(QUESTION_CATEGORIES, key=lambda category: coverage.get(category, 0.0))
+        return [ordered[index % len(ordered)] for index in range(count)]
+
+    def build_batch_question_prompt(
+        self,
+        project: ProjectData,
+        specs: List[SpecificationData],
+        previous_questions: List[QuestionData],
+        categories: List[str],
+        user_behavior: Optional[UserBehaviorData] = None
+    ) -> str:
+        """
+        Build prompt for Claude to generate several questions in one response.
+
+        Pure logic: same context as build_question_generation_prompt, one
+        question requested per entry of `categories`.
+
+        Args:
+            project: ProjectData instance
+            specs: List of SpecificationData instances
+            previous_questions: List of QuestionData instances
+            categories: Focus category of each question (see select_batch_categories)
+            user_behavior: Optional UserBehaviorData for personalization
+
+        Returns:
+            Prompt string for Claude API
+        """
+        focus_areas = "\n".join(f"{index}. {category}" for index, category in enumerate(categories, start=1))
+
+        prompt = f"""{self._prompt_context(project, specs, previous_questions, user_behavior)}FOCUS AREAS (one question each, in this order):
+{focus_areas}
+
+TASK:
+Generate {len(categories)} different questions, one for each focus area above.
+
+REQUIREMENTS:
+1. Each question asks about ONE specific aspect of its focus area
+2. Keep each question concise and clear (max 2 sentences)
+3. Avoid assuming solutions (no "should we use X?" questions)
+4. Make them open-ended to encourage detailed answers
+5. Provide context about why each question matters
+6. Do NOT repeat or rephrase previous questions
+7. Questions in this batch must not overlap each other
+
+IMPORTANT:
+- If user hasn't described their project yet, ask about project goals/purpose
+- If basic goals are known, ask progressively deeper questions
+- Focus on understanding WHAT they want, not HOW to build it (yet)
+
+Return ONLY valid JSON in this EXACT format (no additional text):
+{{
+  "questions": [
+    {{
+      "text": "the question text",
+      "category": "its focus area",
+      "context": "brief explanation of why this question matters"
+    }}
+  ]
+}}"""
+
+        return prompt
+
     def parse_question_response(self, response_text: str, category: str) -> Dict[str, Any]:
         """
         Parse Claude's JSON response into question data.
@@ -210,18 +263,8 @@ Return ONLY valid JSON in this EXACT format (no additional text):
             Dictionary with keys: text, category, context
             Raises json.JSONDecodeError if response is invalid
         """
-        # Strip markdown code fences if present
-        if response_text.startswith('```json'):
-            response_text = response_text[7:]  # Remove ```json
-        if response_text.startswith('```'):
-            response_text = response_text[3:]  # Remove ```
-        if response_text.endswith('```'):
-            response_text = response_text[:-3]  # Remove ```
-
-        response_text = response_text.strip()
-
         # Parse JSON
-        question_data = json.loads(response_text)
+        question_data = json.loads(self._strip_code_fences(response_text))
 
         # Validate required fields
         if 'text' not in question_data:
@@ -233,6 +276,53 @@ Return ONLY valid JSON in this EXACT format (no additional text):
 
         return question_data
 
+    def parse_batch_question_response(
+        self,
+        response_text: str,
+        categories: List[str],
+        previous_questions: Optional[List[QuestionData]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Parse Claude's JSON response to a batch prompt into question data.
+
+        Pure logic: entries without text are skipped, and so are questions
+        that repeat another question of the batch or a previous question
+        (compared case- and punctuation-insensitively).
+
+        Args:
+            response_text: Raw response from Claude API
+            categories: Focus categories the questions were requested for
+            previous_questions: Previously asked questions to exclude
+
+        Returns:
+            List of dictionaries with keys: text, category, context
+            Raises json.JSONDecodeError if response is invalid JSON,
+            ValueError if it has no question list
+        """
+        document = json.loads(self._strip_code_fences(response_text))
+        entries = document.get('questions') if isinstance(document, dict) else document
+        if not isinstance(entries, list):
+            raise ValueError("Batch question response missing 'questions' list")
+
+        seen = {self._question_key(q.text) for q in previous_questions or []}
+        questions = []
+        for index, entry in enumerate(entries):
+            if not isinstance(entry, dict) or not str(entry.get('text') or '').strip():
+                continue
+            key = self._question_key(entry['text'])
+            if key in seen:
+                self.logger.debug(f"Dropping repeated question from batch: {entry['text']}")
+                continue
+            seen.add(key)
+            fallback = categories[min(index, len(categories) - 1)] if categories else 'goals'
+            questions.append({
+                'text': str(entry['text']).strip(),
+                'category': entry.get('category') or fallback,
+                'context': entry.get('context') or ""
+            })
+
+        return questions
+
     def create_question_data(
         self,
         question_id: str,
@@ -268,6 +358,78 @@ Return ONLY valid JSON in this EXACT format (no additional text):
     # PRIVATE HELPERS (Pure Logic)
     # =========================================================================
 
+    def _prompt_context(
+        self,
+        project: ProjectData,
+        specs: List[SpecificationData],
+        previous_questions: List[QuestionData],
+        user_behavior: Optional[UserBehaviorData]
+    ) -> str:
+        """
+        Shared opening of the question prompts (role, project, specs, history).
+
+        Args:
+            project: ProjectData instance
+            specs: List of SpecificationData instances
+            previous_questions: List of QuestionData instances
+            user_behavior: Optional UserBehaviorData for personalization
+
+        Returns:
+            Prompt text, ending where the focus area section starts
+        """
+        # Format user learning context if available
+        user_learning_context = ""
+        if user_behavior:
+            total_q = user_behavior.total_questions_asked
+            quality = user_behavior.overall_response_quality
+            if total_q > 0:
+                user_learning_context = f"""
+USER LEARNING PROFILE:
+- Experience: {total_q} questions answered previously
+- Response quality: {quality:.0%}
+- Known patterns: {len(user_behavior.patterns)} learned behavior patterns
+
+Adapt your question style based on this user's experience level and communication style.
+"""
+
+        return f"""You are a Socratic counselor helping gather requirements for a software project.
+
+PROJECT CONTEXT:
+- Name: {project.name}
+- Description: {project.description or 'None provided yet'}
+- Phase: {project.current_phase}
+- Maturity: {project.maturity_score:.0f}%
+
+EXISTING SPECIFICATIONS:
+{self._format_specs(specs)}
+
+PREVIOUS QUESTIONS ASKED:
+{self._format_questions(previous_questions)}
+{user_learning_context}"""
+
+    def _strip_code_fences(self, response_text: str) -> str:
+        """
+        Remove markdown code fences around a JSON response.
+
+        Args:
+            response_text: Raw response from Claude API
+
+        Returns:
+            Response text without fences, stripped
+        """
+        if response_text.startswith('```json'):
+            response_text = response_text[7:]  # Remove ```json
+        if response_text.startswith('```'):
+            response_text = response_text[3:]  # Remove ```
+        if response_text.endswith('```'):
+            response_text = response_text[:-3]  # Remove ```
+
+        return response_text.strip()
+
+    def _question_key(self, text: str) -> str:
+        """Normalized question text for duplicate detection."""
+        return " ".join(re.sub(r"[^\w\s]", " ", text.lower()).split())
+
     def _format_specs(self, specs: List[SpecificationData]) -> str:
         """
         Format specifications for prompt.
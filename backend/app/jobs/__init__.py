@@ -4,11 +4,20 @@ Background jobs module for Socrates.
 Contains scheduled tasks and job definitions.
 """
 from .analytics_jobs import aggregate_daily_analytics, process_analytics_queue
-from .maintenance_jobs import cleanup_old_sessions, refresh_cached_metrics
+from .maintenance_jobs import (
+    cleanup_old_sessions,
+    fail_stale_ingestion_jobs,
+    rebuild_spec_stats,
+    refresh_cached_metrics,
+)
+from .vector_index_jobs import rebuild_vector_indexes
 
 __all__ = [
     "aggregate_daily_analytics",
     "process_analytics_queue",
     "cleanup_old_sessions",
     "refresh_cached_metrics",
+    "rebuild_spec_stats",
+    "fail_stale_ingestion_jobs",
+    "rebuild_vector_indexes",
 ]
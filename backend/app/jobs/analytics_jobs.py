@@ -5,125 +5,64 @@ Jobs:
 - aggregate_daily_analytics: Aggregates analytics events into daily metrics
 - process_analytics_queue: Processes pending analytics events
 """
+import asyncio
 import logging
-from datetime import datetime, timedelta, timezone
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional
 
 logger = logging.getLogger(__name__)
 
 
-async def aggregate_daily_analytics() -> dict:
+async def aggregate_daily_analytics(since: Optional[str] = None) -> dict:
     """
     Aggregate analytics events into daily metrics.
 
     This job runs daily at 2 AM UTC and:
-    1. Fetches all analytics events from the previous day
-    2. Groups them by project
-    3. Calculates metrics (analyses_count, specs_added, conflicts_resolved)
-    4. Saves aggregates to project_metrics table
+    1. Reads the job watermark (end of the last aggregated day)
+    2. Aggregates each complete day since then, plus ANALYTICS_LOOKBACK_DAYS
+       already aggregated days for late events, with one GROUP BY/upsert
+       statement per day (see services/analytics_aggregation.py)
+    3. Commits every day together with the watermark, so an interrupted
+       catch-up resumes at the first missing day
+
+    Args:
+        since: ISO date to recompute from regardless of the watermark (backfill)
 
     Returns:
         Dictionary with aggregation results
     """
     try:
         # Import here to avoid circular imports
+        from ..core.config import settings
         from ..core.database import SessionLocalSpecs
-        from ..models.analytics_event import AnalyticsEvent
-        from ..models.project_metrics import ProjectMetrics
-
-        db = SessionLocalSpecs()
-
-        try:
-            yesterday = datetime.now(timezone.utc).date() - timedelta(days=1)
-            start_time = datetime.combine(yesterday, datetime.min.time(), tzinfo=timezone.utc)
-            end_time = start_time + timedelta(days=1)
-
-            logger.info(f"Aggregating analytics for {yesterday}")
-
-            # Get events from yesterday
-            events = db.query(AnalyticsEvent).filter(
-                AnalyticsEvent.timestamp >= start_time,
-                AnalyticsEvent.timestamp < end_time
-            ).all()
-
-            if not events:
-                logger.info("No analytics events to aggregate")
-                return {"status": "success", "aggregated_projects": 0, "total_events": 0}
-
-            # Aggregate by project
-            project_aggregates = {}
-            for event in events:
-                try:
-                    event_data = event.event_data or {}
-                    project_id = event_data.get("project_id")
-
-                    if not project_id:
-                        continue
-
-                    if project_id not in project_aggregates:
-                        project_aggregates[project_id] = {
-                            "analyses_count": 0,
-                            "specs_added": 0,
-                            "conflicts_resolved": 0,
-                            "sessions_created": 0,
-                            "user_id": event.user_id,
-                        }
-
-                    if event.event_type == "analysis_run":
-                        project_aggregates[project_id]["analyses_count"] += 1
-                    elif event.event_type == "spec_added":
-                        project_aggregates[project_id]["specs_added"] += 1
-                    elif event.event_type == "conflict_resolved":
-                        project_aggregates[project_id]["conflicts_resolved"] += 1
-                    elif event.event_type == "session_created":
-                        project_aggregates[project_id]["sessions_created"] += 1
-
-                except Exception as e:
-                    logger.warning(f"Error processing analytics event {event.id}: {e}")
-                    continue
-
-            # Save aggregates
-            saved_count = 0
-            for project_id, metrics in project_aggregates.items():
-                try:
-                    # Check if metric already exists for this date
-                    existing = db.query(ProjectMetrics).filter(
-                        ProjectMetrics.project_id == project_id,
-                        ProjectMetrics.date == yesterday
-                    ).first()
-
-                    if existing:
-                        # Update existing metric
-                        existing.analyses_count = metrics["analyses_count"]
-                        existing.specs_added = metrics["specs_added"]
-                        existing.conflicts_resolved = metrics["conflicts_resolved"]
-                        existing.sessions_created = metrics.get("sessions_created", 0)
-                    else:
-                        # Create new metric
-                        metric = ProjectMetrics(
-                            project_id=project_id,
-                            user_id=metrics["user_id"],
-                            date=yesterday,
-                            **{k: v for k, v in metrics.items() if k != "user_id"}
-                        )
-                        db.add(metric)
-
-                    saved_count += 1
-
-                except Exception as e:
-                    logger.error(f"Error saving metric for project {project_id}: {e}")
-                    continue
-
-            db.commit()
-            logger.info(f"Successfully aggregated {saved_count} projects, {len(events)} total events")
-
-            return {
-                "status": "success",
-                "aggregated_projects": saved_count,
-                "total_events": len(events),
-            }
+        from ..services.analytics_aggregation import aggregate_pending_windows
+
+        since_day = date.fromisoformat(since) if since else None
+
+        def run() -> dict:
+            db = SessionLocalSpecs()
+            try:
+                return aggregate_pending_windows(
+                    db,
+                    lookback_days=settings.ANALYTICS_LOOKBACK_DAYS,
+                    max_windows=settings.ANALYTICS_MAX_WINDOWS_PER_RUN,
+                    since=since_day,
+                )
+            finally:
+                db.close()
+
+        # Database-bound: keep it off the scheduler's event loop
+        result = await asyncio.to_thread(run)
+        logger.info(
+            f"Aggregated {result['windows']} analytics windows into {result['project_rows']} project rows "
+            f"(watermark {result['watermark']})"
+        )
 
-        finally:
-            db.close()
+        return {
+            "status": "success",
+            "aggregated_projects": result["project_rows"],
+            **result,
+        }
 
     except Exception as e:
         logger.error(f"Analytics aggregation failed: {e}", exc_info=True)
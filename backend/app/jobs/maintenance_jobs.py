@@ -4,9 +4,14 @@ Maintenance-related background jobs.
 Jobs:
 - cleanup_old_sessions: Removes old or expired sessions
 - refresh_cached_metrics: Refreshes cached metrics
+- rebuild_spec_stats: Repairs the per-project specification aggregates
+- fail_stale_ingestion_jobs: Fails document ingestion jobs orphaned by a restart
 """
+import asyncio
 import logging
+import uuid
 from datetime import datetime, timedelta, timezone
+from typing import Optional
 
 logger = logging.getLogger(__name__)
 
@@ -115,3 +120,111 @@ async def refresh_cached_metrics() -> dict:
             "status": "error",
             "error": str(e),
         }
+
+
+async def rebuild_spec_stats(project_id: Optional[str] = None) -> dict:
+    """
+    Rebuild the per-project, per-category specification aggregates.
+
+    The aggregates are maintained on every ORM write to specifications;
+    bulk statements (query.update()/query.delete()) and manual SQL bypass
+    that. This job runs daily at 5 AM UTC (and can be run by hand after a
+    bulk change or migration) and:
+    1. Recomputes count and confidence sum with one GROUP BY pass
+    2. Replaces the aggregate rows in a single transaction
+    3. Refreshes maturity scores of projects whose score changed
+
+    Args:
+        project_id: Only rebuild this project (default: all projects)
+
+    Returns:
+        Dictionary with rebuild results
+    """
+    try:
+        # Import here to avoid circular imports
+        from ..agents.context import maturity_from_category_scores
+        from ..core.database import SessionLocalSpecs
+        from ..models.project import Project
+        from ..models.project_spec_stats import ProjectSpecStats
+        from ..services import spec_stats
+
+        if project_id is not None:
+            project_id = uuid.UUID(str(project_id))
+
+        db = SessionLocalSpecs()
+
+        try:
+            logger.info("Rebuilding specification aggregates...")
+            rows = spec_stats.rebuild_spec_stats(db, project_id)
+
+            # Recompute maturity from the rebuilt aggregates (O(categories) per project)
+            category_scores = {}
+            stats = db.query(ProjectSpecStats)
+            if project_id is not None:
+                stats = stats.filter(ProjectSpecStats.project_id == project_id)
+            for row in stats:
+                category_scores.setdefault(row.project_id, {})[row.category] = float(row.confidence_sum)
+
+            projects = db.query(Project)
+            if project_id is not None:
+                projects = projects.filter(Project.id == project_id)
+
+            updated_projects = 0
+            for project in projects:
+                maturity = maturity_from_category_scores(category_scores.get(project.id, {}))
+                if project.maturity_score != maturity:
+                    project.maturity_score = maturity
+                    updated_projects += 1
+
+            db.commit()
+            logger.info(f"Rebuilt {rows} aggregate rows, updated maturity of {updated_projects} projects")
+
+            return {
+                "status": "success",
+                "aggregate_rows": rows,
+                "updated_projects": updated_projects,
+            }
+
+        except Exception:
+            db.rollback()
+            raise
+
+        finally:
+            db.close()
+
+    except Exception as e:
+        logger.error(f"Specification aggregate rebuild failed: {e}", exc_info=True)
+        return {
+            "status": "error",
+            "error": str(e),
+        }
+
+
+async def fail_stale_ingestion_jobs() -> dict:
+    """
+    Mark document ingestion jobs orphaned by a crash or restart as failed.
+
+    Runs at application startup and every 10 minutes. A job whose worker
+    died stays queued/processing until this job fails it, so clients
+    polling its status_url get an answer. Jobs still making progress in
+    another process are left alone (see IngestionQueue.fail_stale_jobs).
+
+    Returns:
+        Dictionary with the number of jobs marked failed
+    """
+    try:
+        # Import here to avoid circular imports
+        from ..services.ingestion_service import get_ingestion_queue
+
+        failed = await asyncio.to_thread(get_ingestion_queue().fail_stale_jobs)
+        return {
+            "status": "success",
+            "failed_jobs": failed,
+        }
+
+    except Exception as e:
+        logger.error(f"Stale ingestion job check failed: {e}", exc_info=True)
+        return {
+            "status": "error",
+            "error": str(e),
+        }
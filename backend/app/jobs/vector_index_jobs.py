@@ -0,0 +1,93 @@
+"""
+Vector index background jobs.
+
+Jobs:
+- rebuild_vector_indexes: Rebuilds large project indexes and retrains their IVF partitions
+"""
+import logging
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+async def rebuild_vector_indexes(min_chunks: Optional[int] = None) -> dict:
+    """
+    Rebuild vector indexes for projects large enough to use IVF search.
+
+    This job runs daily at 4 AM UTC and:
+    1. Counts embedded document chunks per project
+    2. Rebuilds each large project's index from the database
+    3. Retrains its IVF centroids (chunks inserted since the last build
+       are assigned to stale centroids, which lowers recall over time)
+    4. Writes the new sidecar so all workers pick it up
+
+    Args:
+        min_chunks: Only rebuild projects with at least this many chunks
+            (default VECTOR_ANN_MIN_CHUNKS)
+
+    Returns:
+        Dictionary with rebuild results
+    """
+    try:
+        # Import here to avoid circular imports
+        from sqlalchemy import func
+
+        from ..core.database import SessionLocalSpecs
+        from ..models.document_chunk import DocumentChunk
+        from ..models.knowledge_base_document import KnowledgeBaseDocument
+        from ..services.vector_index import get_vector_index_manager
+
+        manager = get_vector_index_manager()
+        if min_chunks is None:
+            min_chunks = manager.ann_min_chunks
+        if not min_chunks:
+            logger.info("Approximate vector search disabled; skipping index rebuild")
+            return {"status": "success", "rebuilt_projects": 0, "failed_projects": 0}
+
+        db = SessionLocalSpecs()
+
+        try:
+            project_counts = db.query(
+                KnowledgeBaseDocument.project_id,
+                func.count(DocumentChunk.id)
+            ).join(
+                DocumentChunk,
+                DocumentChunk.document_id == KnowledgeBaseDocument.id
+            ).filter(
+                DocumentChunk.embedding_vector.isnot(None)
+            ).group_by(
+                KnowledgeBaseDocument.project_id
+            ).having(
+                func.count(DocumentChunk.id) >= min_chunks
+            ).all()
+
+            rebuilt = 0
+            failed = 0
+            for project_id, chunk_count in project_counts:
+                try:
+                    index = manager.rebuild(str(project_id), db)
+                    rebuilt += 1
+                    lists = index.ann.n_lists if index.ann is not None else 0
+                    logger.info(
+                        f"Rebuilt vector index for project {project_id}: "
+                        f"{chunk_count} chunks, {lists} IVF lists"
+                    )
+                except Exception as e:
+                    failed += 1
+                    logger.error(f"Vector index rebuild failed for project {project_id}: {e}")
+
+            return {
+                "status": "success",
+                "rebuilt_projects": rebuilt,
+                "failed_projects": failed,
+            }
+
+        finally:
+            db.close()
+
+    except Exception as e:
+        logger.error(f"Vector index rebuild failed: {e}", exc_info=True)
+        return {
+            "status": "error",
+            "error": str(e),
+        }
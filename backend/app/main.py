@@ -5,6 +5,7 @@ Socrates - AI-Powered Specification Assistant
 Phase 7.0+: Pluggifiable Domain Architecture (COMPLETE)
 Phase 7.2: Domain API Integration (IN PROGRESS)
 """
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 from typing import Callable, Optional
@@ -52,6 +53,7 @@ from .core.action_logger import initialize_action_logger
 from .core.config import settings
 from .core.database import close_db_connections
 from .core.sentry_config import init_sentry
+from .middleware.llm_cache_middleware import LLMCacheMiddleware
 from .middleware.rate_limit_middleware import RateLimitMiddleware
 
 # Configure logging
@@ -80,8 +82,14 @@ def _initialize_job_scheduler():
     If APScheduler is not installed, logs a warning and continues without scheduling.
     """
     try:
-        from .jobs import aggregate_daily_analytics, cleanup_old_sessions
-        from .services.job_scheduler import get_scheduler, APSCHEDULER_AVAILABLE
+        from .jobs import (
+            aggregate_daily_analytics,
+            cleanup_old_sessions,
+            fail_stale_ingestion_jobs,
+            rebuild_spec_stats,
+            rebuild_vector_indexes,
+        )
+        from .services.job_scheduler import APSCHEDULER_AVAILABLE, get_scheduler
 
         if not APSCHEDULER_AVAILABLE:
             logger.warning(
@@ -116,6 +124,37 @@ def _initialize_job_scheduler():
             timezone="UTC"
         )
 
+        # Vector index rebuild (IVF retraining) at 4 AM UTC
+        scheduler.add_job(
+            rebuild_vector_indexes,
+            trigger="cron",
+            job_id="rebuild_vector_indexes",
+            name="Rebuild Vector Indexes",
+            hour=4,
+            minute=0,
+            timezone="UTC"
+        )
+
+        # Specification aggregate repair at 5 AM UTC
+        scheduler.add_job(
+            rebuild_spec_stats,
+            trigger="cron",
+            job_id="rebuild_spec_stats",
+            name="Rebuild Specification Aggregates",
+            hour=5,
+            minute=0,
+            timezone="UTC"
+        )
+
+        # Orphaned document ingestion jobs every 10 minutes
+        scheduler.add_job(
+            fail_stale_ingestion_jobs,
+            trigger="interval",
+            job_id="fail_stale_ingestion_jobs",
+            name="Fail Stale Ingestion Jobs",
+            minutes=10
+        )
+
         logger.info("Background job scheduler initialized with registered jobs")
     except Exception as e:
         logger.error(f"Failed to initialize job scheduler: {e}", exc_info=True)
@@ -160,6 +199,10 @@ def create_app(register_agents_fn: Optional[Callable] = None) -> FastAPI:
         # Initialize background job scheduler
         _initialize_job_scheduler()
 
+        # Fail document ingestion jobs left active by a previous crash
+        from .jobs import fail_stale_ingestion_jobs
+        await fail_stale_ingestion_jobs()
+
         # Initialize orchestrator and register agents
         if register_agents_fn:
             # Use injected agent registration function
@@ -180,6 +223,27 @@ def create_app(register_agents_fn: Optional[Callable] = None) -> FastAPI:
             scheduler.stop()
             logger.info("Job scheduler stopped")
 
+        # Stop background document ingestion workers
+        from .services.ingestion_service import get_ingestion_queue
+        await get_ingestion_queue().stop()
+
+        # Write vector index changes not yet in their sidecars
+        from .services.vector_index import get_vector_index_manager
+        get_vector_index_manager().close()
+
+        # Finish LLM calls in flight and close the provider connection pools;
+        # their usage rows reach the usage writer before it is closed
+        from .services.llm_gateway import close_llm_gateway
+        await asyncio.to_thread(close_llm_gateway)
+
+        # Write buffered LLM usage rows before the database connections close
+        from .services.usage_writer import get_usage_writer
+        get_usage_writer().close()
+
+        # Stop cache background sweeper / close Redis connection
+        from .services.cache_service import cache_service
+        cache_service.close()
+
         close_db_connections()
         logger.info("Database connections closed")
 
@@ -204,6 +268,10 @@ def create_app(register_agents_fn: Optional[Callable] = None) -> FastAPI:
     # Add rate limiting middleware (Phase 2)
     app.add_middleware(RateLimitMiddleware)
 
+    # X-LLM-Cache: bypass|refresh for debugging cached LLM responses
+    if settings.LLM_CACHE_BYPASS_HEADER:
+        app.add_middleware(LLMCacheMiddleware)
+
     # Include routers
     app.include_router(auth.router)
     app.include_router(admin.router)
@@ -0,0 +1,56 @@
+"""
+LLM response cache debugging middleware for FastAPI.
+
+Lets a request skip the LLM response cache with a header:
+
+    X-LLM-Cache: bypass    # neither read nor write cached responses
+    X-LLM-Cache: refresh   # call the provider and overwrite cached responses
+
+Registered only when LLM_CACHE_BYPASS_HEADER is enabled, since bypassing
+the cache makes every call billable.
+"""
+import logging
+from typing import Callable
+
+from fastapi import Request
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from ..services.llm_cache import reset_cache_mode, set_cache_mode
+
+logger = logging.getLogger(__name__)
+
+LLM_CACHE_HEADER = "X-LLM-Cache"
+
+
+class LLMCacheMiddleware(BaseHTTPMiddleware):
+    """
+    FastAPI middleware that applies the X-LLM-Cache header to LLM calls.
+
+    The mode is stored in a context variable, which the LLM gateway reads
+    for every cache=True call made while handling the request.
+    """
+
+    async def dispatch(self, request: Request, call_next: Callable) -> any:
+        """
+        Set the cache mode for the request when the header is present.
+
+        Args:
+            request: Incoming HTTP request
+            call_next: Next middleware/endpoint
+
+        Returns:
+            Response (echoing the applied mode in X-LLM-Cache)
+        """
+        mode = request.headers.get(LLM_CACHE_HEADER, "").strip().lower()
+        if mode not in ("bypass", "refresh"):
+            return await call_next(request)
+
+        logger.debug(f"LLM cache {mode} requested for {request.method} {request.url.path}")
+        token = set_cache_mode(mode)
+        try:
+            response = await call_next(request)
+        finally:
+            reset_cache_mode(token)
+
+        response.headers[LLM_CACHE_HEADER] = mode
+        return response
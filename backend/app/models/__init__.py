@@ -17,6 +17,10 @@ from .project import Project
 from .session import Session
 from .question import Question
 from .specification import Specification
+from .project_spec_stats import ProjectSpecStats
+# Importing spec_revision registers the session hooks that bump
+# projects.spec_revision on every specification write
+from .spec_revision import bump_spec_revisions
 from .conversation_history import ConversationHistory
 from .conflict import Conflict
 
@@ -38,12 +42,18 @@ from .project_share import ProjectShare
 # SPECS Database Models - API & LLM Integration
 from .api_key import APIKey
 from .llm_usage_tracking import LLMUsageTracking
+from .llm_usage_daily import LLMUsageDaily
 from .subscription import Subscription
 from .invoice import Invoice
 
 # SPECS Database Models - Analytics & Search
 from .analytics_metrics import AnalyticsMetrics
+from .analytics_event import AnalyticsEvent
+from .project_metrics import ProjectMetrics
+from .job_watermark import JobWatermark
 from .document_chunk import DocumentChunk
+from .embedding_cache_entry import EmbeddingCacheEntry
+from .ingestion_job import IngestionJob
 from .notification_preferences import NotificationPreferences
 
 # SPECS Database Models - Activity & Management
@@ -69,6 +79,8 @@ __all__ = [
     'Session',
     'Question',
     'Specification',
+    'ProjectSpecStats',
+    'bump_spec_revisions',
     'ConversationHistory',
     'Conflict',
 
@@ -90,12 +102,18 @@ __all__ = [
     # SPECS Database - API & LLM Integration
     'APIKey',
     'LLMUsageTracking',
+    'LLMUsageDaily',
     'Subscription',
     'Invoice',
 
     # SPECS Database - Analytics & Search
     'AnalyticsMetrics',
+    'AnalyticsEvent',
+    'ProjectMetrics',
+    'JobWatermark',
     'DocumentChunk',
+    'EmbeddingCacheEntry',
+    'IngestionJob',
     'NotificationPreferences',
 
     # SPECS Database - Activity & Management
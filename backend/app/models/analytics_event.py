@@ -0,0 +1,70 @@
+"""
+AnalyticsEvent model for specifications database (socrates_specs).
+Raw user action events, aggregated daily into project_metrics.
+"""
+import uuid
+
+from sqlalchemy import JSON, Column, DateTime, Index, String, func
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+
+from ..core.database import Base
+
+
+class AnalyticsEvent(Base):
+    """
+    AnalyticsEvent model - append-only user action events.
+
+    NOTE: Does NOT inherit from BaseModel because events are immutable;
+    timestamp is the only time column.
+
+    Fields:
+    - id: UUID primary key
+    - user_id: References users.id in socrates_auth database (cross-database, no FK)
+    - event_type: project_created, spec_added, analysis_run, conflict_resolved, session_created, ...
+    - event_data: Event context as JSON (project_id, spec_id, ...)
+    - timestamp: When the event happened
+    """
+    __tablename__ = "analytics_events"
+    __table_args__ = (
+        # Daily aggregation scans one timestamp window at a time
+        Index('idx_analytics_events_timestamp', 'timestamp'),
+        Index('idx_analytics_events_user_id', 'user_id'),
+        Index('idx_analytics_events_event_type', 'event_type'),
+    )
+
+    id = Column(
+        PG_UUID(as_uuid=True),
+        primary_key=True,
+        default=uuid.uuid4,
+        nullable=False,
+        comment="Event ID (UUID)"
+    )
+
+    user_id = Column(
+        PG_UUID(as_uuid=True),
+        nullable=False,
+        comment="User who triggered the event"
+    )
+
+    event_type = Column(
+        String(50),
+        nullable=False,
+        comment="Event type: project_created, spec_added, analysis_run, conflict_resolved, etc."
+    )
+
+    event_data = Column(
+        JSON,
+        nullable=True,
+        comment="Event context data as JSON (project_id, spec_id, etc.)"
+    )
+
+    timestamp = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+        comment="Event timestamp"
+    )
+
+    def __repr__(self):
+        """String representation of the event"""
+        return f"<AnalyticsEvent(id={self.id}, event_type={self.event_type}, timestamp={self.timestamp})>"
@@ -1,6 +1,8 @@
 """
 ConversationHistory model for storing complete conversation history.
 """
+import uuid
+
 from sqlalchemy import BigInteger, Column, DateTime, ForeignKey, Index, Integer, JSON, String, Text, func
 
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
@@ -33,6 +35,7 @@ class ConversationHistory(Base):
     id = Column(
         PG_UUID(as_uuid=True),
         primary_key=True,
+        default=uuid.uuid4,
         server_default=func.text('gen_random_uuid()'),
         comment="Unique message identifier (UUID)"
     )
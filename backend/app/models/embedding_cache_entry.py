@@ -0,0 +1,44 @@
+"""Embedding cache entry model.
+
+Stores provider embeddings keyed by a hash of (model, normalised text) so
+identical text is only embedded once across uploads and queries.
+"""
+from sqlalchemy import Column, Integer, LargeBinary, String
+
+from .base import BaseModel
+
+
+class EmbeddingCacheEntry(BaseModel):
+    """Cached embedding vector.
+
+    Vectors are stored as raw little-endian float16/float32 bytes rather
+    than JSON lists (a 1536-dim float16 vector is 3 KB instead of ~30 KB).
+
+    Attributes:
+        id: SHA-256 hex digest of model + normalised text
+        model: Embedding model name
+        dim: Vector dimension
+        dtype: Blob element type (float16 | float32)
+        vector: Packed vector bytes
+        token_count: Estimated tokens the provider would bill for the text
+        created_at: Timestamp when entry was created
+    """
+    __tablename__ = "embedding_cache"
+
+    id = Column(String(64), primary_key=True)
+    model = Column(String(100), nullable=False, index=True)
+    dim = Column(Integer, nullable=False)
+    dtype = Column(String(16), nullable=False)
+    vector = Column(LargeBinary, nullable=False)
+    token_count = Column(Integer, nullable=False, default=0)
+
+    def to_dict(self):
+        """Convert to dictionary (without the vector blob)."""
+        return {
+            "id": self.id,
+            "model": self.model,
+            "dim": self.dim,
+            "dtype": self.dtype,
+            "token_count": self.token_count,
+            "created_at": self.created_at.isoformat() if self.created_at else None
+        }
@@ -0,0 +1,61 @@
+"""Ingestion job model.
+
+Tracks background processing of an uploaded knowledge base document
+(parse -> chunk -> embed -> insert) so clients can poll for progress.
+"""
+from sqlalchemy import Column, DateTime, Integer, String, Text
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+
+from .base import BaseModel
+
+
+class IngestionJob(BaseModel):
+    """Background document ingestion job.
+
+    Attributes:
+        id: Job ID (UUID)
+        project_id: Project the document is uploaded to
+        user_id: Uploading user
+        document_id: Created KnowledgeBaseDocument (set once processing starts)
+        filename: Original filename
+        file_size: Upload size in bytes
+        status: queued | processing | completed | failed
+        chunks_processed: Chunks stored so far
+        chunks_embedded: Stored chunks that have an embedding
+        embedding_status: pending | completed | partial | failed
+        error: Failure reason when status is failed
+        started_at: When a worker picked the job up
+        completed_at: When the job finished (completed or failed)
+    """
+    __tablename__ = "ingestion_jobs"
+
+    project_id = Column(PG_UUID(as_uuid=True), nullable=False, index=True)
+    user_id = Column(PG_UUID(as_uuid=True), nullable=False, index=True)
+    document_id = Column(PG_UUID(as_uuid=True), nullable=True)
+    filename = Column(String(255), nullable=False)
+    file_size = Column(Integer, nullable=False, default=0)
+    status = Column(String(20), nullable=False, default="queued", index=True)
+    chunks_processed = Column(Integer, nullable=False, default=0)
+    chunks_embedded = Column(Integer, nullable=False, default=0)
+    embedding_status = Column(String(20), nullable=False, default="pending")
+    error = Column(Text, nullable=True)
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+
+    def to_dict(self):
+        """Convert to dictionary."""
+        return {
+            "job_id": str(self.id),
+            "project_id": str(self.project_id),
+            "document_id": str(self.document_id) if self.document_id else None,
+            "filename": self.filename,
+            "file_size": self.file_size,
+            "status": self.status,
+            "chunks_processed": self.chunks_processed,
+            "chunks_embedded": self.chunks_embedded,
+            "embedding_status": self.embedding_status,
+            "error": self.error,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "completed_at": self.completed_at.isoformat() if self.completed_at else None
+        }
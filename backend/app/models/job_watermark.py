@@ -0,0 +1,48 @@
+"""
+JobWatermark model for specifications database (socrates_specs).
+Progress markers of resumable background jobs.
+"""
+from sqlalchemy import Column, DateTime, String, func
+
+from ..core.database import Base
+
+
+class JobWatermark(Base):
+    """
+    JobWatermark model - how far a windowed job has processed.
+
+    A job processes its input in time windows and advances its watermark
+    in the same transaction as each window's output, so an interrupted
+    run resumes at the first unprocessed window.
+
+    Fields:
+    - job_name: Job identifier (primary key)
+    - watermark: End (exclusive) of the last processed window
+    - updated_at: When the watermark last moved
+    """
+    __tablename__ = "job_watermarks"
+
+    job_name = Column(
+        String(100),
+        primary_key=True,
+        nullable=False,
+        comment="Job identifier"
+    )
+
+    watermark = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        comment="End (exclusive) of the last processed window"
+    )
+
+    updated_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+        onupdate=func.now(),
+        comment="When the watermark last moved"
+    )
+
+    def __repr__(self):
+        """String representation of the watermark"""
+        return f"<JobWatermark(job_name={self.job_name}, watermark={self.watermark})>"
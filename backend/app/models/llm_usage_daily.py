@@ -0,0 +1,196 @@
+"""
+Per-user, per-day LLM usage rollups.
+
+Usage statistics only need token, cost and call totals per user, day,
+provider and model. Keeping those totals up to date as usage rows are
+written turns a stats query into an indexed range scan over at most
+(days x models) rows instead of a scan over every recorded call.
+
+The rollups are maintained by record_usage_rows() (app/services/llm_gateway.py)
+in the same transaction as the llm_usage_tracking insert, so the raw rows
+and the rollups commit or roll back together.
+"""
+import uuid
+from collections import defaultdict
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from typing import Any, Dict, Iterable, Tuple
+
+from sqlalchemy import Column, Date, Index, Integer, Numeric, String, UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+
+from .base import BaseModel
+
+
+class LLMUsageDaily(BaseModel):
+    """
+    Usage totals of one user for one provider/model on one (UTC) day.
+
+    Fields:
+    - id: UUID (inherited from BaseModel)
+    - user_id: References users.id in socrates_auth database (cross-database, no FK)
+    - day: UTC date of the calls
+    - provider: LLM provider
+    - model: Model name
+    - request_count: Number of calls (including cache hits)
+    - tokens_input / tokens_output: Token totals
+    - cost_usd: Cost total in USD
+    - created_at / updated_at: Timestamps (inherited from BaseModel)
+    """
+    __tablename__ = "llm_usage_daily"
+    __table_args__ = (
+        # Leading (user_id, day) serves the per-user date range queries
+        UniqueConstraint('user_id', 'day', 'provider', 'model', name='uq_llm_usage_daily_user_day_model'),
+        Index('idx_llm_usage_daily_day', 'day'),
+    )
+
+    user_id = Column(
+        PG_UUID(as_uuid=True),
+        nullable=False,
+        comment="References users.id in socrates_auth database"
+    )
+
+    day = Column(
+        Date,
+        nullable=False,
+        comment="UTC date of the calls"
+    )
+
+    provider = Column(
+        String(50),
+        nullable=False,
+        comment="LLM provider used"
+    )
+
+    model = Column(
+        String(100),
+        nullable=False,
+        comment="Model name"
+    )
+
+    request_count = Column(
+        Integer,
+        nullable=False,
+        default=0,
+        server_default='0',
+        comment="Number of calls"
+    )
+
+    tokens_input = Column(
+        Integer,
+        nullable=False,
+        default=0,
+        server_default='0',
+        comment="Input tokens used"
+    )
+
+    tokens_output = Column(
+        Integer,
+        nullable=False,
+        default=0,
+        server_default='0',
+        comment="Output tokens generated"
+    )
+
+    cost_usd = Column(
+        Numeric(precision=14, scale=6),
+        nullable=False,
+        default=0,
+        server_default='0',
+        comment="Cost in USD"
+    )
+
+    def __repr__(self):
+        """String representation of the rollup"""
+        return (
+            f"<LLMUsageDaily(user_id={self.user_id}, day={self.day}, model={self.provider}/{self.model}, "
+            f"requests={self.request_count}, cost=${self.cost_usd})>"
+        )
+
+
+def usage_day(timestamp) -> date:
+    """UTC day a usage row belongs to (naive timestamps are taken as UTC)."""
+    if timestamp is None:
+        return datetime.now(timezone.utc).date()
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc)
+    return timestamp.date()
+
+
+def _rollup_deltas(rows: Iterable[Dict[str, Any]]) -> Dict[Tuple, Dict[str, Any]]:
+    """Sum usage rows per (user_id, day, provider, model)."""
+    deltas: Dict[Tuple, Dict[str, Any]] = defaultdict(
+        lambda: {'request_count': 0, 'tokens_input': 0, 'tokens_output': 0, 'cost_usd': Decimal("0")}
+    )
+    for row in rows:
+        key = (row['user_id'], usage_day(row.get('timestamp')), row['provider'], row['model'])
+        delta = deltas[key]
+        delta['request_count'] += 1
+        delta['tokens_input'] += row.get('tokens_input') or 0
+        delta['tokens_output'] += row.get('tokens_output') or 0
+        delta['cost_usd'] += Decimal(str(row.get('cost_usd') or 0))
+    return deltas
+
+
+def apply_usage_rollups(connection, rows: Iterable[Dict[str, Any]]) -> int:
+    """
+    Add a batch of llm_usage_tracking rows to the daily rollups.
+
+    The batch is summed per rollup key first, so a flush of N calls costs
+    one statement per (user, day, model) touched rather than N. Updates are
+    relative (tokens_input = tokens_input + delta), so concurrent writers
+    serialize on the row lock instead of overwriting each other.
+
+    Args:
+        connection: Connection of the transaction inserting the usage rows
+        rows: Usage row mappings (user_id, provider, model, tokens_input,
+            tokens_output, cost_usd, optional timestamp)
+
+    Returns:
+        Number of rollup rows touched
+    """
+    table = LLMUsageDaily.__table__
+    dialect = connection.dialect.name
+    deltas = _rollup_deltas(rows)
+
+    for (user_id, day, provider, model), delta in deltas.items():
+        if dialect in ("postgresql", "sqlite"):
+            if dialect == "postgresql":
+                from sqlalchemy.dialects.postgresql import insert
+            else:
+                from sqlalchemy.dialects.sqlite import insert
+
+            statement = insert(table).values(
+                id=uuid.uuid4(), user_id=user_id, day=day, provider=provider, model=model, **delta
+            )
+            connection.execute(statement.on_conflict_do_update(
+                index_elements=[table.c.user_id, table.c.day, table.c.provider, table.c.model],
+                set_={
+                    'request_count': table.c.request_count + delta['request_count'],
+                    'tokens_input': table.c.tokens_input + delta['tokens_input'],
+                    'tokens_output': table.c.tokens_output + delta['tokens_output'],
+                    'cost_usd': table.c.cost_usd + delta['cost_usd'],
+                    'updated_at': statement.excluded.updated_at
+                }
+            ))
+            continue
+
+        result = connection.execute(
+            table.update().where(
+                table.c.user_id == user_id,
+                table.c.day == day,
+                table.c.provider == provider,
+                table.c.model == model
+            ).values(
+                request_count=table.c.request_count + delta['request_count'],
+                tokens_input=table.c.tokens_input + delta['tokens_input'],
+                tokens_output=table.c.tokens_output + delta['tokens_output'],
+                cost_usd=table.c.cost_usd + delta['cost_usd']
+            )
+        )
+        if result.rowcount == 0:
+            connection.execute(table.insert().values(
+                id=uuid.uuid4(), user_id=user_id, day=day, provider=provider, model=model, **delta
+            ))
+
+    return len(deltas)
@@ -8,6 +8,7 @@ from decimal import Decimal
 
 from sqlalchemy import (
     BigInteger,
+    Boolean,
     Column,
     DateTime,
     ForeignKey,
@@ -15,6 +16,7 @@ from sqlalchemy import (
     Integer,
     Numeric,
     String,
+    false,
     func,
 )
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
@@ -41,6 +43,7 @@ class LLMUsageTracking(Base):
     - tokens_total: Total tokens used
     - cost_usd: Cost in USD
     - latency_ms: Request latency in milliseconds
+    - cached: Served from the LLM response cache (zero tokens and cost)
     - timestamp: When the LLM call was made
 
     Relationships:
@@ -56,7 +59,8 @@ class LLMUsageTracking(Base):
     )
 
     id = Column(
-        BigInteger,
+        # SQLite only auto-increments INTEGER PRIMARY KEY columns
+        BigInteger().with_variant(Integer, "sqlite"),
         primary_key=True,
         autoincrement=True,
         nullable=False,
@@ -125,6 +129,14 @@ class LLMUsageTracking(Base):
         comment="Request latency in milliseconds"
     )
 
+    cached = Column(
+        Boolean,
+        nullable=False,
+        default=False,
+        server_default=false(),
+        comment="Served from the LLM response cache"
+    )
+
     timestamp = Column(
         DateTime(timezone=True),
         nullable=False,
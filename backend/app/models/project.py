@@ -3,7 +3,7 @@ Project model for user projects.
 """
 import enum
 
-from sqlalchemy import Column, Index, Integer, String, Text
+from sqlalchemy import JSON, Column, Index, Integer, String, Text
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 from sqlalchemy.orm import relationship
 
@@ -33,6 +33,8 @@ class Project(BaseModel):
     - current_phase: Current workflow phase (discovery, analysis, design, implementation)
     - maturity_score: Overall maturity score (0-100)
     - status: Project status (active, archived, completed)
+    - chunking_config: Document chunking overrides (NULL = server defaults)
+    - spec_revision: Incremented whenever the project's specifications change
     - created_at: Timestamp (inherited from BaseModel)
     - updated_at: Timestamp (inherited from BaseModel)
     """
@@ -100,6 +102,20 @@ class Project(BaseModel):
         comment="Project status: active, archived, completed"
     )
 
+    chunking_config = Column(
+        JSON,
+        nullable=True,
+        comment="Document chunking overrides (strategy, max_tokens, overlap_tokens, ...); NULL = server defaults"
+    )
+
+    spec_revision = Column(
+        Integer,
+        nullable=False,
+        default=0,
+        server_default='0',
+        comment="Incremented on every flush that changes the project's specifications"
+    )
+
     # Relationships
     sessions = relationship("Session", back_populates="project", cascade="all, delete-orphan")
     questions = relationship("Question", back_populates="project", cascade="all, delete-orphan")
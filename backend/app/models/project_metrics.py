@@ -0,0 +1,97 @@
+"""
+ProjectMetrics model for specifications database (socrates_specs).
+Daily per-project activity counts computed from analytics_events.
+"""
+from sqlalchemy import Column, Date, DateTime, ForeignKey, Index, Integer, func
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+
+from ..core.database import Base
+
+
+class ProjectMetrics(Base):
+    """
+    ProjectMetrics model - one row per project and day.
+
+    NOTE: Does NOT inherit from BaseModel: (project_id, date) is the
+    natural primary key, which is what the aggregation upserts on.
+    Rows are recomputed, never edited by hand.
+
+    Fields:
+    - project_id: Foreign key to projects table (part of primary key)
+    - date: UTC day (part of primary key)
+    - user_id: Project owner (references users.id in socrates_auth, no FK)
+    - analyses_count / specs_added / conflicts_resolved / sessions_created:
+      Number of matching events that day
+    - updated_at: When the row was last recomputed
+    """
+    __tablename__ = "project_metrics"
+    __table_args__ = (
+        Index('idx_project_metrics_date', 'date'),
+    )
+
+    project_id = Column(
+        PG_UUID(as_uuid=True),
+        ForeignKey('projects.id', ondelete='CASCADE'),
+        primary_key=True,
+        nullable=False,
+        comment="Project ID"
+    )
+
+    date = Column(
+        Date,
+        primary_key=True,
+        nullable=False,
+        comment="Date of the metric (UTC)"
+    )
+
+    user_id = Column(
+        PG_UUID(as_uuid=True),
+        nullable=True,
+        comment="Project owner"
+    )
+
+    analyses_count = Column(
+        Integer,
+        nullable=False,
+        default=0,
+        server_default='0',
+        comment="Number of analyses run this day"
+    )
+
+    specs_added = Column(
+        Integer,
+        nullable=False,
+        default=0,
+        server_default='0',
+        comment="Number of specifications added this day"
+    )
+
+    conflicts_resolved = Column(
+        Integer,
+        nullable=False,
+        default=0,
+        server_default='0',
+        comment="Number of conflicts resolved this day"
+    )
+
+    sessions_created = Column(
+        Integer,
+        nullable=False,
+        default=0,
+        server_default='0',
+        comment="Number of sessions created this day"
+    )
+
+    updated_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+        comment="When the row was last recomputed"
+    )
+
+    def __repr__(self):
+        """String representation of the daily metrics"""
+        return (
+            f"<ProjectMetrics(project_id={self.project_id}, date={self.date}, analyses={self.analyses_count}, "
+            f"specs={self.specs_added}, conflicts={self.conflicts_resolved}, sessions={self.sessions_created})>"
+        )
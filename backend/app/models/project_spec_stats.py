@@ -0,0 +1,225 @@
+"""
+Per-project, per-category specification aggregates.
+
+Maturity scoring only needs, per category, how many current specs there
+are and the sum of their confidence. Keeping those sums up to date on
+every write makes maturity O(categories) instead of a scan over every
+specification of the project.
+
+The aggregates are maintained by mapper events on Specification, in the
+same transaction (and on the same connection) as the specification
+write, so they commit or roll back together with it. Bulk Core/ORM
+statements (query.update(), query.delete()) bypass mapper events; run
+rebuild_spec_stats() (maintenance job) after those.
+"""
+import uuid
+from decimal import Decimal
+
+from sqlalchemy import (
+    Column,
+    ForeignKey,
+    Index,
+    Integer,
+    Numeric,
+    String,
+    UniqueConstraint,
+    event,
+    inspect,
+)
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+
+from .base import BaseModel
+from .specification import Specification
+
+# Weight of a spec without a confidence score (matches maturity scoring)
+DEFAULT_SPEC_WEIGHT = Decimal("0.90")
+
+
+class ProjectSpecStats(BaseModel):
+    """
+    Aggregate of current specifications for one project category.
+
+    Fields:
+    - id: UUID (inherited from BaseModel)
+    - project_id: Foreign key to projects table
+    - category: Specification category
+    - spec_count: Number of current specifications
+    - confidence_sum: Sum of spec weights (confidence, or 0.90 when missing)
+    - created_at / updated_at: Timestamps (inherited from BaseModel)
+    """
+    __tablename__ = "project_spec_stats"
+    __table_args__ = (
+        UniqueConstraint('project_id', 'category', name='uq_project_spec_stats_project_category'),
+        Index('idx_project_spec_stats_project_id', 'project_id'),
+    )
+
+    project_id = Column(
+        PG_UUID(as_uuid=True),
+        ForeignKey('projects.id', ondelete='CASCADE'),
+        nullable=False,
+        comment="Foreign key to projects table"
+    )
+
+    category = Column(
+        String(100),
+        nullable=False,
+        comment="Specification category"
+    )
+
+    spec_count = Column(
+        Integer,
+        nullable=False,
+        default=0,
+        server_default='0',
+        comment="Number of current specifications in this category"
+    )
+
+    confidence_sum = Column(
+        Numeric(12, 2),
+        nullable=False,
+        default=0,
+        server_default='0',
+        comment="Sum of confidence of current specifications (missing confidence counts as 0.90)"
+    )
+
+    def __repr__(self):
+        """String representation of the aggregate"""
+        return (
+            f"<ProjectSpecStats(project_id={self.project_id}, category={self.category}, "
+            f"spec_count={self.spec_count}, confidence_sum={self.confidence_sum})>"
+        )
+
+
+def spec_weight(confidence) -> Decimal:
+    """
+    Maturity weight of one specification.
+
+    Args:
+        confidence: Specification confidence (may be None)
+
+    Returns:
+        The confidence, or DEFAULT_SPEC_WEIGHT when it is missing or zero
+    """
+    return Decimal(str(confidence)) if confidence else DEFAULT_SPEC_WEIGHT
+
+
+def apply_spec_stats_delta(connection, project_id, category: str, count_delta: int, weight_delta: Decimal) -> None:
+    """
+    Add a delta to one aggregate row, creating the row if needed.
+
+    The UPDATE is relative (spec_count = spec_count + delta), so concurrent
+    transactions touching the same category serialize on the row lock
+    instead of overwriting each other.
+
+    Args:
+        connection: Connection of the transaction doing the spec write
+        project_id: Project UUID
+        category: Specification category
+        count_delta: Change in current spec count
+        weight_delta: Change in confidence sum
+    """
+    table = ProjectSpecStats.__table__
+    dialect = connection.dialect.name
+
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+
+        statement = insert(table).values(
+            id=uuid.uuid4(),
+            project_id=project_id,
+            category=category,
+            spec_count=count_delta,
+            confidence_sum=weight_delta
+        )
+        connection.execute(statement.on_conflict_do_update(
+            index_elements=[table.c.project_id, table.c.category],
+            set_={
+                'spec_count': table.c.spec_count + count_delta,
+                'confidence_sum': table.c.confidence_sum + weight_delta,
+                'updated_at': statement.excluded.updated_at
+            }
+        ))
+        return
+
+    result = connection.execute(
+        table.update().where(
+            table.c.project_id == project_id,
+            table.c.category == category
+        ).values(
+            spec_count=table.c.spec_count + count_delta,
+            confidence_sum=table.c.confidence_sum + weight_delta
+        )
+    )
+    if result.rowcount == 0:
+        connection.execute(table.insert().values(
+            id=uuid.uuid4(),
+            project_id=project_id,
+            category=category,
+            spec_count=count_delta,
+            confidence_sum=weight_delta
+        ))
+
+
+def _contribution(project_id, category, is_current, confidence):
+    """(project_id, category, weight) a spec adds to the aggregates, or None."""
+    if is_current is False or project_id is None or category is None:
+        return None
+    return project_id, category, spec_weight(confidence)
+
+
+def _previous_value(state, key):
+    """Attribute value before the pending change (current value if unchanged)."""
+    history = state.attrs[key].history
+    if history.deleted:
+        return history.deleted[0]
+    if history.unchanged:
+        return history.unchanged[0]
+    return state.attrs[key].value
+
+
+# Attributes that decide a spec's contribution. active_history loads the
+# old value when one of them is set on an expired instance (the usual case
+# after a commit), so after_update can subtract the old contribution.
+_TRACKED_ATTRIBUTES = ("project_id", "category", "is_current", "confidence")
+
+
+def _keep_old_value(target, value, oldvalue, initiator):
+    return value
+
+
+for _key in _TRACKED_ATTRIBUTES:
+    event.listen(getattr(Specification, _key), "set", _keep_old_value, active_history=True, retval=True)
+
+
+@event.listens_for(Specification, "after_insert")
+def _spec_inserted(mapper, connection, target):
+    added = _contribution(target.project_id, target.category, target.is_current, target.confidence)
+    if added:
+        apply_spec_stats_delta(connection, added[0], added[1], 1, added[2])
+
+
+@event.listens_for(Specification, "after_update")
+def _spec_updated(mapper, connection, target):
+    state = inspect(target)
+    if not any(state.attrs[key].history.has_changes() for key in _TRACKED_ATTRIBUTES):
+        return
+
+    removed = _contribution(*(_previous_value(state, key) for key in _TRACKED_ATTRIBUTES))
+    added = _contribution(target.project_id, target.category, target.is_current, target.confidence)
+    if removed == added:
+        return
+    if removed:
+        apply_spec_stats_delta(connection, removed[0], removed[1], -1, -removed[2])
+    if added:
+        apply_spec_stats_delta(connection, added[0], added[1], 1, added[2])
+
+
+# before_delete: an expired instance can still load its values here
+@event.listens_for(Specification, "before_delete")
+def _spec_deleted(mapper, connection, target):
+    removed = _contribution(target.project_id, target.category, target.is_current, target.confidence)
+    if removed:
+        apply_spec_stats_delta(connection, removed[0], removed[1], -1, -removed[2])
@@ -0,0 +1,76 @@
+"""
+Per-project specification revision counter.
+
+projects.spec_revision (and updated_at) move whenever a flush inserts,
+changes or deletes specifications of the project, in the same
+transaction as the specification write. Export artifacts are keyed on
+the revision, so "has anything changed since the last export?" is a
+primary key lookup on projects.
+
+One UPDATE is issued per flush for all touched projects. Bulk
+Core/ORM statements (query.update(), query.delete()) bypass the session
+and must call bump_spec_revisions() themselves.
+"""
+from typing import Iterable, Set
+
+from sqlalchemy import event, func, inspect
+from sqlalchemy.orm import Session
+
+from .project import Project
+from .specification import Specification
+
+_PENDING_KEY = "spec_revision_projects"
+
+
+def bump_spec_revisions(connection, project_ids: Iterable) -> None:
+    """
+    Increment spec_revision of the given projects.
+
+    Args:
+        connection: Connection of the transaction doing the spec write
+        project_ids: Project UUIDs
+    """
+    project_ids = [project_id for project_id in set(project_ids) if project_id is not None]
+    if not project_ids:
+        return
+
+    table = Project.__table__
+    connection.execute(
+        table.update().where(
+            table.c.id.in_(project_ids)
+        ).values(
+            spec_revision=table.c.spec_revision + 1,
+            updated_at=func.now()
+        )
+    )
+
+
+def _touched_projects(session: Session) -> Set:
+    """Projects whose specifications the pending flush writes."""
+    touched = set()
+    for spec in session.new:
+        if isinstance(spec, Specification):
+            touched.add(spec.project_id)
+    for spec in session.deleted:
+        if isinstance(spec, Specification):
+            touched.add(spec.project_id)
+    for spec in session.dirty:
+        if isinstance(spec, Specification) and session.is_modified(spec, include_collections=False):
+            touched.add(spec.project_id)
+            # A spec moved to another project changes the old one too
+            touched.update(inspect(spec).attrs.project_id.history.deleted or ())
+    return touched
+
+
+# Collected before the flush, while deleted and expired specs can still be
+# loaded; bumped after it, on the flush's connection
+@event.listens_for(Session, "before_flush")
+def _collect_before_flush(session, flush_context, instances):
+    session.info[_PENDING_KEY] = _touched_projects(session)
+
+
+@event.listens_for(Session, "after_flush")
+def _bump_after_flush(session, flush_context):
+    touched = session.info.pop(_PENDING_KEY, None)
+    if touched:
+        bump_spec_revisions(session.connection(), touched)
@@ -0,0 +1,225 @@
+"""
+Set-based daily aggregation of analytics events into project_metrics.
+
+Each UTC day is one window, aggregated by a single statement:
+
+    INSERT INTO project_metrics (...)
+    SELECT project, day, count(*) FILTER (WHERE event_type = ...), ...
+    FROM analytics_events
+    WHERE timestamp in [day, day + 1) AND event_data.project_id is set
+    GROUP BY event_data.project_id
+    ON CONFLICT (project_id, date) DO UPDATE ...
+
+On databases without ON CONFLICT (anything but PostgreSQL and SQLite)
+the day's rows are deleted and re-inserted by a plain INSERT ... SELECT,
+counting with CASE instead of FILTER.
+
+No event is loaded into Python. Windows are processed oldest first; each
+one replaces that day's rows and moves the job watermark in the same
+transaction, so an interrupted catch-up resumes where it stopped and
+re-running a day gives the same rows.
+"""
+import logging
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any, Dict, Optional
+
+from sqlalchemy import String, case, cast, func, insert, literal, select, true
+from sqlalchemy.orm import Session
+
+from ..core.datetime_utils import as_utc
+
+logger = logging.getLogger(__name__)
+
+JOB_NAME = "daily_analytics"
+
+# Event type -> project_metrics counter column
+EVENT_COUNTERS = {
+    "analysis_run": "analyses_count",
+    "spec_added": "specs_added",
+    "conflict_resolved": "conflicts_resolved",
+    "session_created": "sessions_created",
+}
+
+DEFAULT_LOOKBACK_DAYS = 1
+DEFAULT_MAX_WINDOWS = 31
+
+
+def _day_start(day: date) -> datetime:
+    return datetime.combine(day, time.min, tzinfo=timezone.utc)
+
+
+def get_watermark(db: Session, job_name: str = JOB_NAME) -> Optional[datetime]:
+    """End (exclusive) of the last processed window, or None if the job never ran."""
+    from ..models.job_watermark import JobWatermark
+
+    row = db.get(JobWatermark, job_name)
+    return as_utc(row.watermark) if row is not None else None
+
+
+def set_watermark(db: Session, value: datetime, job_name: str = JOB_NAME) -> None:
+    """Record progress (in the caller's transaction)."""
+    from ..models.job_watermark import JobWatermark
+
+    row = db.get(JobWatermark, job_name)
+    if row is None:
+        db.add(JobWatermark(job_name=job_name, watermark=value))
+    else:
+        row.watermark = value
+    db.flush()
+
+
+def _upsert_insert(dialect: str):
+    """The dialect's INSERT supporting ON CONFLICT, or None."""
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as upsert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as upsert
+    else:
+        return None
+    return upsert
+
+
+def aggregate_day(db: Session, day: date) -> int:
+    """
+    Recompute project_metrics for one UTC day with one INSERT ... SELECT.
+
+    Events whose event_data.project_id does not name an existing project
+    are ignored. Runs in the caller's transaction; the caller commits.
+
+    Args:
+        db: Specs database session
+        day: UTC day to aggregate
+
+    Returns:
+        Number of project rows written
+    """
+    from ..models.analytics_event import AnalyticsEvent
+    from ..models.project import Project
+    from ..models.project_metrics import ProjectMetrics
+
+    dialect = db.get_bind().dialect.name
+    upsert = _upsert_insert(dialect)
+
+    def counter(event_type: str):
+        if upsert is None:
+            return func.count(case((AnalyticsEvent.event_type == event_type, 1)))
+        return func.count().filter(AnalyticsEvent.event_type == event_type)
+
+    start = _day_start(day)
+    project_key = AnalyticsEvent.event_data["project_id"].as_string()
+    counts = select(
+        func.lower(project_key).label("project_key"),
+        *(counter(event_type).label(column) for event_type, column in EVENT_COUNTERS.items())
+    ).where(
+        AnalyticsEvent.timestamp >= start,
+        AnalyticsEvent.timestamp < start + timedelta(days=1),
+        project_key.isnot(None)
+    ).group_by(
+        func.lower(project_key)
+    ).subquery()
+
+    # Match the JSON string against the UUID column in its stored text form
+    # (Postgres: canonical text; SQLite: 32 hex digits without dashes)
+    if dialect == "sqlite":
+        matches_project = Project.id == func.replace(counts.c.project_key, "-", "")
+    else:
+        matches_project = cast(Project.id, String) == counts.c.project_key
+
+    rows = select(
+        Project.id,
+        Project.user_id,
+        literal(day),
+        *(counts.c[column] for column in EVENT_COUNTERS.values())
+    ).select_from(counts).join(Project, matches_project).where(true())  # WHERE: SQLite upsert-after-join parsing
+
+    # Days are recomputed whole: drop rows for projects with no events left
+    db.query(ProjectMetrics).filter(ProjectMetrics.date == day).delete(synchronize_session=False)
+
+    table = ProjectMetrics.__table__
+    columns = ["project_id", "user_id", "date", *EVENT_COUNTERS.values()]
+    if upsert is None:
+        result = db.execute(insert(table).from_select(columns, rows))
+        return max(result.rowcount or 0, 0)
+
+    statement = upsert(table).from_select(columns, rows)
+    # A concurrent run of the same window updates instead of failing
+    statement = statement.on_conflict_do_update(
+        index_elements=[table.c.project_id, table.c.date],
+        set_={
+            **{column: statement.excluded[column] for column in EVENT_COUNTERS.values()},
+            "user_id": statement.excluded.user_id,
+            "updated_at": func.now(),
+        }
+    )
+    result = db.execute(statement)
+    return max(result.rowcount or 0, 0)
+
+
+def aggregate_pending_windows(
+    db: Session,
+    now: Optional[datetime] = None,
+    lookback_days: int = DEFAULT_LOOKBACK_DAYS,
+    max_windows: int = DEFAULT_MAX_WINDOWS,
+    since: Optional[date] = None,
+) -> Dict[str, Any]:
+    """
+    Aggregate every complete day from the watermark up to yesterday.
+
+    The last `lookback_days` days before the watermark are recomputed too,
+    to pick up late events. Each day is committed with its watermark
+    update; the watermark never moves backwards.
+
+    Args:
+        db: Specs database session
+        now: Current time (default: now, UTC)
+        lookback_days: Already processed days to recompute
+        max_windows: Days processed per call (the rest is left for the next run)
+        since: Recompute from this day regardless of the watermark (backfill)
+
+    Returns:
+        {'windows': int, 'project_rows': int, 'watermark': str | None, 'remaining_windows': int}
+    """
+    from ..models.analytics_event import AnalyticsEvent
+
+    now = as_utc(now or datetime.now(timezone.utc))
+    end_day = now.astimezone(timezone.utc).date()  # Today is incomplete
+    watermark = get_watermark(db)
+
+    if since is not None:
+        start_day = since
+    elif watermark is not None:
+        start_day = watermark.date() - timedelta(days=lookback_days)
+    else:
+        first_event = db.query(func.min(AnalyticsEvent.timestamp)).scalar()
+        if first_event is None:
+            return {"windows": 0, "project_rows": 0, "watermark": None, "remaining_windows": 0}
+        start_day = as_utc(first_event).date()
+
+    total_windows = max((end_day - start_day).days, 0)
+    windows = min(total_windows, max_windows)
+    project_rows = 0
+
+    for offset in range(windows):
+        day = start_day + timedelta(days=offset)
+        try:
+            project_rows += aggregate_day(db, day)
+            window_end = _day_start(day + timedelta(days=1))
+            if watermark is None or window_end > watermark:
+                set_watermark(db, window_end)
+                watermark = window_end
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        logger.debug(f"Aggregated analytics window {day}")
+
+    remaining = total_windows - windows
+    if remaining:
+        logger.info(f"Analytics aggregation stopped after {windows} windows; {remaining} left for the next run")
+
+    return {
+        "windows": windows,
+        "project_rows": project_rows,
+        "watermark": watermark.isoformat() if watermark else None,
+        "remaining_windows": remaining,
+    }
@@ -0,0 +1,244 @@
+"""Approximate nearest-neighbour (IVF) partitioning for the vector index.
+
+An inverted-file index splits a project's chunk vectors into `n_lists`
+clusters using spherical k-means. A query is scored against the centroids
+first and only the rows in the `nprobe` closest clusters are compared
+exactly, so search cost drops from O(rows) to roughly
+O(n_lists + rows * nprobe / n_lists).
+
+IVFPartition stores row ids of a ProjectVectorIndex matrix rather than a
+copy of the vectors, so it adds ~8 bytes per chunk. The owning index calls
+assign/remove_row/move_row as rows are inserted or swap-removed, which keeps
+incremental updates O(1) per row. Quality degrades slowly as new documents
+drift from the trained centroids; the rebuild job in
+app/jobs/vector_index_jobs.py retrains them.
+
+Tuning knobs:
+- n_lists: more lists = faster search, lower recall at a fixed nprobe
+  (default ~sqrt(rows))
+- nprobe: lists scanned per query; higher = better recall, slower
+"""
+import logging
+import math
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from .vector_index import normalize_rows, top_k_indices
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_NPROBE = 16
+_SAMPLE_PER_LIST = 64
+_ASSIGN_BATCH = 8192
+_NO_LIST = -1
+
+
+def default_n_lists(rows: int) -> int:
+    """Rule-of-thumb list count for a matrix of `rows` vectors."""
+    return max(1, min(rows, int(math.sqrt(rows))))
+
+
+def train_centroids(
+    matrix: np.ndarray,
+    n_lists: int,
+    iterations: int = 10,
+    sample_size: Optional[int] = None,
+    seed: int = 0,
+) -> np.ndarray:
+    """
+    Train unit-length centroids with spherical k-means.
+
+    Trains on a random sample (64 points per list by default) so training
+    time grows with sqrt(rows) rather than rows.
+
+    Args:
+        matrix: Row-normalised float32 vectors
+        n_lists: Number of clusters
+        iterations: Lloyd iterations
+        sample_size: Training sample size (default 64 * n_lists)
+        seed: RNG seed for reproducible builds
+
+    Returns:
+        (n_lists, dim) float32 centroid matrix
+    """
+    rows = matrix.shape[0]
+    if rows == 0:
+        raise ValueError("Cannot train centroids on an empty matrix")
+    n_lists = min(n_lists, rows)
+    rng = np.random.default_rng(seed)
+
+    sample_size = min(rows, sample_size or _SAMPLE_PER_LIST * n_lists)
+    sample_rows = np.sort(rng.choice(rows, size=sample_size, replace=False))
+    sample = np.ascontiguousarray(matrix[sample_rows], dtype=np.float32)
+
+    centroids = sample[rng.choice(sample_size, size=n_lists, replace=False)].copy()
+    for _ in range(iterations):
+        labels = np.argmax(sample @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, sample)
+        counts = np.bincount(labels, minlength=n_lists)
+
+        empty = counts == 0
+        if empty.any():
+            # Reseed empty clusters with random sample points
+            sums[empty] = sample[rng.choice(sample_size, size=int(empty.sum()))]
+        centroids = normalize_rows(sums)
+
+    return centroids
+
+
+class _IntBuffer:
+    """Growable int32 array used for one inverted list."""
+
+    __slots__ = ('data', 'size')
+
+    def __init__(self):
+        self.data = np.empty(16, dtype=np.int32)
+        self.size = 0
+
+    def append(self, value: int) -> int:
+        if self.size == self.data.shape[0]:
+            grown = np.empty(self.size * 2, dtype=np.int32)
+            grown[:self.size] = self.data
+            self.data = grown
+        self.data[self.size] = value
+        self.size += 1
+        return self.size - 1
+
+    def view(self) -> np.ndarray:
+        return self.data[:self.size]
+
+
+class IVFPartition:
+    """
+    Inverted lists over the rows of a ProjectVectorIndex matrix.
+
+    Not thread-safe on its own; the owning index holds its lock.
+    """
+
+    def __init__(self, centroids: np.ndarray):
+        """
+        Args:
+            centroids: (n_lists, dim) unit-length centroids
+        """
+        self.centroids = np.ascontiguousarray(centroids, dtype=np.float32)
+        self._lists: List[_IntBuffer] = [_IntBuffer() for _ in range(self.n_lists)]
+        # Per row: owning list and position inside it (O(1) removal/move)
+        self._list_of_row = np.full(0, _NO_LIST, dtype=np.int32)
+        self._pos_of_row = np.zeros(0, dtype=np.int32)
+
+    @property
+    def n_lists(self) -> int:
+        return self.centroids.shape[0]
+
+    @property
+    def dim(self) -> int:
+        return self.centroids.shape[1]
+
+    @classmethod
+    def train(
+        cls,
+        matrix: np.ndarray,
+        n_lists: Optional[int] = None,
+        iterations: int = 10,
+        seed: int = 0,
+    ) -> "IVFPartition":
+        """Train centroids on matrix and assign every row."""
+        rows = matrix.shape[0]
+        n_lists = n_lists or default_n_lists(rows)
+        partition = cls(train_centroids(matrix, n_lists, iterations=iterations, seed=seed))
+        partition.assign(0, matrix)
+        logger.info(f"Trained IVF partition: {rows} rows, {partition.n_lists} lists")
+        return partition
+
+    def _ensure_rows(self, rows: int) -> None:
+        capacity = self._list_of_row.shape[0]
+        if rows <= capacity:
+            return
+        new_capacity = max(rows, 2 * capacity, 64)
+        list_of_row = np.full(new_capacity, _NO_LIST, dtype=np.int32)
+        pos_of_row = np.zeros(new_capacity, dtype=np.int32)
+        list_of_row[:capacity] = self._list_of_row
+        pos_of_row[:capacity] = self._pos_of_row
+        self._list_of_row = list_of_row
+        self._pos_of_row = pos_of_row
+
+    def assign(self, start_row: int, vectors: np.ndarray) -> None:
+        """Assign consecutive rows starting at start_row to their nearest list."""
+        count = vectors.shape[0]
+        self._ensure_rows(start_row + count)
+        for offset in range(0, count, _ASSIGN_BATCH):
+            block = vectors[offset:offset + _ASSIGN_BATCH]
+            labels = np.argmax(block @ self.centroids.T, axis=1)
+            self.assign_labels(start_row + offset, labels)
+
+    def assign_labels(self, start_row: int, labels: np.ndarray) -> None:
+        """Register precomputed list labels for consecutive rows."""
+        self._ensure_rows(start_row + len(labels))
+        for offset, label in enumerate(labels.tolist()):
+            row = start_row + offset
+            self._list_of_row[row] = label
+            self._pos_of_row[row] = self._lists[label].append(row)
+
+    def remove_row(self, row: int) -> None:
+        """Drop a row from its inverted list."""
+        label = int(self._list_of_row[row])
+        if label == _NO_LIST:
+            return
+        buffer = self._lists[label]
+        pos = int(self._pos_of_row[row])
+        last_pos = buffer.size - 1
+        if pos != last_pos:
+            moved = int(buffer.data[last_pos])
+            buffer.data[pos] = moved
+            self._pos_of_row[moved] = pos
+        buffer.size -= 1
+        self._list_of_row[row] = _NO_LIST
+
+    def move_row(self, src: int, dst: int) -> None:
+        """Record that the vector at row src now lives at row dst."""
+        label = int(self._list_of_row[src])
+        if label == _NO_LIST:
+            return
+        pos = int(self._pos_of_row[src])
+        self._lists[label].data[pos] = dst
+        self._list_of_row[dst] = label
+        self._pos_of_row[dst] = pos
+        self._list_of_row[src] = _NO_LIST
+
+    def labels(self, rows: int) -> np.ndarray:
+        """List label of each of the first `rows` rows (for persistence)."""
+        return self._list_of_row[:rows].copy()
+
+    def list_sizes(self) -> np.ndarray:
+        return np.array([buffer.size for buffer in self._lists], dtype=np.int64)
+
+    def search(
+        self,
+        matrix: np.ndarray,
+        query: np.ndarray,
+        top_k: int,
+        nprobe: int = DEFAULT_NPROBE,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Approximate top-k over the rows of matrix.
+
+        Args:
+            matrix: The owning index's live rows
+            query: Unit-length query vector
+            top_k: Number of results
+            nprobe: Number of closest lists to scan
+
+        Returns:
+            (rows, scores), best first
+        """
+        nprobe = max(1, min(nprobe, self.n_lists))
+        probe = top_k_indices(self.centroids @ query, nprobe)
+        candidates = np.concatenate([self._lists[label].view() for label in probe.tolist()])
+        if candidates.size == 0:
+            return candidates.astype(np.int64), np.empty(0, dtype=np.float32)
+
+        scores = matrix[candidates] @ query
+        best = top_k_indices(scores, top_k)
+        return candidates[best].astype(np.int64), scores[best]
@@ -3,26 +3,907 @@ Cache service for storing and retrieving frequently accessed data.
 
 Supports both in-memory caching (default) and Redis caching (optional).
 Implements TTL (Time-To-Live) for automatic expiration.
+
+Storage is delegated to a pluggable cache engine:
+- InMemoryCacheEngine: bounded LRU (entry count + byte budget) with a TTL heap
+  that is swept by a background thread, plus a key trie and tag index so
+  invalidation only touches matching entries
+- RedisCacheEngine: shared cache for multi-worker deployments (requires `redis`)
+- SQLiteCacheEngine: persistent single-host cache in a local SQLite file
+
+The engine is selected from settings (CACHE_BACKEND, CACHE_MAX_ENTRIES, ...)
+the first time the cache is used.
+
+cache_result coalesces concurrent misses for the same key (single-flight) and
+can optionally serve stale values while one background refresh runs.
 """
-import json
+import asyncio
+import heapq
+import inspect
 import logging
+import pickle
+import sys
+import threading
 import time
+from collections import OrderedDict
 from functools import wraps
-from typing import Any, Callable, Optional
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.orm import Session as SASession
 
 logger = logging.getLogger(__name__)
 
+# Defaults used when settings cannot be loaded (library usage without .env)
+DEFAULT_MAX_ENTRIES = 10000
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_SWEEP_INTERVAL_SECONDS = 30.0
+
+_MAX_SIZE_DEPTH = 8
+
+# Cache keys are namespaced with ':' ("project:<id>:<func>:..."); the key trie
+# indexes keys segment by segment on this separator.
+KEY_SEPARATOR = ":"
+
+
+def _estimate_size(value: Any, _seen: Optional[set] = None, _depth: int = 0) -> int:
+    """
+    Estimate the in-memory footprint of a cached value in bytes.
+
+    Walks containers recursively so that nested dicts/lists are accounted for.
+    Computed once per SET, so stats never have to re-serialise stored values.
+    """
+    if _seen is None:
+        _seen = set()
+    obj_id = id(value)
+    if obj_id in _seen:
+        return 0
+    _seen.add(obj_id)
+
+    size = sys.getsizeof(value)
+    if _depth >= _MAX_SIZE_DEPTH:
+        return size
+
+    if isinstance(value, dict):
+        size += sum(
+            _estimate_size(k, _seen, _depth + 1) + _estimate_size(v, _seen, _depth + 1)
+            for k, v in value.items()
+        )
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(_estimate_size(item, _seen, _depth + 1) for item in value)
+    elif hasattr(value, '__dict__'):
+        # Skip SQLAlchemy instance state, which links to the whole session/mapper graph
+        size += sum(
+            _estimate_size(v, _seen, _depth + 1)
+            for k, v in vars(value).items()
+            if not k.startswith('_sa_')
+        )
+    return size
+
+
+class _CacheEntry:
+    """Single cached value with its expiry time, accounted size and tags."""
+
+    __slots__ = ('value', 'expires_at', 'size', 'tags')
+
+    def __init__(self, value: Any, expires_at: float, size: int, tags: Tuple[str, ...] = ()):
+        self.value = value
+        self.expires_at = expires_at
+        self.size = size
+        self.tags = tags
+
+
+class _TrieNode:
+    """Trie node for one key segment."""
+
+    __slots__ = ('children', 'terminal')
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.terminal = False
+
+
+class KeyTrie:
+    """
+    Segment trie over cache keys, split on KEY_SEPARATOR.
+
+    Lets a prefix such as "project:p1:" be resolved by walking its full
+    segments and then collecting only the matching subtree, so the cost is
+    proportional to the number of matching keys instead of the cache size.
+    Not thread-safe on its own; the owning engine holds the lock.
+    """
+
+    def __init__(self):
+        self._root = _TrieNode()
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, key: str) -> None:
+        node = self._root
+        for segment in key.split(KEY_SEPARATOR):
+            child = node.children.get(segment)
+            if child is None:
+                child = node.children[segment] = _TrieNode()
+            node = child
+        if not node.terminal:
+            node.terminal = True
+            self._size += 1
+
+    def discard(self, key: str) -> None:
+        path = [self._root]
+        segments = key.split(KEY_SEPARATOR)
+        for segment in segments:
+            child = path[-1].children.get(segment)
+            if child is None:
+                return
+            path.append(child)
+        if not path[-1].terminal:
+            return
+        path[-1].terminal = False
+        self._size -= 1
+
+        # Prune nodes that no longer lead to any key
+        for depth in range(len(segments), 0, -1):
+            node = path[depth]
+            if node.terminal or node.children:
+                break
+            del path[depth - 1].children[segments[depth - 1]]
+
+    def clear(self) -> None:
+        self._root = _TrieNode()
+        self._size = 0
+
+    def keys_with_prefix(self, prefix: str) -> List[str]:
+        """Return all keys that start with prefix."""
+        *full, partial = prefix.split(KEY_SEPARATOR)
+        node = self._root
+        for segment in full:
+            node = node.children.get(segment)
+            if node is None:
+                return []
+
+        base = KEY_SEPARATOR.join(full) + KEY_SEPARATOR if full else ""
+        matches: List[str] = []
+        for segment, child in node.children.items():
+            if segment.startswith(partial):
+                self._collect(child, base + segment, matches)
+        return matches
+
+    @staticmethod
+    def _collect(node: _TrieNode, key: str, out: List[str]) -> None:
+        stack = [(node, key)]
+        while stack:
+            current, current_key = stack.pop()
+            if current.terminal:
+                out.append(current_key)
+            for segment, child in current.children.items():
+                stack.append((child, current_key + KEY_SEPARATOR + segment))
+
+
+class CacheEngine:
+    """
+    Interface implemented by cache storage backends.
+
+    Engines must be safe to call from multiple threads. `get` returns
+    (found, value) so that falsy values such as 0 or [] can be cached.
+    """
+
+    name = "base"
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, ttl_seconds: float, tags: Sequence[str] = ()) -> None:
+        raise NotImplementedError
+
+    def delete(self, key: str) -> bool:
+        raise NotImplementedError
+
+    def clear_prefix(self, prefix: str) -> int:
+        raise NotImplementedError
+
+    def clear_tags(self, tags: Iterable[str]) -> int:
+        raise NotImplementedError
+
+    def clear(self) -> int:
+        raise NotImplementedError
+
+    def stats(self) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Release background resources (threads, connections)."""
+
+
+class InMemoryCacheEngine(CacheEngine):
+    """
+    Bounded, thread-safe LRU cache with TTL expiry.
+
+    - Entries live in an OrderedDict kept in recency order (O(1) LRU updates)
+    - Inserting past max_entries or max_bytes evicts least recently used entries
+    - Expiry times are pushed onto a min-heap; a background thread pops and
+      removes expired entries every sweep_interval seconds
+    - Hit/miss/eviction/byte counters are maintained incrementally, so
+      stats() is O(1)
+    - A KeyTrie and a tag -> keys index make prefix and tag invalidation
+      proportional to the number of matching entries
+    """
+
+    name = "memory"
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        sweep_interval: float = DEFAULT_SWEEP_INTERVAL_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            max_entries: Maximum number of entries before LRU eviction
+            max_bytes: Maximum estimated size of all values before LRU eviction
+            sweep_interval: Seconds between background TTL sweeps (0 disables)
+            clock: Monotonic time source (injectable for tests)
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sweep_interval = sweep_interval
+        self._clock = clock
+
+        self._entries: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+        self._expiry_heap: List[Tuple[float, str]] = []
+        self._key_trie = KeyTrie()
+        self._tag_index: Dict[str, Set[str]] = {}
+        self._lock = threading.RLock()
+
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+        self._sweeper: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+
+    # ----- internal helpers (caller holds the lock) -----
+
+    def _unindex(self, key: str, entry: _CacheEntry) -> None:
+        self._bytes -= entry.size
+        self._key_trie.discard(key)
+        for tag in entry.tags:
+            keys = self._tag_index.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tag_index[tag]
+
+    def _remove(self, key: str) -> Optional[_CacheEntry]:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._unindex(key, entry)
+        return entry
+
+    def _evict_overflow(self) -> None:
+        while self._entries and (
+            len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+        ):
+            key, entry = self._entries.popitem(last=False)
+            self._unindex(key, entry)
+            self._evictions += 1
+            logger.debug(f"Cache EVICT: {key}")
+
+    def _compact_heap(self) -> None:
+        # Overwrites and deletes leave stale heap items behind; rebuild the
+        # heap when they dominate so it stays proportional to live entries.
+        if len(self._expiry_heap) > 2 * len(self._entries) + 64:
+            self._expiry_heap = [
+                (entry.expires_at, key) for key, entry in self._entries.items()
+            ]
+            heapq.heapify(self._expiry_heap)
+
+    # ----- public API -----
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return False, None
+
+            if now > entry.expires_at:
+                self._remove(key)
+                self._expirations += 1
+                self._misses += 1
+                return False, None
+
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return True, entry.value
+
+    def set(self, key: str, value: Any, ttl_seconds: float, tags: Sequence[str] = ()) -> None:
+        size = _estimate_size(key) + _estimate_size(value)
+        expires_at = self._clock() + ttl_seconds
+        tags = tuple(dict.fromkeys(tags))
+
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = _CacheEntry(value, expires_at, size, tags)
+            self._bytes += size
+            self._key_trie.add(key)
+            for tag in tags:
+                self._tag_index.setdefault(tag, set()).add(key)
+            heapq.heappush(self._expiry_heap, (expires_at, key))
+            self._evict_overflow()
+            self._compact_heap()
+
+        self._ensure_sweeper()
+
+    def delete(self, key: str) -> bool:
+        with self._lock:
+            return self._remove(key) is not None
+
+    def clear_prefix(self, prefix: str) -> int:
+        with self._lock:
+            keys = self._key_trie.keys_with_prefix(prefix)
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+    def clear_tags(self, tags: Iterable[str]) -> int:
+        removed = 0
+        with self._lock:
+            for tag in tags:
+                for key in list(self._tag_index.get(tag, ())):
+                    if self._remove(key) is not None:
+                        removed += 1
+        return removed
+
+    def clear(self) -> int:
+        with self._lock:
+            count = len(self._entries)
+            self._entries.clear()
+            self._expiry_heap.clear()
+            self._key_trie.clear()
+            self._tag_index.clear()
+            self._bytes = 0
+            return count
+
+    def sweep_expired(self) -> int:
+        """
+        Remove all expired entries.
+
+        Pops the TTL heap until the earliest expiry is in the future, so the
+        cost is proportional to the number of expired items rather than the
+        size of the cache.
+
+        Returns:
+            Number of entries removed
+        """
+        now = self._clock()
+        removed = 0
+        with self._lock:
+            heap = self._expiry_heap
+            while heap and heap[0][0] <= now:
+                expires_at, key = heapq.heappop(heap)
+                entry = self._entries.get(key)
+                # Skip heap items left behind by an overwrite or delete
+                if entry is not None and entry.expires_at == expires_at:
+                    self._remove(key)
+                    self._expirations += 1
+                    removed += 1
+        if removed:
+            logger.debug(f"Cache SWEEP: {removed} expired entries removed")
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'backend': self.name,
+                'total_entries': len(self._entries),
+                'expired_entries': self._expirations,
+                'memory_usage': self._bytes,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_ratio': round(self._hits / lookups, 4) if lookups else 0.0,
+                'evictions': self._evictions,
+                'indexed_tags': len(self._tag_index),
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+            }
+
+    # ----- background sweeper -----
+
+    def _ensure_sweeper(self) -> None:
+        if self.sweep_interval <= 0 or self._sweeper is not None:
+            return
+        with self._lock:
+            if self._sweeper is not None:
+                return
+            self._stop_event.clear()
+            self._sweeper = threading.Thread(
+                target=self._sweep_loop,
+                name="cache-ttl-sweeper",
+                daemon=True,
+            )
+            self._sweeper.start()
+
+    def _sweep_loop(self) -> None:
+        while not self._stop_event.wait(self.sweep_interval):
+            try:
+                self.sweep_expired()
+            except Exception as e:
+                logger.error(f"Cache sweep failed: {e}")
+
+    def close(self) -> None:
+        """Stop the background sweeper thread."""
+        self._stop_event.set()
+        sweeper = self._sweeper
+        self._sweeper = None
+        if sweeper is not None and sweeper is not threading.current_thread():
+            sweeper.join(timeout=1.0)
+
+
+class RedisCacheEngine(CacheEngine):
+    """
+    Shared cache backed by Redis.
+
+    Values are pickled and stored under a namespace prefix with a native
+    Redis TTL, so expiry and memory limits are enforced by the server
+    (configure `maxmemory-policy allkeys-lru` for LRU eviction).
+
+    Tags are kept as Redis sets ("<namespace>tag:<tag>" -> keys), so tag
+    invalidation only touches matching keys. Prefix invalidation uses SCAN.
+    """
+
+    name = "redis"
+
+    def __init__(self, url: str, namespace: str = "socrates:cache:", client: Any = None):
+        """
+        Args:
+            url: Redis connection URL (redis://host:port/db)
+            namespace: Prefix applied to every key
+            client: Pre-built redis client (used instead of url when given)
+
+        Raises:
+            ImportError: If the redis package is not installed
+        """
+        if client is None:
+            import redis  # Optional dependency
+
+            client = redis.Redis.from_url(url)
+        self._client = client
+        self._namespace = namespace
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def _key(self, key: str) -> str:
+        return f"{self._namespace}{key}"
+
+    def _tag_key(self, tag: str) -> str:
+        return f"{self._namespace}tag:{tag}"
+
+    @staticmethod
+    def _escape_glob(pattern: str) -> str:
+        for char in ('\\', '*', '?', '[', ']'):
+            pattern = pattern.replace(char, f"\\{char}")
+        return pattern
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        payload = self._client.get(self._key(key))
+        with self._lock:
+            if payload is None:
+                self._misses += 1
+                return False, None
+            self._hits += 1
+        return True, pickle.loads(payload)
+
+    def set(self, key: str, value: Any, ttl_seconds: float, tags: Sequence[str] = ()) -> None:
+        ttl = max(1, int(ttl_seconds))
+        pipe = self._client.pipeline()
+        pipe.set(
+            self._key(key),
+            pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL),
+            ex=ttl,
+        )
+        for tag in tags:
+            tag_key = self._tag_key(tag)
+            pipe.sadd(tag_key, self._key(key))
+            # Keep the tag set alive at least as long as its newest member
+            pipe.expire(tag_key, ttl, gt=True)
+            pipe.expire(tag_key, ttl, nx=True)
+        pipe.execute()
+
+    def delete(self, key: str) -> bool:
+        return bool(self._client.delete(self._key(key)))
+
+    def clear_prefix(self, prefix: str) -> int:
+        match = f"{self._escape_glob(self._key(prefix))}*"
+        deleted = 0
+        batch = []
+        for redis_key in self._client.scan_iter(match=match, count=500):
+            batch.append(redis_key)
+            if len(batch) >= 500:
+                deleted += self._client.delete(*batch)
+                batch = []
+        if batch:
+            deleted += self._client.delete(*batch)
+        return deleted
+
+    def clear_tags(self, tags: Iterable[str]) -> int:
+        deleted = 0
+        for tag in tags:
+            tag_key = self._tag_key(tag)
+            members = list(self._client.smembers(tag_key))
+            if members:
+                deleted += self._client.delete(*members)
+            self._client.delete(tag_key)
+        return deleted
+
+    def clear(self) -> int:
+        return self.clear_prefix("")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits, misses = self._hits, self._misses
+        lookups = hits + misses
+        try:
+            memory_usage = self._client.info('memory').get('used_memory', 0)
+            total_entries = self._client.dbsize()
+        except Exception as e:
+            logger.warning(f"Redis stats unavailable: {e}")
+            memory_usage, total_entries = 0, 0
+        return {
+            'backend': self.name,
+            'total_entries': total_entries,
+            'expired_entries': 0,  # Expiry handled by Redis
+            'memory_usage': memory_usage,
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': round(hits / lookups, 4) if lookups else 0.0,
+            'evictions': 0,
+        }
+
+    def close(self) -> None:
+        try:
+            self._client.close()
+        except Exception:
+            pass
+
+
+class SQLiteCacheEngine(CacheEngine):
+    """
+    Persistent cache in a local SQLite file.
+
+    Shared by worker processes on one host and survives restarts, without
+    running Redis. Values are pickled; expiry uses wall-clock time and
+    expired rows are purged on write. Once more than max_entries rows are
+    stored, the least recently read rows are deleted.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 clock: Callable[[], float] = time.time):
+        """
+        Args:
+            path: Database file (directories are created; ":memory:" for tests)
+            max_entries: Maximum number of rows before LRU eviction
+            clock: Wall-clock time source (injectable for tests)
+        """
+        import os
+        import sqlite3
+
+        if path != ":memory:" and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.max_entries = max_entries
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5.0)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache_entries ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL, "
+            "accessed_at REAL NOT NULL, tags TEXT NOT NULL DEFAULT '')"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_entries_accessed ON cache_entries (accessed_at)")
+        self._conn.commit()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @staticmethod
+    def _escape_like(pattern: str) -> str:
+        return pattern.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        now = self._clock()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM cache_entries WHERE key = ? AND expires_at > ?", (key, now)
+            ).fetchone()
+            if row is None:
+                self._misses += 1
+                return False, None
+            self._hits += 1
+            self._conn.execute("UPDATE cache_entries SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+        return True, pickle.loads(row[0])
+
+    def set(self, key: str, value: Any, ttl_seconds: float, tags: Sequence[str] = ()) -> None:
+        now = self._clock()
+        payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        # Tags are stored delimited on both sides so LIKE can match whole tags
+        tag_field = "".join(f"|{tag}|" for tag in tags)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache_entries (key, value, expires_at, accessed_at, tags) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, payload, now + ttl_seconds, now, tag_field),
+            )
+            self._conn.execute("DELETE FROM cache_entries WHERE expires_at <= ?", (now,))
+            overflow = self._conn.execute("SELECT COUNT(*) FROM cache_entries").fetchone()[0] - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM cache_entries WHERE key IN "
+                    "(SELECT key FROM cache_entries ORDER BY accessed_at LIMIT ?)",
+                    (overflow,),
+                )
+                self._evictions += overflow
+            self._conn.commit()
+
+    def delete(self, key: str) -> bool:
+        with self._lock:
+            deleted = self._conn.execute("DELETE FROM cache_entries WHERE key = ?", (key,)).rowcount
+            self._conn.commit()
+        return bool(deleted)
+
+    def clear_prefix(self, prefix: str) -> int:
+        with self._lock:
+            deleted = self._conn.execute(
+                "DELETE FROM cache_entries WHERE key LIKE ? ESCAPE '\\'", (f"{self._escape_like(prefix)}%",)
+            ).rowcount
+            self._conn.commit()
+        return deleted
+
+    def clear_tags(self, tags: Iterable[str]) -> int:
+        deleted = 0
+        with self._lock:
+            for tag in tags:
+                deleted += self._conn.execute(
+                    "DELETE FROM cache_entries WHERE tags LIKE ? ESCAPE '\\'",
+                    (f"%|{self._escape_like(tag)}|%",),
+                ).rowcount
+            self._conn.commit()
+        return deleted
+
+    def clear(self) -> int:
+        return self.clear_prefix("")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total_entries, memory_usage = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(value)), 0) FROM cache_entries"
+            ).fetchone()
+            hits, misses = self._hits, self._misses
+        lookups = hits + misses
+        return {
+            'backend': self.name,
+            'total_entries': total_entries,
+            'expired_entries': 0,  # Purged on write
+            'memory_usage': memory_usage,
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': round(hits / lookups, 4) if lookups else 0.0,
+            'evictions': self._evictions,
+            'max_entries': self.max_entries,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def create_cache_engine() -> CacheEngine:
+    """
+    Build the cache engine configured in settings.
+
+    Falls back to the in-memory engine when settings are not configured,
+    or when Redis is requested but unavailable.
+    """
+    backend = "memory"
+    redis_url = None
+    max_entries = DEFAULT_MAX_ENTRIES
+    max_bytes = DEFAULT_MAX_BYTES
+    sweep_interval = DEFAULT_SWEEP_INTERVAL_SECONDS
+
+    try:
+        from ..core.config import settings
+
+        backend = settings.CACHE_BACKEND.lower()
+        redis_url = settings.CACHE_REDIS_URL
+        max_entries = settings.CACHE_MAX_ENTRIES
+        max_bytes = settings.CACHE_MAX_BYTES
+        sweep_interval = settings.CACHE_SWEEP_INTERVAL_SECONDS
+    except Exception:
+        # Library usage without a configured environment
+        pass
+
+    if backend == "redis":
+        if not redis_url:
+            logger.warning("CACHE_BACKEND=redis but CACHE_REDIS_URL is not set; using in-memory cache")
+        else:
+            try:
+                return RedisCacheEngine(redis_url)
+            except ImportError:
+                logger.warning("redis package not installed; using in-memory cache")
+            except Exception as e:
+                logger.error(f"Redis cache unavailable ({e}); using in-memory cache")
+
+    return InMemoryCacheEngine(
+        max_entries=max_entries,
+        max_bytes=max_bytes,
+        sweep_interval=sweep_interval,
+    )
+
+
+class _InFlight:
+    """Result slot shared by the leader and followers of one computation."""
+
+    __slots__ = ('event', 'result', 'error')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Per-key request coalescing for sync and async computations.
+
+    The first caller for a key (the leader) runs the computation; callers that
+    arrive while it is in flight wait for and share its result or exception.
+    Also tracks the stale-while-revalidate refreshes started by cache_result.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _InFlight] = {}
+        self._async_calls: Dict[Tuple[int, str], "asyncio.Future"] = {}
+        self._refreshing: Set[str] = set()
+        self._tasks: Set["asyncio.Task"] = set()
+
+        self.coalesced = 0
+        self.stale_hits = 0
+        self.refreshes = 0
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        """Run fn once per key across concurrent threads."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _InFlight()
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+
+    async def do_async(self, key: str, fn: Callable[[], Any]) -> Any:
+        """Await fn() once per key across concurrent tasks on the running loop."""
+        loop = asyncio.get_running_loop()
+        flight_key = (id(loop), key)
+        with self._lock:
+            future = self._async_calls.get(flight_key)
+            leader = future is None
+            if leader:
+                future = self._async_calls[flight_key] = loop.create_future()
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            # shield: a cancelled follower must not cancel the shared result
+            return await asyncio.shield(future)
+
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # Mark retrieved when there are no followers
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._async_calls.pop(flight_key, None)
+
+    def start_refresh(self, key: str) -> bool:
+        """Claim the background refresh for key; False if one is running."""
+        with self._lock:
+            self.stale_hits += 1
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+            self.refreshes += 1
+            return True
+
+    def finish_refresh(self, key: str) -> None:
+        with self._lock:
+            self._refreshing.discard(key)
+
+    def track_task(self, task: "asyncio.Task") -> None:
+        """Keep a strong reference to a background refresh task."""
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'coalesced': self.coalesced,
+                'in_flight': len(self._calls) + len(self._async_calls),
+                'stale_hits': self.stale_hits,
+                'background_refreshes': self.refreshes,
+            }
+
+
+class _StaleableValue:
+    """Cached value stamped with the wall-clock time it stops being fresh."""
+
+    __slots__ = ('value', 'fresh_until')
+
+    def __init__(self, value: Any, fresh_until: float):
+        self.value = value
+        self.fresh_until = fresh_until
+
+    def __getstate__(self):
+        return (self.value, self.fresh_until)
+
+    def __setstate__(self, state):
+        self.value, self.fresh_until = state
+
+
+# Wall clock for stale-while-revalidate (shared across workers with Redis)
+_wall_clock = time.time
+
+_single_flight = SingleFlight()
+
 
 class CacheService:
     """
-    In-memory cache service with TTL support.
+    Cache service with TTL support.
 
-    Thread-safe dictionary-based caching for development and small deployments.
-    Automatically removes expired entries on access.
+    Thin singleton facade over a CacheEngine. The engine is created lazily
+    from settings on first use and can be swapped with configure().
     """
 
     _instance = None
-    _cache = {}
+    _engine: Optional[CacheEngine] = None
+    _engine_lock = threading.Lock()
 
     def __new__(cls):
         """Implement singleton pattern."""
@@ -30,25 +911,70 @@ class CacheService:
             cls._instance = super().__new__(cls)
         return cls._instance
 
-    def set(self, key: str, value: Any, ttl_seconds: int = 3600) -> None:
+    @property
+    def engine(self) -> CacheEngine:
+        """Active cache engine (created from settings on first access)."""
+        if CacheService._engine is None:
+            with CacheService._engine_lock:
+                if CacheService._engine is None:
+                    CacheService._engine = create_cache_engine()
+        return CacheService._engine
+
+    def configure(self, engine: CacheEngine) -> None:
+        """
+        Replace the active cache engine.
+
+        Args:
+            engine: New engine; the previous engine is closed
+        """
+        with CacheService._engine_lock:
+            previous = CacheService._engine
+            CacheService._engine = engine
+        if previous is not None and previous is not engine:
+            previous.close()
+
+    def close(self) -> None:
+        """Close the active engine, if one was created."""
+        with CacheService._engine_lock:
+            engine = CacheService._engine
+            CacheService._engine = None
+        if engine is not None:
+            engine.close()
+
+    def set(self, key: str, value: Any, ttl_seconds: int = 3600, tags: Sequence[str] = ()) -> None:
         """
         Set a cache value with TTL.
 
         Args:
             key: Cache key
-            value: Value to cache (will be JSON serialized)
+            value: Value to cache
             ttl_seconds: Time to live in seconds (default 1 hour)
+            tags: Optional invalidation tags (e.g. "project_id:<id>")
         """
         try:
-            expiration = time.time() + ttl_seconds
-            self._cache[key] = {
-                'value': value,
-                'expires_at': expiration
-            }
+            self.engine.set(key, value, ttl_seconds, tags=tags)
             logger.debug(f"Cache SET: {key} (TTL: {ttl_seconds}s)")
         except Exception as e:
             logger.error(f"Cache SET failed for {key}: {e}")
 
+    def lookup(self, key: str) -> Tuple[bool, Any]:
+        """
+        Get a cache value, distinguishing misses from cached None.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Tuple of (found, value)
+        """
+        try:
+            found, value = self.engine.get(key)
+            logger.debug(f"Cache {'HIT' if found else 'MISS'}: {key}")
+            return found, value
+        except Exception as e:
+            logger.error(f"Cache GET failed for {key}: {e}")
+            return False, None
+
     def get(self, key: str) -> Optional[Any]:
         """
         Get a cache value.
@@ -62,20 +988,9 @@ class CacheService:
             Cached value or None if expired/not found
         """
         try:
-            if key not in self._cache:
-                logger.debug(f"Cache MISS: {key} (not found)")
-                return None
-
-            entry = self._cache[key]
-
-            # Check if expired
-            if time.time() > entry['expires_at']:
-                del self._cache[key]
-                logger.debug(f"Cache MISS: {key} (expired)")
-                return None
-
-            logger.debug(f"Cache HIT: {key}")
-            return entry['value']
+            found, value = self.engine.get(key)
+            logger.debug(f"Cache {'HIT' if found else 'MISS'}: {key}")
+            return value if found else None
         except Exception as e:
             logger.error(f"Cache GET failed for {key}: {e}")
             return None
@@ -88,8 +1003,7 @@ class CacheService:
             key: Cache key to delete
         """
         try:
-            if key in self._cache:
-                del self._cache[key]
+            if self.engine.delete(key):
                 logger.debug(f"Cache DELETE: {key}")
         except Exception as e:
             logger.error(f"Cache DELETE failed for {key}: {e}")
@@ -107,20 +1021,36 @@ class CacheService:
             Number of keys deleted
         """
         try:
-            keys_to_delete = [k for k in self._cache.keys() if k.startswith(pattern)]
-            for key in keys_to_delete:
-                del self._cache[key]
-            logger.debug(f"Cache CLEAR: {len(keys_to_delete)} keys matching '{pattern}'")
-            return len(keys_to_delete)
+            count = self.engine.clear_prefix(pattern)
+            logger.debug(f"Cache CLEAR: {count} keys matching '{pattern}'")
+            return count
         except Exception as e:
             logger.error(f"Cache CLEAR_PATTERN failed: {e}")
             return 0
 
+    def clear_tags(self, tags: Iterable[str]) -> int:
+        """
+        Delete all entries carrying any of the given tags.
+
+        Args:
+            tags: Tags to invalidate
+
+        Returns:
+            Number of keys deleted
+        """
+        tags = list(tags)
+        try:
+            count = self.engine.clear_tags(tags)
+            logger.debug(f"Cache CLEAR: {count} keys tagged {tags}")
+            return count
+        except Exception as e:
+            logger.error(f"Cache CLEAR_TAGS failed: {e}")
+            return 0
+
     def clear_all(self) -> None:
         """Clear entire cache."""
         try:
-            count = len(self._cache)
-            self._cache.clear()
+            count = self.engine.clear()
             logger.info(f"Cache CLEAR_ALL: {count} entries removed")
         except Exception as e:
             logger.error(f"Cache CLEAR_ALL failed: {e}")
@@ -129,83 +1059,233 @@ class CacheService:
         """
         Get cache statistics.
 
+        Counters are maintained incrementally by the engine, so this is O(1).
+
         Returns:
-            Dictionary with cache size, expiration info
+            Dictionary with entry count, memory usage (bytes), hits, misses,
+            evictions and expirations, plus cache_result coalescing counters
+            (coalesced, in_flight, stale_hits, background_refreshes)
         """
-        current_time = time.time()
-        expired_count = sum(
-            1 for entry in self._cache.values()
-            if current_time > entry['expires_at']
-        )
-
-        return {
-            'total_entries': len(self._cache),
-            'expired_entries': expired_count,
-            'memory_usage': sum(
-                len(json.dumps(entry['value']).encode()) if isinstance(entry['value'], (dict, list))
-                else len(str(entry['value']).encode())
-                for entry in self._cache.values()
-            )
-        }
+        try:
+            stats = self.engine.stats()
+        except Exception as e:
+            logger.error(f"Cache GET_STATS failed: {e}")
+            stats = {'total_entries': 0, 'expired_entries': 0, 'memory_usage': 0}
+        stats.update(_single_flight.stats())
+        return stats
 
 
 # Global cache instance
 cache_service = CacheService()
 
 
-def cache_result(ttl_seconds: int = 3600, key_prefix: str = ""):
+def cache_tag(name: str, value: Any) -> str:
+    """
+    Build the invalidation tag for a named value.
+
+    Example:
+        cache_tag("project_id", project.id)  # "project_id:<uuid>"
+    """
+    return f"{name}:{_key_part(value)}"
+
+
+def _key_part(value: Any) -> Optional[str]:
+    """
+    Stable string form of a function argument for cache keys.
+
+    Returns None for arguments that must not affect the key (database
+    sessions). ORM instances are keyed by class and primary key rather than
+    their repr, which embeds a memory address.
+    """
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return str(value)
+    if isinstance(value, SASession):
+        return None
+    if isinstance(value, (list, tuple)):
+        return "[" + ",".join(str(_key_part(v)) for v in value) + "]"
+    if isinstance(value, dict):
+        return "{" + ",".join(f"{k}={_key_part(v)}" for k, v in sorted(value.items())) + "}"
+
+    state = sa_inspect(value, raiseerr=False)
+    if state is not None and getattr(state, 'mapper', None) is not None and hasattr(state, 'identity'):
+        identity = state.identity
+        if identity is not None:
+            return f"{type(value).__name__}#{','.join(str(i) for i in identity)}"
+    return str(value)
+
+
+def cache_result(
+    ttl_seconds: int = 3600,
+    key_prefix: str = "",
+    tags: Sequence[str] = (),
+    coalesce: bool = True,
+    stale_ttl_seconds: int = 0,
+):
     """
     Decorator for caching function results.
 
     Automatically generates cache key from function name and arguments.
+    Arguments are bound to the function signature so positional and keyword
+    calls share a key; Session arguments are ignored and ORM objects are
+    keyed by primary key. Works for both regular and async functions.
+
+    Concurrent misses for the same key are coalesced: one caller computes
+    the value and the others wait for its result.
 
     Args:
         ttl_seconds: Time to live in seconds
         key_prefix: Optional prefix for cache key (e.g., "user:123:")
+        tags: Names of parameters to tag entries with. Each cached result is
+              tagged "<name>:<value>" and can be dropped with
+              invalidate_cache(tags=[cache_tag(name, value)])
+        coalesce: Deduplicate concurrent misses (single-flight)
+        stale_ttl_seconds: Keep serving a value for this long after it
+              expires while one background refresh recomputes it. The
+              refresh runs outside the request, so only use this for
+              functions that do not take a request-scoped Session.
 
     Example:
-        @cache_result(ttl_seconds=300, key_prefix="projects:")
-        def get_projects(user_id: str):
+        @cache_result(ttl_seconds=300, key_prefix="projects:", tags=("user_id",))
+        def get_projects(user_id: str, db: Session):
             return db.query(Project).filter(Project.user_id == user_id).all()
+
+        invalidate_cache(tags=[cache_tag("user_id", user_id)])
     """
     def decorator(func: Callable):
+        signature = inspect.signature(func)
+        unknown = [name for name in tags if name not in signature.parameters]
+        if unknown:
+            raise ValueError(f"cache_result tags {unknown} are not parameters of {func.__name__}")
+
+        def build_key(args, kwargs) -> Tuple[str, List[str]]:
+            # Build cache key from function name and bound arguments
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+
+            parts = []
+            for name, value in bound.arguments.items():
+                part = _key_part(value)
+                if part is not None:
+                    parts.append(f"{name}={part}")
+
+            cache_key = f"{key_prefix}{func.__name__}"
+            if parts:
+                cache_key += ":" + ":".join(parts)
+            entry_tags = [cache_tag(name, bound.arguments[name]) for name in tags]
+            return cache_key, entry_tags
+
+        def store(cache_key: str, entry_tags: List[str], result: Any) -> None:
+            if stale_ttl_seconds > 0:
+                cache_service.set(
+                    cache_key,
+                    _StaleableValue(result, _wall_clock() + ttl_seconds),
+                    ttl_seconds=ttl_seconds + stale_ttl_seconds,
+                    tags=entry_tags,
+                )
+            else:
+                cache_service.set(cache_key, result, ttl_seconds=ttl_seconds, tags=entry_tags)
+
+        def is_fresh(cached: Any) -> bool:
+            return not isinstance(cached, _StaleableValue) or _wall_clock() <= cached.fresh_until
+
+        def unwrap(cache_key: str, cached: Any) -> Tuple[Any, bool]:
+            # Returns (value, needs_refresh)
+            if isinstance(cached, _StaleableValue):
+                if _wall_clock() > cached.fresh_until:
+                    return cached.value, _single_flight.start_refresh(cache_key)
+                return cached.value, False
+            return cached, False
+
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                cache_key, entry_tags = build_key(args, kwargs)
+
+                async def compute():
+                    # A leader that finished just before us may have filled the cache
+                    found, cached = cache_service.lookup(cache_key)
+                    if found and is_fresh(cached):
+                        return unwrap(cache_key, cached)[0]
+                    result = await func(*args, **kwargs)
+                    store(cache_key, entry_tags, result)
+                    return result
+
+                async def refresh():
+                    try:
+                        store(cache_key, entry_tags, await func(*args, **kwargs))
+                    except Exception as e:
+                        logger.warning(f"Background refresh failed for {cache_key}: {e}")
+                    finally:
+                        _single_flight.finish_refresh(cache_key)
+
+                # Try to get from cache
+                found, cached = cache_service.lookup(cache_key)
+                if found:
+                    logger.debug(f"Using cached result for {func.__name__}")
+                    value, needs_refresh = unwrap(cache_key, cached)
+                    if needs_refresh:
+                        _single_flight.track_task(asyncio.get_running_loop().create_task(refresh()))
+                    return value
+
+                # Call function (once per key) and cache result
+                if coalesce:
+                    return await _single_flight.do_async(cache_key, compute)
+                return await compute()
+
+            return async_wrapper
+
         @wraps(func)
         def wrapper(*args, **kwargs):
-            # Build cache key from function name and arguments
-            args_str = "_".join(str(arg) for arg in args)
-            kwargs_str = "_".join(f"{k}:{v}" for k, v in sorted(kwargs.items()))
+            cache_key, entry_tags = build_key(args, kwargs)
 
-            cache_key = f"{key_prefix}{func.__name__}"
-            if args_str:
-                cache_key += f":{args_str}"
-            if kwargs_str:
-                cache_key += f":{kwargs_str}"
+            def compute():
+                # A leader that finished just before us may have filled the cache
+                found, cached = cache_service.lookup(cache_key)
+                if found and is_fresh(cached):
+                    return unwrap(cache_key, cached)[0]
+                result = func(*args, **kwargs)
+                store(cache_key, entry_tags, result)
+                return result
+
+            def refresh():
+                try:
+                    store(cache_key, entry_tags, func(*args, **kwargs))
+                except Exception as e:
+                    logger.warning(f"Background refresh failed for {cache_key}: {e}")
+                finally:
+                    _single_flight.finish_refresh(cache_key)
 
             # Try to get from cache
-            cached_result = cache_service.get(cache_key)
-            if cached_result is not None:
+            found, cached = cache_service.lookup(cache_key)
+            if found:
                 logger.debug(f"Using cached result for {func.__name__}")
-                return cached_result
-
-            # Call function and cache result
-            result = func(*args, **kwargs)
-            cache_service.set(cache_key, result, ttl_seconds=ttl_seconds)
+                value, needs_refresh = unwrap(cache_key, cached)
+                if needs_refresh:
+                    threading.Thread(
+                        target=refresh, name=f"cache-refresh-{func.__name__}", daemon=True
+                    ).start()
+                return value
 
-            return result
+            # Call function (once per key) and cache result
+            if coalesce:
+                return _single_flight.do(cache_key, compute)
+            return compute()
 
         return wrapper
 
     return decorator
 
 
-def invalidate_cache(pattern: str) -> None:
+def invalidate_cache(pattern: Optional[str] = None, tags: Optional[Iterable[str]] = None) -> None:
     """
-    Invalidate cache entries matching a pattern.
+    Invalidate cache entries matching a pattern and/or tags.
 
-    Used when data is modified to prevent stale cache.
+    Used when data is modified to prevent stale cache. Both lookups are
+    indexed, so the cost depends on the number of matching entries only.
 
     Args:
         pattern: Key pattern to match (prefix-based)
+        tags: Tags to invalidate (see cache_tag)
 
     Example:
         # When user profile changes
@@ -213,6 +1293,14 @@ def invalidate_cache(pattern: str) -> None:
 
         # When project is updated
         invalidate_cache("project:proj_123:")
+
+        # Everything cached for a project, whatever its key prefix
+        invalidate_cache(tags=[cache_tag("project_id", "proj_123")])
     """
-    cache_service.clear_pattern(pattern)
-    logger.info(f"Cache invalidated for pattern: {pattern}")
+    if pattern is not None:
+        cache_service.clear_pattern(pattern)
+        logger.info(f"Cache invalidated for pattern: {pattern}")
+    if tags:
+        tags = list(tags)
+        cache_service.clear_tags(tags)
+        logger.info(f"Cache invalidated for tags: {tags}")
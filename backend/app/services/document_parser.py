@@ -1,20 +1,44 @@
 """Document parsing service for multiple file formats.
 
 Handles parsing of PDF, DOCX, Markdown, and plain text documents,
-with support for text chunking with overlap for RAG.
+with support for text chunking with overlap for RAG. parse() chunks with
+TextChunker (token budget, sentence/heading boundaries); chunk_text() and
+iter_chunks() are the fixed-width character chunkers behind the "fixed"
+strategy.
+
+parse() works on in-memory bytes. iter_segments()/iter_chunks() stream a
+file from disk (PDF page by page, DOCX paragraph by paragraph, text in
+blocks) so background ingestion can process large documents with bounded
+memory.
 """
 import logging
 from io import BytesIO
-from typing import List, Tuple
+from typing import Iterable, Iterator, List, Optional, Tuple
 
 import chardet
 
+from .text_chunker import ChunkingConfig, TextChunker
+
 logger = logging.getLogger(__name__)
 
 
+TEXT_BLOCK_CHARS = 64 * 1024
+
+
 class DocumentParser:
     """Parse documents in multiple formats (PDF, DOCX, Markdown, TXT)."""
 
+    SUPPORTED_EXTENSIONS = ('pdf', 'docx', 'doc', 'md', 'markdown', 'txt', 'text')
+
+    @staticmethod
+    def file_extension(filename: str) -> str:
+        return filename.lower().split('.')[-1]
+
+    @staticmethod
+    def is_supported(filename: str) -> bool:
+        """Check whether a filename has a parseable extension."""
+        return DocumentParser.file_extension(filename) in DocumentParser.SUPPORTED_EXTENSIONS
+
     @staticmethod
     def parse_pdf(file_bytes: bytes) -> str:
         """Extract text from PDF file.
@@ -170,7 +194,127 @@ class DocumentParser:
         return chunks
 
     @staticmethod
-    def parse(filename: str, file_bytes: bytes) -> Tuple[str, List[str]]:
+    def iter_chunks(
+        segments: Iterable[str],
+        chunk_size: int = 500,
+        overlap: int = 50
+    ) -> Iterator[str]:
+        """Chunk a stream of text segments.
+
+        Produces exactly the chunks chunk_text() would produce for the
+        concatenated segments, while only buffering about one segment.
+
+        Args:
+            segments: Text pieces in document order
+            chunk_size: Target size of each chunk in characters
+            overlap: Number of characters to overlap between chunks
+
+        Yields:
+            Non-empty text chunks
+        """
+        step = max(1, chunk_size - overlap)
+        buffer = ""
+        seen_text = False
+        for segment in segments:
+            if not segment:
+                continue
+            buffer += segment
+            seen_text = seen_text or bool(segment.strip())
+            # Emit every chunk whose window is complete
+            consumed = 0
+            while len(buffer) - consumed >= chunk_size + step:
+                chunk = buffer[consumed:consumed + chunk_size].strip()
+                if chunk:
+                    yield chunk
+                consumed += step
+            buffer = buffer[consumed:]
+
+        if not seen_text:
+            return
+        start = 0
+        while start < len(buffer):
+            chunk = buffer[start:start + chunk_size].strip()
+            if chunk:
+                yield chunk
+            start += step
+
+    @staticmethod
+    def iter_pdf_pages(path: str) -> Iterator[str]:
+        """Yield text page by page from a PDF file on disk.
+
+        Falls back to PyPDF2 if pdfplumber fails before producing any page.
+        """
+        produced = False
+        try:
+            import pdfplumber
+
+            with pdfplumber.open(path) as pdf:
+                for page in pdf.pages:
+                    page_text = page.extract_text()
+                    # Drop cached layout objects so memory stays per-page
+                    page.flush_cache()
+                    if page_text:
+                        produced = True
+                        yield page_text + "\n"
+            return
+        except Exception as e:
+            if produced:
+                raise
+            logger.warning(f"pdfplumber failed, trying PyPDF2: {e}")
+
+        from PyPDF2 import PdfReader
+
+        with open(path, 'rb') as f:
+            for page in PdfReader(f).pages:
+                yield (page.extract_text() or "") + "\n"
+
+    @staticmethod
+    def iter_docx_paragraphs(path: str) -> Iterator[str]:
+        """Yield paragraphs (newline-joined, as parse_docx) from a DOCX file."""
+        from docx import Document as DocxDocument
+
+        for i, paragraph in enumerate(DocxDocument(path).paragraphs):
+            yield paragraph.text if i == 0 else "\n" + paragraph.text
+
+    @staticmethod
+    def iter_text_blocks(path: str) -> Iterator[str]:
+        """Yield a UTF-8 text file in fixed-size blocks."""
+        with open(path, encoding='utf-8', errors='ignore', newline='') as f:
+            while True:
+                block = f.read(TEXT_BLOCK_CHARS)
+                if not block:
+                    return
+                yield block
+
+    @staticmethod
+    def iter_segments(filename: str, path: str) -> Iterator[str]:
+        """Stream text segments from a document on disk.
+
+        Args:
+            filename: Original filename (used to detect format)
+            path: Path to the file contents
+
+        Raises:
+            ValueError: If file format is not supported
+        """
+        ext = DocumentParser.file_extension(filename)
+        if ext == 'pdf':
+            return DocumentParser.iter_pdf_pages(path)
+        if ext in ['docx', 'doc']:
+            return DocumentParser.iter_docx_paragraphs(path)
+        if ext in ['md', 'markdown', 'txt', 'text']:
+            return DocumentParser.iter_text_blocks(path)
+        raise ValueError(
+            f"Unsupported file type: {ext}. "
+            "Supported formats: PDF, DOCX, Markdown, TXT"
+        )
+
+    @staticmethod
+    def parse(
+        filename: str,
+        file_bytes: bytes,
+        chunking: Optional[ChunkingConfig] = None
+    ) -> Tuple[str, List[str]]:
         """Parse document in any supported format.
 
         Detects format by file extension and parses accordingly.
@@ -179,6 +323,7 @@ class DocumentParser:
         Args:
             filename: Original filename (used to detect format)
             file_bytes: Raw file bytes
+            chunking: Chunking configuration (default: CHUNK_* settings)
 
         Returns:
             Tuple of (full_text, text_chunks)
@@ -212,7 +357,7 @@ class DocumentParser:
             )
 
         # Split into chunks
-        chunks = DocumentParser.chunk_text(content)
+        chunks = TextChunker(chunking).chunk(content)
 
         logger.info(
             f"Parsed {filename}: {len(content)} chars, "
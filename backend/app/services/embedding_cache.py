@@ -0,0 +1,285 @@
+"""Content-addressed embedding cache.
+
+Embeddings are keyed by sha256(model, normalised text), so identical text
+is embedded once no matter which document, chunk or query it came from.
+Vectors are stored as packed float16 (default) or float32 blobs in the
+embedding_cache table, with the shared CacheService in front of the
+database for hot keys (e.g. repeated RAG queries).
+
+The cache is best-effort: database errors are logged and treated as
+misses, so embedding still works when the table is missing.
+"""
+import hashlib
+import logging
+import threading
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_DTYPES = ("float16", "float32")
+_LOOKUP_BATCH = 500
+_MEMORY_PREFIX = "embedding:"
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace so formatting-only differences share a key."""
+    return " ".join(text.split())
+
+
+def embedding_cache_key(model: str, text: str) -> str:
+    """SHA-256 hex digest of model and normalised text."""
+    digest = hashlib.sha256()
+    digest.update(model.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(normalize_text(text).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough provider token count (~4 characters per token)."""
+    return max(1, len(text) // 4)
+
+
+def encode_vector(vector: Sequence[float], dtype: str = "float16") -> bytes:
+    """Pack a vector into little-endian bytes."""
+    return np.asarray(vector, dtype=np.dtype(dtype).newbyteorder("<")).tobytes()
+
+
+def decode_vector(blob: bytes, dtype: str = "float16") -> List[float]:
+    """Unpack bytes produced by encode_vector into a list of floats."""
+    return np.frombuffer(blob, dtype=np.dtype(dtype).newbyteorder("<")).astype(np.float32).tolist()
+
+
+class EmbeddingCache:
+    """
+    Persistent embedding cache with batched lookups.
+
+    Tracks hits, misses and the provider tokens saved by hits.
+    """
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable] = None,
+        dtype: str = "float16",
+        memory_ttl_seconds: int = 3600,
+        enabled: bool = True,
+    ):
+        """
+        Args:
+            session_factory: Callable returning a specs DB session
+                (default SessionLocalSpecs)
+            dtype: Blob element type for new entries (float16 | float32)
+            memory_ttl_seconds: TTL of the in-process copy (0 disables it)
+            enabled: When False every lookup misses and nothing is stored
+        """
+        if dtype not in SUPPORTED_DTYPES:
+            raise ValueError(f"Unsupported embedding cache dtype: {dtype}")
+        self._session_factory = session_factory
+        self.dtype = dtype
+        self.memory_ttl_seconds = memory_ttl_seconds
+        self.enabled = enabled
+        self._stats_lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._saved_tokens = 0
+        self._stored = 0
+        self._errors = 0
+
+    def _session(self):
+        if self._session_factory is None:
+            from ..core.database import SessionLocalSpecs
+
+            self._session_factory = SessionLocalSpecs
+        return self._session_factory()
+
+    def _record(self, hits: int = 0, misses: int = 0, saved_tokens: int = 0, stored: int = 0, errors: int = 0):
+        with self._stats_lock:
+            self._hits += hits
+            self._misses += misses
+            self._saved_tokens += saved_tokens
+            self._stored += stored
+            self._errors += errors
+
+    def _memory_get(self, key: str):
+        if not self.memory_ttl_seconds:
+            return None
+        from .cache_service import cache_service
+
+        return cache_service.get(_MEMORY_PREFIX + key)
+
+    def _memory_set(self, key: str, dtype: str, blob: bytes) -> None:
+        if not self.memory_ttl_seconds:
+            return
+        from .cache_service import cache_service
+
+        cache_service.set(_MEMORY_PREFIX + key, (dtype, blob), self.memory_ttl_seconds)
+
+    def get_many(self, model: str, texts: Sequence[str]) -> List[Optional[List[float]]]:
+        """
+        Look up cached embeddings for texts.
+
+        Args:
+            model: Embedding model name
+            texts: Texts to look up
+
+        Returns:
+            One embedding per text, None for misses
+        """
+        results: List[Optional[List[float]]] = [None] * len(texts)
+        if not self.enabled or not texts:
+            return results
+
+        keys = [embedding_cache_key(model, text) for text in texts]
+        pending: Dict[str, List[int]] = {}
+        for position, key in enumerate(keys):
+            cached = self._memory_get(key)
+            if cached is not None:
+                dtype, blob = cached
+                results[position] = decode_vector(blob, dtype)
+            else:
+                pending.setdefault(key, []).append(position)
+
+        if pending:
+            self._load_from_db(pending, results)
+
+        hits = sum(1 for vector in results if vector is not None)
+        saved = sum(estimate_tokens(text) for text, vector in zip(texts, results) if vector is not None)
+        self._record(hits=hits, misses=len(texts) - hits, saved_tokens=saved)
+        return results
+
+    def _load_from_db(self, pending: Dict[str, List[int]], results: List[Optional[List[float]]]) -> None:
+        from ..models.embedding_cache_entry import EmbeddingCacheEntry
+
+        pending_keys = list(pending)
+        try:
+            db = self._session()
+            try:
+                for i in range(0, len(pending_keys), _LOOKUP_BATCH):
+                    batch = pending_keys[i:i + _LOOKUP_BATCH]
+                    rows = db.query(
+                        EmbeddingCacheEntry.id,
+                        EmbeddingCacheEntry.dtype,
+                        EmbeddingCacheEntry.vector
+                    ).filter(EmbeddingCacheEntry.id.in_(batch)).all()
+                    for key, dtype, blob in rows:
+                        blob = bytes(blob)
+                        vector = decode_vector(blob, dtype)
+                        for position in pending[key]:
+                            results[position] = vector
+                        self._memory_set(key, dtype, blob)
+            finally:
+                db.close()
+        except Exception as e:
+            self._record(errors=1)
+            logger.warning(f"Embedding cache lookup failed: {e}")
+
+    def put_many(
+        self,
+        model: str,
+        texts: Sequence[str],
+        vectors: Sequence[Optional[Sequence[float]]],
+    ) -> int:
+        """
+        Store embeddings for texts (existing keys are left untouched).
+
+        Returns:
+            Number of new entries written
+        """
+        if not self.enabled:
+            return 0
+
+        from ..models.embedding_cache_entry import EmbeddingCacheEntry
+
+        entries: Dict[str, EmbeddingCacheEntry] = {}
+        for text, vector in zip(texts, vectors):
+            if vector is None:
+                continue
+            key = embedding_cache_key(model, text)
+            if key in entries:
+                continue
+            blob = encode_vector(vector, self.dtype)
+            self._memory_set(key, self.dtype, blob)
+            entries[key] = EmbeddingCacheEntry(
+                id=key,
+                model=model,
+                dim=len(vector),
+                dtype=self.dtype,
+                vector=blob,
+                token_count=estimate_tokens(text),
+            )
+        if not entries:
+            return 0
+
+        try:
+            db = self._session()
+            try:
+                keys = list(entries)
+                existing = set()
+                for i in range(0, len(keys), _LOOKUP_BATCH):
+                    batch = keys[i:i + _LOOKUP_BATCH]
+                    existing.update(
+                        key for (key,) in db.query(EmbeddingCacheEntry.id).filter(EmbeddingCacheEntry.id.in_(batch))
+                    )
+                new_entries = [entry for key, entry in entries.items() if key not in existing]
+                if new_entries:
+                    db.add_all(new_entries)
+                    db.commit()
+                self._record(stored=len(new_entries))
+                return len(new_entries)
+            except Exception:
+                db.rollback()
+                raise
+            finally:
+                db.close()
+        except Exception as e:
+            # Typically a concurrent insert of the same key; the other writer's row is equivalent
+            self._record(errors=1)
+            logger.warning(f"Embedding cache store failed: {e}")
+            return 0
+
+    def get_stats(self) -> Dict[str, float]:
+        """Hit/miss counters and provider tokens saved by cache hits."""
+        with self._stats_lock:
+            lookups = self._hits + self._misses
+            return {
+                "enabled": self.enabled,
+                "dtype": self.dtype,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": self._hits / lookups if lookups else 0.0,
+                "saved_tokens": self._saved_tokens,
+                "stored": self._stored,
+                "errors": self._errors,
+            }
+
+    def reset_stats(self) -> None:
+        with self._stats_lock:
+            self._hits = self._misses = self._saved_tokens = self._stored = self._errors = 0
+
+
+_embedding_cache: Optional[EmbeddingCache] = None
+_embedding_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """Get the process-wide EmbeddingCache (configured from settings)."""
+    global _embedding_cache
+    if _embedding_cache is None:
+        with _embedding_cache_lock:
+            if _embedding_cache is None:
+                options = {}
+                try:
+                    from ..core.config import settings
+
+                    options = {
+                        "enabled": settings.EMBEDDING_CACHE_ENABLED,
+                        "dtype": settings.EMBEDDING_CACHE_DTYPE,
+                        "memory_ttl_seconds": settings.EMBEDDING_CACHE_MEMORY_TTL_SECONDS,
+                    }
+                except Exception:
+                    # Library usage without a configured environment
+                    pass
+                _embedding_cache = EmbeddingCache(**options)
+    return _embedding_cache
@@ -0,0 +1,350 @@
+"""Async, rate-aware batch embedding pipeline.
+
+Splits texts into provider batches and embeds them with a bounded pool of
+concurrent requests. A token bucket sized from the provider's
+tokens-per-minute limit paces the requests, and failed batches are
+retried with exponential backoff. Results are yielded in input order as
+soon as each prefix of batches is complete, so callers can persist early
+batches while later ones are still in flight.
+
+Providers are pluggable:
+- OpenAIEmbeddingProvider: async client (openai>=1.0) or the legacy sync
+  API run in a worker thread; never blocks the event loop
+- FakeEmbeddingProvider: deterministic local vectors for tests and
+  offline benchmarks
+"""
+import asyncio
+import hashlib
+import logging
+import random
+import threading
+import time
+import weakref
+from typing import AsyncIterator, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .embedding_cache import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 100  # OpenAI batch limit
+DEFAULT_MAX_CONCURRENCY = 4
+DEFAULT_TOKENS_PER_MINUTE = 1_000_000
+DEFAULT_MAX_RETRIES = 3
+
+
+class EmbeddingProvider:
+    """Interface for embedding backends."""
+
+    model: str = ""
+
+    async def embed(self, texts: Sequence[str]) -> List[List[float]]:
+        """Embed texts in one provider request, preserving order."""
+        raise NotImplementedError
+
+
+class OpenAIEmbeddingProvider(EmbeddingProvider):
+    """OpenAI embeddings API."""
+
+    def __init__(self, model: str = "text-embedding-3-small", api_key: Optional[str] = None):
+        self.model = model
+        self._api_key = api_key
+        self._client = None
+
+    def _async_client(self):
+        import openai
+
+        if not hasattr(openai, "AsyncOpenAI"):
+            return None
+        if self._client is None:
+            self._client = openai.AsyncOpenAI(api_key=self._api_key) if self._api_key else openai.AsyncOpenAI()
+        return self._client
+
+    async def embed(self, texts: Sequence[str]) -> List[List[float]]:
+        client = self._async_client()
+        if client is not None:
+            response = await client.embeddings.create(input=list(texts), model=self.model)
+            items = sorted(response.data, key=lambda item: item.index)
+            return [item.embedding for item in items]
+
+        # openai<1.0 only has a blocking client; keep it off the event loop
+        import openai
+
+        response = await asyncio.to_thread(openai.Embedding.create, input=list(texts), model=self.model)
+        embeddings: List[Optional[List[float]]] = [None] * len(texts)
+        for item in response['data']:
+            embeddings[item['index']] = item['embedding']
+        return embeddings
+
+
+class FakeEmbeddingProvider(EmbeddingProvider):
+    """
+    Deterministic offline provider.
+
+    Vectors are derived from a hash of the text, so identical text always
+    gets the same embedding. latency_seconds simulates request time.
+    """
+
+    def __init__(self, dim: int = 1536, latency_seconds: float = 0.0, model: str = "fake-embedding"):
+        self.model = model
+        self.dim = dim
+        self.latency_seconds = latency_seconds
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def vector(self, text: str) -> List[float]:
+        seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+        return np.random.default_rng(seed).standard_normal(self.dim).astype(np.float32).tolist()
+
+    async def embed(self, texts: Sequence[str]) -> List[List[float]]:
+        with self._lock:
+            self.requests += 1
+        if self.latency_seconds:
+            await asyncio.sleep(self.latency_seconds)
+        return [self.vector(text) for text in texts]
+
+
+class TokenBucket:
+    """
+    Async token bucket refilled continuously at tokens_per_minute.
+
+    A request larger than the bucket capacity waits for a full bucket and
+    then overdraws it, so oversized batches still make progress.
+    """
+
+    def __init__(
+        self,
+        tokens_per_minute: float,
+        capacity: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if tokens_per_minute <= 0:
+            raise ValueError("tokens_per_minute must be positive")
+        self.rate = tokens_per_minute / 60.0
+        self.capacity = capacity or tokens_per_minute
+        self._tokens = self.capacity
+        self._clock = clock
+        self._updated = clock()
+        self._lock = asyncio.Lock()
+        self.waited_seconds = 0.0
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, tokens: float) -> None:
+        """Wait until `tokens` can be spent, then spend them."""
+        async with self._lock:
+            needed = min(tokens, self.capacity)
+            while True:
+                self._refill()
+                if self._tokens >= needed:
+                    self._tokens -= tokens
+                    return
+                delay = (needed - self._tokens) / self.rate
+                self.waited_seconds += delay
+                await asyncio.sleep(delay)
+
+
+class EmbeddingPipeline:
+    """Bounded-concurrency, rate-limited batch embedding."""
+
+    def __init__(
+        self,
+        provider: EmbeddingProvider,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        tokens_per_minute: Optional[float] = DEFAULT_TOKENS_PER_MINUTE,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        backoff_base_seconds: float = 0.5,
+        backoff_max_seconds: float = 20.0,
+    ):
+        """
+        Args:
+            provider: Embedding backend
+            batch_size: Texts per provider request
+            max_concurrency: Provider requests in flight at once
+            tokens_per_minute: Provider token budget (None disables limiting)
+            max_retries: Retries per batch after the first attempt
+            backoff_base_seconds: First retry delay (doubles each retry, with jitter)
+            backoff_max_seconds: Upper bound for a single retry delay
+        """
+        self.provider = provider
+        self.batch_size = batch_size
+        self.max_concurrency = max(1, max_concurrency)
+        self.tokens_per_minute = tokens_per_minute
+        self.max_retries = max_retries
+        self.backoff_base_seconds = backoff_base_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        # Buckets hold an asyncio.Lock, so keep one per event loop
+        self._buckets: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, TokenBucket]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._stats_lock = threading.Lock()
+        self._stats = {"batches": 0, "texts": 0, "retries": 0, "failed_batches": 0, "tokens": 0}
+
+    @property
+    def model(self) -> str:
+        return self.provider.model
+
+    def _bucket(self) -> Optional[TokenBucket]:
+        if not self.tokens_per_minute:
+            return None
+        loop = asyncio.get_running_loop()
+        bucket = self._buckets.get(loop)
+        if bucket is None:
+            bucket = self._buckets[loop] = TokenBucket(self.tokens_per_minute)
+        return bucket
+
+    def _record(self, **counts: int) -> None:
+        with self._stats_lock:
+            for name, value in counts.items():
+                self._stats[name] += value
+
+    def get_stats(self) -> Dict[str, float]:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["rate_limited_seconds"] = round(sum(b.waited_seconds for b in list(self._buckets.values())), 3)
+        return stats
+
+    def _backoff(self, attempt: int) -> float:
+        delay = min(self.backoff_max_seconds, self.backoff_base_seconds * (2 ** attempt))
+        return delay * random.uniform(0.5, 1.0)
+
+    async def embed_batch(self, texts: Sequence[str]) -> List[List[float]]:
+        """
+        Embed one provider batch with rate limiting and retries.
+
+        Raises:
+            Exception: The provider's last error once retries are exhausted
+        """
+        tokens = sum(estimate_tokens(text) for text in texts)
+        bucket = self._bucket()
+        for attempt in range(self.max_retries + 1):
+            if bucket is not None:
+                await bucket.acquire(tokens)
+            try:
+                embeddings = await self.provider.embed(texts)
+                self._record(batches=1, texts=len(texts), tokens=tokens)
+                return embeddings
+            except Exception as e:
+                if attempt >= self.max_retries:
+                    self._record(failed_batches=1)
+                    logger.error(f"Embedding batch of {len(texts)} failed after {attempt + 1} attempts: {e}")
+                    raise
+                delay = self._backoff(attempt)
+                self._record(retries=1)
+                logger.warning(f"Embedding batch failed ({e}); retrying in {delay:.2f}s")
+                await asyncio.sleep(delay)
+
+    async def stream(self, texts: Sequence[str]) -> AsyncIterator[Tuple[int, List[List[float]]]]:
+        """
+        Embed texts, yielding (start_index, embeddings) per batch in input order.
+
+        At most max_concurrency batches are in flight; a batch is yielded
+        once it and every earlier batch have finished. If a batch fails
+        after its retries, outstanding batches are cancelled and the error
+        is raised.
+        """
+        batches = [
+            (start, texts[start:start + self.batch_size])
+            for start in range(0, len(texts), self.batch_size)
+        ]
+        if not batches:
+            return
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def run(batch: Sequence[str]) -> List[List[float]]:
+            async with semaphore:
+                return await self.embed_batch(batch)
+
+        # Tasks are created lazily, a bounded window ahead of the consumer,
+        # so a huge upload does not create thousands of pending tasks
+        window = 2 * self.max_concurrency
+        pending: Dict[int, asyncio.Task] = {}
+        next_to_start = 0
+        try:
+            for position, (start, _) in enumerate(batches):
+                while next_to_start < len(batches) and next_to_start < position + window:
+                    pending[next_to_start] = asyncio.ensure_future(run(batches[next_to_start][1]))
+                    next_to_start += 1
+                embeddings = await pending.pop(position)
+                yield start, embeddings
+        finally:
+            for task in pending.values():
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending.values(), return_exceptions=True)
+
+    async def embed(self, texts: Sequence[str]) -> List[List[float]]:
+        """Embed all texts and return embeddings in input order."""
+        results: List[List[float]] = []
+        async for _, embeddings in self.stream(texts):
+            results.extend(embeddings)
+        return results
+
+
+def create_embedding_provider(name: Optional[str] = None, model: str = "text-embedding-3-small") -> EmbeddingProvider:
+    """
+    Build an embedding provider by name.
+
+    Args:
+        name: openai | fake (default EMBEDDING_PROVIDER, then openai)
+        model: Model name for real providers
+
+    Raises:
+        ValueError: If the provider name is unknown
+    """
+    api_key = None
+    if name is None:
+        try:
+            from ..core.config import settings
+
+            name = settings.EMBEDDING_PROVIDER
+            api_key = settings.OPENAI_API_KEY
+        except Exception:
+            name = "openai"
+
+    name = name.lower()
+    if name == "openai":
+        return OpenAIEmbeddingProvider(model=model, api_key=api_key)
+    if name == "fake":
+        return FakeEmbeddingProvider()
+    raise ValueError(f"Unknown embedding provider: {name}")
+
+
+_pipeline: Optional[EmbeddingPipeline] = None
+_pipeline_lock = threading.Lock()
+
+
+def get_embedding_pipeline() -> EmbeddingPipeline:
+    """Get the process-wide EmbeddingPipeline (configured from settings)."""
+    global _pipeline
+    if _pipeline is None:
+        with _pipeline_lock:
+            if _pipeline is None:
+                options = {}
+                try:
+                    from ..core.config import settings
+
+                    options = {
+                        "batch_size": settings.EMBEDDING_BATCH_SIZE,
+                        "max_concurrency": settings.EMBEDDING_MAX_CONCURRENCY,
+                        "tokens_per_minute": settings.EMBEDDING_TOKENS_PER_MINUTE,
+                        "max_retries": settings.EMBEDDING_MAX_RETRIES,
+                    }
+                except Exception:
+                    # Library usage without a configured environment
+                    pass
+                _pipeline = EmbeddingPipeline(create_embedding_provider(), **options)
+    return _pipeline
+
+
+def configure_embedding_pipeline(pipeline: Optional[EmbeddingPipeline]) -> None:
+    """Replace the process-wide pipeline (None = rebuild from settings on next use)."""
+    global _pipeline
+    with _pipeline_lock:
+        _pipeline = pipeline
@@ -1,11 +1,18 @@
 """OpenAI embedding service for vector embeddings.
 
 Generates vector embeddings for text chunks using OpenAI's
-text-embedding-3-small model (1536 dimensions).
+text-embedding-3-small model (1536 dimensions). embed_text and
+embed_chunks go through the content-addressed embedding cache
+(embedding_cache.py), so only unseen text reaches the provider, and
+provider calls go through the async rate-limited pipeline
+(embedding_pipeline.py) so they never block the event loop.
 """
 import asyncio
 import logging
-from typing import List, Optional
+from typing import Dict, List, Optional
+
+from .embedding_cache import get_embedding_cache, normalize_text
+from .embedding_pipeline import get_embedding_pipeline
 
 logger = logging.getLogger(__name__)
 
@@ -21,8 +28,17 @@ class EmbeddingService:
     # specifically designed for semantic search. Claude embeddings are
     # available but OpenAI embeddings have better vector space properties.
     MODEL = "text-embedding-3-small"
-    BATCH_SIZE = 100  # OpenAI batch limit
-    MAX_RETRIES = 3
+    MAX_CHARS = 8000
+
+    @staticmethod
+    def get_cache_stats() -> Dict[str, float]:
+        """Embedding cache hit ratio and provider tokens saved."""
+        return get_embedding_cache().get_stats()
+
+    @staticmethod
+    def get_pipeline_stats() -> Dict[str, float]:
+        """Provider batches, retries and time spent rate limited."""
+        return get_embedding_pipeline().get_stats()
 
     @staticmethod
     async def embed_text(text: str) -> Optional[List[float]]:
@@ -36,22 +52,22 @@ class EmbeddingService:
             or None if embedding fails
 
         Raises:
-            Exception: If OpenAI API call fails after retries
+            Exception: If the provider call fails after retries
         """
         try:
-            import openai
-
-
             # Ensure text is not too long
-            if len(text) > 8000:
-                text = text[:8000]
-
-            response = openai.Embedding.create(
-                input=text,
-                model=EmbeddingService.MODEL
-            )
-
-            embedding = response['data'][0]['embedding']
+            if len(text) > EmbeddingService.MAX_CHARS:
+                text = text[:EmbeddingService.MAX_CHARS]
+
+            pipeline = get_embedding_pipeline()
+            cache = get_embedding_cache()
+            cached = (await asyncio.to_thread(cache.get_many, pipeline.model, [text]))[0]
+            if cached is not None:
+                logger.debug(f"Embedding cache hit for text ({len(text)} chars)")
+                return cached
+
+            embedding = (await pipeline.embed_batch([text]))[0]
+            await asyncio.to_thread(cache.put_many, pipeline.model, [text], [embedding])
             logger.debug(f"Generated embedding for text ({len(text)} chars)")
             return embedding
 
@@ -63,38 +79,27 @@ class EmbeddingService:
     async def embed_batch(texts: List[str]) -> List[Optional[List[float]]]:
         """Get embeddings for multiple text chunks.
 
-        Batches requests for efficiency. Returns list of embeddings
+        Sends the texts through the embedding pipeline (rate limited,
+        retried) without consulting the cache. Returns list of embeddings
         in same order as input texts.
 
         Args:
             texts: List of text chunks to embed
 
         Returns:
-            List of embeddings (same length as texts),
-            with None for failed embeddings
+            List of embeddings (same length as texts)
 
         Raises:
-            Exception: If OpenAI API call fails
+            Exception: If the provider call fails after retries
         """
         if not texts:
             return []
 
         try:
-            import openai
-
-
             # Truncate long texts
-            texts = [t[:8000] if len(t) > 8000 else t for t in texts]
-
-            response = openai.Embedding.create(
-                input=texts,
-                model=EmbeddingService.MODEL
-            )
+            texts = [t[:EmbeddingService.MAX_CHARS] for t in texts]
 
-            # Sort by index to ensure correct order
-            embeddings = [None] * len(texts)
-            for item in response['data']:
-                embeddings[item['index']] = item['embedding']
+            embeddings = await get_embedding_pipeline().embed(texts)
 
             logger.info(
                 f"Generated {len([e for e in embeddings if e])} "
@@ -110,7 +115,10 @@ class EmbeddingService:
     async def embed_chunks(chunks: List[str]) -> List[Optional[List[float]]]:
         """Get embeddings for document chunks with batching.
 
-        Automatically batches requests to respect OpenAI API limits.
+        Looks all chunks up in the embedding cache first; only misses are
+        sent to the provider, each distinct text once. Misses go through
+        the embedding pipeline, which runs several rate-limited batches
+        concurrently and caches each batch as it completes.
 
         Args:
             chunks: List of document chunks to embed
@@ -123,16 +131,35 @@ class EmbeddingService:
             >>> embeddings = await EmbeddingService.embed_chunks(chunks)
             >>> len(embeddings)  # 3
         """
-        all_embeddings = []
-
-        for i in range(0, len(chunks), EmbeddingService.BATCH_SIZE):
-            batch = chunks[i:i + EmbeddingService.BATCH_SIZE]
-            embeddings = await EmbeddingService.embed_batch(batch)
-            all_embeddings.extend(embeddings)
+        chunks = [chunk[:EmbeddingService.MAX_CHARS] for chunk in chunks]
+        pipeline = get_embedding_pipeline()
+        cache = get_embedding_cache()
+        all_embeddings = await asyncio.to_thread(cache.get_many, pipeline.model, chunks)
+
+        # Positions of each distinct uncached text (duplicates are embedded once)
+        pending: Dict[str, List[int]] = {}
+        miss_texts: List[str] = []
+        for position, (chunk, embedding) in enumerate(zip(chunks, all_embeddings)):
+            if embedding is not None:
+                continue
+            key = normalize_text(chunk)
+            if key not in pending:
+                pending[key] = []
+                miss_texts.append(chunk)
+            pending[key].append(position)
+
+        if len(miss_texts) < len(chunks):
+            logger.info(
+                f"Embedding cache: {len(chunks) - sum(len(p) for p in pending.values())} "
+                f"of {len(chunks)} chunks cached, embedding {len(miss_texts)} distinct texts"
+            )
 
-            # Small delay between batches to avoid rate limiting
-            if i + EmbeddingService.BATCH_SIZE < len(chunks):
-                await asyncio.sleep(0.1)
+        async for start, embeddings in pipeline.stream(miss_texts):
+            batch = miss_texts[start:start + len(embeddings)]
+            await asyncio.to_thread(cache.put_many, pipeline.model, batch, embeddings)
+            for text, embedding in zip(batch, embeddings):
+                for position in pending[normalize_text(text)]:
+                    all_embeddings[position] = embedding
 
         return all_embeddings
 
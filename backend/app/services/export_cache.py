@@ -0,0 +1,262 @@
+"""Cached export artifacts and conditional GET support.
+
+An export is fully determined by the project row (its spec_revision and
+updated_at, see models/spec_revision.py), the format and the export
+options. ArtifactKey hashes those into an ETag, so endpoints can:
+
+- answer If-None-Match / If-Modified-Since with 304 after reading only
+  the project row (see core/http_cache.py), and
+- serve a previously rendered artifact from EXPORT_CACHE_DIR instead of
+  rendering it again.
+
+Artifacts live in one directory per project. Writing an artifact for a
+new project version removes the artifacts of older versions.
+"""
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, Optional, Union
+
+from ..core.datetime_utils import as_utc
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ArtifactKey:
+    """Identity of one rendered export."""
+    project_id: str
+    version: str  # Project spec revision + updated_at
+    variant: str  # Format + options
+
+    @property
+    def etag(self) -> str:
+        return f'"{self.version}-{self.variant}"'
+
+    @property
+    def name(self) -> str:
+        return f"{self.version}-{self.variant}"
+
+
+def _digest(value: str, length: int) -> str:
+    return hashlib.sha256(value.encode("utf-8")).hexdigest()[:length]
+
+
+def artifact_key(project, format: str, **options: Any) -> ArtifactKey:
+    """
+    Key of a project export.
+
+    Args:
+        project: Project row (id, spec_revision, updated_at)
+        format: Export format or endpoint-specific name
+        **options: Every option that changes the output
+
+    Returns:
+        ArtifactKey
+    """
+    updated_at = as_utc(project.updated_at).isoformat() if project.updated_at else ""
+    version = _digest(f"{project.id}:{project.spec_revision or 0}:{updated_at}", 16)
+    variant = _digest(json.dumps({"format": format, **options}, sort_keys=True, default=str), 12)
+    return ArtifactKey(str(project.id), version, variant)
+
+
+def last_modified(project) -> Optional[datetime]:
+    """When the project (or one of its specifications) last changed, to the second."""
+    if not project.updated_at:
+        return None
+    return as_utc(project.updated_at).replace(microsecond=0)
+
+
+class ExportArtifactCache:
+    """Rendered exports on disk, keyed by ArtifactKey."""
+
+    def __init__(self, directory: Union[str, Path]):
+        """
+        Args:
+            directory: Root directory (created on first write)
+        """
+        self.directory = Path(directory)
+        self._stats = {"hits": 0, "misses": 0, "writes": 0}
+        self._lock = threading.Lock()
+
+    def _project_dir(self, key: ArtifactKey) -> Path:
+        return self.directory / key.project_id
+
+    def path(self, key: ArtifactKey) -> Path:
+        return self._project_dir(key) / key.name
+
+    def _count(self, stat: str) -> None:
+        with self._lock:
+            self._stats[stat] += 1
+
+    def open(self, key: ArtifactKey) -> Optional[BinaryIO]:
+        """
+        Open a cached artifact for reading, or None on a miss.
+
+        The handle stays readable even if a newer version prunes the
+        file while it is being sent.
+        """
+        try:
+            handle = open(self.path(key), "rb")
+        except OSError:
+            self._count("misses")
+            return None
+        self._count("hits")
+        return handle
+
+    def read(self, key: ArtifactKey) -> Optional[bytes]:
+        """Content of the cached artifact, or None."""
+        handle = self.open(key)
+        if handle is None:
+            return None
+        with handle:
+            return handle.read()
+
+    @staticmethod
+    def iter_file(handle: BinaryIO, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+        """Stream an opened artifact in chunks and close it."""
+        with handle:
+            while True:
+                chunk = handle.read(chunk_size)
+                if not chunk:
+                    return
+                yield chunk
+
+    def put(self, key: ArtifactKey, content: Union[str, bytes]) -> None:
+        """Store an artifact (errors are logged, never raised)."""
+        writer = self._open(key)
+        if writer is not None:
+            writer.write(content)
+            self._commit(writer)
+
+    def write_through(self, key: ArtifactKey, chunks: Iterable[Union[str, bytes]]) -> Iterator[bytes]:
+        """
+        Pass a streamed export through, storing it once it is complete.
+
+        Nothing is stored if the stream fails or the client disconnects
+        before the end.
+
+        Args:
+            key: Artifact key
+            chunks: Rendered chunks (text is UTF-8 encoded)
+
+        Yields:
+            The chunks as bytes
+        """
+        writer = self._open(key)
+        try:
+            for chunk in chunks:
+                data = chunk.encode("utf-8") if isinstance(chunk, str) else chunk
+                if writer is not None:
+                    writer.write(data)
+                yield data
+        except BaseException:
+            if writer is not None:
+                writer.abort()
+            raise
+        if writer is not None:
+            self._commit(writer)
+
+    def _open(self, key: ArtifactKey) -> Optional["_ArtifactWriter"]:
+        try:
+            return _ArtifactWriter(key, self._project_dir(key), self.path(key))
+        except OSError as e:
+            logger.warning(f"Export cache unavailable for {key.name}: {e}")
+            return None
+
+    def _commit(self, writer: "_ArtifactWriter") -> None:
+        if writer.commit():
+            self._count("writes")
+            self._prune(writer.key)
+
+    def _prune(self, key: ArtifactKey) -> None:
+        """Remove artifacts of older project versions."""
+        for path in self._project_dir(key).iterdir():
+            if path.name.startswith(".tmp-") or path.name.startswith(f"{key.version}-"):
+                continue
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+    def invalidate(self, project_id: Any) -> None:
+        """Drop every artifact of a project."""
+        shutil.rmtree(self.directory / str(project_id), ignore_errors=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self._stats, "directory": str(self.directory)}
+
+
+class _ArtifactWriter:
+    """Temporary file renamed into place on commit, so readers never see partial artifacts."""
+
+    def __init__(self, key: ArtifactKey, directory: Path, target: Path):
+        directory.mkdir(parents=True, exist_ok=True)
+        self.key = key
+        self.target = target
+        self.handle = tempfile.NamedTemporaryFile(dir=directory, prefix=".tmp-", delete=False)
+        self.failed = False
+
+    def write(self, data: Union[str, bytes]) -> None:
+        if self.failed:
+            return
+        try:
+            self.handle.write(data.encode("utf-8") if isinstance(data, str) else data)
+        except OSError as e:
+            logger.warning(f"Failed to write export artifact {self.key.name}: {e}")
+            self.abort()
+
+    def commit(self) -> bool:
+        if self.failed:
+            return False
+        try:
+            self.handle.close()
+            os.replace(self.handle.name, self.target)
+        except OSError as e:
+            logger.warning(f"Failed to store export artifact {self.key.name}: {e}")
+            self.abort()
+            return False
+        return True
+
+    def abort(self) -> None:
+        self.failed = True
+        self.handle.close()
+        try:
+            os.unlink(self.handle.name)
+        except OSError:
+            pass
+
+
+_cache: Optional[ExportArtifactCache] = None
+_cache_configured = False
+_cache_lock = threading.Lock()
+
+
+def get_export_cache() -> Optional[ExportArtifactCache]:
+    """Get the process-wide artifact cache (None if EXPORT_CACHE_DIR is unset)."""
+    global _cache, _cache_configured
+    if not _cache_configured:
+        with _cache_lock:
+            if not _cache_configured:
+                from ..core.config import settings
+
+                if settings.EXPORT_CACHE_DIR:
+                    _cache = ExportArtifactCache(settings.EXPORT_CACHE_DIR)
+                _cache_configured = True
+    return _cache
+
+
+def configure_export_cache(cache: Optional[ExportArtifactCache]) -> None:
+    """Replace the process-wide cache (None disables artifact caching)."""
+    global _cache, _cache_configured
+    with _cache_lock:
+        _cache = cache
+        _cache_configured = True
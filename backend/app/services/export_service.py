@@ -1,20 +1,100 @@
 """Export service for specifications in multiple formats.
 
-Supports JSON, CSV, Markdown, and YAML export formats.
+Supports JSON, CSV, Markdown, YAML, and HTML export formats.
+
+Every format has a generator (iter_json, iter_csv, ...) that takes any
+iterable of specification dicts and yields the document in pieces, so an
+export can be written to the client while rows are still being read from
+the database (see iter_project_specifications and gzip_chunks). The to_*
+methods join the same generators into one string.
 """
 import csv
 import json
 import logging
+import zlib
 from datetime import datetime, timezone
 from io import StringIO
-from typing import Any, Dict, List, Optional
+from itertools import chain
+from typing import Any, Dict, Iterable, Iterator, List, Optional
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_STREAM_BATCH_SIZE = 500
+
+# Export format -> (file extension, content type)
+EXPORT_FORMATS = {
+    "json": ("json", "application/json"),
+    "csv": ("csv", "text/csv"),
+    "markdown": ("md", "text/markdown"),
+    "yaml": ("yaml", "application/x-yaml"),
+    "html": ("html", "text/html"),
+}
+
+HTML_PRIORITY_COLORS = {
+    "CRITICAL": "#d9534f",
+    "HIGH": "#f0ad4e",
+    "MEDIUM": "#5bc0de",
+    "LOW": "#5cb85c"
+}
+
+
+def _json_block(value: Any, depth: int) -> str:
+    """json.dumps(indent=2) of a value nested `depth` levels deep."""
+    # Newlines inside JSON strings are escaped, so every raw newline is a line break
+    return json.dumps(value, indent=2).replace("\n", "\n" + "  " * depth)
+
+
+def _export_metadata(project_name: str, project_id: str) -> Dict[str, Any]:
+    return {
+        "name": project_name,
+        "id": project_id,
+        "exported_at": datetime.now(timezone.utc).isoformat()
+    }
+
+
+def _category(spec: Dict[str, Any]) -> str:
+    return spec.get("category", "Other")
+
+
+_NO_CATEGORY = object()
+
 
 class ExportService:
     """Export specifications in multiple formats."""
 
+    @staticmethod
+    def iter_json(
+        project_name: str,
+        project_id: str,
+        specifications: Iterable[Dict[str, Any]],
+        include_metadata: bool = True
+    ) -> Iterator[str]:
+        """Stream specifications as JSON.
+
+        Yields the same document as to_json, one specification at a time.
+
+        Args:
+            project_name: Project name
+            project_id: Project ID
+            specifications: Iterable of specification dictionaries
+            include_metadata: Include project metadata
+
+        Yields:
+            JSON text chunks
+        """
+        yield "{\n"
+        if include_metadata:
+            metadata = _export_metadata(project_name, project_id)
+            yield f'  "project": {_json_block(metadata, 1)},\n'
+        yield '  "specifications": ['
+
+        empty = True
+        for spec in specifications:
+            yield ("\n    " if empty else ",\n    ") + _json_block(spec, 2)
+            empty = False
+
+        yield "]\n}" if empty else "\n  ]\n}"
+
     @staticmethod
     def to_json(
         project_name: str,
@@ -40,21 +120,43 @@ class ExportService:
             ...     [{"key": "api_limit", "value": "1000 req/min"}]
             ... )
         """
-        data = {
-            "specifications": specifications
-        }
+        return "".join(ExportService.iter_json(
+            project_name, project_id, specifications, include_metadata
+        ))
 
-        if include_metadata:
-            data = {
-                "project": {
-                    "name": project_name,
-                    "id": project_id,
-                    "exported_at": datetime.now(timezone.utc).isoformat()
-                },
-                **data
-            }
+    @staticmethod
+    def iter_csv(
+        specifications: Iterable[Dict[str, Any]],
+        fieldnames: Optional[List[str]] = None
+    ) -> Iterator[str]:
+        """Stream specifications as CSV, one row per chunk.
+
+        Args:
+            specifications: Iterable of specification dictionaries
+            fieldnames: CSV column names (auto-detect from the first spec if not provided)
 
-        return json.dumps(data, indent=2)
+        Yields:
+            CSV text chunks (nothing for no specifications)
+        """
+        specs = iter(specifications)
+        first = next(specs, None)
+        if first is None:
+            return
+
+        # Auto-detect fieldnames from first spec if not provided
+        if not fieldnames:
+            fieldnames = list(first.keys())
+
+        output = StringIO()
+        writer = csv.DictWriter(output, fieldnames=fieldnames)
+
+        writer.writeheader()
+        for spec in chain([first], specs):
+            # Ensure all fields exist
+            writer.writerow({field: spec.get(field, "") for field in fieldnames})
+            yield output.getvalue()
+            output.seek(0)
+            output.truncate()
 
     @staticmethod
     def to_csv(
@@ -78,23 +180,53 @@ class ExportService:
             ...     ]
             ... )
         """
-        if not specifications:
-            return ""
+        return "".join(ExportService.iter_csv(specifications, fieldnames))
 
-        # Auto-detect fieldnames from first spec if not provided
-        if not fieldnames:
-            fieldnames = list(specifications[0].keys())
+    @staticmethod
+    def iter_markdown(
+        project_name: str,
+        specifications: Iterable[Dict[str, Any]],
+        group_by_category: bool = True
+    ) -> Iterator[str]:
+        """Stream specifications as Markdown.
 
-        output = StringIO()
-        writer = csv.DictWriter(output, fieldnames=fieldnames)
+        With group_by_category, specifications must arrive ordered by
+        category (a heading is written whenever the category changes);
+        to_markdown sorts them first.
 
-        writer.writeheader()
-        for spec in specifications:
-            # Ensure all fields exist
-            row = {field: spec.get(field, "") for field in fieldnames}
-            writer.writerow(row)
+        Args:
+            project_name: Project name
+            specifications: Iterable of specification dictionaries
+            group_by_category: Group specs by category if True
 
-        return output.getvalue()
+        Yields:
+            Markdown text chunks
+        """
+        yield "\n".join([
+            f"# {project_name}",
+            "",
+            f"**Exported:** {datetime.now(timezone.utc).isoformat()}",
+            "",
+            "## Specifications",
+            ""
+        ])
+
+        if group_by_category:
+            current = _NO_CATEGORY
+            for spec in specifications:
+                category = _category(spec)
+                if category != current:
+                    if current is not _NO_CATEGORY:
+                        yield "\n"
+                    yield f"\n### {category}\n"
+                    current = category
+                yield "\n" + ExportService._spec_to_md_item(spec)
+            if current is not _NO_CATEGORY:
+                yield "\n"
+        else:
+            # No grouping
+            for spec in specifications:
+                yield "\n" + ExportService._spec_to_md_item(spec) + "\n"
 
     @staticmethod
     def to_markdown(
@@ -121,39 +253,11 @@ class ExportService:
             ...     ]
             ... )
         """
-        lines = [
-            f"# {project_name}",
-            "",
-            f"**Exported:** {datetime.now(timezone.utc).isoformat()}",
-            "",
-            "## Specifications",
-            ""
-        ]
-
         if group_by_category:
-            # Group by category
-            categories: Dict[str, List[Dict[str, Any]]] = {}
-            for spec in specifications:
-                category = spec.get("category", "Other")
-                if category not in categories:
-                    categories[category] = []
-                categories[category].append(spec)
-
-            for category in sorted(categories.keys()):
-                lines.append(f"### {category}")
-                lines.append("")
-
-                for spec in categories[category]:
-                    lines.append(ExportService._spec_to_md_item(spec))
-
-                lines.append("")
-        else:
-            # No grouping
-            for spec in specifications:
-                lines.append(ExportService._spec_to_md_item(spec))
-                lines.append("")
-
-        return "\n".join(lines)
+            specifications = sorted(specifications, key=_category)
+        return "".join(ExportService.iter_markdown(
+            project_name, specifications, group_by_category
+        ))
 
     @staticmethod
     def _spec_to_md_item(spec: Dict[str, Any]) -> str:
@@ -181,86 +285,93 @@ class ExportService:
         return "- " + "\n  ".join(lines)
 
     @staticmethod
-    def to_yaml(
+    def iter_yaml(
         project_name: str,
         project_id: str,
-        specifications: List[Dict[str, Any]],
+        specifications: Iterable[Dict[str, Any]],
         include_metadata: bool = True
-    ) -> str:
-        """Export specifications as YAML.
+    ) -> Iterator[str]:
+        """Stream specifications as YAML, one specification per chunk.
+
+        Falls back to JSON if PyYAML is not installed.
 
         Args:
             project_name: Project name
             project_id: Project ID
-            specifications: List of specification dictionaries
+            specifications: Iterable of specification dictionaries
             include_metadata: Include project metadata
 
-        Returns:
-            YAML string
-
-        Example:
-            >>> yaml_str = ExportService.to_yaml(
-            ...     "My Project",
-            ...     "proj_123",
-            ...     [{"key": "api_limit", "value": "1000 req/min"}]
-            ... )
+        Yields:
+            YAML text chunks
         """
         try:
             import yaml
         except ImportError:
             logger.warning("PyYAML not installed - using JSON fallback")
-            return ExportService.to_json(
+            yield from ExportService.iter_json(
                 project_name, project_id, specifications, include_metadata
             )
-
-        data = {"specifications": specifications}
+            return
 
         if include_metadata:
-            data = {
-                "project": {
-                    "name": project_name,
-                    "id": project_id,
-                    "exported_at": datetime.now(timezone.utc).isoformat()
-                },
-                **data
-            }
+            metadata = _export_metadata(project_name, project_id)
+            yield yaml.dump({"project": metadata}, default_flow_style=False, sort_keys=False)
 
-        return yaml.dump(data, default_flow_style=False, sort_keys=False)
+        # Block sequence items under a key are not indented, so each item
+        # dumps exactly as it would inside the whole document
+        empty = True
+        for spec in specifications:
+            if empty:
+                yield "specifications:\n"
+                empty = False
+            yield yaml.dump([spec], default_flow_style=False, sort_keys=False)
+
+        if empty:
+            yield "specifications: []\n"
 
     @staticmethod
-    def to_html(
+    def to_yaml(
         project_name: str,
+        project_id: str,
         specifications: List[Dict[str, Any]],
-        include_styles: bool = True
+        include_metadata: bool = True
     ) -> str:
-        """Export specifications as HTML.
+        """Export specifications as YAML.
 
         Args:
             project_name: Project name
+            project_id: Project ID
             specifications: List of specification dictionaries
-            include_styles: Include CSS styles
+            include_metadata: Include project metadata
 
         Returns:
-            HTML string
+            YAML string
 
         Example:
-            >>> html_str = ExportService.to_html(
+            >>> yaml_str = ExportService.to_yaml(
             ...     "My Project",
-            ...     [{"key": "api_limit", "value": "1000 req/min", "priority": "high"}]
+            ...     "proj_123",
+            ...     [{"key": "api_limit", "value": "1000 req/min"}]
             ... )
         """
-        # Build specification rows
-        spec_rows = ""
-        for spec in specifications:
-            priority = spec.get("priority", "medium").upper()
-            priority_color = {
-                "CRITICAL": "#d9534f",
-                "HIGH": "#f0ad4e",
-                "MEDIUM": "#5bc0de",
-                "LOW": "#5cb85c"
-            }.get(priority, "#5bc0de")
-
-            spec_rows += f"""
+        return "".join(ExportService.iter_yaml(
+            project_name, project_id, specifications, include_metadata
+        ))
+
+    @staticmethod
+    def _spec_to_html_row(spec: Dict[str, Any]) -> str:
+        """Convert a specification to an HTML table row.
+
+        Args:
+            spec: Specification dictionary
+
+        Returns:
+            HTML <tr> block
+        """
+        priority = spec.get("priority", "medium").upper()
+        priority_color = HTML_PRIORITY_COLORS.get(priority, "#5bc0de")
+
+        return f"""
             <tr>
                 <td><strong>{spec.get('key', 'Unknown')}</strong></td>
                 <td>{spec.get('value', '')}</td>
@@ -269,7 +380,28 @@ class ExportService:
             </tr>
             """
 
-        # Build HTML
+    @staticmethod
+    def iter_html(
+        project_name: str,
+        specifications: Iterable[Dict[str, Any]],
+        include_styles: bool = True,
+        total: Optional[int] = None
+    ) -> Iterator[str]:
+        """Stream specifications as HTML, one table row per chunk.
+
+        Args:
+            project_name: Project name
+            specifications: Iterable of specification dictionaries
+            include_styles: Include CSS styles
+            total: Specification count for the header (default: len(specifications)
+                for sized collections; omitted for other iterables)
+
+        Yields:
+            HTML text chunks
+        """
+        if total is None and hasattr(specifications, "__len__"):
+            total = len(specifications)
+
         html = f"""<!DOCTYPE html>
 <html>
 <head>
@@ -319,13 +451,16 @@ class ExportService:
         }
     </style>"""
 
+        total_line = (
+            f"\n        <p><strong>Total Specifications:</strong> {total}</p>"
+            if total is not None else ""
+        )
         html += f"""
 </head>
 <body>
     <h1>{project_name}</h1>
     <div class="metadata">
-        <p><strong>Exported:</strong> {datetime.now(timezone.utc).isoformat()}</p>
-        <p><strong>Total Specifications:</strong> {len(specifications)}</p>
+        <p><strong>Exported:</strong> {datetime.now(timezone.utc).isoformat()}</p>{total_line}
     </div>
 
     <table>
@@ -338,14 +473,105 @@ class ExportService:
             </tr>
         </thead>
         <tbody>
-            {spec_rows}
+            """
+        yield html
+
+        for spec in specifications:
+            yield ExportService._spec_to_html_row(spec)
+
+        yield """
         </tbody>
     </table>
 </body>
 </html>
 """
 
-        return html
+    @staticmethod
+    def to_html(
+        project_name: str,
+        specifications: List[Dict[str, Any]],
+        include_styles: bool = True
+    ) -> str:
+        """Export specifications as HTML.
+
+        Args:
+            project_name: Project name
+            specifications: List of specification dictionaries
+            include_styles: Include CSS styles
+
+        Returns:
+            HTML string
+
+        Example:
+            >>> html_str = ExportService.to_html(
+            ...     "My Project",
+            ...     [{"key": "api_limit", "value": "1000 req/min", "priority": "high"}]
+            ... )
+        """
+        return "".join(ExportService.iter_html(
+            project_name, specifications, include_styles, total=len(specifications)
+        ))
+
+    @staticmethod
+    def stream(
+        format: str,
+        project_name: str,
+        project_id: str,
+        specifications: Iterable[Dict[str, Any]],
+        **kwargs
+    ) -> Iterator[str]:
+        """Stream specifications in specified format.
+
+        Nothing is buffered beyond the current specification, so memory
+        does not grow with the number of specifications.
+
+        Args:
+            format: Export format (json, csv, markdown, yaml, html)
+            project_name: Project name
+            project_id: Project ID
+            specifications: Iterable of specification dictionaries
+                (ordered by category for grouped markdown)
+            **kwargs: Format-specific options (as for export; html also takes total)
+
+        Returns:
+            Iterator of text chunks
+
+        Raises:
+            ValueError: If format is not supported
+        """
+        format_lower = format.lower()
+
+        if format_lower == "json":
+            return ExportService.iter_json(
+                project_name, project_id, specifications,
+                kwargs.get("include_metadata", True)
+            )
+        elif format_lower == "csv":
+            return ExportService.iter_csv(
+                specifications,
+                kwargs.get("fieldnames")
+            )
+        elif format_lower in ["markdown", "md"]:
+            return ExportService.iter_markdown(
+                project_name, specifications,
+                kwargs.get("group_by_category", True)
+            )
+        elif format_lower == "yaml":
+            return ExportService.iter_yaml(
+                project_name, project_id, specifications,
+                kwargs.get("include_metadata", True)
+            )
+        elif format_lower == "html":
+            return ExportService.iter_html(
+                project_name, specifications,
+                kwargs.get("include_styles", True),
+                kwargs.get("total")
+            )
+        else:
+            raise ValueError(
+                f"Unsupported export format: {format}. "
+                f"Supported formats: json, csv, markdown, yaml, html"
+            )
 
     @staticmethod
     def export(
@@ -410,3 +636,132 @@ class ExportService:
                 f"Unsupported export format: {format}. "
                 f"Supported formats: json, csv, markdown, yaml, html"
             )
+
+
+def gzip_chunks(chunks: Iterable[str], level: int = 6) -> Iterator[bytes]:
+    """Gzip a stream of text chunks on the fly.
+
+    Only the compressor's window is kept in memory; compressed bytes are
+    yielded as soon as zlib emits them.
+
+    Args:
+        chunks: Text chunks (UTF-8 encoded before compression)
+        level: zlib compression level (1-9)
+
+    Yields:
+        gzip-formatted bytes
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS | 16)  # gzip header/trailer
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode("utf-8"))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def iter_project_specifications(
+    db,
+    project_id: Any,
+    batch_size: int = DEFAULT_STREAM_BATCH_SIZE,
+    include_timestamps: bool = True
+) -> Iterator[Dict[str, Any]]:
+    """Stream a project's current specifications as export dicts.
+
+    Selects columns rather than ORM objects (nothing accumulates in the
+    session's identity map) and fetches them `batch_size` rows at a time
+    through a server-side cursor where the driver supports one. Rows are
+    ordered by category and key, as grouped markdown requires.
+
+    Args:
+        db: Specs database session (must stay open while iterating)
+        project_id: Project ID
+        batch_size: Rows fetched per round trip
+        include_timestamps: Include created_at/updated_at
+
+    Yields:
+        Specification dictionaries
+    """
+    from sqlalchemy import select
+
+    from ..models.specification import Specification
+
+    columns = [
+        Specification.category,
+        Specification.key,
+        Specification.value,
+        Specification.content,
+        Specification.source,
+        Specification.confidence,
+    ]
+    if include_timestamps:
+        columns += [Specification.created_at, Specification.updated_at]
+
+    statement = select(*columns).where(
+        Specification.project_id == project_id,
+        Specification.is_current.is_(True)
+    ).order_by(
+        Specification.category,
+        Specification.key
+    ).execution_options(yield_per=batch_size)
+
+    for row in db.execute(statement):
+        spec = {
+            "category": row.category,
+            "key": row.key,
+            "value": row.value,
+            "content": row.content,
+            "source": row.source,
+            "confidence": float(row.confidence) if row.confidence else None,
+        }
+        if include_timestamps:
+            spec["created_at"] = row.created_at.isoformat() if row.created_at else None
+            spec["updated_at"] = row.updated_at.isoformat() if row.updated_at else None
+        yield spec
+
+
+def stream_project_export(
+    format: str,
+    project_name: str,
+    project_id: Any,
+    compress: bool = False,
+    batch_size: Optional[int] = None,
+    **kwargs
+) -> Iterator[Any]:
+    """Stream a project's export for a StreamingResponse.
+
+    Opens its own specs session for the duration of the stream (the
+    response body is produced after the endpoint has returned) and closes
+    it when the stream ends or the client disconnects.
+
+    Args:
+        format: Export format (json, csv, markdown, yaml, html)
+        project_name: Project name
+        project_id: Project ID (ownership already checked by the caller)
+        compress: Gzip the output
+        batch_size: Rows fetched per round trip (default: EXPORT_STREAM_BATCH_SIZE)
+        **kwargs: Format-specific options (see ExportService.stream)
+
+    Returns:
+        Iterator of text chunks, or of gzip bytes if compress is set
+
+    Raises:
+        ValueError: If format is not supported (before any query runs)
+    """
+    from ..core import database
+    from ..core.config import settings
+
+    # Validate eagerly so an unsupported format fails before the response starts
+    ExportService.stream(format, project_name, str(project_id), [], **kwargs)
+    batch_size = batch_size or settings.EXPORT_STREAM_BATCH_SIZE
+
+    def body() -> Iterator[str]:
+        db = database.SessionLocalSpecs()
+        try:
+            specifications = iter_project_specifications(db, project_id, batch_size)
+            yield from ExportService.stream(
+                format, project_name, str(project_id), specifications, **kwargs
+            )
+        finally:
+            db.close()
+
+    return gzip_chunks(body()) if compress else body()
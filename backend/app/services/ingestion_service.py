@@ -0,0 +1,488 @@
+"""Background document ingestion.
+
+POST /documents/upload spools the file to disk, records an IngestionJob
+and returns immediately. Worker tasks on the application event loop then
+stream the document through:
+
+    parse (page/paragraph/block) -> chunk (TextChunker, streaming)
+    -> embed (batched)
+    -> bulk insert (executemany) -> vector index update
+
+Only one batch of chunks (INGESTION_BATCH_CHUNKS) and one parsed segment
+are held in memory at a time, so peak memory does not grow with document
+size. Parsing and database work run in worker threads so the event loop
+keeps serving requests.
+"""
+import asyncio
+import logging
+import os
+import tempfile
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+from itertools import islice
+from typing import Callable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = 2
+DEFAULT_BATCH_CHUNKS = 256
+DEFAULT_MAX_UPLOAD_BYTES = 100 * 1024 * 1024
+DEFAULT_MAX_CONTENT_CHARS = 1_000_000
+DEFAULT_STALE_JOB_SECONDS = 1800
+_SPOOL_BLOCK_BYTES = 1024 * 1024
+
+
+class IngestionError(Exception):
+    """Raised when a document cannot be ingested."""
+    pass
+
+
+class UploadTooLargeError(IngestionError):
+    """Raised when an upload exceeds the configured size limit."""
+    pass
+
+
+class _ContentPreview:
+    """Pass-through segment iterator that keeps the first max_chars characters."""
+
+    def __init__(self, segments: Iterator[str], max_chars: int):
+        self._segments = segments
+        self._max_chars = max_chars
+        self._parts: List[str] = []
+        self._size = 0
+
+    def __iter__(self):
+        for segment in self._segments:
+            if self._size < self._max_chars:
+                part = segment[:self._max_chars - self._size]
+                self._parts.append(part)
+                self._size += len(part)
+            yield segment
+
+    @property
+    def text(self) -> str:
+        return "".join(self._parts)
+
+
+def _take(iterator: Iterator[str], count: int) -> List[str]:
+    return list(islice(iterator, count))
+
+
+class IngestionQueue:
+    """
+    In-process queue of document ingestion jobs.
+
+    Job state lives in the ingestion_jobs table, so any worker can answer
+    status requests; the queue itself is per process.
+    """
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable] = None,
+        workers: int = DEFAULT_WORKERS,
+        batch_chunks: int = DEFAULT_BATCH_CHUNKS,
+        spool_dir: Optional[str] = None,
+        max_upload_bytes: int = DEFAULT_MAX_UPLOAD_BYTES,
+        max_content_chars: int = DEFAULT_MAX_CONTENT_CHARS,
+        stale_job_seconds: int = DEFAULT_STALE_JOB_SECONDS,
+    ):
+        """
+        Args:
+            session_factory: Callable returning a specs DB session (default SessionLocalSpecs)
+            workers: Concurrent ingestion jobs per process
+            batch_chunks: Chunks embedded and inserted per batch
+            spool_dir: Directory for uploaded files awaiting processing (default: system temp)
+            max_upload_bytes: Uploads larger than this are rejected
+            max_content_chars: Extracted text kept on KnowledgeBaseDocument.content
+            stale_job_seconds: Processing jobs not updated for this long are marked failed by fail_stale_jobs
+        """
+        self._session_factory = session_factory
+        self.workers = max(1, workers)
+        self.batch_chunks = max(1, batch_chunks)
+        self.spool_dir = spool_dir
+        self.max_upload_bytes = max_upload_bytes
+        self.max_content_chars = max_content_chars
+        self.stale_job_seconds = stale_job_seconds
+        self._started_at = datetime.now(timezone.utc)
+        self._queue: Optional[asyncio.Queue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._tasks: List[asyncio.Task] = []
+
+    def _session(self):
+        if self._session_factory is None:
+            from ..core.database import SessionLocalSpecs
+
+            self._session_factory = SessionLocalSpecs
+        return self._session_factory()
+
+    # ----- submission -----
+
+    async def spool(self, upload) -> Tuple[str, int]:
+        """
+        Copy an UploadFile to a spool file in fixed-size blocks.
+
+        Returns:
+            (path, size in bytes)
+
+        Raises:
+            UploadTooLargeError: If the upload exceeds max_upload_bytes
+        """
+        if self.spool_dir:
+            os.makedirs(self.spool_dir, exist_ok=True)
+        fd, path = tempfile.mkstemp(prefix="upload_", suffix=".part", dir=self.spool_dir)
+        size = 0
+        try:
+            with os.fdopen(fd, "wb") as f:
+                while True:
+                    block = await upload.read(_SPOOL_BLOCK_BYTES)
+                    if not block:
+                        break
+                    size += len(block)
+                    if self.max_upload_bytes and size > self.max_upload_bytes:
+                        raise UploadTooLargeError(
+                            f"File exceeds the {self.max_upload_bytes // (1024 * 1024)} MB upload limit"
+                        )
+                    await asyncio.to_thread(f.write, block)
+        except BaseException:
+            os.remove(path)
+            raise
+        return path, size
+
+    def create_job(self, db, project_id: str, user_id, filename: str, file_size: int):
+        """Record a queued ingestion job."""
+        from ..models.ingestion_job import IngestionJob
+
+        job = IngestionJob(
+            project_id=project_id,
+            user_id=user_id,
+            filename=filename,
+            file_size=file_size,
+            status="queued",
+        )
+        db.add(job)
+        db.commit()
+        return job
+
+    async def submit(self, job_id, path: str, filename: str, content_type: str) -> None:
+        """Queue a spooled file for processing by the background workers."""
+        self._ensure_started()
+        await self._queue.put((str(job_id), path, filename, content_type))
+
+    # ----- workers -----
+
+    def _ensure_started(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._queue is not None and self._loop is loop:
+            return
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        self._tasks = [asyncio.ensure_future(self._worker()) for _ in range(self.workers)]
+        logger.info(f"Started {self.workers} ingestion workers")
+
+    async def _worker(self) -> None:
+        while True:
+            job_id, path, filename, content_type = await self._queue.get()
+            try:
+                await self.process(job_id, path, filename, content_type)
+            except Exception as e:
+                logger.error(f"Ingestion job {job_id} crashed: {e}", exc_info=True)
+            finally:
+                self._queue.task_done()
+
+    async def join(self) -> None:
+        """Wait until every queued job has been processed."""
+        if self._queue is not None:
+            await self._queue.join()
+
+    async def stop(self) -> None:
+        """Cancel worker tasks (their jobs are marked failed by a later fail_stale_jobs)."""
+        for task in self._tasks:
+            task.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+        self._loop = None
+
+    def fail_stale_jobs(self) -> int:
+        """
+        Mark jobs that can no longer finish as failed.
+
+        Jobs are lost when their process restarts. A processing job bumps
+        updated_at on every batch, so one older than stale_job_seconds is
+        orphaned. A queued job is not touched until a worker claims it, so
+        it only counts as orphaned when it was queued before this process
+        started (and is equally old); jobs waiting in a long backlog are
+        left alone. Runs at application startup and periodically from the
+        fail_stale_ingestion_jobs background job.
+        """
+        from sqlalchemy import and_, or_
+
+        from ..models.ingestion_job import IngestionJob
+
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=self.stale_job_seconds)
+        # created_at may only have second precision (SQLite CURRENT_TIMESTAMP)
+        queued_before = self._started_at - timedelta(seconds=1)
+        try:
+            db = self._session()
+            try:
+                count = db.query(IngestionJob).filter(
+                    IngestionJob.updated_at < cutoff,
+                    or_(
+                        IngestionJob.status == "processing",
+                        and_(IngestionJob.status == "queued", IngestionJob.created_at < queued_before),
+                    )
+                ).update({
+                    "status": "failed",
+                    "error": "Interrupted before completion; please upload again",
+                    "completed_at": datetime.now(timezone.utc),
+                }, synchronize_session=False)
+                db.commit()
+            finally:
+                db.close()
+        except Exception as e:
+            logger.warning(f"Could not check for stale ingestion jobs: {e}")
+            return 0
+        if count:
+            logger.warning(f"Marked {count} stale ingestion jobs as failed")
+        return count
+
+    # ----- processing -----
+
+    def _start_job(self, job_id: str, filename: str, content_type: str):
+        from ..models.ingestion_job import IngestionJob
+        from ..models.knowledge_base_document import KnowledgeBaseDocument
+        from ..models.project import Project
+        from .text_chunker import ChunkingConfig, default_chunking_config
+
+        db = self._session()
+        try:
+            # Claim the job; fail_stale_jobs may have failed it while it waited
+            claimed = db.query(IngestionJob).filter(
+                IngestionJob.id == uuid.UUID(job_id),
+                IngestionJob.status == "queued"
+            ).update({
+                "status": "processing",
+                "started_at": datetime.now(timezone.utc),
+            }, synchronize_session=False)
+            job = db.query(IngestionJob).filter(IngestionJob.id == uuid.UUID(job_id)).first()
+            if job is None:
+                raise IngestionError(f"Ingestion job {job_id} not found")
+            if not claimed:
+                db.rollback()
+                logger.warning(f"Skipping ingestion job {job_id}: status is {job.status}, not queued")
+                return None
+
+            doc = KnowledgeBaseDocument(
+                project_id=job.project_id,
+                user_id=job.user_id,
+                filename=filename,
+                file_size=job.file_size,
+                content_type=content_type or "application/octet-stream",
+            )
+            db.add(doc)
+            db.flush()
+            job.document_id = doc.id
+            db.commit()
+
+            overrides = db.query(Project.chunking_config).filter(Project.id == job.project_id).scalar()
+            try:
+                config = ChunkingConfig.from_dict(overrides, base=default_chunking_config())
+            except ValueError as e:
+                logger.warning(f"Ignoring invalid chunking config for project {job.project_id}: {e}")
+                config = default_chunking_config()
+            return str(job.project_id), doc.id, config
+        finally:
+            db.close()
+
+    def _insert_chunks(
+        self,
+        job_id: str,
+        document_id,
+        first_index: int,
+        chunks: List[str],
+        embeddings: List[Optional[List[float]]],
+    ) -> None:
+        from sqlalchemy import insert
+
+        from ..models.document_chunk import DocumentChunk
+        from ..models.ingestion_job import IngestionJob
+
+        rows = [
+            {
+                "id": str(uuid.uuid4()),
+                "document_id": document_id,
+                "chunk_index": first_index + offset,
+                "content": chunk,
+                "embedding_vector": embedding,
+            }
+            for offset, (chunk, embedding) in enumerate(zip(chunks, embeddings))
+        ]
+        embedded = sum(1 for embedding in embeddings if embedding is not None)
+
+        db = self._session()
+        try:
+            # Core executemany; SQLAlchemy batches it into multi-row INSERTs on PostgreSQL
+            db.execute(insert(DocumentChunk), rows)
+            db.query(IngestionJob).filter(IngestionJob.id == uuid.UUID(job_id)).update({
+                "chunks_processed": IngestionJob.chunks_processed + len(rows),
+                "chunks_embedded": IngestionJob.chunks_embedded + embedded,
+                "updated_at": datetime.now(timezone.utc),
+            }, synchronize_session=False)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _finish_job(self, job_id: str, document_id, project_id: str, content: str, embedding_status: str) -> None:
+        from ..models.ingestion_job import IngestionJob
+        from ..models.knowledge_base_document import KnowledgeBaseDocument
+        from .vector_index import get_vector_index_manager
+
+        db = self._session()
+        try:
+            db.query(KnowledgeBaseDocument).filter(
+                KnowledgeBaseDocument.id == document_id
+            ).update({"content": content}, synchronize_session=False)
+            db.query(IngestionJob).filter(IngestionJob.id == uuid.UUID(job_id)).update({
+                "status": "completed",
+                "embedding_status": embedding_status,
+                "completed_at": datetime.now(timezone.utc),
+            }, synchronize_session=False)
+            db.commit()
+
+            # Keep the in-process vector index in sync (rebuilt lazily if this fails)
+            try:
+                get_vector_index_manager().add_document_from_db(project_id, str(document_id), db)
+            except Exception as e:
+                logger.error(f"Vector index update failed for project {project_id}: {e}")
+                get_vector_index_manager().invalidate(project_id)
+        finally:
+            db.close()
+
+    def _fail_job(self, job_id: str, document_id, error: str) -> None:
+        from ..models.document_chunk import DocumentChunk
+        from ..models.ingestion_job import IngestionJob
+        from ..models.knowledge_base_document import KnowledgeBaseDocument
+
+        db = self._session()
+        try:
+            if document_id is not None:
+                # Remove the partial document so a retry starts clean
+                db.query(DocumentChunk).filter(
+                    DocumentChunk.document_id == document_id
+                ).delete(synchronize_session=False)
+                db.query(KnowledgeBaseDocument).filter(
+                    KnowledgeBaseDocument.id == document_id
+                ).delete(synchronize_session=False)
+            db.query(IngestionJob).filter(IngestionJob.id == uuid.UUID(job_id)).update({
+                "status": "failed",
+                "document_id": None,
+                "error": error[:2000],
+                "completed_at": datetime.now(timezone.utc),
+            }, synchronize_session=False)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Could not record failure of ingestion job {job_id}: {e}")
+        finally:
+            db.close()
+
+    async def process(self, job_id: str, path: str, filename: str, content_type: str = "") -> None:
+        """
+        Run one ingestion job to completion.
+
+        Failures are recorded on the job (and the partial document removed)
+        rather than raised. The spool file is always deleted.
+        """
+        from .document_parser import DocumentParser
+        from .embedding_service import EmbeddingService
+        from .text_chunker import TextChunker
+
+        job_id = str(job_id)
+        document_id = None
+        try:
+            started = await asyncio.to_thread(self._start_job, job_id, filename, content_type)
+            if started is None:
+                return
+            project_id, document_id, chunking = started
+
+            preview = _ContentPreview(DocumentParser.iter_segments(filename, path), self.max_content_chars)
+            chunks_iter = TextChunker(chunking).iter_chunks(preview)
+
+            total = 0
+            embedded = 0
+            while True:
+                # Parsing is CPU-bound (pdfplumber); keep it off the event loop
+                batch = await asyncio.to_thread(_take, chunks_iter, self.batch_chunks)
+                if not batch:
+                    break
+
+                try:
+                    embeddings = await EmbeddingService.embed_chunks(batch)
+                except Exception as e:
+                    logger.error(f"Embedding failed for ingestion job {job_id}: {e}")
+                    embeddings = [None] * len(batch)
+
+                await asyncio.to_thread(self._insert_chunks, job_id, document_id, total, batch, embeddings)
+                total += len(batch)
+                embedded += sum(1 for embedding in embeddings if embedding is not None)
+
+            if total == 0:
+                raise IngestionError("No text extracted from document")
+
+            if embedded == total:
+                embedding_status = "completed"
+            elif embedded:
+                embedding_status = "partial"
+            else:
+                embedding_status = "failed"
+
+            await asyncio.to_thread(
+                self._finish_job, job_id, document_id, project_id, preview.text, embedding_status
+            )
+            logger.info(
+                f"Ingested {filename} for project {project_id}: "
+                f"{total} chunks ({embedded} embedded)"
+            )
+
+        except Exception as e:
+            logger.error(f"Ingestion job {job_id} failed: {e}")
+            message = str(e) if isinstance(e, (IngestionError, ValueError)) else f"Processing error: {e}"
+            await asyncio.to_thread(self._fail_job, job_id, document_id, message)
+
+        finally:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+_queue: Optional[IngestionQueue] = None
+_queue_lock = threading.Lock()
+
+
+def get_ingestion_queue() -> IngestionQueue:
+    """Get the process-wide IngestionQueue (configured from settings)."""
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                options = {}
+                try:
+                    from ..core.config import settings
+
+                    options = {
+                        "workers": settings.INGESTION_WORKERS,
+                        "batch_chunks": settings.INGESTION_BATCH_CHUNKS,
+                        "spool_dir": settings.INGESTION_SPOOL_DIR,
+                        "max_upload_bytes": settings.INGESTION_MAX_UPLOAD_BYTES,
+                    }
+                except Exception:
+                    # Library usage without a configured environment
+                    pass
+                _queue = IngestionQueue(**options)
+    return _queue
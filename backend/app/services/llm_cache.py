@@ -0,0 +1,229 @@
+"""Response cache for deterministic LLM calls.
+
+Call sites opt in per request (messages.create(..., cache=True)); the LLM
+gateway then looks the request up by (model, hash of the normalised
+prompt, generation parameters) before calling the provider:
+
+- memory tier: a dedicated bounded InMemoryCacheEngine (LRU + TTL)
+- shared tier (optional, LLM_CACHE_BACKEND): SQLiteCacheEngine (one host,
+  survives restarts) or RedisCacheEngine (all workers)
+
+Hits on the shared tier are promoted to the memory tier. Cache hits are
+recorded in llm_usage_tracking as zero-cost rows (cached = true).
+
+For debugging, a request can skip the cache with the X-LLM-Cache header
+(see LLMCacheMiddleware) or in code with llm_cache_mode():
+- bypass: neither read nor write the cache
+- refresh: call the provider and overwrite the cached response
+"""
+import contextvars
+import hashlib
+import json
+import logging
+import re
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+from .cache_service import CacheEngine, InMemoryCacheEngine, RedisCacheEngine, SQLiteCacheEngine
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL_SECONDS = 24 * 3600
+DEFAULT_MAX_ENTRIES = 2000
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+
+CACHE_MODES = ("use", "refresh", "bypass")
+KEY_PREFIX = "llm:"
+
+# Request fields that are not generation parameters (excluded from the key)
+_NON_KEY_FIELDS = {"model", "system", "messages", "metadata", "stream"}
+
+_cache_mode: contextvars.ContextVar[str] = contextvars.ContextVar("llm_cache_mode", default="use")
+
+
+def current_cache_mode() -> str:
+    """Cache mode of the current request/context (use | refresh | bypass)."""
+    return _cache_mode.get()
+
+
+@contextmanager
+def llm_cache_mode(mode: str) -> Iterator[None]:
+    """
+    Run a block with a different cache mode.
+
+    Usage:
+        with llm_cache_mode("bypass"):
+            agent.process_request(...)
+    """
+    if mode not in CACHE_MODES:
+        raise ValueError(f"Unknown LLM cache mode: {mode}")
+    token = _cache_mode.set(mode)
+    try:
+        yield
+    finally:
+        _cache_mode.reset(token)
+
+
+def set_cache_mode(mode: str) -> contextvars.Token:
+    """Set the cache mode for the current context (returns a reset token)."""
+    if mode not in CACHE_MODES:
+        raise ValueError(f"Unknown LLM cache mode: {mode}")
+    return _cache_mode.set(mode)
+
+
+def reset_cache_mode(token: contextvars.Token) -> None:
+    """Restore the cache mode saved by set_cache_mode()."""
+    _cache_mode.reset(token)
+
+
+def _normalize_text(text: str) -> str:
+    # Layout-only differences (CRLF, trailing spaces, indentation runs) do
+    # not change the answer; case and punctuation do
+    text = text.replace("\r\n", "\n").replace("\r", "\n")
+    lines = [re.sub(r"[ \t]+", " ", line).strip() for line in text.split("\n")]
+    return re.sub(r"\n{3,}", "\n\n", "\n".join(lines)).strip()
+
+
+def _normalize_content(content: Any) -> Any:
+    if isinstance(content, str):
+        return _normalize_text(content)
+    if isinstance(content, list):
+        return [_normalize_content(item) for item in content]
+    if isinstance(content, dict):
+        return {key: _normalize_content(value) if key == "text" else value for key, value in content.items()}
+    return content
+
+
+def cache_key(request: Dict[str, Any]) -> str:
+    """
+    Cache key for a Messages API request.
+
+    Format: "llm:<model>:<sha256 of normalised system + messages + params>"
+    """
+    document = {
+        "system": _normalize_content(request.get("system") or ""),
+        "messages": [
+            {"role": message.get("role"), "content": _normalize_content(message.get("content"))}
+            for message in request.get("messages", [])
+        ],
+        "params": {key: value for key, value in request.items() if key not in _NON_KEY_FIELDS},
+    }
+    digest = hashlib.sha256(
+        json.dumps(document, sort_keys=True, separators=(",", ":"), default=str).encode("utf-8")
+    ).hexdigest()
+    return f"{KEY_PREFIX}{request.get('model', '')}:{digest}"
+
+
+class LLMResponseCache:
+    """Two-tier cache of LLM responses (dicts of LLMResult fields)."""
+
+    def __init__(self, memory: Optional[CacheEngine] = None, shared: Optional[CacheEngine] = None,
+                 ttl_seconds: float = DEFAULT_TTL_SECONDS):
+        """
+        Args:
+            memory: In-process tier (default: bounded InMemoryCacheEngine)
+            shared: Optional SQLite/Redis tier
+            ttl_seconds: Default time-to-live of cached responses
+        """
+        self.memory = memory or InMemoryCacheEngine(
+            max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES
+        )
+        self.shared = shared
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'memory_hits': 0, 'shared_hits': 0, 'misses': 0, 'stores': 0,
+                       'bypassed': 0, 'saved_tokens': 0}
+
+    def _record(self, **counts: int) -> None:
+        with self._lock:
+            for name, value in counts.items():
+                self._stats[name] += value
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Cached response for key, or None."""
+        found, value = self.memory.get(key)
+        if found:
+            self._record(hits=1, memory_hits=1,
+                         saved_tokens=value.get('tokens_input', 0) + value.get('tokens_output', 0))
+            return value
+        if self.shared is not None:
+            try:
+                found, value = self.shared.get(key)
+            except Exception as e:
+                logger.warning(f"LLM cache shared tier read failed: {e}")
+                found = False
+            if found:
+                self.memory.set(key, value, self.ttl_seconds)
+                self._record(hits=1, shared_hits=1,
+                             saved_tokens=value.get('tokens_input', 0) + value.get('tokens_output', 0))
+                return value
+        self._record(misses=1)
+        return None
+
+    def set(self, key: str, value: Dict[str, Any], ttl_seconds: Optional[float] = None) -> None:
+        """Store a response in both tiers."""
+        ttl = ttl_seconds if ttl_seconds is not None else self.ttl_seconds
+        self.memory.set(key, value, ttl)
+        if self.shared is not None:
+            try:
+                self.shared.set(key, value, ttl)
+            except Exception as e:
+                logger.warning(f"LLM cache shared tier write failed: {e}")
+        self._record(stores=1)
+
+    def record_bypass(self) -> None:
+        self._record(bypassed=1)
+
+    def clear(self) -> None:
+        """Drop all cached responses."""
+        self.memory.clear_prefix(KEY_PREFIX)
+        if self.shared is not None:
+            self.shared.clear_prefix(KEY_PREFIX)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_ratio'] = round(stats['hits'] / lookups, 4) if lookups else 0.0
+        stats['memory_entries'] = self.memory.stats().get('total_entries', 0)
+        stats['shared_backend'] = self.shared.name if self.shared is not None else None
+        return stats
+
+    def close(self) -> None:
+        self.memory.close()
+        if self.shared is not None:
+            self.shared.close()
+
+
+def create_llm_cache() -> Optional[LLMResponseCache]:
+    """
+    Build the response cache from settings (None if LLM_CACHE_ENABLED is off).
+
+    An unavailable shared tier is logged and skipped.
+    """
+    from ..core.config import settings
+
+    if not settings.LLM_CACHE_ENABLED:
+        return None
+
+    memory = InMemoryCacheEngine(
+        max_entries=settings.LLM_CACHE_MAX_ENTRIES,
+        max_bytes=settings.LLM_CACHE_MAX_BYTES,
+    )
+    shared = None
+    backend = (settings.LLM_CACHE_BACKEND or "memory").lower()
+    try:
+        if backend == "sqlite":
+            shared = SQLiteCacheEngine(settings.LLM_CACHE_SQLITE_PATH, max_entries=settings.LLM_CACHE_SHARED_MAX_ENTRIES)
+        elif backend == "redis":
+            if not settings.CACHE_REDIS_URL:
+                logger.warning("LLM_CACHE_BACKEND=redis but CACHE_REDIS_URL is not set; using memory tier only")
+            else:
+                shared = RedisCacheEngine(settings.CACHE_REDIS_URL, namespace="socrates:llm-cache:")
+    except ImportError:
+        logger.warning("redis package not installed; LLM cache uses memory tier only")
+    except Exception as e:
+        logger.error(f"LLM cache shared tier unavailable ({e}); using memory tier only")
+
+    return LLMResponseCache(memory, shared, ttl_seconds=settings.LLM_CACHE_TTL_SECONDS)
@@ -0,0 +1,1026 @@
+"""Provider-agnostic LLM gateway.
+
+Every Claude/OpenAI request made by agents and NLUService goes through one
+LLMGateway per worker process, which provides:
+
+- one pooled async HTTP client per provider, owned by a dedicated event
+  loop thread (sync agents block on a future; async callers await it)
+- a semaphore per provider bounding requests in flight
+- retries of transient errors (rate limits, overload, timeouts, 5xx) with
+  full-jitter exponential backoff, all inside one per-call deadline
+- a circuit breaker per provider that fails fast after repeated failures
+- token usage and cost written to llm_usage_tracking off the request path,
+  in batches through the process-wide UsageWriter (usage_writer.py)
+- an opt-in response cache for deterministic calls (see llm_cache.py);
+  identical cached requests in flight share one provider call
+
+Callers keep the Messages API shape: ServiceContainer.get_claude_client()
+returns gateway.client(), whose messages.create()/messages.stream() accept
+the usual Anthropic arguments plus an optional usage_context
+({'user_id', 'project_id', 'session_id'}) for usage attribution and
+cache=True (optionally cache_ttl=<seconds>) to use the response cache.
+
+Providers are pluggable:
+- AnthropicProvider: AsyncAnthropic on a pooled httpx client
+- OpenAIProvider: AsyncOpenAI chat completions (openai>=1.0, optional)
+- FakeLLMProvider: canned local responses with simulated latency and
+  failures, for tests and load testing (scripts/benchmark_llm_gateway.py)
+"""
+import asyncio
+import logging
+import queue
+import random
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional
+
+from .embedding_cache import estimate_tokens
+from .llm_cache import LLMResponseCache, cache_key, create_llm_cache, current_cache_mode
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL = "claude-sonnet-4-5-20250929"
+DEFAULT_MAX_CONCURRENCY = 8
+DEFAULT_MAX_CONNECTIONS = 20
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_TIMEOUT_SECONDS = 120.0
+DEFAULT_DRAIN_SECONDS = 10.0
+
+# USD per 1K tokens (input, output), matched by model name prefix
+MODEL_PRICES = {
+    'claude-opus': (0.015, 0.075),
+    'claude-sonnet': (0.003, 0.015),
+    'claude-haiku': (0.001, 0.005),
+    'gpt-4o-mini': (0.00015, 0.0006),
+    'gpt-4o': (0.0025, 0.01),
+    'gpt-4-turbo': (0.01, 0.03),
+    'fake': (0.0, 0.0),
+}
+
+# Provider used for a model name prefix; other models use the default provider
+MODEL_PROVIDERS = {'claude': 'anthropic', 'gpt': 'openai', 'o1': 'openai', 'o3': 'openai', 'fake': 'fake'}
+
+
+class LLMGatewayError(Exception):
+    """Base class for errors raised by the gateway itself."""
+
+
+class LLMUnavailableError(LLMGatewayError):
+    """The provider's circuit breaker is open."""
+
+
+class LLMDeadlineExceededError(LLMGatewayError):
+    """The call (including retries) ran past its deadline."""
+
+
+def estimate_cost(model: str, tokens_input: int, tokens_output: int) -> Optional[Decimal]:
+    """Cost in USD from MODEL_PRICES (None for unknown models)."""
+    for prefix, (input_price, output_price) in MODEL_PRICES.items():
+        if model.startswith(prefix):
+            cost = (tokens_input * input_price + tokens_output * output_price) / 1000
+            return Decimal(str(round(cost, 6)))
+    return None
+
+
+@dataclass
+class LLMResult:
+    """Provider-neutral completion result."""
+    text: str
+    model: str
+    provider: str = ""
+    tokens_input: int = 0
+    tokens_output: int = 0
+    stop_reason: Optional[str] = None
+    latency_ms: int = 0
+    attempts: int = 1
+    deltas: int = 0  # Streamed deltas already handed to the caller
+    cached: bool = False  # Served from the response cache (no provider call)
+
+
+@dataclass
+class TextBlock:
+    """Messages API content block."""
+    text: str
+    type: str = "text"
+
+
+@dataclass
+class Usage:
+    """Messages API usage block."""
+    input_tokens: int
+    output_tokens: int
+
+
+@dataclass
+class GatewayMessage:
+    """Messages API response shape returned by GatewayClient.messages.create()."""
+    content: List[TextBlock]
+    model: str
+    usage: Usage
+    stop_reason: Optional[str] = None
+    role: str = "assistant"
+
+    @classmethod
+    def from_result(cls, result: LLMResult) -> "GatewayMessage":
+        return cls(
+            content=[TextBlock(result.text)],
+            model=result.model,
+            usage=Usage(result.tokens_input, result.tokens_output),
+            stop_reason=result.stop_reason,
+        )
+
+
+class LLMProvider:
+    """Interface for completion backends (Messages API request dicts)."""
+
+    name: str = ""
+
+    async def create(self, request: Dict[str, Any]) -> LLMResult:
+        """Run one completion request."""
+        raise NotImplementedError
+
+    async def stream(self, request: Dict[str, Any], result: LLMResult) -> AsyncIterator[str]:
+        """
+        Yield text deltas of one completion, filling `result` once done.
+
+        The default streams the whole create() response as one delta.
+        """
+        completed = await self.create(request)
+        result.text, result.model = completed.text, completed.model
+        result.tokens_input, result.tokens_output = completed.tokens_input, completed.tokens_output
+        result.stop_reason = completed.stop_reason
+        yield completed.text
+
+    def is_retryable(self, error: Exception) -> bool:
+        """Whether the error is transient (retried and counted by the breaker)."""
+        return isinstance(error, (asyncio.TimeoutError, ConnectionError))
+
+    async def aclose(self) -> None:
+        """Close pooled connections."""
+
+
+class AnthropicProvider(LLMProvider):
+    """Anthropic Messages API on one pooled async HTTP client."""
+
+    name = "anthropic"
+
+    def __init__(self, api_key: str, max_connections: int = DEFAULT_MAX_CONNECTIONS,
+                 timeout_seconds: float = DEFAULT_TIMEOUT_SECONDS):
+        self._api_key = api_key
+        self.max_connections = max_connections
+        self.timeout_seconds = timeout_seconds
+        self._client = None
+
+    def _async_client(self):
+        if self._client is None:
+            import anthropic
+            import httpx
+
+            http_client = anthropic.DefaultAsyncHttpxClient(
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                )
+            )
+            # Retries are the gateway's job (shared deadline and breaker)
+            self._client = anthropic.AsyncAnthropic(
+                api_key=self._api_key,
+                http_client=http_client,
+                max_retries=0,
+                timeout=self.timeout_seconds,
+            )
+        return self._client
+
+    async def create(self, request: Dict[str, Any]) -> LLMResult:
+        response = await self._async_client().messages.create(**request)
+        return LLMResult(
+            text="".join(block.text for block in response.content if getattr(block, "type", "text") == "text"),
+            model=response.model,
+            tokens_input=response.usage.input_tokens,
+            tokens_output=response.usage.output_tokens,
+            stop_reason=response.stop_reason,
+        )
+
+    async def stream(self, request: Dict[str, Any], result: LLMResult) -> AsyncIterator[str]:
+        async with self._async_client().messages.stream(**request) as stream:
+            async for text in stream.text_stream:
+                if text:
+                    result.text += text
+                    yield text
+            final = await stream.get_final_message()
+        result.model = final.model
+        result.tokens_input = final.usage.input_tokens
+        result.tokens_output = final.usage.output_tokens
+        result.stop_reason = final.stop_reason
+
+    def is_retryable(self, error: Exception) -> bool:
+        import anthropic
+
+        if isinstance(error, (anthropic.APIConnectionError, anthropic.RateLimitError, anthropic.InternalServerError)):
+            return True
+        if isinstance(error, anthropic.APIStatusError):
+            return error.status_code in (408, 409, 429) or error.status_code >= 500
+        return super().is_retryable(error)
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+
+
+class OpenAIProvider(LLMProvider):
+    """OpenAI chat completions (requires openai>=1.0)."""
+
+    name = "openai"
+
+    def __init__(self, api_key: Optional[str] = None, max_connections: int = DEFAULT_MAX_CONNECTIONS,
+                 timeout_seconds: float = DEFAULT_TIMEOUT_SECONDS):
+        self._api_key = api_key
+        self.max_connections = max_connections
+        self.timeout_seconds = timeout_seconds
+        self._client = None
+
+    def _async_client(self):
+        if self._client is None:
+            import httpx
+            import openai
+
+            self._client = openai.AsyncOpenAI(
+                api_key=self._api_key,
+                http_client=httpx.AsyncClient(limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                )),
+                max_retries=0,
+                timeout=self.timeout_seconds,
+            )
+        return self._client
+
+    @staticmethod
+    def _chat_request(request: Dict[str, Any]) -> Dict[str, Any]:
+        messages = list(request.get("messages", []))
+        if request.get("system"):
+            messages.insert(0, {"role": "system", "content": request["system"]})
+        chat = {"model": request["model"], "messages": messages, "max_tokens": request.get("max_tokens")}
+        if "temperature" in request:
+            chat["temperature"] = request["temperature"]
+        return chat
+
+    async def create(self, request: Dict[str, Any]) -> LLMResult:
+        response = await self._async_client().chat.completions.create(**self._chat_request(request))
+        choice = response.choices[0]
+        return LLMResult(
+            text=choice.message.content or "",
+            model=response.model,
+            tokens_input=response.usage.prompt_tokens if response.usage else 0,
+            tokens_output=response.usage.completion_tokens if response.usage else 0,
+            stop_reason=choice.finish_reason,
+        )
+
+    def is_retryable(self, error: Exception) -> bool:
+        import openai
+
+        if isinstance(error, (openai.APIConnectionError, openai.RateLimitError, openai.InternalServerError)):
+            return True
+        return super().is_retryable(error)
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+
+
+class FakeLLMProvider(LLMProvider):
+    """
+    Local provider for tests and load testing.
+
+    Responds with `response` (or response(request) if callable) after
+    latency_seconds; streamed responses arrive word by word, the first after
+    latency_seconds and the rest every delta_interval_seconds. A fraction
+    failure_rate of calls raises a retryable ConnectionError.
+    """
+
+    name = "fake"
+
+    def __init__(
+        self,
+        response: Any = "OK",
+        latency_seconds: float = 0.0,
+        delta_interval_seconds: float = 0.0,
+        failure_rate: float = 0.0,
+        seed: Optional[int] = None,
+    ):
+        self.response = response
+        self.latency_seconds = latency_seconds
+        self.delta_interval_seconds = delta_interval_seconds
+        self.failure_rate = failure_rate
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._random = random.Random(seed)
+
+    def _text(self, request: Dict[str, Any]) -> str:
+        return self.response(request) if callable(self.response) else str(self.response)
+
+    def _usage(self, request: Dict[str, Any], text: str) -> Dict[str, int]:
+        prompt = " ".join(str(message.get("content", "")) for message in request.get("messages", []))
+        return {'tokens_input': estimate_tokens(prompt), 'tokens_output': estimate_tokens(text)}
+
+    async def _begin(self) -> None:
+        self.requests += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if self.latency_seconds:
+                await asyncio.sleep(self.latency_seconds)
+            if self.failure_rate and self._random.random() < self.failure_rate:
+                raise ConnectionError("Simulated provider failure")
+        except BaseException:
+            self.in_flight -= 1
+            raise
+
+    async def create(self, request: Dict[str, Any]) -> LLMResult:
+        await self._begin()
+        try:
+            text = self._text(request)
+            return LLMResult(text=text, model=request.get("model", "fake"), stop_reason="end_turn",
+                             **self._usage(request, text))
+        finally:
+            self.in_flight -= 1
+
+    async def stream(self, request: Dict[str, Any], result: LLMResult) -> AsyncIterator[str]:
+        await self._begin()
+        try:
+            text = self._text(request)
+            for index, word in enumerate(text.split(" ")):
+                if index and self.delta_interval_seconds:
+                    await asyncio.sleep(self.delta_interval_seconds)
+                delta = word if index == 0 else " " + word
+                result.text += delta
+                yield delta
+            result.model = request.get("model", "fake")
+            result.stop_reason = "end_turn"
+            usage = self._usage(request, text)
+            result.tokens_input, result.tokens_output = usage['tokens_input'], usage['tokens_output']
+        finally:
+            self.in_flight -= 1
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    closed -> open after failure_threshold failures in a row; open rejects
+    calls for reset_seconds, then half_open lets one trial call through,
+    whose outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_running = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            return "half_open" if self._clock() - self._opened_at >= self.reset_seconds else "open"
+
+    def allow(self) -> bool:
+        """Whether a call may proceed (claims the half-open trial slot)."""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._clock() - self._opened_at < self.reset_seconds or self._trial_running:
+                return False
+            self._trial_running = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_running = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._trial_running or self._failures >= self.failure_threshold:
+                self._opened_at = self._clock()
+            self._trial_running = False
+
+
+def _as_uuid(value: Any) -> Optional[uuid.UUID]:
+    if value is None or isinstance(value, uuid.UUID):
+        return value
+    try:
+        return uuid.UUID(str(value))
+    except ValueError:
+        return None
+
+
+def record_usage_rows(rows: List[Dict[str, Any]]) -> None:
+    """
+    Insert usage rows into llm_usage_tracking (specs database).
+
+    The per-user daily rollups (llm_usage_daily) are updated in the same
+    transaction. Rows without a timestamp are stamped with the current time.
+    """
+    from ..core.database import SessionLocalSpecs
+    from ..models.llm_usage_daily import apply_usage_rollups
+    from ..models.llm_usage_tracking import LLMUsageTracking
+
+    now = datetime.now(timezone.utc)
+    rows = [row if row.get('timestamp') else {**row, 'timestamp': now} for row in rows]
+    session = SessionLocalSpecs()
+    try:
+        session.bulk_insert_mappings(LLMUsageTracking, rows)
+        apply_usage_rollups(session.connection(), rows)
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+
+class LLMGateway:
+    """Pooled, rate-limited, retrying access to LLM providers."""
+
+    def __init__(
+        self,
+        providers: Dict[str, LLMProvider],
+        default_provider: Optional[str] = None,
+        default_model: str = DEFAULT_MODEL,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        timeout_seconds: float = DEFAULT_TIMEOUT_SECONDS,
+        backoff_base_seconds: float = 0.5,
+        backoff_max_seconds: float = 20.0,
+        circuit_failure_threshold: int = 5,
+        circuit_reset_seconds: float = 30.0,
+        usage_sink: Optional[Callable[[List[Dict[str, Any]]], None]] = record_usage_rows,
+        response_cache: Optional[LLMResponseCache] = None,
+    ):
+        """
+        Args:
+            providers: Provider name -> backend
+            default_provider: Provider for models without a known prefix
+                (default: the first provider)
+            default_model: Model used when a request does not name one
+            max_concurrency: Requests in flight per provider
+            max_retries: Retries of transient errors after the first attempt
+            timeout_seconds: Default deadline per call, including retries
+            backoff_base_seconds: First retry delay cap (doubles each retry)
+            backoff_max_seconds: Upper bound of a single retry delay cap
+            circuit_failure_threshold: Consecutive failures that open a circuit
+            circuit_reset_seconds: How long an open circuit rejects calls
+            usage_sink: Receives usage rows for llm_usage_tracking (None disables)
+            response_cache: Cache for calls made with cache=True (None disables)
+        """
+        if not providers:
+            raise ValueError("At least one LLM provider is required")
+        self.providers = dict(providers)
+        self.default_provider = default_provider or next(iter(self.providers))
+        self.default_model = default_model
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_retries = max_retries
+        self.timeout_seconds = timeout_seconds
+        self.backoff_base_seconds = backoff_base_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self.usage_sink = usage_sink
+        self.response_cache = response_cache
+        self.breakers = {
+            name: CircuitBreaker(circuit_failure_threshold, circuit_reset_seconds) for name in self.providers
+        }
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._cache_flights: Dict[str, asyncio.Future] = {}
+        self._stats_lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    # ----- event loop thread -----
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        if self._loop is None:
+            with self._start_lock:
+                if self._loop is None:
+                    loop = asyncio.new_event_loop()
+                    ready = threading.Event()
+
+                    def run() -> None:
+                        asyncio.set_event_loop(loop)
+                        loop.call_soon(ready.set)
+                        loop.run_forever()
+
+                    self._thread = threading.Thread(target=run, name="llm-gateway", daemon=True)
+                    self._thread.start()
+                    ready.wait()
+                    self._loop = loop
+        return self._loop
+
+    def _on_loop(self) -> bool:
+        try:
+            return asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            return False
+
+    def _submit(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self._ensure_loop())
+
+    def close(self, drain_seconds: float = DEFAULT_DRAIN_SECONDS) -> None:
+        """
+        Stop the gateway: let in-flight calls finish (up to drain_seconds),
+        flush usage writes, close provider connection pools and stop the
+        loop thread.
+        """
+        if self._loop is None:
+            return
+        if self._on_loop():
+            raise RuntimeError("LLMGateway.close() cannot be called from the gateway loop")
+
+        async def drain() -> None:
+            # Every task on this loop is a call in flight
+            pending = asyncio.all_tasks() - {asyncio.current_task()}
+            if pending:
+                logger.info(f"Waiting for {len(pending)} LLM calls in flight")
+                await asyncio.wait(pending, timeout=drain_seconds)
+
+        async def close_providers() -> None:
+            for provider in self.providers.values():
+                try:
+                    await provider.aclose()
+                except Exception as e:
+                    logger.warning(f"Failed to close LLM provider {provider.name}: {e}")
+
+        self._submit(drain()).result(timeout=drain_seconds + 5)
+        self._submit(close_providers()).result(timeout=10)
+        # Let queued usage writes finish before the loop goes away
+        self._submit(self._loop.shutdown_default_executor()).result(timeout=10)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=10)
+        self._loop.close()
+        self._loop = None
+        self._thread = None
+        self._semaphores.clear()
+        self._cache_flights.clear()
+        if self.response_cache is not None:
+            self.response_cache.close()
+
+    # ----- bookkeeping -----
+
+    def _record(self, provider: str, **counts: int) -> None:
+        with self._stats_lock:
+            stats = self._stats.setdefault(provider, {
+                'calls': 0, 'succeeded': 0, 'failed': 0, 'retries': 0, 'rejected': 0,
+                'in_flight': 0, 'tokens_input': 0, 'tokens_output': 0, 'cache_hits': 0,
+            })
+            for name, value in counts.items():
+                stats[name] += value
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-provider call counters, token totals and circuit state."""
+        with self._stats_lock:
+            stats = {name: dict(values) for name, values in self._stats.items()}
+        for name, breaker in self.breakers.items():
+            stats.setdefault(name, {})['circuit'] = breaker.state
+        return stats
+
+    def _semaphore(self, provider: str) -> asyncio.Semaphore:
+        # Only touched on the gateway loop, so no lock is needed
+        semaphore = self._semaphores.get(provider)
+        if semaphore is None:
+            semaphore = self._semaphores[provider] = asyncio.Semaphore(self.max_concurrency)
+        return semaphore
+
+    def resolve(self, request: Dict[str, Any], provider: Optional[str] = None) -> str:
+        """Fill in the default model and pick the provider for a request."""
+        request.setdefault("model", self.default_model)
+        if provider is None:
+            for prefix, name in MODEL_PROVIDERS.items():
+                if request["model"].startswith(prefix) and name in self.providers:
+                    provider = name
+                    break
+        provider = provider or self.default_provider
+        if provider not in self.providers:
+            raise ValueError(f"Unknown LLM provider: {provider}")
+        return provider
+
+    def _backoff(self, attempt: int) -> float:
+        # Full jitter: spreads retries of concurrent callers apart
+        return random.uniform(0, min(self.backoff_max_seconds, self.backoff_base_seconds * (2 ** attempt)))
+
+    def _record_usage(self, result: LLMResult, usage_context: Optional[Dict[str, Any]]) -> None:
+        if self.usage_sink is None or not usage_context or not usage_context.get('user_id'):
+            return
+        row = {
+            'user_id': _as_uuid(usage_context['user_id']),
+            'project_id': _as_uuid(usage_context.get('project_id')),
+            'session_id': _as_uuid(usage_context.get('session_id')),
+            'provider': result.provider,
+            'model': result.model,
+            'tokens_input': result.tokens_input,
+            'tokens_output': result.tokens_output,
+            'tokens_total': result.tokens_input + result.tokens_output,
+            'cost_usd': estimate_cost(result.model, result.tokens_input, result.tokens_output),
+            'latency_ms': result.latency_ms,
+            'cached': False,
+            'timestamp': datetime.now(timezone.utc),
+        }
+        if result.cached:
+            # Nothing was billed for a cache hit
+            row.update(tokens_input=0, tokens_output=0, tokens_total=0, cost_usd=Decimal("0"), cached=True)
+
+        def write() -> None:
+            try:
+                self.usage_sink([row])
+            except Exception as e:
+                logger.warning(f"Failed to record LLM usage: {e}")
+
+        # Off the request path: the caller does not wait for the insert
+        asyncio.get_running_loop().run_in_executor(None, write)
+
+    # ----- calls (run on the gateway loop) -----
+
+    async def _call(self, provider_name: str, request: Dict[str, Any], timeout: Optional[float],
+                    usage_context: Optional[Dict[str, Any]], attempt_call) -> LLMResult:
+        """Run attempt_call(provider, result) with breaker, semaphore, retries and deadline."""
+        provider = self.providers[provider_name]
+        breaker = self.breakers[provider_name]
+        deadline = time.monotonic() + (timeout if timeout is not None else self.timeout_seconds)
+        started = time.perf_counter()
+        self._record(provider_name, calls=1)
+
+        attempt = 0
+        while True:
+            if not breaker.allow():
+                self._record(provider_name, rejected=1)
+                raise LLMUnavailableError(f"LLM provider {provider_name} is unavailable (circuit open)")
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self._record(provider_name, failed=1)
+                raise LLMDeadlineExceededError(f"LLM call to {provider_name} exceeded its deadline")
+
+            result = LLMResult(text="", model=request["model"], provider=provider_name)
+
+            async def guarded() -> None:
+                async with self._semaphore(provider_name):
+                    self._record(provider_name, in_flight=1)
+                    try:
+                        await attempt_call(provider, result)
+                    finally:
+                        self._record(provider_name, in_flight=-1)
+
+            try:
+                # Waiting for a semaphore slot counts against the deadline too
+                await asyncio.wait_for(guarded(), timeout=remaining)
+            except Exception as e:
+                retryable = provider.is_retryable(e)
+                if retryable:
+                    breaker.record_failure()
+                else:
+                    # The provider answered (bad request, auth): not an outage
+                    breaker.record_success()
+                if isinstance(e, asyncio.TimeoutError) and time.monotonic() >= deadline:
+                    self._record(provider_name, failed=1)
+                    raise LLMDeadlineExceededError(f"LLM call to {provider_name} exceeded its deadline") from e
+                delay = self._backoff(attempt)
+                if not retryable or attempt >= self.max_retries or time.monotonic() + delay >= deadline \
+                        or result.deltas:
+                    self._record(provider_name, failed=1)
+                    logger.error(f"LLM call to {provider_name} failed after {attempt + 1} attempts: {e}")
+                    raise
+                attempt += 1
+                self._record(provider_name, retries=1)
+                logger.warning(f"LLM call to {provider_name} failed ({e}); retrying in {delay:.2f}s")
+                await asyncio.sleep(delay)
+                continue
+
+            breaker.record_success()
+            result.provider = provider_name
+            result.attempts = attempt + 1
+            result.latency_ms = int((time.perf_counter() - started) * 1000)
+            self._record(provider_name, succeeded=1, tokens_input=result.tokens_input,
+                         tokens_output=result.tokens_output)
+            self._record_usage(result, usage_context)
+            return result
+
+    async def _complete(self, provider_name: str, request: Dict[str, Any], timeout: Optional[float],
+                        usage_context: Optional[Dict[str, Any]]) -> LLMResult:
+        async def attempt(provider: LLMProvider, result: LLMResult) -> None:
+            completed = await provider.create(request)
+            result.text, result.model = completed.text, completed.model
+            result.tokens_input, result.tokens_output = completed.tokens_input, completed.tokens_output
+            result.stop_reason = completed.stop_reason
+
+        return await self._call(provider_name, request, timeout, usage_context, attempt)
+
+    def _cache_hit(self, provider_name: str, cached: Dict[str, Any], started: float,
+                   usage_context: Optional[Dict[str, Any]]) -> LLMResult:
+        result = LLMResult(
+            text=cached['text'],
+            model=cached['model'],
+            provider=provider_name,
+            tokens_input=cached.get('tokens_input', 0),
+            tokens_output=cached.get('tokens_output', 0),
+            stop_reason=cached.get('stop_reason'),
+            latency_ms=int((time.perf_counter() - started) * 1000),
+            attempts=0,
+            cached=True,
+        )
+        self._record(provider_name, calls=1, succeeded=1, cache_hits=1)
+        self._record_usage(result, usage_context)
+        return result
+
+    async def _complete_cached(self, provider_name: str, request: Dict[str, Any], timeout: Optional[float],
+                               usage_context: Optional[Dict[str, Any]], cache_mode: str,
+                               cache_ttl: Optional[float]) -> LLMResult:
+        """_complete() through the response cache (cache_mode: use | refresh | bypass)."""
+        if cache_mode == "bypass":
+            self.response_cache.record_bypass()
+            return await self._complete(provider_name, request, timeout, usage_context)
+
+        loop = asyncio.get_running_loop()
+        key = cache_key(request)
+        started = time.perf_counter()
+        if cache_mode == "use":
+            # The shared tier may be SQLite or Redis: keep its I/O off the loop
+            cached = await loop.run_in_executor(None, self.response_cache.get, key)
+            if cached is not None:
+                return self._cache_hit(provider_name, cached, started, usage_context)
+            flight = self._cache_flights.get(key)
+            if flight is not None:
+                # Same request already in flight: share its response
+                completed = await asyncio.shield(flight)
+                return self._cache_hit(provider_name, vars(completed), started, usage_context)
+
+        flight = loop.create_future()
+        self._cache_flights[key] = flight
+        try:
+            result = await self._complete(provider_name, request, timeout, usage_context)
+        except BaseException as e:
+            if not isinstance(e, asyncio.CancelledError):
+                flight.set_exception(e)
+                flight.exception()  # Followers re-raise it; do not log it as unretrieved
+            else:
+                flight.cancel()
+            raise
+        finally:
+            if self._cache_flights.get(key) is flight:
+                del self._cache_flights[key]
+
+        flight.set_result(result)
+        payload = {
+            'text': result.text, 'model': result.model, 'tokens_input': result.tokens_input,
+            'tokens_output': result.tokens_output, 'stop_reason': result.stop_reason,
+        }
+        await loop.run_in_executor(None, self.response_cache.set, key, payload, cache_ttl)
+        return result
+
+    def _completion(self, provider_name: str, request: Dict[str, Any], timeout: Optional[float],
+                    usage_context: Optional[Dict[str, Any]], cache: bool, cache_ttl: Optional[float]):
+        """Coroutine for one completion; reads the cache mode in the caller's context."""
+        if cache and self.response_cache is not None:
+            return self._complete_cached(
+                provider_name, request, timeout, usage_context, current_cache_mode(), cache_ttl
+            )
+        return self._complete(provider_name, request, timeout, usage_context)
+
+    async def _stream_into(self, provider_name: str, request: Dict[str, Any], timeout: Optional[float],
+                           usage_context: Optional[Dict[str, Any]], on_delta: Callable[[str], None]) -> LLMResult:
+        async def attempt(provider: LLMProvider, result: LLMResult) -> None:
+            async for delta in provider.stream(request, result):
+                # Deltas already shown to the caller cannot be retried
+                result.deltas += 1
+                on_delta(delta)
+
+        return await self._call(provider_name, request, timeout, usage_context, attempt)
+
+    # ----- public API -----
+
+    def complete(self, provider: Optional[str] = None, timeout: Optional[float] = None,
+                 usage_context: Optional[Dict[str, Any]] = None, cache: bool = False,
+                 cache_ttl: Optional[float] = None, **request) -> LLMResult:
+        """
+        Run a completion from synchronous code (blocks the calling thread).
+
+        Args:
+            provider: Provider name (default: chosen from the model name)
+            timeout: Deadline in seconds including retries (default timeout_seconds)
+            usage_context: {'user_id', 'project_id', 'session_id'} for usage rows
+            cache: Serve identical earlier requests from the response cache
+                (only for calls whose answer may be reused)
+            cache_ttl: Seconds to keep this response (default LLM_CACHE_TTL_SECONDS)
+            **request: Messages API arguments (model, max_tokens, messages, system, ...)
+
+        Raises:
+            LLMUnavailableError: Circuit open for the provider
+            LLMDeadlineExceededError: Deadline reached
+            Exception: The provider's error for non-retryable or exhausted calls
+        """
+        if self._on_loop():
+            raise RuntimeError("Use acomplete() on the gateway event loop")
+        provider_name = self.resolve(request, provider)
+        return self._submit(
+            self._completion(provider_name, request, timeout, usage_context, cache, cache_ttl)
+        ).result()
+
+    async def acomplete(self, provider: Optional[str] = None, timeout: Optional[float] = None,
+                        usage_context: Optional[Dict[str, Any]] = None, cache: bool = False,
+                        cache_ttl: Optional[float] = None, **request) -> LLMResult:
+        """Async variant of complete(); safe to await from any event loop."""
+        provider_name = self.resolve(request, provider)
+        coroutine = self._completion(provider_name, request, timeout, usage_context, cache, cache_ttl)
+        if self._on_loop():
+            return await coroutine
+        return await asyncio.wrap_future(self._submit(coroutine))
+
+    def stream(self, provider: Optional[str] = None, timeout: Optional[float] = None,
+               usage_context: Optional[Dict[str, Any]] = None, **request) -> Iterator[str]:
+        """
+        Stream a completion's text deltas into synchronous code.
+
+        Transient errors before the first delta are retried; closing the
+        iterator early cancels the provider request.
+        """
+        if self._on_loop():
+            raise RuntimeError("LLMGateway.stream() cannot be used on the gateway event loop")
+        provider_name = self.resolve(request, provider)
+        deltas: "queue.Queue" = queue.Queue()
+        done = object()
+
+        async def pump() -> None:
+            try:
+                await self._stream_into(provider_name, request, timeout, usage_context, deltas.put)
+            except Exception as e:
+                deltas.put(e)
+            finally:
+                deltas.put(done)
+
+        future = self._submit(pump())
+        try:
+            while True:
+                item = deltas.get()
+                if item is done:
+                    break
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            future.cancel()
+
+    def client(self, usage_context: Optional[Dict[str, Any]] = None) -> "GatewayClient":
+        """Anthropic-compatible client object backed by this gateway."""
+        return GatewayClient(self, usage_context)
+
+
+class _GatewayStream:
+    """messages.stream() context manager (exposes text_stream)."""
+
+    def __init__(self, deltas: Iterator[str]):
+        self._deltas = deltas
+
+    def __enter__(self) -> "_GatewayStream":
+        return self
+
+    def __exit__(self, *exc) -> bool:
+        self._deltas.close()
+        return False
+
+    @property
+    def text_stream(self) -> Iterator[str]:
+        return self._deltas
+
+
+class _GatewayMessages:
+    def __init__(self, gateway: LLMGateway, usage_context: Optional[Dict[str, Any]]):
+        self._gateway = gateway
+        self._usage_context = usage_context
+
+    def create(self, usage_context: Optional[Dict[str, Any]] = None, **kwargs) -> GatewayMessage:
+        result = self._gateway.complete(usage_context=usage_context or self._usage_context, **kwargs)
+        return GatewayMessage.from_result(result)
+
+    def stream(self, usage_context: Optional[Dict[str, Any]] = None, cache: bool = False,
+               cache_ttl: Optional[float] = None, **kwargs) -> _GatewayStream:
+        # Streams are never cached: the point is to show fresh text as it arrives
+        return _GatewayStream(self._gateway.stream(usage_context=usage_context or self._usage_context, **kwargs))
+
+
+class GatewayClient:
+    """
+    Drop-in for the sync Anthropic client's messages API.
+
+    Usage:
+        client = get_llm_gateway().client()
+        response = client.messages.create(model=..., max_tokens=500, messages=[...],
+                                          usage_context={'user_id': user_id})
+        response.content[0].text
+    """
+
+    def __init__(self, gateway: LLMGateway, usage_context: Optional[Dict[str, Any]] = None):
+        self.gateway = gateway
+        self.messages = _GatewayMessages(gateway, usage_context)
+
+
+def create_llm_gateway() -> LLMGateway:
+    """
+    Build a gateway from settings.
+
+    Raises:
+        ValueError: If ANTHROPIC_API_KEY is not set (anthropic provider)
+    """
+    from ..core.config import settings
+    from .usage_writer import get_usage_writer
+
+    provider_name = settings.LLM_PROVIDER.lower()
+    options = {
+        'max_connections': settings.LLM_MAX_CONNECTIONS,
+        'timeout_seconds': settings.LLM_TIMEOUT_SECONDS,
+    }
+    providers: Dict[str, LLMProvider] = {}
+    if provider_name == "fake":
+        providers['fake'] = FakeLLMProvider()
+    else:
+        if not settings.ANTHROPIC_API_KEY:
+            raise ValueError(
+                "ANTHROPIC_API_KEY not set in environment. "
+                "Please add it to your .env file."
+            )
+        providers['anthropic'] = AnthropicProvider(settings.ANTHROPIC_API_KEY, **options)
+        if settings.OPENAI_API_KEY:
+            providers['openai'] = OpenAIProvider(settings.OPENAI_API_KEY, **options)
+        if provider_name not in providers:
+            raise ValueError(f"Unknown or unconfigured LLM provider: {provider_name}")
+
+    return LLMGateway(
+        providers,
+        default_provider=provider_name,
+        default_model=settings.LLM_DEFAULT_MODEL,
+        max_concurrency=settings.LLM_MAX_CONCURRENCY,
+        max_retries=settings.LLM_MAX_RETRIES,
+        timeout_seconds=settings.LLM_TIMEOUT_SECONDS,
+        circuit_failure_threshold=settings.LLM_CIRCUIT_FAILURES,
+        circuit_reset_seconds=settings.LLM_CIRCUIT_RESET_SECONDS,
+        usage_sink=get_usage_writer().add_many if settings.LLM_RECORD_USAGE else None,
+        response_cache=create_llm_cache(),
+    )
+
+
+_gateway: Optional[LLMGateway] = None
+_gateway_lock = threading.Lock()
+
+
+def get_llm_gateway() -> LLMGateway:
+    """Get the process-wide LLMGateway (configured from settings)."""
+    global _gateway
+    if _gateway is None:
+        with _gateway_lock:
+            if _gateway is None:
+                _gateway = create_llm_gateway()
+    return _gateway
+
+
+def get_llm_gateway_stats() -> Dict[str, Any]:
+    """Stats of the process-wide gateway ({} if it has not been created)."""
+    gateway = _gateway
+    return gateway.get_stats() if gateway is not None else {}
+
+
+def get_llm_cache_stats() -> Dict[str, Any]:
+    """Response cache stats of the process-wide gateway ({} if none)."""
+    gateway = _gateway
+    if gateway is None or gateway.response_cache is None:
+        return {}
+    return gateway.response_cache.get_stats()
+
+
+def close_llm_gateway() -> None:
+    """Close the process-wide gateway, if it was created (application shutdown)."""
+    global _gateway
+    with _gateway_lock:
+        gateway, _gateway = _gateway, None
+    if gateway is not None:
+        gateway.close()
+
+
+def configure_llm_gateway(gateway: Optional[LLMGateway]) -> None:
+    """Replace the process-wide gateway (None = rebuild from settings on next use)."""
+    global _gateway
+    with _gateway_lock:
+        previous, _gateway = _gateway, gateway
+    if previous is not None and previous is not gateway:
+        previous.close()
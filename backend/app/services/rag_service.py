@@ -3,11 +3,15 @@
 Enhances specification extraction by retrieving relevant document context
 and providing it to Claude for more accurate results.
 """
+import asyncio
+import json
 import logging
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 from sqlalchemy.orm import Session
 
+from .llm_gateway import GatewayClient
+
 logger = logging.getLogger(__name__)
 
 
@@ -161,6 +165,16 @@ Answer: {answer}
 
         return prompt
 
+    @staticmethod
+    def _parse_spec_list(response_text: str) -> List[Dict]:
+        """Parse the JSON array of specifications (tolerates ```json fences)."""
+        text = response_text.strip()
+        if text.startswith("```"):
+            text = text.split("\n", 1)[1] if "\n" in text else ""
+            text = text.rsplit("```", 1)[0]
+        specs = json.loads(text)
+        return [spec for spec in specs if isinstance(spec, dict)] if isinstance(specs, list) else []
+
     @staticmethod
     async def extract_specs_with_rag(
         question: str,
@@ -168,7 +182,8 @@ Answer: {answer}
         project_id: str,
         spec_type: str,
         db: Session = None,
-        claude_client = None
+        claude_client = None,
+        user_id: Optional[str] = None
     ) -> Dict[str, any]:
         """Extract specifications with RAG augmentation.
 
@@ -180,7 +195,8 @@ Answer: {answer}
             project_id: Project ID for context search
             spec_type: Type of spec to extract (functional, non-functional, etc)
             db: Database session
-            claude_client: Anthropic Claude client
+            claude_client: Claude client (default: the LLM gateway client)
+            user_id: User the extraction's LLM usage is recorded against
 
         Returns:
             Dictionary with extracted specifications and context:
@@ -225,15 +241,23 @@ Return a JSON array of specifications with:
 If no specifications can be extracted, return an empty array [].
 """
 
-            # Call Claude for extraction
-            # (This assumes the orchestrator has a method for this)
-            specs = []  # Placeholder - would call Claude here
+            # Call Claude for extraction. Through the gateway, reruns over the
+            # same question, answer and retrieved context are served from the
+            # LLM cache; a plain Anthropic client rejects those arguments.
+            specs = []
             try:
-                response = orchestrator.extract_specifications(
-                    text=extraction_prompt,
-                    spec_type=spec_type
-                )
-                specs = response.get("specifications", [])
+                services = orchestrator.services
+                client = claude_client or services.get_claude_client()
+                request = {
+                    "model": services.get_default_model(),
+                    "max_tokens": 2000,
+                    "messages": [{"role": "user", "content": extraction_prompt}],
+                }
+                if isinstance(client, GatewayClient):
+                    request["usage_context"] = {"user_id": user_id, "project_id": project_id}
+                    request["cache"] = True
+                response = await asyncio.to_thread(client.messages.create, **request)
+                specs = RAGService._parse_spec_list(response.content[0].text)
             except Exception as e:
                 logger.warning(f"Spec extraction failed: {e}")
                 specs = []
@@ -306,7 +330,8 @@ If no specifications can be extracted, return an empty array [].
         project_id: str,
         spec_type: str,
         db: Session = None,
-        claude_client = None
+        claude_client = None,
+        user_id: Optional[str] = None
     ) -> Dict[str, any]:
         """Synchronous version of extract_specs_with_rag.
 
@@ -317,6 +342,7 @@ If no specifications can be extracted, return an empty array [].
             spec_type: Spec type
             db: Database session
             claude_client: Claude client
+            user_id: User the extraction's LLM usage is recorded against
 
         Returns:
             Extracted specs with context
@@ -331,6 +357,6 @@ If no specifications can be extracted, return an empty array [].
 
         return loop.run_until_complete(
             RAGService.extract_specs_with_rag(
-                question, answer, project_id, spec_type, db, claude_client
+                question, answer, project_id, spec_type, db, claude_client, user_id
             )
         )
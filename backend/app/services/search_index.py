@@ -0,0 +1,407 @@
+"""Full-text search over projects, specifications and questions.
+
+Ranking, filtering and pagination all happen in the database, so a
+search request costs roughly one page of rows rather than every match.
+
+Backends (chosen by the session's dialect):
+- PostgreSQL: weighted to_tsvector() expressions backed by GIN expression
+  indexes (migration 021), matched with to_tsquery() and ranked with
+  ts_rank(). The index is maintained by PostgreSQL on every write.
+- SQLite: an FTS5 index (search_documents + search_documents_fts) kept
+  in sync by triggers on the source tables, ranked with bm25(). Created
+  and backfilled on first use.
+- Anything else (or SQLite without FTS5): ILIKE matching, still paginated
+  in SQL, with a constant relevance score.
+
+Titles (project names, categories) weigh more than body text. Query
+terms are ANDed and prefix-matched, so "auth tok" finds "authentication
+tokens".
+"""
+import logging
+import re
+import threading
+import uuid
+import weakref
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import (
+    String,
+    and_,
+    bindparam,
+    cast,
+    func,
+    literal,
+    literal_column,
+    or_,
+    select,
+    text,
+    union_all,
+)
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# resource_type query parameter -> stored resource type
+RESOURCE_TYPES = {"projects": "project", "specifications": "specification", "questions": "question"}
+COUNT_KEYS = {value: key for key, value in RESOURCE_TYPES.items()}
+
+MAX_QUERY_TERMS = 16
+PREVIEW_CHARS = 200
+TITLE_CHARS = 100
+
+# Must stay identical to the GIN index expressions in migration 021,
+# otherwise PostgreSQL cannot use the indexes
+PROJECT_VECTOR_SQL = (
+    "setweight(to_tsvector('english', coalesce(projects.name, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(projects.description, '')), 'B')"
+)
+SPECIFICATION_VECTOR_SQL = (
+    "setweight(to_tsvector('english', coalesce(specifications.category, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(specifications.content, '')), 'B')"
+)
+QUESTION_VECTOR_SQL = (
+    "setweight(to_tsvector('english', coalesce(questions.category, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(questions.text, '')), 'B')"
+)
+
+# ----- SQLite FTS5 schema -----
+
+_SQLITE_TABLES = [
+    """
+    CREATE TABLE search_documents (
+        doc_id INTEGER PRIMARY KEY,
+        resource_type TEXT NOT NULL,
+        resource_id TEXT NOT NULL,
+        project_id TEXT,
+        category TEXT,
+        created_at TEXT,
+        title TEXT,
+        body TEXT,
+        UNIQUE (resource_type, resource_id)
+    )
+    """,
+    """
+    CREATE VIRTUAL TABLE search_documents_fts USING fts5(
+        title, body, content='search_documents', content_rowid='doc_id', tokenize='porter unicode61'
+    )
+    """,
+]
+
+# (resource_type, table, category column, title column, body column, project id column)
+_SQLITE_SOURCES = [
+    ("project", "projects", "current_phase", "name", "description", "id"),
+    ("specification", "specifications", "category", "category", "content", "project_id"),
+    ("question", "questions", "category", "category", "text", "project_id"),
+]
+
+
+def _sqlite_backfill() -> List[str]:
+    statements = [
+        f"""
+        INSERT INTO search_documents (resource_type, resource_id, project_id, category, created_at, title, body)
+        SELECT '{kind}', id, {project}, {category}, created_at, {title}, {body} FROM {table}
+        """
+        for kind, table, category, title, body, project in _SQLITE_SOURCES
+    ]
+    statements.append("INSERT INTO search_documents_fts (search_documents_fts) VALUES ('rebuild')")
+    return statements
+
+
+def _sqlite_triggers() -> List[str]:
+    statements = [
+        """
+        CREATE TRIGGER search_documents_ai AFTER INSERT ON search_documents BEGIN
+            INSERT INTO search_documents_fts (rowid, title, body) VALUES (new.doc_id, new.title, new.body);
+        END
+        """,
+        """
+        CREATE TRIGGER search_documents_ad AFTER DELETE ON search_documents BEGIN
+            INSERT INTO search_documents_fts (search_documents_fts, rowid, title, body)
+            VALUES ('delete', old.doc_id, old.title, old.body);
+        END
+        """,
+        """
+        CREATE TRIGGER search_documents_au AFTER UPDATE ON search_documents BEGIN
+            INSERT INTO search_documents_fts (search_documents_fts, rowid, title, body)
+            VALUES ('delete', old.doc_id, old.title, old.body);
+            INSERT INTO search_documents_fts (rowid, title, body) VALUES (new.doc_id, new.title, new.body);
+        END
+        """,
+    ]
+    for kind, table, category, title, body, project in _SQLITE_SOURCES:
+        columns = ", ".join(sorted({category, title, body}))
+        statements += [
+            f"""
+            CREATE TRIGGER {table}_search_ai AFTER INSERT ON {table} BEGIN
+                INSERT INTO search_documents (resource_type, resource_id, project_id, category, created_at, title, body)
+                VALUES ('{kind}', new.id, new.{project}, new.{category}, new.created_at, new.{title}, new.{body});
+            END
+            """,
+            f"""
+            CREATE TRIGGER {table}_search_au AFTER UPDATE OF {columns} ON {table} BEGIN
+                UPDATE search_documents
+                SET category = new.{category}, title = new.{title}, body = new.{body}
+                WHERE resource_type = '{kind}' AND resource_id = old.id;
+            END
+            """,
+            f"""
+            CREATE TRIGGER {table}_search_ad AFTER DELETE ON {table} BEGIN
+                DELETE FROM search_documents WHERE resource_type = '{kind}' AND resource_id = old.id;
+            END
+            """,
+        ]
+    return statements
+
+
+def query_terms(query: str) -> List[str]:
+    """Split a user query into lowercase word terms (punctuation and operators are dropped)."""
+    return re.findall(r"\w+", query.lower())[:MAX_QUERY_TERMS]
+
+
+def _format_result(
+    kind: str,
+    resource_id: Any,
+    project_id: Any,
+    category: Optional[str],
+    title: Optional[str],
+    body: Optional[str],
+    score: float,
+) -> Dict[str, Any]:
+    body = body or ""
+    if kind == "project":
+        display_title = title or ""
+    else:
+        display_title = f"[{category}] {body[:TITLE_CHARS]}"
+    return {
+        "resource_type": kind,
+        "id": str(uuid.UUID(str(resource_id))),
+        "title": display_title,
+        "preview": body[:PREVIEW_CHARS],
+        "category": category,
+        "project_id": str(uuid.UUID(str(project_id))) if project_id is not None else None,
+        "relevance_score": round(float(score), 6),
+    }
+
+
+class SearchIndex:
+    """Dialect-aware full-text search with database-side ranking and pagination."""
+
+    def __init__(self):
+        # SQLite engines whose FTS5 index has been checked (value: available)
+        self._sqlite_ready: "weakref.WeakKeyDictionary[Any, bool]" = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def search(
+        self,
+        db: Session,
+        user_id,
+        query: str,
+        resource_type: Optional[str] = None,
+        category: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 20,
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+        """
+        Search the user's projects, specifications and questions.
+
+        Args:
+            db: Specs database session
+            user_id: Only projects owned by this user (and their contents) are searched
+            query: Free-text query
+            resource_type: Optional filter: projects, specifications or questions
+            category: Optional exact category filter (specifications and questions)
+            skip: Pagination offset
+            limit: Page size
+
+        Returns:
+            (page of result dicts ordered by relevance, match counts keyed
+            projects/specifications/questions)
+        """
+        counts = {key: 0 for key in RESOURCE_TYPES}
+        terms = query_terms(query)
+        kinds = [RESOURCE_TYPES[resource_type]] if resource_type in RESOURCE_TYPES else list(COUNT_KEYS)
+        if resource_type and resource_type not in RESOURCE_TYPES:
+            return [], counts
+
+        dialect = db.get_bind().dialect.name
+        if dialect == "postgresql":
+            if not terms:
+                return [], counts
+            return self._search_union(db, user_id, query, terms, kinds, category, skip, limit, fulltext=True)
+        if dialect == "sqlite" and self._ensure_sqlite(db):
+            if not terms:
+                return [], counts
+            return self._search_sqlite(db, user_id, terms, kinds, category, skip, limit)
+        return self._search_union(db, user_id, query, terms, kinds, category, skip, limit, fulltext=False)
+
+    # ----- PostgreSQL tsvector / ILIKE fallback -----
+
+    def _search_union(self, db, user_id, query, terms, kinds, category, skip, limit, fulltext):
+        from ..models.project import Project
+        from ..models.question import Question
+        from ..models.specification import Specification
+
+        if fulltext:
+            tsquery = func.to_tsquery(
+                literal_column("'english'"),
+                bindparam("tsquery", " & ".join(f"{term}:*" for term in terms), type_=String),
+            )
+
+        def matcher(vector_sql, *columns):
+            if fulltext:
+                vector = literal_column(f"({vector_sql})")
+                return vector.op("@@")(tsquery), func.ts_rank(vector, tsquery)
+            pattern = f"%{query}%"
+            return or_(*(column.ilike(pattern) for column in columns)), literal(1.0)
+
+        selects = []
+        counts_selects = []
+        for kind in kinds:
+            if kind == "project":
+                match, rank = matcher(PROJECT_VECTOR_SQL, Project.name, Project.description)
+                columns = [
+                    Project.id.label("id"),
+                    Project.id.label("project_id"),
+                    Project.current_phase.label("category"),
+                    Project.name.label("title"),
+                    func.substr(Project.description, 1, PREVIEW_CHARS).label("body"),
+                    Project.created_at.label("created_at"),
+                ]
+                where = [Project.user_id == user_id, match]
+                source = Project.__table__
+            else:
+                model = Specification if kind == "specification" else Question
+                body_column = Specification.content if kind == "specification" else Question.text
+                vector_sql = SPECIFICATION_VECTOR_SQL if kind == "specification" else QUESTION_VECTOR_SQL
+                match, rank = matcher(vector_sql, body_column, model.category)
+                columns = [
+                    model.id.label("id"),
+                    model.project_id.label("project_id"),
+                    model.category.label("category"),
+                    model.category.label("title"),
+                    func.substr(body_column, 1, PREVIEW_CHARS).label("body"),
+                    model.created_at.label("created_at"),
+                ]
+                where = [Project.user_id == user_id, match]
+                if category:
+                    where.append(model.category == category)
+                source = model.__table__.join(Project.__table__, model.project_id == Project.id)
+
+            condition = and_(*where)
+            selects.append(
+                select(literal(kind).label("resource_type"), *columns, rank.label("score"))
+                .select_from(source).where(condition)
+            )
+            counts_selects.append(
+                select(literal(kind).label("resource_type"), func.count().label("total"))
+                .select_from(source).where(condition)
+            )
+
+        page = union_all(*selects).subquery("matches")
+        rows = db.execute(
+            select(page)
+            .order_by(page.c.score.desc(), page.c.created_at.desc(), cast(page.c.id, String))
+            .offset(skip)
+            .limit(limit)
+        ).all()
+        counts = {key: 0 for key in RESOURCE_TYPES}
+        for kind, total in db.execute(union_all(*counts_selects)).all():
+            counts[COUNT_KEYS[kind]] = total
+
+        results = [
+            _format_result(row.resource_type, row.id, row.project_id, row.category, row.title, row.body, row.score)
+            for row in rows
+        ]
+        return results, counts
+
+    # ----- SQLite FTS5 -----
+
+    def _ensure_sqlite(self, db: Session) -> bool:
+        """Create and backfill the FTS5 index for this engine if needed."""
+        engine = db.get_bind()
+        ready = self._sqlite_ready.get(engine)
+        if ready is not None:
+            return ready
+
+        with self._lock:
+            ready = self._sqlite_ready.get(engine)
+            if ready is not None:
+                return ready
+            try:
+                with engine.begin() as connection:
+                    exists = connection.exec_driver_sql(
+                        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'search_documents_fts'"
+                    ).first()
+                    if not exists:
+                        for statement in _SQLITE_TABLES + _sqlite_backfill() + _sqlite_triggers():
+                            connection.exec_driver_sql(statement)
+                        logger.info("Created SQLite FTS5 search index")
+                ready = True
+            except Exception as e:
+                logger.warning(f"SQLite FTS5 search index unavailable, falling back to LIKE search: {e}")
+                ready = False
+            self._sqlite_ready[engine] = ready
+            return ready
+
+    def _search_sqlite(self, db, user_id, terms, kinds, category, skip, limit):
+        from ..models.project import Project
+
+        filters = ["search_documents_fts MATCH :match", "p.user_id = :user_id"]
+        params: Dict[str, Any] = {
+            "match": " ".join('"' + term + '"*' for term in terms),
+            "user_id": user_id,
+            "skip": skip,
+            "limit": limit,
+        }
+        if len(kinds) < len(RESOURCE_TYPES):
+            filters.append("d.resource_type = :kind")
+            params["kind"] = kinds[0]
+        if category:
+            filters.append("(d.resource_type = 'project' OR d.category = :category)")
+            params["category"] = category
+
+        source = f"""
+            FROM search_documents_fts
+            JOIN search_documents d ON d.doc_id = search_documents_fts.rowid
+            JOIN projects p ON p.id = d.project_id
+            WHERE {' AND '.join(filters)}
+        """
+        user_id_param = bindparam("user_id", type_=Project.__table__.c.user_id.type)
+
+        page = text(f"""
+            SELECT d.resource_type, d.resource_id, d.project_id, d.category, d.title,
+                   substr(d.body, 1, {PREVIEW_CHARS}) AS body,
+                   -bm25(search_documents_fts, 4.0, 1.0) AS score
+            {source}
+            ORDER BY score DESC, d.created_at DESC, d.doc_id
+            LIMIT :limit OFFSET :skip
+        """).bindparams(user_id_param)
+        totals = text(f"SELECT d.resource_type, count(*) {source} GROUP BY d.resource_type").bindparams(
+            user_id_param
+        )
+
+        count_params = {key: value for key, value in params.items() if key not in ("skip", "limit")}
+        rows = db.execute(page, params).all()
+        counts = {key: 0 for key in RESOURCE_TYPES}
+        for kind, total in db.execute(totals, count_params).all():
+            counts[COUNT_KEYS[kind]] = total
+
+        results = [
+            _format_result(kind, resource_id, project_id, row_category, title, body, score)
+            for kind, resource_id, project_id, row_category, title, body, score in rows
+        ]
+        return results, counts
+
+
+_search_index: Optional[SearchIndex] = None
+_search_index_lock = threading.Lock()
+
+
+def get_search_index() -> SearchIndex:
+    """Get the process-wide SearchIndex."""
+    global _search_index
+    if _search_index is None:
+        with _search_index_lock:
+            if _search_index is None:
+                _search_index = SearchIndex()
+    return _search_index
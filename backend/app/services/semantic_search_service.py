@@ -1,19 +1,30 @@
-"""Semantic search service using pgvector.
+"""Semantic search service for document chunks.
 
-Performs similarity searches across document chunks using
-vector embeddings stored in pgvector PostgreSQL extension.
+Performs similarity searches across document chunks using vector
+embeddings. By default an in-process NumPy index (see vector_index.py) is
+used, since DocumentChunk.embedding_vector is stored as JSON; set
+VECTOR_SEARCH_BACKEND=pgvector to order by the pgvector distance operator
+in PostgreSQL instead.
 """
 import logging
-from typing import Dict, List
+from typing import Dict, List, Optional
 
-from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 logger = logging.getLogger(__name__)
 
 
+def _search_backend() -> str:
+    try:
+        from ..core.config import settings
+
+        return settings.VECTOR_SEARCH_BACKEND.lower()
+    except Exception:
+        return "memory"
+
+
 class SemanticSearchService:
-    """Semantic search using pgvector similarity.
+    """Semantic search using cosine similarity.
 
     Searches for semantically similar document chunks using
     cosine similarity on embedding vectors.
@@ -29,8 +40,8 @@ class SemanticSearchService:
     ) -> List[Dict[str, any]]:
         """Search for similar document chunks.
 
-        Embeds the query using OpenAI, then searches pgvector
-        for the most similar chunks.
+        Embeds the query using OpenAI, then searches the project's
+        vector index for the most similar chunks.
 
         Args:
             query: Query text to search for
@@ -56,8 +67,6 @@ class SemanticSearchService:
         Raises:
             Exception: If embedding or search fails
         """
-        from ..models.document_chunk import DocumentChunk
-        from ..models.knowledge_base_documents import KnowledgeBaseDocument
         from .embedding_service import EmbeddingService
 
         try:
@@ -67,54 +76,13 @@ class SemanticSearchService:
                 logger.warning(f"Failed to embed query: {query}")
                 return []
 
-            # Search for similar chunks
-            # Note: PostgreSQL pgvector uses <-> operator for cosine distance
-            # Distance 0 = identical, 1 = completely different
-            # So similarity = 1 - distance
-            results = db.query(
-                DocumentChunk.id,
-                DocumentChunk.document_id,
-                DocumentChunk.chunk_index,
-                DocumentChunk.content,
-                KnowledgeBaseDocument.filename,
-                # Calculate cosine distance (1 - dot product for normalized vectors)
-                func.cast(
-                    1 - func.sum(
-                        DocumentChunk.embedding_vector * query_embedding
-                    ) / (
-                        func.sqrt(func.sum(
-                            func.square(DocumentChunk.embedding_vector)
-                        )) *
-                        func.sqrt(func.sum(
-                            func.square(func.array(query_embedding))
-                        ))
-                    ),
-                    float
-                ).label('distance')
-            ).join(
-                KnowledgeBaseDocument,
-                DocumentChunk.document_id == KnowledgeBaseDocument.id
-            ).filter(
-                KnowledgeBaseDocument.project_id == project_id,
-                DocumentChunk.embedding_vector.isnot(None)
-            ).order_by(
-                'distance'
-            ).limit(top_k).all()
-
-            # Convert to result format
-            search_results = []
-            for chunk_id, doc_id, index, content, filename, distance in results:
-                similarity = 1 - distance if distance is not None else 0
-
-                if similarity >= similarity_threshold:
-                    search_results.append({
-                        "chunk_id": str(chunk_id),
-                        "document_id": str(doc_id),
-                        "filename": filename,
-                        "content": content,
-                        "similarity": round(similarity, 3),
-                        "chunk_index": index
-                    })
+            search_results = await SemanticSearchService.search_by_embedding(
+                embedding=query_embedding,
+                project_id=project_id,
+                top_k=top_k,
+                similarity_threshold=similarity_threshold,
+                db=db
+            )
 
             logger.info(
                 f"Found {len(search_results)} similar chunks "
@@ -132,7 +100,9 @@ class SemanticSearchService:
         project_id: str,
         top_k: int = 5,
         similarity_threshold: float = 0.7,
-        db: Session = None
+        db: Session = None,
+        nprobe: Optional[int] = None,
+        exact: bool = False
     ) -> List[Dict[str, any]]:
         """Search using pre-computed embedding.
 
@@ -145,47 +115,121 @@ class SemanticSearchService:
             top_k: Number of results to return
             similarity_threshold: Minimum similarity score
             db: Database session
+            nprobe: IVF lists to scan for large projects (default VECTOR_ANN_NPROBE)
+            exact: Force exact search even if the project has an IVF partition
 
         Returns:
             List of matching chunks with similarity scores
         """
-        from ..models.document_chunk import DocumentChunk
-        from ..models.knowledge_base_documents import KnowledgeBaseDocument
-
         try:
-            # Use same logic as search() but with pre-computed embedding
-            results = db.query(
-                DocumentChunk.id,
-                DocumentChunk.document_id,
-                DocumentChunk.chunk_index,
-                DocumentChunk.content,
-                KnowledgeBaseDocument.filename
-            ).join(
-                KnowledgeBaseDocument,
-                DocumentChunk.document_id == KnowledgeBaseDocument.id
-            ).filter(
-                KnowledgeBaseDocument.project_id == project_id,
-                DocumentChunk.embedding_vector.isnot(None)
-            ).order_by(
-                DocumentChunk.embedding_vector.op('<->')(embedding)
-            ).limit(top_k).all()
-
-            search_results = []
-            for chunk_id, doc_id, index, content, filename in results:
-                search_results.append({
-                    "chunk_id": str(chunk_id),
-                    "document_id": str(doc_id),
-                    "filename": filename,
-                    "content": content,
-                    "chunk_index": index
-                })
-
-            return search_results
+            if _search_backend() == "pgvector":
+                return SemanticSearchService._search_pgvector(embedding, project_id, top_k, db)
+            return SemanticSearchService._search_index(
+                embedding, project_id, top_k, similarity_threshold, db, nprobe, exact
+            )
 
         except Exception as e:
             logger.error(f"Search by embedding failed: {e}")
             raise
 
+    @staticmethod
+    def _search_index(
+        embedding: List[float],
+        project_id: str,
+        top_k: int,
+        similarity_threshold: float,
+        db: Session,
+        nprobe: Optional[int] = None,
+        exact: bool = False
+    ) -> List[Dict[str, any]]:
+        """Top-k search over the in-process project vector index."""
+        from ..models.document_chunk import DocumentChunk
+        from ..models.knowledge_base_document import KnowledgeBaseDocument
+        from .vector_index import get_vector_index_manager
+
+        hits = get_vector_index_manager().search(
+            project_id,
+            embedding,
+            db,
+            top_k=top_k,
+            similarity_threshold=similarity_threshold,
+            nprobe=nprobe,
+            exact=exact
+        )
+        if not hits:
+            return []
+
+        # Fetch content for the top-k chunks only
+        rows = db.query(
+            DocumentChunk.id,
+            DocumentChunk.document_id,
+            DocumentChunk.chunk_index,
+            DocumentChunk.content,
+            KnowledgeBaseDocument.filename
+        ).join(
+            KnowledgeBaseDocument,
+            DocumentChunk.document_id == KnowledgeBaseDocument.id
+        ).filter(
+            DocumentChunk.id.in_([chunk_id for chunk_id, _, _ in hits])
+        ).all()
+        by_id = {str(row[0]): row for row in rows}
+
+        search_results = []
+        for chunk_id, _, similarity in hits:
+            row = by_id.get(chunk_id)
+            if row is None:
+                # Chunk deleted since the index was built
+                continue
+            _, doc_id, index_in_doc, content, filename = row
+            search_results.append({
+                "chunk_id": chunk_id,
+                "document_id": str(doc_id),
+                "filename": filename,
+                "content": content,
+                "similarity": round(similarity, 3),
+                "chunk_index": index_in_doc
+            })
+        return search_results
+
+    @staticmethod
+    def _search_pgvector(
+        embedding: List[float],
+        project_id: str,
+        top_k: int,
+        db: Session
+    ) -> List[Dict[str, any]]:
+        """Top-k search ordered by the pgvector distance operator."""
+        from ..models.document_chunk import DocumentChunk
+        from ..models.knowledge_base_document import KnowledgeBaseDocument
+
+        results = db.query(
+            DocumentChunk.id,
+            DocumentChunk.document_id,
+            DocumentChunk.chunk_index,
+            DocumentChunk.content,
+            KnowledgeBaseDocument.filename
+        ).join(
+            KnowledgeBaseDocument,
+            DocumentChunk.document_id == KnowledgeBaseDocument.id
+        ).filter(
+            KnowledgeBaseDocument.project_id == project_id,
+            DocumentChunk.embedding_vector.isnot(None)
+        ).order_by(
+            DocumentChunk.embedding_vector.op('<->')(embedding)
+        ).limit(top_k).all()
+
+        search_results = []
+        for chunk_id, doc_id, index, content, filename in results:
+            search_results.append({
+                "chunk_id": str(chunk_id),
+                "document_id": str(doc_id),
+                "filename": filename,
+                "content": content,
+                "chunk_index": index
+            })
+
+        return search_results
+
     @staticmethod
     def search_sync(
         query: str,
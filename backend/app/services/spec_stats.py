@@ -0,0 +1,104 @@
+"""
+Reads and rebuilds the per-project specification aggregates.
+
+Writes to the aggregates happen automatically (see
+app/models/project_spec_stats.py); this module provides the read side
+used by maturity scoring and the GROUP BY rebuild used by the
+maintenance job.
+"""
+import logging
+import uuid
+from decimal import Decimal
+from typing import Dict, Optional
+
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+
+def get_category_stats(db: Session, project_id) -> Dict[str, Dict[str, float]]:
+    """
+    Get current specification count and confidence sum per category.
+
+    Args:
+        db: Specs database session
+        project_id: Project UUID
+
+    Returns:
+        {category: {'count': int, 'confidence_sum': float}}
+    """
+    from ..models.project_spec_stats import ProjectSpecStats
+
+    rows = db.query(
+        ProjectSpecStats.category,
+        ProjectSpecStats.spec_count,
+        ProjectSpecStats.confidence_sum
+    ).filter(
+        ProjectSpecStats.project_id == project_id,
+        ProjectSpecStats.spec_count > 0
+    ).all()
+
+    return {
+        category: {'count': int(count), 'confidence_sum': float(confidence_sum)}
+        for category, count, confidence_sum in rows
+    }
+
+
+def rebuild_spec_stats(db: Session, project_id: Optional[uuid.UUID] = None) -> int:
+    """
+    Recompute the aggregates from the specifications table.
+
+    One GROUP BY pass over current specifications, then the existing
+    aggregate rows are replaced. Runs in the caller's transaction; the
+    caller commits.
+
+    Args:
+        db: Specs database session
+        project_id: Only rebuild this project (default: all projects)
+
+    Returns:
+        Number of aggregate rows written
+    """
+    from ..models.project_spec_stats import DEFAULT_SPEC_WEIGHT, ProjectSpecStats
+    from ..models.specification import Specification
+
+    weight = case(
+        (func.coalesce(Specification.confidence, 0) == 0, DEFAULT_SPEC_WEIGHT),
+        else_=Specification.confidence
+    )
+    grouped = select(
+        Specification.project_id,
+        Specification.category,
+        func.count(Specification.id),
+        func.sum(weight)
+    ).where(
+        Specification.is_current.is_(True)
+    ).group_by(
+        Specification.project_id,
+        Specification.category
+    )
+    if project_id is not None:
+        grouped = grouped.where(Specification.project_id == project_id)
+
+    rows = db.execute(grouped).all()
+
+    existing = db.query(ProjectSpecStats)
+    if project_id is not None:
+        existing = existing.filter(ProjectSpecStats.project_id == project_id)
+    existing.delete(synchronize_session=False)
+
+    if rows:
+        db.execute(ProjectSpecStats.__table__.insert(), [
+            {
+                'id': uuid.uuid4(),
+                'project_id': row_project_id,
+                'category': category,
+                'spec_count': count,
+                'confidence_sum': Decimal(str(total or 0)).quantize(Decimal("0.01"))
+            }
+            for row_project_id, category, count, total in rows
+        ])
+
+    logger.info(f"Rebuilt {len(rows)} specification aggregate rows" + (f" for project {project_id}" if project_id else ""))
+    return len(rows)
@@ -0,0 +1,194 @@
+"""Buffered, batched writer for LLM usage rows.
+
+Callers (LLMRouter.track_usage, the LLM gateway) hand rows to add(), which
+only appends to an in-memory buffer. A background thread writes the buffer
+to llm_usage_tracking (and the llm_usage_daily rollups) in one transaction
+per batch when it reaches LLM_USAGE_BATCH_SIZE rows or every
+LLM_USAGE_FLUSH_SECONDS, whichever comes first.
+
+The buffer is bounded (LLM_USAGE_MAX_BUFFER): if the database stays
+unavailable, failed batches are kept for the next flush and the oldest
+rows are dropped (and counted) once the bound is reached.
+"""
+import logging
+import threading
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_FLUSH_SECONDS = 2.0
+DEFAULT_MAX_BUFFER = 10000
+
+
+def _default_sink(rows: List[Dict[str, Any]]) -> None:
+    from .llm_gateway import record_usage_rows
+    record_usage_rows(rows)
+
+
+class UsageWriter:
+    """Buffers usage rows and writes them in batches from a background thread."""
+
+    def __init__(
+        self,
+        sink: Optional[Callable[[List[Dict[str, Any]]], None]] = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        flush_interval_seconds: float = DEFAULT_FLUSH_SECONDS,
+        max_buffer: int = DEFAULT_MAX_BUFFER,
+    ):
+        """
+        Args:
+            sink: Writes one batch (default: record_usage_rows)
+            batch_size: Rows per write; a full batch wakes the writer early
+            flush_interval_seconds: Longest a row waits in the buffer
+            max_buffer: Rows kept while the sink is failing (oldest dropped)
+        """
+        self.sink = sink or _default_sink
+        self.batch_size = max(1, batch_size)
+        self.flush_interval_seconds = flush_interval_seconds
+        self.max_buffer = max(self.batch_size, max_buffer)
+
+        self._buffer: Deque[Dict[str, Any]] = deque()
+        self._condition = threading.Condition()
+        self._write_lock = threading.Lock()  # One batch in flight at a time
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        self._stats = {'added': 0, 'written': 0, 'batches': 0, 'failed_batches': 0, 'dropped': 0}
+
+    def add(self, row: Dict[str, Any]) -> None:
+        """Queue one usage row (stamped with the current time if it has none)."""
+        self.add_many([row])
+
+    def add_many(self, rows: List[Dict[str, Any]]) -> None:
+        """Queue several usage rows."""
+        now = datetime.now(timezone.utc)
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("UsageWriter is closed")
+            for row in rows:
+                self._buffer.append(row if row.get('timestamp') else {**row, 'timestamp': now})
+            self._stats['added'] += len(rows)
+            self._trim()
+            self._ensure_thread()
+            if len(self._buffer) >= self.batch_size:
+                self._condition.notify()
+
+    def _trim(self) -> None:
+        overflow = len(self._buffer) - self.max_buffer
+        if overflow > 0:
+            for _ in range(overflow):
+                self._buffer.popleft()
+            self._stats['dropped'] += overflow
+            logger.warning(f"LLM usage buffer full; dropped {overflow} oldest rows")
+
+    def _ensure_thread(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="llm-usage-writer", daemon=True)
+            self._thread.start()
+
+    def _take_batch(self) -> List[Dict[str, Any]]:
+        count = min(self.batch_size, len(self._buffer))
+        return [self._buffer.popleft() for _ in range(count)]
+
+    def _write(self, batch: List[Dict[str, Any]]) -> bool:
+        try:
+            self.sink(batch)
+        except Exception as e:
+            logger.warning(f"Failed to write {len(batch)} LLM usage rows: {e}")
+            with self._condition:
+                # Keep the rows for the next flush, ahead of newer ones
+                self._buffer.extendleft(reversed(batch))
+                self._stats['failed_batches'] += 1
+                self._trim()
+            return False
+        with self._condition:
+            self._stats['written'] += len(batch)
+            self._stats['batches'] += 1
+        return True
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                if len(self._buffer) < self.batch_size and not self._closed:
+                    self._condition.wait(self.flush_interval_seconds)
+                if self._closed:
+                    return
+            # A failed batch waits for the next interval instead of spinning
+            self._drain(stop_on_failure=True)
+
+    def _drain(self, stop_on_failure: bool) -> bool:
+        with self._write_lock:
+            while True:
+                with self._condition:
+                    batch = self._take_batch()
+                if not batch:
+                    return True
+                if not self._write(batch) and stop_on_failure:
+                    return False
+
+    def flush(self) -> bool:
+        """
+        Write every buffered row now (blocks the caller).
+
+        Returns:
+            True if the buffer was fully written
+        """
+        return self._drain(stop_on_failure=True)
+
+    def pending(self) -> int:
+        """Rows waiting to be written."""
+        with self._condition:
+            return len(self._buffer)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._condition:
+            return {**self._stats, 'pending': len(self._buffer)}
+
+    def close(self) -> None:
+        """Stop the background thread and write what is left."""
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout=self.flush_interval_seconds + 5)
+        if not self.flush():
+            logger.error(f"Lost {self.pending()} LLM usage rows on shutdown")
+
+
+def create_usage_writer() -> UsageWriter:
+    """Build the usage writer from settings."""
+    from ..core.config import settings
+
+    return UsageWriter(
+        batch_size=settings.LLM_USAGE_BATCH_SIZE,
+        flush_interval_seconds=settings.LLM_USAGE_FLUSH_SECONDS,
+        max_buffer=settings.LLM_USAGE_MAX_BUFFER,
+    )
+
+
+_writer: Optional[UsageWriter] = None
+_writer_lock = threading.Lock()
+
+
+def get_usage_writer() -> UsageWriter:
+    """Get the process-wide UsageWriter (configured from settings)."""
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = create_usage_writer()
+    return _writer
+
+
+def configure_usage_writer(writer: Optional[UsageWriter]) -> None:
+    """Replace the process-wide writer (None = rebuild from settings on next use)."""
+    global _writer
+    with _writer_lock:
+        previous, _writer = _writer, writer
+    if previous is not None and previous is not writer:
+        previous.close()
@@ -0,0 +1,993 @@
+"""In-process vector index for document chunk semantic search.
+
+Keeps one contiguous float32 matrix of L2-normalised chunk embeddings per
+project, so cosine similarity against a query is a single matrix-vector
+product followed by an argpartition top-k. Used by SemanticSearchService
+when pgvector is not available (DocumentChunk.embedding_vector is a JSON
+column, so SQL-side similarity only works with pgvector).
+
+Indexes are:
+- loaded lazily per project (from the .npy sidecar, or rebuilt from the DB)
+- updated incrementally when documents are uploaded or deleted
+- persisted to memory-mapped .npy sidecars so workers share pages; the
+  sidecar is rewritten when an index is (re)built and at most once per
+  VECTOR_INDEX_PERSIST_DELAY_SECONDS for incremental changes
+- optionally partitioned by an IVF index (ann_index.py) once a project is
+  large enough that exact search is too slow
+"""
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_PROJECTS = 64
+DEFAULT_ANN_MIN_CHUNKS = 50000
+DEFAULT_PERSIST_DELAY_SECONDS = 5.0
+_MIN_CAPACITY = 64
+
+
+def normalize_rows(vectors: Any) -> np.ndarray:
+    """
+    Convert vectors to a contiguous float32 matrix with unit-length rows.
+
+    Zero vectors are left as zeros (similarity 0 with everything).
+    """
+    matrix = np.ascontiguousarray(vectors, dtype=np.float32)
+    if matrix.ndim == 1:
+        matrix = matrix.reshape(1, -1)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def top_k_indices(scores: np.ndarray, top_k: int) -> np.ndarray:
+    """Indices of the top_k highest scores, best first (O(n + k log k))."""
+    n = scores.shape[0]
+    k = min(top_k, n)
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    if k < n:
+        candidates = np.argpartition(-scores, k - 1)[:k]
+    else:
+        candidates = np.arange(n)
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+
+class ProjectVectorIndex:
+    """
+    Exact cosine-similarity index for one project's document chunks.
+
+    Rows are stored in a preallocated matrix that grows geometrically, so
+    inserts are amortised O(rows added). Deleting a document swap-removes
+    its rows, which is O(rows removed). Thread-safe.
+    """
+
+    def __init__(self, project_id: str, dim: Optional[int] = None):
+        """
+        Args:
+            project_id: Project the index belongs to
+            dim: Embedding dimension (inferred from the first insert if None)
+        """
+        self.project_id = str(project_id)
+        self.dim = dim
+        self._matrix = np.empty((0, dim or 0), dtype=np.float32)
+        self._size = 0
+        self._chunk_ids: List[str] = []
+        self._document_ids: List[str] = []
+        self._row_of: Dict[str, int] = {}
+        self._rows_by_document: Dict[str, Set[int]] = {}
+        self._lock = threading.RLock()
+        # Bumped by every removal (rows below _size only move on removal)
+        self._removals = 0
+        self.sidecar_mtime: Optional[int] = None
+        # Optional IVFPartition; when set, search() is approximate by default
+        self.ann = None
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def matrix(self) -> np.ndarray:
+        """Live rows (a view; do not modify)."""
+        return self._matrix[:self._size]
+
+    def contains(self, chunk_id: str) -> bool:
+        return str(chunk_id) in self._row_of
+
+    def chunk_id_at(self, row: int) -> str:
+        return self._chunk_ids[row]
+
+    def document_id_at(self, row: int) -> str:
+        return self._document_ids[row]
+
+    # ----- mutation -----
+
+    def _reserve(self, rows: int) -> None:
+        # Memory-mapped sidecars are read-only; copy into an owned buffer on first write
+        capacity = self._matrix.shape[0]
+        owned = isinstance(self._matrix, np.ndarray) and not isinstance(self._matrix, np.memmap)
+        if rows <= capacity and owned and self._matrix.flags.writeable:
+            return
+        new_capacity = max(rows, 2 * capacity, _MIN_CAPACITY)
+        grown = np.empty((new_capacity, self.dim), dtype=np.float32)
+        grown[:self._size] = self._matrix[:self._size]
+        self._matrix = grown
+
+    def add(
+        self,
+        chunk_ids: Sequence[str],
+        document_ids: Sequence[str],
+        vectors: Sequence[Optional[Sequence[float]]],
+        normalized: bool = False,
+    ) -> int:
+        """
+        Add chunk embeddings to the index.
+
+        Chunks without an embedding, or already indexed, are skipped.
+
+        Args:
+            chunk_ids: Chunk IDs
+            document_ids: Owning document of each chunk
+            vectors: Embeddings (None for chunks without one)
+            normalized: Vectors are already unit-length rows (see normalize_rows)
+
+        Returns:
+            Number of rows added
+
+        Raises:
+            ValueError: If a vector's dimension does not match the index
+        """
+        new_ids, new_docs, new_vectors = [], [], []
+        seen = set()
+        for chunk_id, document_id, vector in zip(chunk_ids, document_ids, vectors):
+            chunk_id = str(chunk_id)
+            if vector is None or chunk_id in self._row_of or chunk_id in seen:
+                continue
+            seen.add(chunk_id)
+            new_ids.append(chunk_id)
+            new_docs.append(str(document_id))
+            new_vectors.append(vector)
+
+        if not new_ids:
+            return 0
+
+        block = np.asarray(new_vectors, dtype=np.float32) if normalized else normalize_rows(new_vectors)
+        with self._lock:
+            if self.dim is None:
+                self.dim = block.shape[1]
+                self._matrix = np.empty((0, self.dim), dtype=np.float32)
+            if block.shape[1] != self.dim:
+                raise ValueError(
+                    f"Embedding dimension {block.shape[1]} does not match index dimension {self.dim}"
+                )
+
+            start = self._size
+            self._reserve(start + len(new_ids))
+            self._matrix[start:start + len(new_ids)] = block
+            for offset, (chunk_id, document_id) in enumerate(zip(new_ids, new_docs)):
+                row = start + offset
+                self._row_of[chunk_id] = row
+                self._rows_by_document.setdefault(document_id, set()).add(row)
+            self._chunk_ids.extend(new_ids)
+            self._document_ids.extend(new_docs)
+            self._size += len(new_ids)
+            if self.ann is not None:
+                self.ann.assign(start, block)
+
+        return len(new_ids)
+
+    def remove_document(self, document_id: str) -> int:
+        """
+        Remove all rows belonging to a document.
+
+        Returns:
+            Number of rows removed
+        """
+        document_id = str(document_id)
+        with self._lock:
+            rows = self._rows_by_document.pop(document_id, None)
+            if not rows:
+                return 0
+
+            self._removals += 1
+            # Remove from the highest row down so swapped-in rows are never ones we still have to delete
+            for row in sorted(rows, reverse=True):
+                self._swap_remove(row)
+            return len(rows)
+
+    def _swap_remove(self, row: int) -> None:
+        last = self._size - 1
+        removed_chunk = self._chunk_ids[row]
+        del self._row_of[removed_chunk]
+        if self.ann is not None:
+            self.ann.remove_row(row)
+
+        if row != last:
+            self._reserve(self._size)
+            self._matrix[row] = self._matrix[last]
+            moved_chunk = self._chunk_ids[last]
+            moved_document = self._document_ids[last]
+            self._chunk_ids[row] = moved_chunk
+            self._document_ids[row] = moved_document
+            self._row_of[moved_chunk] = row
+            document_rows = self._rows_by_document[moved_document]
+            document_rows.discard(last)
+            document_rows.add(row)
+            if self.ann is not None:
+                self.ann.move_row(last, row)
+
+        self._chunk_ids.pop()
+        self._document_ids.pop()
+        self._size -= 1
+
+    # ----- approximate search -----
+
+    def build_ann(self, n_lists: Optional[int] = None, seed: int = 0) -> None:
+        """
+        (Re)train the IVF partition over the current rows.
+
+        Args:
+            n_lists: Number of inverted lists (default ~sqrt(rows))
+            seed: RNG seed for k-means
+        """
+        from .ann_index import IVFPartition
+
+        with self._lock:
+            if self._size == 0:
+                self.ann = None
+                return
+            self.ann = IVFPartition.train(self.matrix, n_lists=n_lists, seed=seed)
+
+    def train_ann(self, n_lists: Optional[int] = None, seed: int = 0) -> Tuple[Any, int, int]:
+        """
+        Train an IVF partition over a snapshot of the current rows.
+
+        Runs without the lock, so searches and inserts continue; pass the
+        result to install_ann().
+
+        Returns:
+            (partition, rows trained on, removal count at snapshot)
+        """
+        from .ann_index import IVFPartition
+
+        with self._lock:
+            # Inserts only write past _size (or into a new buffer), so this view stays valid
+            snapshot = self.matrix
+            removals = self._removals
+        return IVFPartition.train(snapshot, n_lists=n_lists, seed=seed), snapshot.shape[0], removals
+
+    def install_ann(self, trained: Tuple[Any, int, int]) -> bool:
+        """
+        Install a partition from train_ann(), assigning rows added since.
+
+        Returns:
+            False if a removal moved rows during training (partition discarded)
+        """
+        partition, rows, removals = trained
+        with self._lock:
+            if self.ann is not None:
+                return True
+            if removals != self._removals:
+                return False
+            partition.assign(rows, self.matrix[rows:])
+            self.ann = partition
+            return True
+
+    def drop_ann(self) -> None:
+        """Discard the IVF partition (search becomes exact)."""
+        with self._lock:
+            self.ann = None
+
+    # ----- search -----
+
+    def search(
+        self,
+        query: Sequence[float],
+        top_k: int = 5,
+        similarity_threshold: float = 0.0,
+        nprobe: Optional[int] = None,
+        exact: bool = False,
+    ) -> List[Tuple[str, str, float]]:
+        """
+        Find the most similar chunks by cosine similarity.
+
+        Args:
+            query: Query embedding
+            top_k: Number of results to return
+            similarity_threshold: Minimum similarity score
+            nprobe: IVF lists to scan when the index is partitioned
+            exact: Force a full scan even if an IVF partition exists
+
+        Returns:
+            List of (chunk_id, document_id, similarity), best first
+        """
+        with self._lock:
+            if self._size == 0:
+                return []
+            q = normalize_rows(query)[0]
+            if q.shape[0] != self.dim:
+                raise ValueError(
+                    f"Query dimension {q.shape[0]} does not match index dimension {self.dim}"
+                )
+            if self.ann is not None and not exact:
+                from .ann_index import DEFAULT_NPROBE
+
+                rows, scores = self.ann.search(self.matrix, q, top_k, nprobe or DEFAULT_NPROBE)
+            else:
+                all_scores = self.matrix @ q
+                rows = top_k_indices(all_scores, top_k)
+                scores = all_scores[rows]
+
+            results = []
+            for row, score in zip(rows.tolist(), scores.tolist()):
+                if score < similarity_threshold:
+                    break
+                results.append((self._chunk_ids[row], self._document_ids[row], score))
+            return results
+
+    # ----- persistence -----
+
+    def save(self, path_prefix: str) -> None:
+        """
+        Persist to <path_prefix>.npy (rows) and <path_prefix>.json (ids).
+
+        An IVF partition is written to <path_prefix>.ivf.npz (centroids and
+        per-row list labels). All files are written to temporaries and
+        atomically renamed, so concurrent readers see either the old or the
+        new index.
+        """
+        with self._lock:
+            matrix = np.ascontiguousarray(self.matrix)
+            meta = {
+                "project_id": self.project_id,
+                "dim": self.dim,
+                "chunk_ids": list(self._chunk_ids),
+                "document_ids": list(self._document_ids),
+            }
+            ivf = None
+            if self.ann is not None:
+                ivf = {"centroids": self.ann.centroids.copy(), "labels": self.ann.labels(self._size)}
+
+        directory = os.path.dirname(path_prefix)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        token = uuid.uuid4().hex
+        tmp_matrix = f"{path_prefix}.{token}.tmp.npy"
+        tmp_meta = f"{path_prefix}.{token}.tmp.json"
+        with open(tmp_meta, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        np.save(tmp_matrix, matrix)
+        # The IVF file goes first: readers key reloads off the .npy mtime
+        ivf_path = f"{path_prefix}.ivf.npz"
+        if ivf is not None:
+            tmp_ivf = f"{path_prefix}.{token}.tmp.npz"
+            np.savez(tmp_ivf, **ivf)
+            os.replace(tmp_ivf, ivf_path)
+        elif os.path.exists(ivf_path):
+            os.remove(ivf_path)
+        os.replace(tmp_meta, f"{path_prefix}.json")
+        os.replace(tmp_matrix, f"{path_prefix}.npy")
+        self.sidecar_mtime = os.stat(f"{path_prefix}.npy").st_mtime_ns
+
+    @classmethod
+    def load(cls, path_prefix: str) -> Optional["ProjectVectorIndex"]:
+        """
+        Load an index from its sidecar files, memory-mapping the rows.
+
+        Returns:
+            The index, or None if the sidecar is missing or inconsistent
+        """
+        matrix_path = f"{path_prefix}.npy"
+        meta_path = f"{path_prefix}.json"
+        if not (os.path.exists(matrix_path) and os.path.exists(meta_path)):
+            return None
+
+        try:
+            mtime = os.stat(matrix_path).st_mtime_ns
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            matrix = np.load(matrix_path, mmap_mode="r")
+        except (OSError, ValueError) as e:
+            logger.warning(f"Failed to load vector index sidecar {path_prefix}: {e}")
+            return None
+
+        chunk_ids = meta.get("chunk_ids", [])
+        document_ids = meta.get("document_ids", [])
+        if matrix.ndim != 2 or matrix.shape[0] != len(chunk_ids) or len(chunk_ids) != len(document_ids):
+            logger.warning(f"Vector index sidecar {path_prefix} is inconsistent; ignoring it")
+            return None
+
+        index = cls(meta.get("project_id", ""), dim=matrix.shape[1])
+        index._matrix = matrix
+        index._size = matrix.shape[0]
+        index._chunk_ids = list(chunk_ids)
+        index._document_ids = list(document_ids)
+        for row, (chunk_id, document_id) in enumerate(zip(chunk_ids, document_ids)):
+            index._row_of[chunk_id] = row
+            index._rows_by_document.setdefault(document_id, set()).add(row)
+        index.ann = cls._load_ann(path_prefix, index)
+        index.sidecar_mtime = mtime
+        return index
+
+    @staticmethod
+    def _load_ann(path_prefix: str, index: "ProjectVectorIndex"):
+        ivf_path = f"{path_prefix}.ivf.npz"
+        if not os.path.exists(ivf_path):
+            return None
+
+        from .ann_index import IVFPartition
+
+        try:
+            with np.load(ivf_path) as data:
+                centroids = data["centroids"]
+                labels = data["labels"]
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Failed to load IVF sidecar {ivf_path}: {e}")
+            return None
+
+        if labels.shape[0] != len(index) or centroids.shape[1] != index.dim:
+            # Written by a concurrent save; the index stays exact until the next rebuild
+            logger.warning(f"IVF sidecar {ivf_path} does not match its index; ignoring it")
+            return None
+        if labels.size and (labels.min() < 0 or labels.max() >= centroids.shape[0]):
+            logger.warning(f"IVF sidecar {ivf_path} has invalid labels; ignoring it")
+            return None
+
+        partition = IVFPartition(centroids)
+        partition.assign_labels(0, labels)
+        return partition
+
+
+def _as_uuid(value: Any) -> Any:
+    """Coerce string ids to UUID for PG_UUID(as_uuid=True) columns."""
+    if isinstance(value, str):
+        try:
+            return uuid.UUID(value)
+        except ValueError:
+            return value
+    return value
+
+
+class VectorIndexManager:
+    """
+    Per-project ProjectVectorIndex registry.
+
+    Keeps at most max_projects indexes in memory (LRU). When a storage
+    directory is configured, indexes are written to their project's
+    sidecar when built or rebuilt, and changed indexes are written at most
+    once per persist_delay_seconds by a background thread (and on flush(),
+    close() and LRU eviction), so a chunk upsert does not rewrite the
+    whole matrix. Other workers reload a sidecar when its mtime changes;
+    changes not yet written are replayed onto the reloaded index.
+
+    A project missing from memory is loaded or built under a per-project
+    lock, so a cold project never blocks searches on other projects.
+
+    Projects with at least ann_min_chunks chunks get an IVF partition when
+    built, and searches scan nprobe lists instead of every row. A project
+    that grows past the threshold has its partition trained without the
+    lock and swapped in afterwards.
+    """
+
+    def __init__(
+        self,
+        storage_dir: Optional[str] = None,
+        max_projects: int = DEFAULT_MAX_PROJECTS,
+        ann_min_chunks: int = DEFAULT_ANN_MIN_CHUNKS,
+        ann_lists: Optional[int] = None,
+        nprobe: Optional[int] = None,
+        persist_delay_seconds: float = DEFAULT_PERSIST_DELAY_SECONDS,
+    ):
+        """
+        Args:
+            storage_dir: Directory for .npy sidecars (None = memory only)
+            max_projects: Project indexes kept in memory
+            ann_min_chunks: Chunk count at which IVF is enabled (0 disables)
+            ann_lists: IVF list count (default ~sqrt(rows))
+            nprobe: IVF lists scanned per query (default ann_index.DEFAULT_NPROBE)
+            persist_delay_seconds: Longest a change waits before its sidecar
+                is rewritten (0 = write on every change)
+        """
+        self.storage_dir = storage_dir
+        self.max_projects = max_projects
+        self.ann_min_chunks = ann_min_chunks
+        self.ann_lists = ann_lists
+        self.nprobe = nprobe
+        self.persist_delay_seconds = persist_delay_seconds
+        self._indexes: "OrderedDict[str, ProjectVectorIndex]" = OrderedDict()
+        self._lock = threading.RLock()
+        # project_id -> journals of builds in flight (changes to replay on their result)
+        self._rebuild_journals: Dict[str, List[List[Tuple]]] = {}
+        # project_id -> lock held while its index is loaded or built
+        self._load_locks: Dict[str, threading.Lock] = {}
+        # project_id -> changes not yet in its sidecar (replayed if another worker rewrites it)
+        self._unsaved: Dict[str, List[Tuple]] = {}
+        self._dirty_since: Dict[str, float] = {}
+        self._flush_condition = threading.Condition(self._lock)
+        self._flush_thread: Optional[threading.Thread] = None
+        self._closed = False
+
+    def _path_prefix(self, project_id: str) -> Optional[str]:
+        if not self.storage_dir:
+            return None
+        return os.path.join(self.storage_dir, f"project_{project_id}")
+
+    def _sidecar_mtime(self, project_id: str) -> Optional[int]:
+        prefix = self._path_prefix(project_id)
+        if prefix is None:
+            return None
+        try:
+            return os.stat(f"{prefix}.npy").st_mtime_ns
+        except OSError:
+            return None
+
+    def _remember(self, project_id: str, index: ProjectVectorIndex) -> None:
+        self._indexes[project_id] = index
+        self._indexes.move_to_end(project_id)
+        while len(self._indexes) > self.max_projects:
+            evicted_id, evicted = self._indexes.popitem(last=False)
+            if self._unsaved.pop(evicted_id, None) is not None:
+                # Its changes would otherwise be lost with it
+                self._dirty_since.pop(evicted_id, None)
+                self._persist(evicted_id, evicted)
+
+    def _persist(self, project_id: str, index: ProjectVectorIndex) -> bool:
+        """Write a project's sidecar now; returns False if it could not be written."""
+        prefix = self._path_prefix(project_id)
+        if prefix is None:
+            return True
+        try:
+            index.save(prefix)
+        except OSError as e:
+            logger.error(f"Failed to persist vector index for project {project_id}: {e}")
+            return False
+        return True
+
+    def _mark_unsaved(self, project_id: str, index: ProjectVectorIndex, changes: Sequence[Tuple]) -> None:
+        """Schedule a sidecar write for changes made to an index (caller holds the lock)."""
+        if self.storage_dir is None or not changes:
+            return
+        if not self.persist_delay_seconds or self._closed:
+            self._persist(project_id, index)
+            return
+        self._unsaved.setdefault(project_id, []).extend(changes)
+        if project_id not in self._dirty_since:
+            self._dirty_since[project_id] = time.monotonic()
+            self._ensure_flush_thread()
+            self._flush_condition.notify()
+
+    def _ensure_flush_thread(self) -> None:
+        if self._flush_thread is None and not self._closed:
+            self._flush_thread = threading.Thread(
+                target=self._run_flusher, name="vector-index-flusher", daemon=True
+            )
+            self._flush_thread.start()
+
+    def _run_flusher(self) -> None:
+        while True:
+            with self._flush_condition:
+                while not self._closed:
+                    if self._dirty_since:
+                        due = min(self._dirty_since.values()) + self.persist_delay_seconds
+                        wait = due - time.monotonic()
+                        if wait <= 0:
+                            break
+                    else:
+                        wait = None
+                    self._flush_condition.wait(wait)
+                if self._closed:
+                    return
+            self.flush(due_only=True)
+
+    def flush(self, due_only: bool = False) -> int:
+        """
+        Write sidecars of indexes with unsaved changes.
+
+        Args:
+            due_only: Only write indexes changed at least persist_delay_seconds ago
+
+        Returns:
+            Number of sidecars written
+        """
+        cutoff = time.monotonic() - self.persist_delay_seconds
+        pending = []
+        with self._lock:
+            project_ids = [
+                project_id for project_id, since in self._dirty_since.items()
+                if not due_only or since <= cutoff
+            ]
+            for project_id in project_ids:
+                del self._dirty_since[project_id]
+                changes = self._unsaved.pop(project_id, [])
+                index = self._indexes.get(project_id)
+                if index is not None:
+                    pending.append((project_id, index, changes))
+
+        # Written without the lock; changes made meanwhile mark the index unsaved again
+        written = 0
+        for project_id, index, changes in pending:
+            if self._persist(project_id, index):
+                written += 1
+                continue
+            with self._lock:
+                self._unsaved[project_id] = changes + self._unsaved.get(project_id, [])
+                self._dirty_since.setdefault(project_id, time.monotonic())
+        return written
+
+    def close(self) -> None:
+        """Stop the background writer and write every unsaved index."""
+        with self._flush_condition:
+            self._closed = True
+            self._flush_condition.notify_all()
+            thread = self._flush_thread
+        if thread is not None:
+            thread.join(timeout=5)
+        self.flush()
+
+    def _sidecar_is_current(self, project_id: str, index: ProjectVectorIndex, db: Session) -> bool:
+        """Whether a loaded sidecar holds as many chunks as the DB (a crash can lose unsaved changes)."""
+        if db is None:
+            return True
+        from ..models.document_chunk import DocumentChunk
+        from ..models.knowledge_base_document import KnowledgeBaseDocument
+
+        count = db.query(DocumentChunk.id).join(
+            KnowledgeBaseDocument,
+            DocumentChunk.document_id == KnowledgeBaseDocument.id
+        ).filter(
+            KnowledgeBaseDocument.project_id == _as_uuid(project_id),
+            DocumentChunk.embedding_vector.isnot(None)
+        ).count()
+        return count == len(index)
+
+    def build_from_db(self, project_id: str, db: Session) -> ProjectVectorIndex:
+        """Rebuild a project's index from DocumentChunk rows."""
+        from ..models.document_chunk import DocumentChunk
+        from ..models.knowledge_base_document import KnowledgeBaseDocument
+
+        index = ProjectVectorIndex(project_id)
+        query = db.query(
+            DocumentChunk.id,
+            DocumentChunk.document_id,
+            DocumentChunk.embedding_vector
+        ).join(
+            KnowledgeBaseDocument,
+            DocumentChunk.document_id == KnowledgeBaseDocument.id
+        ).filter(
+            KnowledgeBaseDocument.project_id == _as_uuid(project_id),
+            DocumentChunk.embedding_vector.isnot(None)
+        ).yield_per(1000)
+
+        batch_ids, batch_docs, batch_vectors = [], [], []
+        for chunk_id, document_id, vector in query:
+            batch_ids.append(chunk_id)
+            batch_docs.append(document_id)
+            batch_vectors.append(vector)
+            if len(batch_ids) >= 1000:
+                index.add(batch_ids, batch_docs, batch_vectors)
+                batch_ids, batch_docs, batch_vectors = [], [], []
+        if batch_ids:
+            index.add(batch_ids, batch_docs, batch_vectors)
+
+        self._maybe_build_ann(index)
+        logger.info(f"Built vector index for project {project_id}: {len(index)} chunks")
+        return index
+
+    def _record(self, project_id: str, *change: Any) -> None:
+        """Journal a change for every build of the project in flight (caller holds the lock)."""
+        for journal in self._rebuild_journals.get(project_id, ()):
+            journal.append(change)
+
+    @staticmethod
+    def _replay(index: ProjectVectorIndex, changes: Sequence[Tuple]) -> None:
+        for change in changes:
+            if change[0] == "add":
+                index.add(*change[1:])
+            else:
+                index.remove_document(change[1])
+
+    def _build_ann_if_needed(self, project_id: str, index: ProjectVectorIndex) -> None:
+        """Partition an index that outgrew ann_min_chunks (trained without the lock)."""
+        if index.ann is not None or not self.ann_min_chunks or len(index) < self.ann_min_chunks:
+            return
+        trained = index.train_ann(n_lists=self.ann_lists)
+        with self._lock:
+            if not index.install_ann(trained):
+                # A document was removed meanwhile; the next insert trains again
+                logger.info(f"Discarded IVF partition of project {project_id} trained during a removal")
+
+    def _maybe_build_ann(self, index: ProjectVectorIndex) -> None:
+        if self.ann_min_chunks and len(index) >= self.ann_min_chunks:
+            index.build_ann(n_lists=self.ann_lists)
+        else:
+            index.drop_ann()
+
+    def rebuild(self, project_id: str, db: Session) -> ProjectVectorIndex:
+        """
+        Rebuild a project's index from the DB, retraining its IVF partition.
+
+        Incremental inserts are assigned to the nearest existing centroid, so
+        partitions drift as a project grows; this restores balanced lists.
+
+        Building runs without the lock so searches and ingestion continue;
+        chunks added or documents removed meanwhile are journaled and
+        replayed onto the new index before it replaces the old one.
+        """
+        project_id = str(project_id)
+        journal: List[Tuple] = []
+        with self._lock:
+            self._rebuild_journals.setdefault(project_id, []).append(journal)
+
+        try:
+            index = self.build_from_db(project_id, db)
+        except Exception:
+            with self._lock:
+                self._end_rebuild(project_id, journal)
+            raise
+
+        # Written before the swap, without the lock (searches keep using the old index)
+        self._persist(project_id, index)
+
+        with self._lock:
+            self._end_rebuild(project_id, journal)
+            self._replay(index, journal)
+            if journal and index.ann is None and self.ann_min_chunks and len(index) >= self.ann_min_chunks:
+                index.build_ann(n_lists=self.ann_lists)
+            self._unsaved.pop(project_id, None)
+            self._dirty_since.pop(project_id, None)
+            self._mark_unsaved(project_id, index, journal)
+            self._remember(project_id, index)
+        return index
+
+    def _end_rebuild(self, project_id: str, journal: List[Tuple]) -> None:
+        journals = self._rebuild_journals[project_id]
+        journals.remove(journal)
+        if not journals:
+            del self._rebuild_journals[project_id]
+
+    def search(
+        self,
+        project_id: str,
+        query: Sequence[float],
+        db: Session,
+        top_k: int = 5,
+        similarity_threshold: float = 0.0,
+        nprobe: Optional[int] = None,
+        exact: bool = False,
+    ) -> List[Tuple[str, str, float]]:
+        """Search a project's index (see ProjectVectorIndex.search)."""
+        index = self.get(project_id, db)
+        return index.search(
+            query,
+            top_k=top_k,
+            similarity_threshold=similarity_threshold,
+            nprobe=nprobe or self.nprobe,
+            exact=exact,
+        )
+
+    def _cached(self, project_id: str) -> Optional[ProjectVectorIndex]:
+        """The in-memory index if its sidecar has not been rewritten elsewhere (caller holds the lock)."""
+        index = self._indexes.get(project_id)
+        if index is None:
+            return None
+        sidecar_mtime = self._sidecar_mtime(project_id)
+        if sidecar_mtime is not None and sidecar_mtime != index.sidecar_mtime:
+            return None
+        self._indexes.move_to_end(project_id)
+        return index
+
+    def get(self, project_id: str, db: Session) -> ProjectVectorIndex:
+        """
+        Get a project's index, loading or building it on first use.
+
+        Reloads from the sidecar when another worker has rewritten it. The
+        load or build holds only this project's lock; changes made
+        meanwhile are journaled and replayed onto the result.
+        """
+        project_id = str(project_id)
+        with self._lock:
+            index = self._cached(project_id)
+            if index is not None:
+                return index
+            load_lock = self._load_locks.setdefault(project_id, threading.Lock())
+
+        with load_lock:
+            journal: List[Tuple] = []
+            with self._lock:
+                # Another thread may have loaded it while we waited
+                index = self._cached(project_id)
+                if index is not None:
+                    return index
+                self._rebuild_journals.setdefault(project_id, []).append(journal)
+
+            try:
+                prefix = self._path_prefix(project_id)
+                loaded = ProjectVectorIndex.load(prefix) if prefix is not None else None
+                if loaded is not None and not self._sidecar_is_current(project_id, loaded, db):
+                    logger.warning(f"Vector index sidecar of project {project_id} is stale; rebuilding")
+                    loaded = None
+                if loaded is None:
+                    loaded = self.build_from_db(project_id, db)
+                    self._persist(project_id, loaded)
+            except Exception:
+                with self._lock:
+                    self._end_rebuild(project_id, journal)
+                raise
+
+            with self._lock:
+                self._end_rebuild(project_id, journal)
+                # Changes not yet written by us are missing from a sidecar
+                # another worker wrote; replay them with those made meanwhile
+                unsaved = self._unsaved.pop(project_id, [])
+                self._dirty_since.pop(project_id, None)
+                self._replay(loaded, unsaved + journal)
+                self._mark_unsaved(project_id, loaded, unsaved + journal)
+                self._remember(project_id, loaded)
+                return loaded
+
+    def _current(self, project_id: str, index: ProjectVectorIndex) -> ProjectVectorIndex:
+        """
+        The index to change (caller holds the lock).
+
+        A rebuild or reload may have replaced the index returned by get();
+        an evicted one is put back, since it is the newest copy.
+        """
+        current = self._indexes.get(project_id)
+        if current is None:
+            self._remember(project_id, index)
+            return index
+        return current
+
+    def add_chunks(
+        self,
+        project_id: str,
+        chunk_ids: Sequence[str],
+        document_ids: Sequence[str],
+        vectors: Sequence[Optional[Sequence[float]]],
+        db: Session,
+    ) -> int:
+        """
+        Add newly stored chunks to a project's index.
+
+        Idempotent: chunks already present (e.g. picked up by a rebuild) are skipped.
+        """
+        project_id = str(project_id)
+        index = self.get(project_id, db)
+        with self._lock:
+            index = self._current(project_id, index)
+            added = index.add(chunk_ids, document_ids, vectors)
+            change = ("add", list(chunk_ids), list(document_ids), list(vectors))
+            self._record(project_id, *change)
+            if added:
+                self._mark_unsaved(project_id, index, [change])
+        if added:
+            self._build_ann_if_needed(project_id, index)
+        return added
+
+    def add_document_from_db(self, project_id: str, document_id: str, db: Session) -> int:
+        """
+        Add a stored document's chunks to its project's index.
+
+        Streams the chunks from the DB in batches, so large documents
+        ingested in the background are indexed with bounded memory. Batches
+        are read and normalized without the lock; it is held only while
+        each one is inserted, so searches continue meanwhile.
+
+        Returns:
+            Number of rows added
+        """
+        from ..models.document_chunk import DocumentChunk
+
+        project_id = str(project_id)
+        query = db.query(
+            DocumentChunk.id,
+            DocumentChunk.embedding_vector
+        ).filter(
+            DocumentChunk.document_id == _as_uuid(document_id),
+            DocumentChunk.embedding_vector.isnot(None)
+        ).yield_per(1000)
+
+        index = self.get(project_id, db)
+        added = 0
+        batch_ids, batch_vectors = [], []
+        for chunk_id, vector in query:
+            batch_ids.append(chunk_id)
+            batch_vectors.append(vector)
+            if len(batch_ids) >= 1000:
+                index, count = self._add_batch(project_id, index, document_id, batch_ids, batch_vectors)
+                added += count
+                batch_ids, batch_vectors = [], []
+        if batch_ids:
+            index, count = self._add_batch(project_id, index, document_id, batch_ids, batch_vectors)
+            added += count
+
+        if added:
+            self._build_ann_if_needed(project_id, index)
+        return added
+
+    def _add_batch(
+        self,
+        project_id: str,
+        index: ProjectVectorIndex,
+        document_id: str,
+        chunk_ids: List[str],
+        vectors: List[Sequence[float]],
+    ) -> Tuple[ProjectVectorIndex, int]:
+        """Insert one batch of a document's chunks; returns (current index, rows added)."""
+        block = normalize_rows(vectors)
+        document_ids = [document_id] * len(chunk_ids)
+        with self._lock:
+            index = self._current(project_id, index)
+            added = index.add(chunk_ids, document_ids, block, normalized=True)
+            change = ("add", chunk_ids, document_ids, block)
+            self._record(project_id, *change)
+            if added:
+                self._mark_unsaved(project_id, index, [change])
+            return index, added
+
+    def remove_document(self, project_id: str, document_id: str, db: Session) -> int:
+        """Remove a deleted document's chunks from its project's index."""
+        project_id = str(project_id)
+        index = self.get(project_id, db)
+        with self._lock:
+            index = self._current(project_id, index)
+            removed = index.remove_document(document_id)
+            self._record(project_id, "remove", document_id)
+            if removed:
+                self._mark_unsaved(project_id, index, [("remove", document_id)])
+            return removed
+
+    def invalidate(self, project_id: str) -> None:
+        """Drop a project's index from memory and disk (rebuilt on next use)."""
+        project_id = str(project_id)
+        with self._lock:
+            self._indexes.pop(project_id, None)
+            self._unsaved.pop(project_id, None)
+            self._dirty_since.pop(project_id, None)
+            prefix = self._path_prefix(project_id)
+            if prefix is None:
+                return
+            for suffix in (".npy", ".json", ".ivf.npz"):
+                try:
+                    os.remove(f"{prefix}{suffix}")
+                except FileNotFoundError:
+                    pass
+
+
+_manager: Optional[VectorIndexManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_vector_index_manager() -> VectorIndexManager:
+    """Get the process-wide VectorIndexManager (configured from settings)."""
+    global _manager
+    if _manager is None:
+        with _manager_lock:
+            if _manager is None:
+                options: Dict[str, Any] = {}
+                try:
+                    from ..core.config import settings
+
+                    options = {
+                        "storage_dir": settings.VECTOR_INDEX_DIR,
+                        "max_projects": settings.VECTOR_INDEX_MAX_PROJECTS,
+                        "ann_min_chunks": settings.VECTOR_ANN_MIN_CHUNKS,
+                        "ann_lists": settings.VECTOR_ANN_LISTS,
+                        "nprobe": settings.VECTOR_ANN_NPROBE,
+                        "persist_delay_seconds": settings.VECTOR_INDEX_PERSIST_DELAY_SECONDS,
+                    }
+                except Exception:
+                    # Library usage without a configured environment
+                    pass
+                _manager = VectorIndexManager(**options)
+    return _manager
@@ -7,7 +7,7 @@ Used by LSP handlers to fetch specifications, conflicts, and other data.
 
 import asyncio
 import json
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 from dataclasses import dataclass, asdict
 
 import aiohttp
@@ -38,6 +38,19 @@ class Specification:
     created_at: str
     updated_at: str
 
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Specification":
+        """Build from an API specification (extra fields are ignored)"""
+        return cls(
+            id=str(data["id"]),
+            project_id=str(data.get("project_id", "")),
+            key=data["key"],
+            value=data.get("value") or "",
+            category=data.get("category", ""),
+            created_at=data.get("created_at") or "",
+            updated_at=data.get("updated_at") or ""
+        )
+
 
 @dataclass
 class Conflict:
@@ -51,6 +64,21 @@ class Conflict:
     resolved: bool
     created_at: str
 
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Conflict":
+        """Build from an API conflict (backend rows use description/status/detected_at)"""
+        spec_ids = data.get("spec_ids") or []
+        return cls(
+            id=str(data.get("id", "")),
+            project_id=str(data.get("project_id", "")),
+            specification_id=str(data.get("specification_id") or (spec_ids[0] if spec_ids else "")),
+            type=data.get("type", ""),
+            severity=data.get("severity", "medium"),
+            message=data.get("message") or data.get("description", "Specification conflict"),
+            resolved=data.get("resolved", data.get("status") == "resolved"),
+            created_at=data.get("created_at") or data.get("detected_at", "")
+        )
+
 
 class SocratesApiClient:
     """
@@ -94,10 +122,22 @@ class SocratesApiClient:
         params: Optional[Dict] = None
     ) -> Dict[str, Any]:
         """Make HTTP request to API"""
+        _, _, body = await self._send(method, path, json_data=json_data, params=params)
+        return json.loads(body) if body else {}
+
+    async def _send(
+        self,
+        method: str,
+        path: str,
+        json_data: Optional[Dict] = None,
+        params: Optional[Dict] = None,
+        extra_headers: Optional[Dict[str, str]] = None
+    ) -> Tuple[int, Dict[str, str], str]:
+        """Make HTTP request to API, returning (status, headers, body)"""
         await self._ensure_session()
 
         url = f"{self.base_url}{path}"
-        headers = self._build_headers()
+        headers = {**self._build_headers(), **(extra_headers or {})}
 
         try:
             async with self.session.request(
@@ -113,7 +153,7 @@ class SocratesApiClient:
                 if response.status >= 400:
                     raise ApiError(response.status, body)
 
-                return json.loads(body) if body else {}
+                return response.status, dict(response.headers), body
 
         except ClientError as e:
             raise ApiError(0, str(e))
@@ -154,6 +194,52 @@ class SocratesApiClient:
         specs = response.get("specifications", [])
         return [Specification(**s) for s in specs]
 
+    async def get_specifications_since(
+        self,
+        project_id: str,
+        updated_since: Optional[str] = None,
+        etag: Optional[str] = None,
+        page_size: int = 1000
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """
+        Get specifications changed since a delta sync cursor.
+
+        Args:
+            project_id: Project ID
+            updated_since: synced_at of the previous sync (None for everything)
+            etag: ETag of the previous sync's first page
+
+        Returns:
+            ({"specifications", "current_ids", "synced_at"}, or None on
+            304 Not Modified; the first page's ETag)
+        """
+        path = f"/api/v1/projects/{project_id}/specifications"
+        params = {"updated_since": updated_since or "1970-01-01T00:00:00", "limit": page_size, "skip": 0}
+
+        status, headers, body = await self._send(
+            "GET", path, params=params, extra_headers={"If-None-Match": etag} if etag else None
+        )
+        new_etag = headers.get("ETag") or headers.get("etag")
+        if status == 304:
+            return None, new_etag or etag
+
+        data = (json.loads(body) if body else {}).get("data", {})
+        specs = [Specification.from_dict(s) for s in data.get("specifications", [])]
+        synced_at = data.get("synced_at")
+        while len(specs) < data.get("total", 0):
+            params["skip"] = len(specs)
+            page = (await self._request("GET", path, params=params)).get("data", {})
+            if not page.get("specifications"):
+                break
+            specs.extend(Specification.from_dict(s) for s in page["specifications"])
+            synced_at = page.get("synced_at", synced_at)
+
+        return {
+            "specifications": specs,
+            "current_ids": data.get("current_ids"),
+            "synced_at": synced_at
+        }, new_etag
+
     async def get_specification(self, spec_id: str) -> Specification:
         """Get single specification"""
         response = await self._request("GET", f"/api/v1/specifications/{spec_id}")
@@ -182,8 +268,32 @@ class SocratesApiClient:
             "GET",
             f"/api/v1/projects/{project_id}/conflicts"
         )
-        conflicts = response.get("conflicts", [])
-        return [Conflict(**c) for c in conflicts]
+        conflicts = response.get("data", response).get("conflicts", [])
+        return [Conflict.from_dict(c) for c in conflicts]
+
+    async def get_conflicts_if_changed(
+        self,
+        project_id: str,
+        etag: Optional[str] = None
+    ) -> Tuple[Optional[List[Conflict]], Optional[str]]:
+        """
+        Get conflicts for project unless they still match an ETag.
+
+        Returns:
+            (conflicts, or None on 304 Not Modified; the response ETag)
+        """
+        status, headers, body = await self._send(
+            "GET",
+            f"/api/v1/projects/{project_id}/conflicts",
+            extra_headers={"If-None-Match": etag} if etag else None
+        )
+        new_etag = headers.get("ETag") or headers.get("etag")
+        if status == 304:
+            return None, new_etag or etag
+
+        response = json.loads(body) if body else {}
+        conflicts = response.get("data", response).get("conflicts", [])
+        return [Conflict.from_dict(c) for c in conflicts], new_etag
 
     # ============ Code Generation ============
 
@@ -5,7 +5,7 @@ Configuration for Socrates Language Server Protocol server.
 """
 
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 
 @dataclass
@@ -34,19 +34,23 @@ class LSPConfig:
     # Caching Configuration
     cache_ttl: int = int(os.getenv("LSP_CACHE_TTL", "300"))  # 5 minutes
     enable_caching: bool = os.getenv("LSP_ENABLE_CACHING", "true").lower() == "true"
+    conflict_cache_ttl: int = int(os.getenv("LSP_CONFLICT_CACHE_TTL", "30"))  # Seconds before conflicts are revalidated (ETag)
 
     # Sync Configuration
-    text_document_sync_kind: int = int(os.getenv("LSP_SYNC_KIND", "1"))  # 1 = Full, 2 = Incremental
+    text_document_sync_kind: int = int(os.getenv("LSP_SYNC_KIND", "2"))  # 1 = Full, 2 = Incremental
+
+    # Diagnostics Configuration
+    diagnostics_debounce_ms: int = int(os.getenv("LSP_DIAGNOSTICS_DEBOUNCE_MS", "300"))  # Quiet time after an edit before publishing
 
     # Completion Configuration
     max_completion_items: int = int(os.getenv("LSP_MAX_COMPLETIONS", "50"))
-    completion_trigger_chars: list = ["."]
+    completion_trigger_chars: list = field(default_factory=lambda: ["."])
 
     # Code Generation Configuration
     code_gen_timeout: int = int(os.getenv("LSP_CODEGEN_TIMEOUT", "30"))
-    supported_languages: list = [
+    supported_languages: list = field(default_factory=lambda: [
         "python", "javascript", "typescript", "go", "java", "rust", "csharp", "kotlin"
-    ]
+    ])
 
     def __post_init__(self):
         """Validate configuration"""
@@ -56,3 +60,5 @@ class LSPConfig:
             raise ValueError("API timeout must be at least 5 seconds")
         if self.listen_port < 1024:
             raise ValueError("Listen port must be >= 1024")
+        if self.text_document_sync_kind not in (1, 2):
+            raise ValueError("Sync kind must be 1 (Full) or 2 (Incremental)")
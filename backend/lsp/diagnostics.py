@@ -0,0 +1,232 @@
+"""
+Diagnostics scheduling and conflict caching for the Socrates LSP server
+
+Diagnostics come from the project's conflicts, not from the text being
+typed, so recomputing them on every keystroke only produces backend
+traffic. Two pieces keep that down:
+
+- DiagnosticsScheduler debounces publishing per document: a burst of
+  edits publishes once, a short delay after the last edit, and an edit made
+  while a publish is running queues one more publish instead of a
+  concurrent one.
+- ConflictCache keeps each project's conflicts. Entries are served
+  without a request until they expire or are invalidated (server push),
+  then revalidated with If-None-Match, so an unchanged project costs a
+  304. Concurrent lookups of one project share a single request.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# (project_id, etag) -> (conflicts, or None if not modified; new etag)
+ConflictFetch = Callable[[str, Optional[str]], Awaitable[Tuple[Optional[List[Any]], Optional[str]]]]
+
+
+class DiagnosticsScheduler:
+    """Debounced, coalesced diagnostics publishing per document URI."""
+
+    def __init__(
+        self,
+        publish: Callable[[str], Awaitable[None]],
+        delay: float = 0.3,
+        spawn: Optional[Callable[[Awaitable[Any]], asyncio.Task]] = None
+    ):
+        """
+        Args:
+            publish: Coroutine publishing diagnostics for one URI
+            delay: Seconds of quiet after the last edit before publishing
+            spawn: Starts a background task (default: asyncio.ensure_future)
+        """
+        self.publish = publish
+        self.delay = delay
+        self.spawn = spawn or asyncio.ensure_future
+
+        self._timers: Dict[str, asyncio.TimerHandle] = {}
+        self._running: Dict[str, asyncio.Task] = {}
+        self._dirty: Set[str] = set()
+        self._stats = {"scheduled": 0, "published": 0, "coalesced": 0}
+
+    def schedule(self, uri: str, delay: Optional[float] = None) -> None:
+        """
+        Publish diagnostics for a URI once edits pause.
+
+        Args:
+            uri: Document URI
+            delay: Override of the debounce delay (0 publishes on the next loop turn)
+        """
+        self._stats["scheduled"] += 1
+        timer = self._timers.pop(uri, None)
+        if timer is not None:
+            timer.cancel()
+            self._stats["coalesced"] += 1
+
+        loop = asyncio.get_running_loop()
+        self._timers[uri] = loop.call_later(
+            self.delay if delay is None else delay, self._fire, uri
+        )
+
+    def cancel(self, uri: str) -> None:
+        """Drop pending publishing for a URI (document closed)."""
+        timer = self._timers.pop(uri, None)
+        if timer is not None:
+            timer.cancel()
+        self._dirty.discard(uri)
+
+    def pending(self) -> Set[str]:
+        """URIs waiting for their debounce delay."""
+        return set(self._timers)
+
+    def _fire(self, uri: str) -> None:
+        self._timers.pop(uri, None)
+        if uri in self._running:
+            # Publish again when the running one finishes, not concurrently
+            self._dirty.add(uri)
+            return
+        self._running[uri] = self.spawn(self._run(uri))
+
+    async def _run(self, uri: str) -> None:
+        try:
+            await self.publish(uri)
+            self._stats["published"] += 1
+        finally:
+            self._running.pop(uri, None)
+            if uri in self._dirty:
+                self._dirty.discard(uri)
+                self._fire(uri)
+
+    async def close(self) -> None:
+        """Cancel timers and running publishes."""
+        for timer in self._timers.values():
+            timer.cancel()
+        self._timers.clear()
+        self._dirty.clear()
+
+        running = list(self._running.values())
+        for task in running:
+            task.cancel()
+        if running:
+            await asyncio.gather(*running, return_exceptions=True)
+
+    def get_stats(self) -> Dict[str, int]:
+        return dict(self._stats)
+
+
+@dataclass
+class _ConflictEntry:
+    conflicts: List[Any]
+    etag: Optional[str]
+    checked_at: float
+    stale: bool = False
+
+
+class ConflictCache:
+    """Per-project conflicts, revalidated by ETag."""
+
+    def __init__(
+        self,
+        fetch: ConflictFetch,
+        ttl: float = 30.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Args:
+            fetch: Conditional fetch of a project's conflicts
+            ttl: Seconds an entry is served before it is revalidated
+            clock: Monotonic time source
+        """
+        self.fetch = fetch
+        self.ttl = ttl
+        self.clock = clock
+
+        self._entries: Dict[str, _ConflictEntry] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._generations: Dict[str, int] = {}
+        self._stats = {"hits": 0, "fetches": 0, "not_modified": 0, "errors": 0, "shared": 0, "invalidations": 0}
+
+    async def get(self, project_id: str) -> List[Any]:
+        """
+        Conflicts of a project.
+
+        Fresh entries are returned without a request. Otherwise one
+        conditional request is made (shared by concurrent callers); if it
+        fails, the previous conflicts are returned.
+
+        Raises:
+            Exception: The fetch failed and nothing is cached
+        """
+        entry = self._entries.get(project_id)
+        if entry is not None and not entry.stale and self.clock() - entry.checked_at < self.ttl:
+            self._stats["hits"] += 1
+            return entry.conflicts
+
+        inflight = self._inflight.get(project_id)
+        if inflight is not None:
+            self._stats["shared"] += 1
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[project_id] = future
+        try:
+            conflicts = await self._revalidate(project_id, entry)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Mark retrieved; waiters re-raise it themselves
+            raise
+        else:
+            future.set_result(conflicts)
+            return conflicts
+        finally:
+            self._inflight.pop(project_id, None)
+
+    async def _revalidate(self, project_id: str, entry: Optional[_ConflictEntry]) -> List[Any]:
+        generation = self._generations.get(project_id, 0)
+        self._stats["fetches"] += 1
+        try:
+            conflicts, etag = await self.fetch(project_id, entry.etag if entry else None)
+        except Exception as e:
+            self._stats["errors"] += 1
+            if entry is None:
+                raise
+            logger.warning(f"Conflict refresh failed for project {project_id}, serving cached: {e}")
+            return entry.conflicts
+
+        if conflicts is None:
+            if entry is None:
+                raise ValueError(f"Not Modified for project {project_id} without a cached entry")
+            self._stats["not_modified"] += 1
+            conflicts = entry.conflicts
+            etag = etag or entry.etag
+
+        self._entries[project_id] = _ConflictEntry(
+            conflicts=list(conflicts),
+            etag=etag,
+            checked_at=self.clock(),
+            # Invalidated while the request was in flight: check again next time
+            stale=self._generations.get(project_id, 0) != generation
+        )
+        return self._entries[project_id].conflicts
+
+    def invalidate(self, project_id: Optional[str] = None) -> None:
+        """
+        Mark conflicts as changed (all projects if project_id is None).
+
+        The ETag is kept, so the next lookup still revalidates cheaply.
+        """
+        self._stats["invalidations"] += 1
+        project_ids = set(self._entries) | set(self._inflight) if project_id is None else {project_id}
+        for pid in project_ids:
+            self._generations[pid] = self._generations.get(pid, 0) + 1
+            entry = self._entries.get(pid)
+            if entry is not None:
+                entry.stale = True
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self._stats, "projects": len(self._entries)}
@@ -0,0 +1,304 @@
+"""
+Concurrent JSON-RPC dispatch for the Socrates LSP server
+
+Notifications (didOpen, didChange, ...) are handled in arrival order,
+before the next message is read, so document state is always current
+for the requests that follow. Requests run as independent tasks: a slow
+backend call in one request never holds up hover or completion.
+
+Requests are answered exactly once, with an error when they are:
+- cancelled by the client ($/cancelRequest -> RequestCancelled),
+- superseded by a newer request of the same method on the same document
+  (RequestCancelled), or
+- made stale by an edit of their document (ContentModified).
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+from .metrics import LatencyHistogram
+from .transport import MessageWriter, ProtocolError, read_message
+
+# JSON-RPC / LSP error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INTERNAL_ERROR = -32603
+REQUEST_CANCELLED = -32800
+CONTENT_MODIFIED = -32801
+
+# Requests computed from one document position: an edit of the document
+# makes them stale, and a newer request of the same kind supersedes them
+POSITION_REQUESTS = frozenset({
+    "textDocument/hover",
+    "textDocument/completion",
+    "textDocument/definition",
+    "textDocument/references",
+    "textDocument/codeAction",
+    "textDocument/signatureHelp",
+})
+
+# Notifications that change (or drop) a document's content
+DOCUMENT_EDITS = frozenset({"textDocument/didChange", "textDocument/didClose"})
+
+# Requests handled in order, before reading further messages
+SEQUENTIAL_REQUESTS = frozenset({"initialize", "shutdown"})
+
+Handler = Callable[[Dict], Awaitable[Any]]
+
+
+@dataclass
+class PendingRequest:
+    """A request being handled"""
+    id: Any
+    method: str
+    uri: Optional[str]
+    received_at: float
+    task: Optional[asyncio.Task] = None
+    started: bool = False
+    cancel_code: Optional[int] = None
+
+
+def _document_uri(params: Any) -> Optional[str]:
+    if isinstance(params, dict):
+        document = params.get("textDocument")
+        if isinstance(document, dict):
+            return document.get("uri")
+    return None
+
+
+class RequestDispatcher:
+    """Routes incoming messages to handlers and writes their responses."""
+
+    def __init__(
+        self,
+        request_handlers: Dict[str, Handler],
+        notification_handlers: Dict[str, Handler],
+        histogram: Optional[LatencyHistogram] = None,
+        logger: Optional[logging.Logger] = None
+    ):
+        """
+        Args:
+            request_handlers: Method -> coroutine returning the result
+            notification_handlers: Method -> coroutine
+            histogram: Latency histogram to record into
+            logger: Logger (default: module logger)
+        """
+        self.request_handlers = request_handlers
+        self.notification_handlers = notification_handlers
+        self.histogram = histogram or LatencyHistogram()
+        self.logger = logger or logging.getLogger(__name__)
+
+        self.writer: Optional[MessageWriter] = None
+        self._pending: Dict[Any, PendingRequest] = {}
+        self._background: Set[asyncio.Task] = set()
+        self._stopping = False
+
+    # ============ Serving ============
+
+    async def serve(self, reader: asyncio.StreamReader, writer: MessageWriter) -> None:
+        """Handle messages until end of stream or stop()."""
+        self.writer = writer
+        self._stopping = False
+        try:
+            while not self._stopping:
+                try:
+                    message = await read_message(reader)
+                except ProtocolError as e:
+                    self.logger.error(f"Dropping malformed message: {e}")
+                    await self._send_error(None, PARSE_ERROR, str(e))
+                    continue
+                if message is None:
+                    self.logger.info("Client disconnected")
+                    break
+                await self.dispatch(message)
+        finally:
+            await self.close()
+
+    def stop(self) -> None:
+        """Stop serving after the current message."""
+        self._stopping = True
+
+    async def dispatch(self, message: Any) -> None:
+        """Handle one decoded message (requests are started, not awaited)."""
+        if not isinstance(message, dict) or "method" not in message:
+            if isinstance(message, dict) and "id" in message:
+                return  # Response to a server-initiated request
+            await self._send_error(None, INVALID_REQUEST, "Invalid JSON-RPC message")
+            return
+
+        method = message["method"]
+        params = message.get("params") or {}
+
+        if "id" not in message:
+            await self._handle_notification(method, params)
+            return
+
+        pending = PendingRequest(
+            id=message["id"],
+            method=method,
+            uri=_document_uri(params),
+            received_at=asyncio.get_running_loop().time()
+        )
+
+        if method in SEQUENTIAL_REQUESTS:
+            await self._run_request(pending, params)
+            return
+
+        if method in POSITION_REQUESTS and pending.uri:
+            for other in list(self._pending.values()):
+                if other.method == method and other.uri == pending.uri:
+                    self._cancel(other, REQUEST_CANCELLED)
+
+        self._pending[pending.id] = pending
+        pending.task = asyncio.create_task(self._run_request(pending, params))
+
+    async def _handle_notification(self, method: str, params: Dict) -> None:
+        if method == "$/cancelRequest":
+            self.cancel(params.get("id"))
+            return
+
+        if method in DOCUMENT_EDITS:
+            uri = _document_uri(params)
+            if uri:
+                self.invalidate(uri)
+
+        handler = self.notification_handlers.get(method)
+        if handler is None:
+            if not method.startswith("$/"):
+                self.logger.debug(f"Ignoring notification: {method}")
+            return
+
+        started = asyncio.get_running_loop().time()
+        outcome = "ok"
+        try:
+            await handler(params)
+        except Exception as e:
+            outcome = "error"
+            self.logger.error(f"Error handling notification {method}: {e}")
+        self.histogram.observe(method, asyncio.get_running_loop().time() - started, outcome)
+
+    async def _run_request(self, pending: PendingRequest, params: Dict) -> None:
+        handler = self.request_handlers.get(pending.method)
+        outcome = "ok"
+        pending.started = True
+        try:
+            if pending.cancel_code is not None:
+                # Cancelled before it got to run
+                raise asyncio.CancelledError()
+            if handler is None:
+                outcome = "error"
+                response = self._error(pending.id, METHOD_NOT_FOUND, f"Method not found: {pending.method}")
+            else:
+                result = await handler(params)
+                response = {"jsonrpc": "2.0", "id": pending.id, "result": result}
+        except asyncio.CancelledError:
+            if pending.cancel_code is None:
+                raise  # Server shutting down
+            if pending.cancel_code == CONTENT_MODIFIED:
+                outcome = "stale"
+                response = self._error(pending.id, CONTENT_MODIFIED, "Document changed")
+            else:
+                outcome = "cancelled"
+                response = self._error(pending.id, REQUEST_CANCELLED, "Request cancelled")
+        except Exception as e:
+            outcome = "error"
+            self.logger.error(f"Error handling {pending.method}: {e}")
+            response = self._error(pending.id, INTERNAL_ERROR, str(e))
+        finally:
+            # No cancellation once the response is decided
+            self._pending.pop(pending.id, None)
+
+        self.histogram.observe(
+            pending.method, asyncio.get_running_loop().time() - pending.received_at, outcome
+        )
+        await self._send(response)
+
+    # ============ Cancellation ============
+
+    def _cancel(self, pending: PendingRequest, code: int) -> None:
+        if pending.cancel_code is not None or (pending.task is not None and pending.task.done()):
+            return
+        pending.cancel_code = code
+        # A task cancelled before its first step never runs (and never
+        # answers); an unstarted request sees cancel_code when it starts
+        if pending.started and pending.task is not None:
+            pending.task.cancel()
+
+    def cancel(self, request_id: Any) -> bool:
+        """
+        Cancel a running request ($/cancelRequest).
+
+        Returns:
+            True if the request was still running
+        """
+        pending = self._pending.get(request_id)
+        if pending is None:
+            return False
+        self._cancel(pending, REQUEST_CANCELLED)
+        return True
+
+    def invalidate(self, uri: str) -> int:
+        """
+        Drop running position requests on a document that just changed.
+
+        Returns:
+            Number of requests answered with ContentModified
+        """
+        stale = [
+            pending for pending in self._pending.values()
+            if pending.uri == uri and pending.method in POSITION_REQUESTS
+        ]
+        for pending in stale:
+            self._cancel(pending, CONTENT_MODIFIED)
+        return len(stale)
+
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    # ============ Output ============
+
+    @staticmethod
+    def _error(request_id: Any, code: int, message: str) -> Dict[str, Any]:
+        return {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}}
+
+    async def _send_error(self, request_id: Any, code: int, message: str) -> None:
+        await self._send(self._error(request_id, code, message))
+
+    async def _send(self, payload: Dict[str, Any]) -> None:
+        if self.writer is None:
+            self.logger.warning(f"No client connected; dropping {payload.get('method') or 'response'}")
+            return
+        try:
+            await self.writer.write(payload)
+        except (ConnectionError, RuntimeError) as e:
+            self.logger.error(f"Failed to write to client: {e}")
+
+    async def send_notification(self, method: str, params: Optional[Dict] = None) -> None:
+        """Send a notification to the client."""
+        await self._send({"jsonrpc": "2.0", "method": method, "params": params})
+
+    # ============ Background work ============
+
+    def spawn(self, coro: Awaitable[Any]) -> asyncio.Task:
+        """Run work that must not block message handling (errors are logged)."""
+        task = asyncio.ensure_future(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background_done)
+        return task
+
+    def _background_done(self, task: asyncio.Task) -> None:
+        self._background.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            self.logger.error(f"Background task failed: {task.exception()}")
+
+    async def close(self) -> None:
+        """Cancel running requests and background work."""
+        tasks = [pending.task for pending in self._pending.values() if pending.task] + list(self._background)
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        self._pending.clear()
@@ -5,11 +5,12 @@ Implements handler classes for LSP protocol methods.
 Provides specification-aware IDE features through Language Server Protocol.
 """
 
-import re
 import logging
 from typing import Any, Dict, List, Optional, Set, Tuple
 from dataclasses import dataclass
 from ..api.client import SocratesApiClient, Conflict
+from ..spec_index import ReferenceIndex, SpecIndexStore, prefix_at, reference_at
+from ..text_document import TextDocument
 
 logger = logging.getLogger(__name__)
 
@@ -73,77 +74,48 @@ class InitializationHandler:
 class HoverHandler:
     """Handle hover requests with specification details"""
 
-    def __init__(self, api_client: SocratesApiClient):
-        self.api_client = api_client
+    def __init__(self, spec_index: SpecIndexStore):
+        self.spec_index = spec_index
 
     async def get_hover(
         self,
         uri: str,
         line: int,
         character: int,
-        document_text: str,
+        document: TextDocument,
         project_id: Optional[str] = None
     ) -> Optional[Dict]:
         """Get hover information for specification reference"""
         try:
-            # Extract word at position
-            spec_ref = self._extract_specification_reference(document_text, line, character)
-            if not spec_ref:
+            if not project_id:
                 return None
 
-            # Try to find specification by key
-            if project_id:
-                specs = await self.api_client.search_specifications(project_id, spec_ref, limit=1)
-                if specs:
-                    spec = specs[0]
-                    return {
-                        "contents": {
-                            "kind": "markdown",
-                            "value": self._format_specification_hover(spec)
-                        },
-                        "range": {
-                            "start": {"line": line, "character": character - len(spec_ref)},
-                            "end": {"line": line, "character": character}
-                        }
-                    }
+            # Extract reference at position
+            reference = reference_at(document.line(line), character)
+            if not reference:
+                return None
+            spec_ref, start, end = reference
 
-            return None
+            # Look up specification by key in the local index
+            index = await self.spec_index.get(project_id)
+            spec = index.get(spec_ref) if index else None
+            if spec is None:
+                return None
+
+            return {
+                "contents": {
+                    "kind": "markdown",
+                    "value": self._format_specification_hover(spec)
+                },
+                "range": {
+                    "start": {"line": line, "character": start},
+                    "end": {"line": line, "character": end}
+                }
+            }
         except Exception as e:
             logger.error(f"Failed to get hover information: {e}")
             return None
 
-    def _extract_specification_reference(
-        self,
-        document_text: str,
-        line: int,
-        character: int
-    ) -> Optional[str]:
-        """Extract specification reference at cursor position"""
-        lines = document_text.split('\n')
-        if line >= len(lines):
-            return None
-
-        line_text = lines[line]
-        if character > len(line_text):
-            return None
-
-        # Match patterns like @spec.key, spec_key, $KEY
-        pattern = r'[@$]?[\w.]+'
-        match_start = character - 1
-        match_end = character
-
-        while match_start >= 0 and re.match(r'[\w.@$]', line_text[match_start]):
-            match_start -= 1
-        match_start += 1
-
-        while match_end < len(line_text) and re.match(r'[\w.@$]', line_text[match_end]):
-            match_end += 1
-
-        if match_start < match_end:
-            return line_text[match_start:match_end].lstrip('@$')
-
-        return None
-
     def _format_specification_hover(self, spec: Any) -> str:
         """Format specification details for hover display"""
         return f"""# {spec.key}
@@ -164,15 +136,15 @@ class HoverHandler:
 class CompletionHandler:
     """Handle completion requests with specification-aware suggestions"""
 
-    def __init__(self, api_client: SocratesApiClient):
-        self.api_client = api_client
+    def __init__(self, spec_index: SpecIndexStore):
+        self.spec_index = spec_index
 
     async def get_completions(
         self,
         uri: str,
         line: int,
         character: int,
-        document_text: str,
+        document: TextDocument,
         project_id: Optional[str] = None,
         max_items: int = 50
     ) -> List[Dict]:
@@ -182,14 +154,11 @@ class CompletionHandler:
                 return []
 
             # Get word being completed
-            word = self._get_word_at_position(document_text, line, character)
+            word = prefix_at(document.line(line), character)
 
-            # Fetch matching specifications
-            specs = await self.api_client.search_specifications(
-                project_id,
-                word if word else "",
-                limit=max_items
-            )
+            # Matching specifications from the local index (no network hop)
+            index = await self.spec_index.get(project_id)
+            specs = index.complete(word, limit=max_items) if index else []
 
             completions = []
             for spec in specs:
@@ -209,23 +178,6 @@ class CompletionHandler:
             logger.error(f"Failed to get completions: {e}")
             return []
 
-    def _get_word_at_position(self, document_text: str, line: int, character: int) -> str:
-        """Extract word being completed"""
-        lines = document_text.split('\n')
-        if line >= len(lines):
-            return ""
-
-        line_text = lines[line]
-        if character > len(line_text):
-            character = len(line_text)
-
-        start = character - 1
-        while start >= 0 and re.match(r'[\w.]', line_text[start]):
-            start -= 1
-        start += 1
-
-        return line_text[start:character]
-
 
 class DiagnosticsHandler:
     """Handle diagnostic requests for conflict detection"""
@@ -237,27 +189,31 @@ class DiagnosticsHandler:
         """Get diagnostics for document based on conflicts"""
         try:
             conflicts = await self.api_client.get_conflicts(project_id)
-            diagnostics = []
-
-            for conflict in conflicts:
-                severity = self._map_severity(conflict.severity)
-                diagnostics.append({
-                    "range": {
-                        "start": {"line": 0, "character": 0},
-                        "end": {"line": 1, "character": 0}
-                    },
-                    "severity": severity,
-                    "source": "Socrates",
-                    "message": conflict.message,
-                    "code": conflict.id,
-                    "tags": [1] if conflict.type == "deprecated" else []  # DiagnosticTag.Unnecessary
-                })
-
-            return diagnostics
+            return self.to_diagnostics(conflicts)
         except Exception as e:
             logger.error(f"Failed to get diagnostics: {e}")
             return []
 
+    def to_diagnostics(self, conflicts: List[Any]) -> List[Dict]:
+        """Convert conflicts to LSP diagnostics"""
+        diagnostics = []
+
+        for conflict in conflicts:
+            severity = self._map_severity(conflict.severity)
+            diagnostics.append({
+                "range": {
+                    "start": {"line": 0, "character": 0},
+                    "end": {"line": 1, "character": 0}
+                },
+                "severity": severity,
+                "source": "Socrates",
+                "message": conflict.message,
+                "code": conflict.id,
+                "tags": [1] if conflict.type == "deprecated" else []  # DiagnosticTag.Unnecessary
+            })
+
+        return diagnostics
+
     def _map_severity(self, severity_str: str) -> int:
         """Map conflict severity to LSP diagnostic severity"""
         severity_map = {
@@ -272,15 +228,15 @@ class DiagnosticsHandler:
 class DefinitionHandler:
     """Handle definition requests for specifications"""
 
-    def __init__(self, api_client: SocratesApiClient):
-        self.api_client = api_client
+    def __init__(self, spec_index: SpecIndexStore):
+        self.spec_index = spec_index
 
     async def get_definition(
         self,
         uri: str,
         line: int,
         character: int,
-        document_text: str,
+        document: TextDocument,
         project_id: Optional[str] = None
     ) -> Optional[List[Dict]]:
         """Get definition location for specification"""
@@ -289,116 +245,78 @@ class DefinitionHandler:
                 return None
 
             # Extract specification reference
-            spec_ref = self._extract_spec_reference(document_text, line, character)
-            if not spec_ref:
+            reference = reference_at(document.line(line), character)
+            if not reference:
                 return None
 
-            # Search for specification
-            specs = await self.api_client.search_specifications(project_id, spec_ref, limit=1)
-            if not specs:
+            index = await self.spec_index.get(project_id)
+            spec = index.get(reference[0]) if index else None
+            if spec is None:
                 return None
 
             # Return location (in this case, just the specification itself)
-            return [
-                {
-                    "uri": f"socrates://spec/{specs[0].id}",
-                    "range": {
-                        "start": {"line": 0, "character": 0},
-                        "end": {"line": 0, "character": len(spec_ref)}
-                    }
-                }
-            ]
+            return [spec_location(spec)]
         except Exception as e:
             logger.error(f"Failed to get definition: {e}")
             return None
 
-    def _extract_spec_reference(self, document_text: str, line: int, character: int) -> Optional[str]:
-        """Extract specification reference at position"""
-        lines = document_text.split('\n')
-        if line >= len(lines):
-            return None
-
-        line_text = lines[line]
-        pattern = r'[@$]?[\w.]+'
-        match_start = character - 1
-        while match_start >= 0 and re.match(r'[\w.@$]', line_text[match_start]):
-            match_start -= 1
-        match_start += 1
-
-        match_end = character
-        while match_end < len(line_text) and re.match(r'[\w.@$]', line_text[match_end]):
-            match_end += 1
-
-        if match_start < match_end:
-            return line_text[match_start:match_end].lstrip('@$')
-
-        return None
-
 
 class ReferencesHandler:
     """Handle references requests to find specification usage"""
 
-    def __init__(self, api_client: SocratesApiClient):
-        self.api_client = api_client
+    def __init__(self, spec_index: SpecIndexStore, references: ReferenceIndex):
+        self.spec_index = spec_index
+        self.references = references
 
     async def find_references(
         self,
         uri: str,
         line: int,
         character: int,
-        document_text: str,
+        document: TextDocument,
         project_id: Optional[str] = None,
         include_declaration: bool = False
     ) -> List[Dict]:
-        """Find all references to specification in project"""
+        """Find references to specification across open documents"""
         try:
             if not project_id:
                 return []
 
             # Extract specification reference
-            spec_ref = self._extract_spec_reference(document_text, line, character)
-            if not spec_ref:
+            reference = reference_at(document.line(line), character)
+            if not reference:
                 return []
 
-            # Search for specifications
-            specs = await self.api_client.search_specifications(project_id, spec_ref)
+            index = await self.spec_index.get(project_id)
+            spec = index.get(reference[0]) if index else None
+            if spec is None:
+                return []
 
-            references = []
-            for spec in specs:
-                if include_declaration or spec.key != spec_ref:
-                    references.append({
-                        "uri": f"socrates://spec/{spec.id}",
-                        "range": {
-                            "start": {"line": 0, "character": 0},
-                            "end": {"line": 0, "character": len(spec.key)}
-                        }
-                    })
+            references = [spec_location(spec)] if include_declaration else []
+            for ref_uri, ref_line, start, end in self.references.find(spec.key):
+                references.append({
+                    "uri": ref_uri,
+                    "range": {
+                        "start": {"line": ref_line, "character": start},
+                        "end": {"line": ref_line, "character": end}
+                    }
+                })
 
             return references
         except Exception as e:
             logger.error(f"Failed to find references: {e}")
             return []
 
-    def _extract_spec_reference(self, document_text: str, line: int, character: int) -> Optional[str]:
-        """Extract specification reference at position"""
-        lines = document_text.split('\n')
-        if line >= len(lines):
-            return None
-
-        line_text = lines[line]
-        match_start = character - 1
-        while match_start >= 0 and re.match(r'[\w.@$]', line_text[match_start]):
-            match_start -= 1
-        match_start += 1
-
-        match_end = character
-        while match_end < len(line_text) and re.match(r'[\w.@$]', line_text[match_end]):
-            match_end += 1
 
-        if match_start < match_end:
-            return line_text[match_start:match_end].lstrip('@$')
-
-        return None
+def spec_location(spec: Any) -> Dict:
+    """Location of a specification itself"""
+    return {
+        "uri": f"socrates://spec/{spec.id}",
+        "range": {
+            "start": {"line": 0, "character": 0},
+            "end": {"line": 0, "character": len(spec.key)}
+        }
+    }
 
 
 class CodeActionHandler:
@@ -17,7 +17,7 @@ import asyncio
 import json
 import logging
 from typing import Any, Dict, List, Optional, Callable
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
 from datetime import datetime
 
 from .handlers import (
@@ -32,7 +32,12 @@ from .handlers import (
 )
 from .api.client import SocratesApiClient
 from .config import LSPConfig
-from .utils.uri_handler import URIHandler
+from .diagnostics import ConflictCache, DiagnosticsScheduler
+from .dispatcher import RequestDispatcher
+from .metrics import LatencyHistogram
+from .spec_index import ReferenceIndex, SpecIndexStore
+from .text_document import TextDocument
+from .transport import MessageWriter, open_stdio_streams
 
 
 @dataclass
@@ -76,15 +81,22 @@ class SocratesLSPServer:
         self.config = config or LSPConfig()
         self.logger = self._setup_logging()
         self.api_client = SocratesApiClient(base_url=self.config.api_url)
-        self.uri_handler = URIHandler()
+
+        # Specifications are served from a local index kept fresh by delta sync
+        self.spec_index = SpecIndexStore(
+            self.api_client.get_specifications_since,
+            refresh_interval=self.config.cache_ttl,
+            spawn=lambda coro: self.dispatcher.spawn(coro)
+        )
+        self.reference_index = ReferenceIndex()
 
         # Initialize handlers
         self.init_handler = InitializationHandler()
-        self.hover_handler = HoverHandler(self.api_client)
-        self.completion_handler = CompletionHandler(self.api_client)
+        self.hover_handler = HoverHandler(self.spec_index)
+        self.completion_handler = CompletionHandler(self.spec_index)
         self.diagnostics_handler = DiagnosticsHandler(self.api_client)
-        self.definition_handler = DefinitionHandler(self.api_client)
-        self.references_handler = ReferencesHandler(self.api_client)
+        self.definition_handler = DefinitionHandler(self.spec_index)
+        self.references_handler = ReferencesHandler(self.spec_index, self.reference_index)
         self.code_action_handler = CodeActionHandler(self.api_client)
         self.formatting_handler = FormattingHandler()
 
@@ -104,114 +116,61 @@ class SocratesLSPServer:
             "textDocument/references": self.handle_references,
             "textDocument/codeAction": self.handle_code_action,
             "textDocument/formatting": self.handle_formatting,
-            "textDocument/didOpen": self.handle_did_open,
-            "textDocument/didChange": self.handle_did_change,
-            "textDocument/didClose": self.handle_did_close,
+            "socrates/metrics": self.handle_metrics,
         }
 
         self.notification_handlers: Dict[str, Callable] = {
             "initialized": self.handle_initialized,
             "exit": self.handle_exit,
+            "textDocument/didOpen": self.handle_did_open,
+            "textDocument/didChange": self.handle_did_change,
+            "textDocument/didClose": self.handle_did_close,
+            "socrates/conflictsChanged": self.handle_conflicts_changed,
+            "socrates/specificationsChanged": self.handle_specifications_changed,
         }
 
-    async def start(self):
-        """Start the LSP server"""
+        # Requests run concurrently; see dispatcher.py
+        self.latency = LatencyHistogram()
+        self.dispatcher = RequestDispatcher(
+            self.request_handlers,
+            self.notification_handlers,
+            histogram=self.latency,
+            logger=self.logger
+        )
+
+        # Diagnostics are debounced per document and built from cached conflicts
+        self.conflict_cache = ConflictCache(
+            self.api_client.get_conflicts_if_changed,
+            ttl=self.config.conflict_cache_ttl
+        )
+        self.diagnostics_scheduler = DiagnosticsScheduler(
+            self._publish_diagnostics,
+            delay=self.config.diagnostics_debounce_ms / 1000,
+            spawn=self.dispatcher.spawn
+        )
+        self._published_diagnostics: Dict[str, List[Dict]] = {}
+
+    async def start(
+        self,
+        reader: Optional[asyncio.StreamReader] = None,
+        writer: Optional[asyncio.StreamWriter] = None
+    ):
+        """Start the LSP server (on stdin/stdout unless streams are given)"""
         self.logger.info("Starting Socrates LSP Server")
         self.logger.info(f"API URL: {self.config.api_url}")
-        self.logger.info(f"Listen address: {self.config.listen_host}:{self.config.listen_port}")
-
-        # Start server loop
-        while True:
-            try:
-                await self._read_and_process_message()
-            except EOFError:
-                self.logger.info("Client disconnected")
-                break
-            except Exception as e:
-                self.logger.error(f"Error processing message: {e}")
-
-    async def _read_and_process_message(self):
-        """Read JSON-RPC message from stdin and process it"""
-        # Read header
-        headers = {}
-        while True:
-            line = input().strip()
-            if not line:
-                break
-            key, value = line.split(":", 1)
-            headers[key.strip()] = value.strip()
-
-        # Read body
-        content_length = int(headers.get("Content-Length", 0))
-        body = input(content_length)
-        message = json.loads(body)
-
-        # Process message
-        response = await self._process_message(message)
-
-        # Send response if applicable
-        if response:
-            await self._send_response(response)
-
-    async def _process_message(self, message: Dict) -> Optional[JSONRPCResponse]:
-        """Process incoming JSON-RPC message"""
-        msg_id = message.get("id")
-        method = message.get("method", "")
-        params = message.get("params")
-
-        self.logger.debug(f"Received: {method}")
-
-        # Handle request
-        if msg_id is not None:
-            handler = self.request_handlers.get(method)
-            if handler:
-                try:
-                    result = await handler(params or {})
-                    return JSONRPCResponse(
-                        id=msg_id,
-                        result=result
-                    )
-                except Exception as e:
-                    self.logger.error(f"Error handling {method}: {e}")
-                    return JSONRPCResponse(
-                        id=msg_id,
-                        error={
-                            "code": -32603,
-                            "message": str(e)
-                        }
-                    )
-            else:
-                return JSONRPCResponse(
-                    id=msg_id,
-                    error={
-                        "code": -32601,
-                        "message": f"Method not found: {method}"
-                    }
-                )
-
-        # Handle notification
-        elif method in self.notification_handlers:
-            handler = self.notification_handlers[method]
-            try:
-                await handler(params or {})
-            except Exception as e:
-                self.logger.error(f"Error handling notification {method}: {e}")
-
-    async def _send_response(self, response: JSONRPCResponse):
-        """Send JSON-RPC response to client"""
-        body = json.dumps(asdict(response))
-        headers = f"Content-Length: {len(body)}\r\n\r\n"
-        print(headers + body, end="", flush=True)
+
+        if reader is None or writer is None:
+            reader, writer = await open_stdio_streams()
+
+        try:
+            await self.dispatcher.serve(reader, MessageWriter(writer))
+        finally:
+            await self.diagnostics_scheduler.close()
+            self.logger.info(f"Request latency: {json.dumps(self.latency.snapshot())}")
 
     async def _send_notification(self, method: str, params: Optional[Dict] = None):
         """Send JSON-RPC notification to client"""
-        notification = JSONRPCNotification(
-            method=method,
-            params=params
-        )
-        body = json.dumps(asdict(notification))
-        headers = f"Content-Length: {len(body)}\r\n\r\n"
-        print(headers + body, end="", flush=True)
+        await self.dispatcher.send_notification(method, params)
 
     # ============ Request Handlers ============
 
@@ -219,9 +178,23 @@ class SocratesLSPServer:
         """Handle initialize request"""
         self.client_capabilities = params.get("capabilities", {})
 
+        # Project of the workspace, given by the editor extension
+        options = params.get("initializationOptions") or {}
+        if options.get("projectId"):
+            self.project_context = ProjectContext(
+                project_id=options["projectId"],
+                project_name=options.get("projectName", ""),
+                loaded_at=datetime.now()
+            )
+            # Load the project's specifications once, in the background
+            self.spec_index.warm(self.project_context.project_id)
+
         return {
             "capabilities": {
-                "textDocumentSync": 1,  # Full sync
+                "textDocumentSync": {
+                    "openClose": True,
+                    "change": self.config.text_document_sync_kind  # 2 = Incremental
+                },
                 "hoverProvider": True,
                 "completionProvider": {
                     "resolveProvider": True,
@@ -247,6 +220,16 @@ class SocratesLSPServer:
         self.logger.info("Server shutting down")
         return {}
 
+    async def handle_metrics(self, params: Dict) -> Dict:
+        """Handle socrates/metrics request (per-method latency histogram)"""
+        return {
+            "latency": self.latency.snapshot(),
+            "pending_requests": self.dispatcher.pending_count(),
+            "diagnostics": self.diagnostics_scheduler.get_stats(),
+            "conflict_cache": self.conflict_cache.get_stats(),
+            "spec_index": self.spec_index.get_stats()
+        }
+
     async def handle_initialized(self, params: Dict):
         """Handle initialized notification"""
         self.logger.info("Client initialized")
@@ -255,45 +238,59 @@ class SocratesLSPServer:
     async def handle_exit(self, params: Dict):
         """Handle exit notification"""
         self.logger.info("Client exiting")
+        self.dispatcher.stop()
 
     # ============ Document Operations ============
 
     async def handle_did_open(self, params: Dict):
         """Handle textDocument/didOpen notification"""
         uri = params["textDocument"]["uri"]
-        content = params["textDocument"]["text"]
 
         self.open_documents[uri] = DocumentState(
             uri=uri,
-            content=content,
-            language_id=params["textDocument"]["languageId"]
+            document=TextDocument(params["textDocument"]["text"]),
+            language_id=params["textDocument"]["languageId"],
+            version=params["textDocument"].get("version", 1)
         )
+        self.reference_index.update(uri, self.open_documents[uri].document)
 
-        # Publish diagnostics for new document
-        await self._publish_diagnostics(uri)
+        # Publish diagnostics for new document (without waiting for an edit pause)
+        self.diagnostics_scheduler.schedule(uri, delay=0)
 
     async def handle_did_change(self, params: Dict):
         """Handle textDocument/didChange notification"""
         uri = params["textDocument"]["uri"]
 
         if uri in self.open_documents:
-            # Apply changes
+            doc = self.open_documents[uri]
+            doc.version = params["textDocument"].get("version", doc.version + 1)
+
+            # Apply changes in order (ranged changes refer to the text left by the previous one)
             for change in params.get("contentChanges", []):
-                if "range" in change:
-                    # Incremental change
-                    self.open_documents[uri].content = change["text"]
-                else:
-                    # Full document change
-                    self.open_documents[uri].content = change["text"]
-
-            # Publish updated diagnostics
-            await self._publish_diagnostics(uri)
+                doc.document.apply_change(change)
+            self.reference_index.update(uri, doc.document)
+
+            # Publish updated diagnostics once typing pauses
+            self.diagnostics_scheduler.schedule(uri)
 
     async def handle_did_close(self, params: Dict):
         """Handle textDocument/didClose notification"""
         uri = params["textDocument"]["uri"]
         if uri in self.open_documents:
             del self.open_documents[uri]
+        self.diagnostics_scheduler.cancel(uri)
+        self._published_diagnostics.pop(uri, None)
+        self.reference_index.remove(uri)
+
+    async def handle_conflicts_changed(self, params: Dict):
+        """Handle socrates/conflictsChanged notification (conflicts pushed as changed)"""
+        self.conflict_cache.invalidate(params.get("projectId"))
+        for uri in self.open_documents:
+            self.diagnostics_scheduler.schedule(uri)
+
+    async def handle_specifications_changed(self, params: Dict):
+        """Handle socrates/specificationsChanged notification (delta sync on next lookup)"""
+        self.spec_index.invalidate(params.get("projectId"))
 
     # ============ Intelligence Handlers ============
 
@@ -303,7 +300,11 @@ class SocratesLSPServer:
         line = params["position"]["line"]
         character = params["position"]["character"]
 
-        return await self.hover_handler.get_hover(uri, line, character)
+        if uri not in self.open_documents:
+            return None
+        return await self.hover_handler.get_hover(
+            uri, line, character, self.open_documents[uri].document, self._extract_project_id(uri)
+        )
 
     async def handle_completion(self, params: Dict) -> Dict:
         """Handle textDocument/completion request"""
@@ -311,9 +312,15 @@ class SocratesLSPServer:
         line = params["position"]["line"]
         character = params["position"]["character"]
 
-        completions = await self.completion_handler.get_completions(uri, line, character)
+        completions = []
+        if uri in self.open_documents:
+            completions = await self.completion_handler.get_completions(
+                uri, line, character, self.open_documents[uri].document,
+                self._extract_project_id(uri), max_items=self.config.max_completion_items
+            )
         return {
-            "isIncomplete": False,
+            # Possibly more matches: the client asks again as the prefix grows
+            "isIncomplete": len(completions) >= self.config.max_completion_items,
             "items": completions
         }
 
@@ -323,7 +330,11 @@ class SocratesLSPServer:
         line = params["position"]["line"]
         character = params["position"]["character"]
 
-        return await self.definition_handler.get_definition(uri, line, character)
+        if uri not in self.open_documents:
+            return None
+        return await self.definition_handler.get_definition(
+            uri, line, character, self.open_documents[uri].document, self._extract_project_id(uri)
+        )
 
     async def handle_references(self, params: Dict) -> List[Dict]:
         """Handle textDocument/references request"""
@@ -332,8 +343,11 @@ class SocratesLSPServer:
         character = params["position"]["character"]
         include_declaration = params.get("context", {}).get("includeDeclaration", False)
 
+        if uri not in self.open_documents:
+            return []
         return await self.references_handler.find_references(
-            uri, line, character, include_declaration
+            uri, line, character, self.open_documents[uri].document,
+            self._extract_project_id(uri), include_declaration
         )
 
     async def handle_code_action(self, params: Dict) -> List[Dict]:
@@ -357,7 +371,7 @@ class SocratesLSPServer:
                 return [{
                     "range": {
                         "start": {"line": 0, "character": 0},
-                        "end": {"line": len(doc.content.splitlines()), "character": 0}
+                        "end": doc.document.end_position()
                     },
                     "newText": formatted
                 }]
@@ -377,35 +391,23 @@ class SocratesLSPServer:
         if uri not in self.open_documents:
             return
 
-        doc = self.open_documents[uri]
-        diagnostics = []
-
         try:
             # Extract project context from URI
             project_id = self._extract_project_id(uri)
             if not project_id:
                 return
 
-            # Get conflicts from API
-            conflicts = await self.api_client.get_conflicts(project_id)
+            # Conflicts are cached per project and revalidated by ETag
+            conflicts = await self.conflict_cache.get(project_id)
+            diagnostics = self.diagnostics_handler.to_diagnostics(conflicts)
 
-            # Convert conflicts to diagnostics
-            for conflict in conflicts:
-                diagnostic = {
-                    "range": {
-                        "start": {"line": 0, "character": 0},
-                        "end": {"line": 1, "character": 0}
-                    },
-                    "severity": self._severity_to_lsp(conflict.get("severity", "medium")),
-                    "source": "Socrates",
-                    "message": conflict.get("message", "Specification conflict"),
-                    "code": conflict.get("id")
-                }
-                diagnostics.append(diagnostic)
+            if uri not in self.open_documents or self._published_diagnostics.get(uri) == diagnostics:
+                return  # Closed meanwhile, or the client already has these
+            self._published_diagnostics[uri] = diagnostics
 
-            # Publish diagnostics
             await self._send_notification("textDocument/publishDiagnostics", {
                 "uri": uri,
+                "version": self.open_documents[uri].version,
                 "diagnostics": diagnostics
             })
 
@@ -431,27 +433,19 @@ class SocratesLSPServer:
         # Would parse workspace root or metadata
         return self.project_context.project_id if self.project_context else None
 
-    def _severity_to_lsp(self, severity: str) -> int:
-        """Convert conflict severity to LSP diagnostic severity"""
-        severity_map = {
-            "error": 1,
-            "high": 1,
-            "medium": 2,
-            "warning": 2,
-            "low": 3,
-            "info": 3
-        }
-        return severity_map.get(severity.lower(), 3)
-
 
 @dataclass
 class DocumentState:
     """State of an open document"""
     uri: str
-    content: str
+    document: TextDocument
     language_id: str
     version: int = 1
 
+    @property
+    def content(self) -> str:
+        return self.document.text
+
 
 @dataclass
 class ProjectContext:
@@ -0,0 +1,91 @@
+"""
+Request latency metrics for the Socrates LSP server
+
+A fixed-bucket histogram per LSP method: recording is O(buckets) with no
+per-request allocation, and percentiles are estimated from the buckets.
+"""
+
+from bisect import bisect_left
+from typing import Dict, List, Optional, Sequence
+
+# Bucket upper bounds in milliseconds (a final +inf bucket is implicit)
+DEFAULT_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class _MethodHistogram:
+    __slots__ = ("counts", "total", "sum_ms", "max_ms")
+
+    def __init__(self, bucket_count: int):
+        self.counts = [0] * (bucket_count + 1)
+        self.total = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+
+
+class LatencyHistogram:
+    """Latency distribution of handled requests, per method and outcome."""
+
+    def __init__(self, buckets_ms: Sequence[float] = DEFAULT_BUCKETS_MS):
+        self.buckets_ms = tuple(sorted(buckets_ms))
+        self._methods: Dict[str, _MethodHistogram] = {}
+        self._outcomes: Dict[str, Dict[str, int]] = {}
+
+    def observe(self, method: str, seconds: float, outcome: str = "ok") -> None:
+        """
+        Record one request.
+
+        Args:
+            method: LSP method name
+            seconds: Time from receipt to response
+            outcome: ok, error, cancelled or stale
+        """
+        ms = seconds * 1000
+        histogram = self._methods.get(method)
+        if histogram is None:
+            histogram = self._methods[method] = _MethodHistogram(len(self.buckets_ms))
+        histogram.counts[bisect_left(self.buckets_ms, ms)] += 1
+        histogram.total += 1
+        histogram.sum_ms += ms
+        histogram.max_ms = max(histogram.max_ms, ms)
+
+        outcomes = self._outcomes.setdefault(method, {})
+        outcomes[outcome] = outcomes.get(outcome, 0) + 1
+
+    def percentile(self, method: str, fraction: float) -> Optional[float]:
+        """
+        Estimated latency (ms) below which `fraction` of requests fall.
+
+        Returns the upper bound of the bucket holding that rank (the
+        observed maximum for the open-ended last bucket), or None if the
+        method has no samples.
+        """
+        histogram = self._methods.get(method)
+        if histogram is None or histogram.total == 0:
+            return None
+
+        rank = max(1, round(fraction * histogram.total))
+        seen = 0
+        for index, count in enumerate(histogram.counts):
+            seen += count
+            if seen >= rank:
+                if index < len(self.buckets_ms):
+                    return min(float(self.buckets_ms[index]), histogram.max_ms)
+                return histogram.max_ms
+        return histogram.max_ms
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """Per-method counts, mean, p50/p95/p99, max and bucket counts."""
+        labels: List[str] = [f"le_{bound:g}ms" for bound in self.buckets_ms] + ["le_inf"]
+        result = {}
+        for method, histogram in sorted(self._methods.items()):
+            result[method] = {
+                "count": histogram.total,
+                "outcomes": dict(self._outcomes.get(method, {})),
+                "mean_ms": round(histogram.sum_ms / histogram.total, 3),
+                "p50_ms": self.percentile(method, 0.50),
+                "p95_ms": self.percentile(method, 0.95),
+                "p99_ms": self.percentile(method, 0.99),
+                "max_ms": round(histogram.max_ms, 3),
+                "buckets": dict(zip(labels, histogram.counts)),
+            }
+        return result
@@ -0,0 +1,397 @@
+"""
+Local specification index for the Socrates LSP server
+
+Completion, hover, definition and references are answered from memory
+instead of one backend request per keystroke:
+
+- SpecIndex holds one project's specifications: a key -> spec map for
+  hover and definition, and a sorted array of case-folded keys for
+  prefix completion (bisect to the first match, then scan).
+- SpecIndexStore warms a project's index once (at initialize) and keeps
+  it fresh with delta syncs: only specifications changed since the last
+  sync are fetched, revalidated by ETag, so an unchanged project costs a
+  304. Lookups never wait for a refresh, only for the first warm-up.
+  updated_at is the writing transaction's start time, so a specification
+  committed late can sort before the cursor. The server hands back a
+  cursor that trails the newest change by a safety margin, so such
+  writes are sent again on the next sync and replace the indexed copy by
+  ID. As a backstop for writes later than the margin, an index missing
+  any ID in current_ids is reloaded whole.
+- ReferenceIndex maps reference tokens to their positions in the open
+  documents for find-references. Edited documents are re-scanned lazily,
+  on the next lookup rather than on every keystroke.
+"""
+
+import asyncio
+import logging
+import re
+import time
+from bisect import bisect_left, insort
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from .text_document import TextDocument, index_to_utf16, utf16_to_index
+
+logger = logging.getLogger(__name__)
+
+# Characters of a specification reference such as @security.auth_method
+_REFERENCE_CHARS = re.compile(r"[\w.@$]+")
+
+# (project_id, updated_since, etag) -> ({"specifications", "current_ids", "synced_at"},
+# or None if not modified; new etag)
+SpecFetch = Callable[
+    [str, Optional[str], Optional[str]],
+    Awaitable[Tuple[Optional[Dict[str, Any]], Optional[str]]]
+]
+
+
+def _clean_reference(token: str) -> Tuple[int, str]:
+    """Strip sigils and trailing dots; returns (characters stripped in front, key)."""
+    key = token.lstrip("@$")
+    return len(token) - len(key), key.rstrip(".")
+
+
+def reference_at(line_text: str, character: int) -> Optional[Tuple[str, int, int]]:
+    """
+    Specification reference under the cursor.
+
+    Args:
+        line_text: Line without its terminator
+        character: UTF-16 offset of the cursor
+
+    Returns:
+        (key, start, end) with UTF-16 offsets, or None
+    """
+    index = utf16_to_index(line_text, character)
+    for match in _REFERENCE_CHARS.finditer(line_text):
+        if match.start() > index:
+            break
+        if match.end() >= index:
+            stripped, key = _clean_reference(match.group())
+            if not key:
+                return None
+            start = match.start() + stripped
+            return (
+                key,
+                index_to_utf16(line_text, start),
+                index_to_utf16(line_text, start + len(key))
+            )
+    return None
+
+
+def prefix_at(line_text: str, character: int) -> str:
+    """Reference text typed before the cursor (what completion completes)."""
+    index = utf16_to_index(line_text, character)
+    start = index
+    while start > 0 and (line_text[start - 1].isalnum() or line_text[start - 1] in "_."):
+        start -= 1
+    return line_text[start:index]
+
+
+class SpecIndex:
+    """Specifications of one project, indexed by key."""
+
+    def __init__(self):
+        self._by_id: Dict[str, Any] = {}
+        self._by_key: Dict[str, Dict[str, Any]] = {}  # key -> {spec id: spec}
+        self._sorted_keys: List[Tuple[str, str]] = []  # (case-folded key, key)
+        self._folded: Dict[str, str] = {}  # case-folded key -> key
+
+        # Delta sync state
+        self.synced_at: Optional[str] = None
+        self.etag: Optional[str] = None
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    # ============ Lookups ============
+
+    def get(self, key: str) -> Optional[Any]:
+        """Specification with this key (exact, else case-insensitive)."""
+        specs = self._by_key.get(key)
+        if specs is None:
+            folded = self._folded.get(key.casefold())
+            specs = self._by_key.get(folded) if folded is not None else None
+        return next(iter(specs.values())) if specs else None
+
+    def get_by_id(self, spec_id: str) -> Optional[Any]:
+        return self._by_id.get(spec_id)
+
+    def complete(self, prefix: str, limit: int = 50) -> List[Any]:
+        """
+        Specifications whose key starts with prefix (case-insensitive), by key.
+
+        Args:
+            prefix: Text typed so far ("" lists keys from the start)
+            limit: Maximum number of specifications
+        """
+        folded_prefix = prefix.casefold()
+        results = []
+        position = bisect_left(self._sorted_keys, (folded_prefix, ""))
+        while position < len(self._sorted_keys) and len(results) < limit:
+            folded, key = self._sorted_keys[position]
+            if not folded.startswith(folded_prefix):
+                break
+            results.extend(list(self._by_key[key].values())[:limit - len(results)])
+            position += 1
+        return results
+
+    # ============ Updates ============
+
+    def replace(self, specs: Iterable[Any]) -> None:
+        """Replace the whole index."""
+        self._by_id.clear()
+        self._by_key.clear()
+        self._folded.clear()
+        for spec in specs:
+            self._by_id[str(spec.id)] = spec
+            self._by_key.setdefault(spec.key, {})[str(spec.id)] = spec
+        self._sorted_keys = sorted((key.casefold(), key) for key in self._by_key)
+        self._folded = {folded: key for folded, key in reversed(self._sorted_keys)}
+
+    def apply_delta(self, specs: Iterable[Any], current_ids: Optional[Iterable[str]] = None) -> int:
+        """
+        Apply changed specifications and drop deleted ones.
+
+        Args:
+            specs: Specifications added or changed since the last sync
+            current_ids: IDs of all current specifications (None: no deletions known)
+
+        Returns:
+            Number of specifications added, changed or removed
+        """
+        changed = 0
+        for spec in specs:
+            self._remove(str(spec.id))
+            self._add(spec)
+            changed += 1
+
+        if current_ids is not None:
+            keep = set(current_ids)
+            for spec_id in [spec_id for spec_id in self._by_id if spec_id not in keep]:
+                self._remove(spec_id)
+                changed += 1
+        return changed
+
+    def missing_ids(self, ids: Iterable[str]) -> List[str]:
+        """IDs that are not in the index."""
+        return [spec_id for spec_id in ids if spec_id not in self._by_id]
+
+    def _add(self, spec: Any) -> None:
+        spec_id = str(spec.id)
+        self._by_id[spec_id] = spec
+        specs = self._by_key.setdefault(spec.key, {})
+        specs[spec_id] = spec
+        if len(specs) == 1:
+            folded = spec.key.casefold()
+            insort(self._sorted_keys, (folded, spec.key))
+            self._folded.setdefault(folded, spec.key)
+
+    def _remove(self, spec_id: str) -> None:
+        spec = self._by_id.pop(spec_id, None)
+        if spec is None:
+            return
+        specs = self._by_key[spec.key]
+        del specs[spec_id]
+        if specs:
+            return
+
+        del self._by_key[spec.key]
+        folded = spec.key.casefold()
+        entry = (folded, spec.key)
+        position = bisect_left(self._sorted_keys, entry)
+        if position < len(self._sorted_keys) and self._sorted_keys[position] == entry:
+            del self._sorted_keys[position]
+        if self._folded.get(folded) == spec.key:
+            # Another key differing only in case takes over
+            position = bisect_left(self._sorted_keys, (folded, ""))
+            if position < len(self._sorted_keys) and self._sorted_keys[position][0] == folded:
+                self._folded[folded] = self._sorted_keys[position][1]
+            else:
+                del self._folded[folded]
+
+
+class SpecIndexStore:
+    """Spec indexes per project, warmed once and kept fresh by delta sync."""
+
+    def __init__(
+        self,
+        fetch: SpecFetch,
+        refresh_interval: float = 300.0,
+        spawn: Optional[Callable[[Awaitable[Any]], asyncio.Task]] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Args:
+            fetch: Delta fetch of a project's specifications
+            refresh_interval: Seconds before an index is synced again
+            spawn: Starts a background task (default: asyncio.ensure_future)
+            clock: Monotonic time source
+        """
+        self.fetch = fetch
+        self.refresh_interval = refresh_interval
+        self.spawn = spawn or asyncio.ensure_future
+        self.clock = clock
+
+        self._indexes: Dict[str, SpecIndex] = {}
+        self._checked_at: Dict[str, float] = {}
+        self._stale: Set[str] = set()
+        self._syncing: Dict[str, asyncio.Task] = {}
+        self._stats = {"lookups": 0, "syncs": 0, "not_modified": 0, "changes": 0, "reloads": 0, "errors": 0}
+
+    def warm(self, project_id: str) -> asyncio.Task:
+        """Start loading a project's index (initialize); lookups wait for it."""
+        return self._start_sync(project_id)
+
+    async def get(self, project_id: str) -> Optional[SpecIndex]:
+        """
+        Index of a project.
+
+        Waits only while the project has never been loaded; a due refresh
+        runs in the background and the current index is returned.
+
+        Returns:
+            The index, or None if the project could not be loaded
+        """
+        self._stats["lookups"] += 1
+        index = self._indexes.get(project_id)
+        if index is None:
+            try:
+                await asyncio.shield(self._start_sync(project_id))
+            except Exception as e:
+                logger.error(f"Failed to load specifications of project {project_id}: {e}")
+            return self._indexes.get(project_id)
+
+        if project_id in self._stale or self.clock() - self._checked_at.get(project_id, 0) >= self.refresh_interval:
+            self._start_sync(project_id)
+        return index
+
+    def invalidate(self, project_id: Optional[str] = None) -> None:
+        """Mark indexes as changed (server push); the next lookup syncs."""
+        project_ids = set(self._indexes) if project_id is None else {project_id}
+        self._stale.update(project_ids)
+
+    def _start_sync(self, project_id: str) -> asyncio.Task:
+        task = self._syncing.get(project_id)
+        if task is None:
+            task = self._syncing[project_id] = self.spawn(self.sync(project_id))
+        return task
+
+    async def sync(self, project_id: str) -> int:
+        """
+        Fetch changes since the last sync and apply them.
+
+        Returns:
+            Number of specifications added, changed or removed
+        """
+        self._stale.discard(project_id)
+        index = self._indexes.get(project_id)
+        self._stats["syncs"] += 1
+        try:
+            delta, etag = await self.fetch(
+                project_id,
+                index.synced_at if index else None,
+                index.etag if index else None
+            )
+            if delta is None:
+                if index is None:
+                    raise ValueError(f"Not Modified for project {project_id} without an index")
+                self._stats["not_modified"] += 1
+                return 0
+
+            if index is None:
+                index = SpecIndex()
+                index.replace(delta["specifications"])
+                changed = len(index)
+            else:
+                current_ids = delta.get("current_ids")
+                changed = index.apply_delta(delta["specifications"], current_ids)
+                if current_ids is not None and index.missing_ids(current_ids):
+                    # Committed behind the cursor and its overlap: reload
+                    self._stats["reloads"] += 1
+                    delta, etag = await self.fetch(project_id, None, None)
+                    index.replace(delta["specifications"])
+                    changed += len(index)
+            index.synced_at = delta.get("synced_at") or index.synced_at
+            index.etag = etag
+            self._indexes[project_id] = index
+            self._stats["changes"] += changed
+            return changed
+        except Exception:
+            self._stats["errors"] += 1
+            raise
+        finally:
+            self._checked_at[project_id] = self.clock()
+            self._syncing.pop(project_id, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "projects": len(self._indexes),
+            "specifications": sum(len(index) for index in self._indexes.values()),
+        }
+
+
+class ReferenceIndex:
+    """Positions of reference tokens in open documents."""
+
+    def __init__(self):
+        self._documents: Dict[str, TextDocument] = {}
+        self._dirty: Set[str] = set()
+        self._positions: Dict[str, Dict[str, List[Tuple[int, int, int]]]] = {}  # uri -> key -> ranges
+        self._uris_by_key: Dict[str, Set[str]] = {}
+
+    def update(self, uri: str, document: TextDocument) -> None:
+        """Record that a document was opened or edited (scanned on next lookup)."""
+        self._documents[uri] = document
+        self._dirty.add(uri)
+
+    def remove(self, uri: str) -> None:
+        """Forget a closed document."""
+        self._documents.pop(uri, None)
+        self._dirty.discard(uri)
+        self._unindex(uri)
+
+    def find(self, key: str) -> List[Tuple[str, int, int, int]]:
+        """
+        Occurrences of a key.
+
+        Returns:
+            (uri, line, start, end) with UTF-16 offsets, by URI and position
+        """
+        self._flush()
+        results = []
+        for uri in sorted(self._uris_by_key.get(key, ())):
+            results.extend((uri, *position) for position in self._positions[uri][key])
+        return results
+
+    def _flush(self) -> None:
+        for uri in self._dirty:
+            self._unindex(uri)
+            self._index(uri, self._documents[uri])
+        self._dirty.clear()
+
+    def _index(self, uri: str, document: TextDocument) -> None:
+        positions: Dict[str, List[Tuple[int, int, int]]] = {}
+        for number, line in enumerate(document.lines()):
+            for match in _REFERENCE_CHARS.finditer(line):
+                stripped, key = _clean_reference(match.group())
+                if not key:
+                    continue
+                start = match.start() + stripped
+                if line.isascii():
+                    span = (number, start, start + len(key))
+                else:
+                    span = (number, index_to_utf16(line, start), index_to_utf16(line, start + len(key)))
+                positions.setdefault(key, []).append(span)
+
+        self._positions[uri] = positions
+        for key in positions:
+            self._uris_by_key.setdefault(key, set()).add(uri)
+
+    def _unindex(self, uri: str) -> None:
+        for key in self._positions.pop(uri, {}):
+            uris = self._uris_by_key.get(key)
+            if uris is not None:
+                uris.discard(uri)
+                if not uris:
+                    del self._uris_by_key[key]
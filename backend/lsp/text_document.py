@@ -0,0 +1,220 @@
+"""
+Open document text for the Socrates LSP server
+
+Documents are stored as lines grouped into blocks of up to BLOCK_SIZE
+lines, with the first line number of every block kept in a sorted list.
+An incremental edit (textDocumentSync = 2) finds its lines by bisecting
+the block starts and only rewrites the lines it touches, so applying it
+costs O(edit size + block size + block count) instead of re-splitting
+the whole document.
+
+Positions are LSP positions: zero-based line and UTF-16 code unit
+offset. Positions past the end of a line or document are clamped, as
+the specification requires.
+"""
+
+import re
+from bisect import bisect_right
+from itertools import chain
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Lines per block; blocks are split at twice this size
+BLOCK_SIZE = 512
+
+# UTF-16 offset past the end of any line
+_END_OF_LINE = 1 << 31
+
+# Line terminators recognised by LSP
+_LINE_BREAK = re.compile(r"\r\n|\r|\n")
+
+
+def split_lines(text: str) -> List[str]:
+    """
+    Split text into lines that keep their terminators.
+
+    The last line never has a terminator, so "a\\n" is ["a\\n", ""] and
+    the empty document is [""].
+    """
+    lines = []
+    start = 0
+    for match in _LINE_BREAK.finditer(text):
+        lines.append(text[start:match.end()])
+        start = match.end()
+    lines.append(text[start:])
+    return lines
+
+
+def _content_length(line: str) -> int:
+    """Length of a line without its terminator."""
+    if line.endswith("\r\n"):
+        return len(line) - 2
+    if line.endswith(("\n", "\r")):
+        return len(line) - 1
+    return len(line)
+
+
+def utf16_to_index(line: str, character: int) -> int:
+    """
+    Convert a UTF-16 offset within a line to a string index.
+
+    Args:
+        line: Line text (terminator is ignored)
+        character: UTF-16 code unit offset
+
+    Returns:
+        Index into line, clamped to the end of its content
+    """
+    end = _content_length(line)
+    if character <= 0:
+        return 0
+    if line.isascii():
+        return min(character, end)
+
+    units = 0
+    for index in range(end):
+        units += 2 if ord(line[index]) > 0xFFFF else 1
+        if units > character:
+            return index  # Inside a surrogate pair: stay before it
+        if units == character:
+            return index + 1
+    return end
+
+
+def index_to_utf16(line: str, index: int) -> int:
+    """Convert a string index within a line to a UTF-16 offset."""
+    prefix = line[:index]
+    if prefix.isascii():
+        return len(prefix)
+    return len(prefix) + sum(1 for char in prefix if ord(char) > 0xFFFF)
+
+
+class TextDocument:
+    """Line-indexed text of one open document."""
+
+    def __init__(self, text: str = ""):
+        self._blocks: List[List[str]] = []
+        self._starts: List[int] = []
+        self._line_count = 0
+        self._text: Optional[str] = None
+        self.set_text(text)
+
+    # ============ Reading ============
+
+    @property
+    def text(self) -> str:
+        """Whole document (joined once per version)."""
+        if self._text is None:
+            self._text = "".join(chain.from_iterable(self._blocks))
+        return self._text
+
+    @property
+    def line_count(self) -> int:
+        return self._line_count
+
+    def line(self, number: int) -> str:
+        """Line text without its terminator ("" past the end)."""
+        if number < 0 or number >= self._line_count:
+            return ""
+        raw = self._raw(number)
+        return raw[:_content_length(raw)]
+
+    def lines(self) -> Iterator[str]:
+        """Iterate line texts without terminators."""
+        for block in self._blocks:
+            for raw in block:
+                yield raw[:_content_length(raw)]
+
+    def end_position(self) -> Dict[str, int]:
+        """LSP position of the end of the document."""
+        last = self._line_count - 1
+        text = self.line(last)
+        return {"line": last, "character": index_to_utf16(text, len(text))}
+
+    # ============ Editing ============
+
+    def set_text(self, text: str) -> None:
+        """Replace the whole document."""
+        lines = split_lines(text)
+        self._blocks = [lines[i:i + BLOCK_SIZE] for i in range(0, len(lines), BLOCK_SIZE)]
+        self._reindex(0)
+        self._text = text
+
+    def apply_change(self, change: Dict) -> None:
+        """
+        Apply one TextDocumentContentChangeEvent.
+
+        Args:
+            change: {"text": ...} for a full replacement, or
+                {"range": {"start": ..., "end": ...}, "text": ...}
+        """
+        edit_range = change.get("range")
+        if edit_range is None:
+            self.set_text(change["text"])
+            return
+        self.replace(edit_range["start"], edit_range["end"], change["text"])
+
+    def replace(self, start: Dict[str, int], end: Dict[str, int], new_text: str) -> None:
+        """Replace the text between two LSP positions."""
+        first, start_line, start_index = self._resolve(start)
+        last, end_line, end_index = self._resolve(end)
+        if (last, end_index) < (first, start_index):
+            last, end_line, end_index = first, start_line, start_index
+
+        text = start_line[:start_index] + new_text + end_line[end_index:]
+        # A "\r" and "\n" brought together by the edit are one line break
+        if first > 0 and text.startswith("\n") and self._raw(first - 1).endswith("\r"):
+            first -= 1
+            text = self._raw(first) + text
+
+        lines = split_lines(text)
+        if last < self._line_count - 1:
+            lines.pop()  # text ends with end_line's terminator
+        self._replace_lines(first, last, lines)
+
+    # ============ Internals ============
+
+    def _resolve(self, position: Dict[str, int]) -> Tuple[int, str, int]:
+        """Line number, raw line and string index of a (clamped) position."""
+        number = position["line"]
+        if number < 0:
+            number, character = 0, 0
+        elif number >= self._line_count:
+            number, character = self._line_count - 1, _END_OF_LINE
+        else:
+            character = position["character"]
+        raw = self._raw(number)
+        return number, raw, utf16_to_index(raw, character)
+
+    def _raw(self, number: int) -> str:
+        block, offset = self._locate(number)
+        return self._blocks[block][offset]
+
+    def _locate(self, number: int) -> Tuple[int, int]:
+        block = bisect_right(self._starts, number) - 1
+        return block, number - self._starts[block]
+
+    def _replace_lines(self, first: int, last: int, new_lines: List[str]) -> None:
+        first_block, first_offset = self._locate(first)
+        last_block, last_offset = self._locate(last)
+
+        merged = (
+            self._blocks[first_block][:first_offset]
+            + new_lines
+            + self._blocks[last_block][last_offset + 1:]
+        )
+        if len(merged) > 2 * BLOCK_SIZE:
+            replacement = [merged[i:i + BLOCK_SIZE] for i in range(0, len(merged), BLOCK_SIZE)]
+        else:
+            replacement = [merged]
+        self._blocks[first_block:last_block + 1] = replacement
+        self._reindex(first_block)
+        self._text = None
+
+    def _reindex(self, from_block: int) -> None:
+        """Recompute block starts from a block onwards."""
+        del self._starts[from_block:]
+        line = self._starts[-1] + len(self._blocks[from_block - 1]) if from_block else 0
+        for block in self._blocks[from_block:]:
+            self._starts.append(line)
+            line += len(block)
+        self._line_count = line
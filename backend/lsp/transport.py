@@ -0,0 +1,118 @@
+"""
+JSON-RPC transport for the Socrates LSP server
+
+Reads and writes LSP base-protocol messages (Content-Length framed JSON)
+on asyncio byte streams. On stdio the streams are non-blocking pipes, so
+waiting for the editor never blocks the event loop.
+"""
+
+import asyncio
+import json
+import logging
+import sys
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Largest message body accepted (a whole document in didOpen fits easily)
+MAX_CONTENT_LENGTH = 64 * 1024 * 1024
+
+
+class ProtocolError(Exception):
+    """Malformed message framing"""
+
+
+async def read_message(reader: asyncio.StreamReader) -> Optional[Dict[str, Any]]:
+    """
+    Read one framed JSON-RPC message.
+
+    Args:
+        reader: Byte stream from the client
+
+    Returns:
+        Decoded message, or None at end of stream
+
+    Raises:
+        ProtocolError: Missing/invalid Content-Length or invalid JSON body
+    """
+    content_length = None
+    headers_seen = False
+
+    while True:
+        line = await reader.readline()
+        if not line:
+            return None  # EOF (possibly mid-header: the client went away)
+        line = line.rstrip(b"\r\n")
+        if not line:
+            if not headers_seen:
+                continue  # Stray blank line between messages
+            if content_length is None:
+                raise ProtocolError("Missing Content-Length header")
+            break
+        headers_seen = True
+
+        name, _, value = line.decode("ascii", errors="replace").partition(":")
+        if name.strip().lower() == "content-length":
+            try:
+                content_length = int(value.strip())
+            except ValueError:
+                raise ProtocolError(f"Invalid Content-Length: {value.strip()!r}")
+        # Content-Type is always utf-8 JSON in practice; other headers are ignored
+
+    if content_length < 0 or content_length > MAX_CONTENT_LENGTH:
+        raise ProtocolError(f"Unsupported Content-Length: {content_length}")
+
+    try:
+        body = await reader.readexactly(content_length)
+    except asyncio.IncompleteReadError:
+        return None
+
+    try:
+        return json.loads(body.decode("utf-8"))
+    except (UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ProtocolError(f"Invalid JSON body: {e}")
+
+
+def encode_message(payload: Dict[str, Any]) -> bytes:
+    """Frame a JSON-RPC message (Content-Length counts bytes, not characters)."""
+    body = json.dumps(payload, separators=(",", ":"), default=str).encode("utf-8")
+    return b"Content-Length: " + str(len(body)).encode("ascii") + b"\r\n\r\n" + body
+
+
+class MessageWriter:
+    """Writes framed messages; concurrent senders never interleave."""
+
+    def __init__(self, writer: asyncio.StreamWriter):
+        self.writer = writer
+        self._lock = asyncio.Lock()
+
+    async def write(self, payload: Dict[str, Any]) -> None:
+        """Send one message and wait for the transport to accept it."""
+        data = encode_message(payload)
+        async with self._lock:
+            self.writer.write(data)
+            await self.writer.drain()
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+async def open_stdio_streams() -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+    """
+    Wrap the process's stdin/stdout as asyncio streams.
+
+    Returns:
+        (reader, writer) on the raw byte pipes
+    """
+    loop = asyncio.get_running_loop()
+
+    reader = asyncio.StreamReader(limit=MAX_CONTENT_LENGTH)
+    await loop.connect_read_pipe(
+        lambda: asyncio.StreamReaderProtocol(reader), sys.stdin.buffer
+    )
+
+    transport, protocol = await loop.connect_write_pipe(
+        asyncio.streams.FlowControlMixin, sys.stdout.buffer
+    )
+    writer = asyncio.StreamWriter(transport, protocol, reader, loop)
+    return reader, writer
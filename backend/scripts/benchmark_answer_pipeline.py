@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Benchmark the answer pipeline (POST /sessions/{id}/answer) offline.
+
+Runs the real ContextAnalyzer/ConflictDetector/UserLearning agents against
+a temporary SQLite database with a fake Claude client (fixed latency per
+call) and compares:
+
+- before: the agent reloads session, question, project and specs, the
+  conflict detector reloads specs, and effectiveness tracking runs before
+  the response is returned
+- after: the endpoint's rows are shared via AnswerContext and tracking
+  runs after the response (background task), so it is not timed
+
+--db-latency adds a delay to every statement to approximate the network
+round trip to a remote PostgreSQL server. Answers are submitted by
+several users at once (one worker thread each, as FastAPI runs sync
+endpoints).
+
+Usage:
+    python scripts/benchmark_answer_pipeline.py
+    python scripts/benchmark_answer_pipeline.py --answers 200 --llm-latency 0.8 --db-latency 0.003 --users 8
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from sqlalchemy import create_engine, event  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app.agents.conflict_detector import ConflictDetectorAgent  # noqa: E402
+from app.agents.context import AnswerContext, ContextAnalyzerAgent  # noqa: E402
+from app.agents.orchestrator import AgentOrchestrator, set_orchestrator  # noqa: E402
+from app.agents.user_learning import UserLearningAgent  # noqa: E402
+from app.core.database import Base  # noqa: E402
+from app.core.dependencies import ServiceContainer  # noqa: E402
+from app.models import Project, Question, Session, Specification  # noqa: E402
+
+EXTRACTED = json.dumps([
+    {"category": "security", "key": "mfa", "value": "TOTP", "content": "MFA uses TOTP", "confidence": 0.9},
+    {"category": "performance", "key": "p95_latency", "value": "200ms", "content": "p95 under 200ms"},
+])
+NO_CONFLICTS = json.dumps({"conflicts_detected": False, "conflicts": []})
+
+
+class FakeClaude:
+    """Answers extraction and conflict prompts after a fixed delay."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.messages = self
+
+    def create(self, **kwargs):
+        time.sleep(self.latency)
+        prompt = kwargs["messages"][0]["content"]
+        text = EXTRACTED if prompt.startswith("Extract structured specifications") else NO_CONFLICTS
+        return SimpleNamespace(content=[SimpleNamespace(text=text)])
+
+
+class BenchmarkServices(ServiceContainer):
+    """ServiceContainer bound to the benchmark database."""
+
+    def __init__(self, session_factory, claude):
+        super().__init__()
+        self._session_factory = session_factory
+        self._claude_client = claude
+
+    def get_database_specs(self):
+        return self._session_factory()
+
+
+def build_database(path: str, specs: int, db_latency: float):
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    if db_latency:
+        @event.listens_for(engine, "before_cursor_execute")
+        def _round_trip(*args):
+            time.sleep(db_latency)
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    db = factory()
+    user_id = uuid.uuid4()
+    project = Project(name="Benchmark", creator_id=user_id, owner_id=user_id, user_id=user_id)
+    db.add(project)
+    db.flush()
+    session = Session(project_id=project.id, status="active", started_at=datetime.now(timezone.utc))
+    db.add(session)
+    db.flush()
+    question = Question(project_id=project.id, session_id=session.id, category="security", text="How do users log in?")
+    db.add(question)
+    db.add_all(
+        Specification(
+            project_id=project.id, category="requirements", key=f"req_{i}", value=f"value {i}",
+            content=f"Requirement {i}", source="user_input"
+        )
+        for i in range(specs)
+    )
+    db.commit()
+    ids = (user_id, session.id, question.id)
+    db.close()
+    return factory, ids
+
+
+def submit(orchestrator, factory, ids, shared_context: bool) -> float:
+    """One answer, as the endpoint handles it. Returns seconds until the response."""
+    user_id, session_id, question_id = ids
+    start = time.perf_counter()
+
+    # Endpoint: validate access and load rows (same in both modes)
+    db = factory()
+    session = db.query(Session).filter(Session.id == session_id).first()
+    project = db.query(Project).filter(Project.id == session.project_id).first()
+    question = db.query(Question).filter(Question.id == question_id).first()
+    data = {"session_id": session_id, "question_id": question_id, "answer": "We add TOTP MFA.", "user_id": user_id}
+    if shared_context:
+        data["context"] = AnswerContext.from_models(db, session, project, question)
+    db.close()
+
+    result = orchestrator.route_request("context", "extract_specifications", data)
+    assert result.get("success"), result
+
+    tracking = {
+        "user_id": uuid.uuid4(), "question_template_id": str(question_id), "role": "user",
+        "answer_length": 16, "specs_extracted": result["specs_extracted"], "answer_quality": 0.8,
+    }
+    if shared_context:
+        elapsed = time.perf_counter() - start
+        orchestrator.route_request("learning", "track_question_effectiveness", tracking)
+        return elapsed
+    orchestrator.route_request("learning", "track_question_effectiveness", tracking)
+    return time.perf_counter() - start
+
+
+async def run(orchestrator, factory, ids, answers: int, users: int, shared_context: bool):
+    """Submit answers from several users at once; returns per-answer seconds."""
+    timings = []
+    for start in range(0, answers, users):
+        batch = min(users, answers - start)
+        timings += await asyncio.gather(*(
+            asyncio.to_thread(submit, orchestrator, factory, ids, shared_context) for _ in range(batch)
+        ))
+    return timings
+
+
+def percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--answers", type=int, default=60)
+    parser.add_argument("--users", type=int, default=4, help="Concurrent answers")
+    parser.add_argument("--specs", type=int, default=150, help="Existing specs in the project")
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="Seconds per fake Claude call")
+    parser.add_argument("--db-latency", type=float, default=0.002, help="Seconds added per SQL statement")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        factory, ids = build_database(os.path.join(tmp, "specs.db"), args.specs, args.db_latency)
+        services = BenchmarkServices(factory, FakeClaude(args.llm_latency))
+        orchestrator = AgentOrchestrator(services)
+        orchestrator.register_agent(ContextAnalyzerAgent("context", "Context Analyzer", services))
+        orchestrator.register_agent(ConflictDetectorAgent("conflict", "Conflict Detector", services))
+        orchestrator.register_agent(UserLearningAgent("learning", "User Learning", services))
+        set_orchestrator(orchestrator)
+        for name in ("orchestrator", "agent.context", "agent.conflict", "agent.learning"):
+            services.get_logger(name).setLevel("WARNING")
+        logging.getLogger("actions").setLevel(logging.WARNING)
+
+        print(
+            f"{args.answers} answers, {args.users} concurrent, {args.specs} existing specs, "
+            f"LLM {args.llm_latency * 1000:.0f} ms/call, DB {args.db_latency * 1000:.1f} ms/statement"
+        )
+        print()
+        print(f"{'pipeline':<10}{'p50 ms':>10}{'p95 ms':>10}{'mean ms':>10}")
+        for name, shared in (("before", False), ("after", True)):
+            timings = asyncio.run(run(orchestrator, factory, ids, args.answers, args.users, shared))
+            print(
+                f"{name:<10}{percentile(timings, 50) * 1000:>10.0f}{percentile(timings, 95) * 1000:>10.0f}"
+                f"{statistics.mean(timings) * 1000:>10.0f}"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
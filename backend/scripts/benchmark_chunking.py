@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Benchmark document chunkers offline.
+
+Compares the fixed 500-character chunker with the token/sentence-aware
+TextChunker on:
+- chunk count and average estimated tokens per chunk
+- throughput (MB/s), whole-text and streamed
+- fact retrieval hit rate: a synthetic specification is seeded with
+  known "fact" sentences; each fact gets a paraphrased query, and a hit
+  means a top-k chunk (TF-IDF cosine ranking) contains the whole fact.
+  Cutting a fact across two chunks is a miss.
+
+Pass --file to measure count and throughput on a real text/Markdown
+document as well (hit rate needs the synthetic ground truth).
+
+Usage:
+    python scripts/benchmark_chunking.py
+    python scripts/benchmark_chunking.py --sections 2000 --max-tokens 128 256 --top-k 3
+    python scripts/benchmark_chunking.py --file docs/architecture.md
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+from collections import Counter
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.services.text_chunker import (  # noqa: E402
+    ChunkingConfig,
+    TextChunker,
+    estimate_chunk_tokens,
+)
+
+FILLER = (
+    "system user shall must data the a requirement api endpoint request response "
+    "record service store cache latency error retry policy audit access role"
+).split()
+COMPONENTS = ["billing", "search", "gateway", "scheduler", "ledger", "inventory", "notifier", "identity"]
+QUALITIES = ["respond", "recover", "replicate", "rotate", "archive", "validate"]
+WORD_RE = re.compile(r"\w+")
+
+
+def build_corpus(sections: int, seed: int):
+    """Return (text, facts, queries) for a synthetic Markdown spec."""
+    rng = random.Random(seed)
+
+    def filler_sentence() -> str:
+        words = [rng.choice(FILLER) for _ in range(rng.randint(8, 28))]
+        return " ".join(words).capitalize() + "."
+
+    parts, facts, queries = [], [], []
+    for section in range(sections):
+        parts.append(f"## {section + 1}. Requirements area {section + 1}\n\n")
+        for _ in range(rng.randint(2, 4)):
+            sentences = [filler_sentence() for _ in range(rng.randint(3, 7))]
+            if rng.random() < 0.5:
+                component = f"{rng.choice(COMPONENTS)}{len(facts)}"
+                quality = rng.choice(QUALITIES)
+                limit = rng.randint(10, 900)
+                fact = (
+                    f"The {component} component must {quality} within {limit} milliseconds "
+                    f"under peak load for tenant tier {rng.randint(1, 5)}."
+                )
+                sentences.insert(rng.randrange(len(sentences) + 1), fact)
+                facts.append(fact)
+                queries.append(f"how fast does {component} {quality} under peak load")
+            parts.append(" ".join(sentences) + "\n\n")
+    return "".join(parts), facts, queries
+
+
+def tfidf_hit_rate(chunks, facts, queries, top_k: int) -> float:
+    """Fraction of queries whose fact appears intact in a top-k chunk."""
+    vocabulary = {}
+    rows, cols, values = [], [], []
+    doc_freq = Counter()
+    tokenized = [Counter(WORD_RE.findall(chunk.lower())) for chunk in chunks]
+    for counts in tokenized:
+        doc_freq.update(counts.keys())
+    idf = {term: np.log((1 + len(chunks)) / (1 + df)) + 1 for term, df in doc_freq.items()}
+    for row, counts in enumerate(tokenized):
+        for term, count in counts.items():
+            col = vocabulary.setdefault(term, len(vocabulary))
+            rows.append(row)
+            cols.append(col)
+            values.append((1 + np.log(count)) * idf[term])
+
+    matrix = np.zeros((len(chunks), len(vocabulary)), dtype=np.float32)
+    matrix[rows, cols] = values
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True) + 1e-9
+
+    hits = 0
+    for fact, query in zip(facts, queries):
+        q = np.zeros(len(vocabulary), dtype=np.float32)
+        for term in WORD_RE.findall(query.lower()):
+            if term in vocabulary:
+                q[vocabulary[term]] = idf[term]
+        best = np.argsort(-(matrix @ q))[:top_k]
+        hits += any(fact in chunks[i] for i in best)
+    return hits / max(1, len(facts))
+
+
+def best_seconds(fn, repeat: int = 3) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def measure(chunker: TextChunker, text: str):
+    """Return (chunks, whole-text MB/s, streamed MB/s), best of three runs."""
+    megabytes = len(text.encode("utf-8")) / 1e6
+    segments = [text[i:i + 4096] for i in range(0, len(text), 4096)]
+
+    chunks = chunker.chunk(text)
+    assert list(chunker.iter_chunks(segments)) == chunks, "streamed chunking diverged from whole-text chunking"
+
+    whole = megabytes / best_seconds(lambda: chunker.chunk(text))
+    stream = megabytes / best_seconds(lambda: sum(1 for _ in chunker.iter_chunks(segments)))
+    return chunks, whole, stream
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sections", type=int, default=600, help="Synthetic spec sections")
+    parser.add_argument("--max-tokens", type=int, nargs="+", default=[128, 160, 256])
+    parser.add_argument("--overlap-tokens", type=int, default=20)
+    parser.add_argument("--top-k", type=int, default=3)
+    parser.add_argument("--file", help="Also measure chunk count and throughput on this text file")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    configs = [("fixed 500/50", ChunkingConfig(strategy="fixed"))] + [
+        (f"sentence {tokens}/{args.overlap_tokens}",
+         ChunkingConfig(max_tokens=tokens, overlap_tokens=min(args.overlap_tokens, tokens - 1)))
+        for tokens in args.max_tokens
+    ]
+
+    text, facts, queries = build_corpus(args.sections, args.seed)
+    print(f"Synthetic spec: {len(text) / 1e6:.1f} MB, {len(facts)} facts, top-{args.top_k} TF-IDF retrieval")
+    print()
+    print(f"{'chunker':<18}{'chunks':>8}{'avg tok':>9}{'MB/s':>8}{'stream':>8}{'intact':>8}{'hit rate':>10}")
+    for name, config in configs:
+        chunks, whole, stream = measure(TextChunker(config), text)
+        avg_tokens = sum(estimate_chunk_tokens(chunk) for chunk in chunks) / max(1, len(chunks))
+        intact = sum(any(fact in chunk for chunk in chunks) for fact in facts) / max(1, len(facts))
+        hit_rate = tfidf_hit_rate(chunks, facts, queries, args.top_k)
+        print(
+            f"{name:<18}{len(chunks):>8}{avg_tokens:>9.0f}{whole:>8.1f}{stream:>8.1f}"
+            f"{intact:>8.0%}{hit_rate:>10.0%}"
+        )
+
+    if args.file:
+        with open(args.file, encoding="utf-8", errors="ignore") as f:
+            document = f.read()
+        print()
+        print(f"{args.file}: {len(document) / 1e6:.2f} MB")
+        print(f"{'chunker':<18}{'chunks':>8}{'avg tok':>9}{'MB/s':>8}{'stream':>8}")
+        for name, config in configs:
+            chunks, whole, stream = measure(TextChunker(config), document)
+            avg_tokens = sum(estimate_chunk_tokens(chunk) for chunk in chunks) / max(1, len(chunks))
+            print(f"{name:<18}{len(chunks):>8}{avg_tokens:>9.0f}{whole:>8.1f}{stream:>8.1f}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
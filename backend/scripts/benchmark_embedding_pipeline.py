@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Benchmark the batch embedding pipeline offline.
+
+Uses FakeEmbeddingProvider with a simulated per-request latency to compare
+sequential batches (the old embed_chunks behaviour) with concurrent,
+rate-limited batches, and measures how responsive the event loop stays
+while an upload is being embedded.
+
+Usage:
+    python scripts/benchmark_embedding_pipeline.py
+    python scripts/benchmark_embedding_pipeline.py --chunks 5000 --latency 0.4 --concurrency 1 4 8 --tpm 1000000
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.services.embedding_pipeline import EmbeddingPipeline, FakeEmbeddingProvider  # noqa: E402
+
+
+async def measure(pipeline: EmbeddingPipeline, texts) -> tuple:
+    """Return (seconds, worst event-loop stall in ms) for embedding texts."""
+    worst_stall = 0.0
+    running = True
+
+    async def heartbeat():
+        nonlocal worst_stall
+        interval = 0.01
+        while running:
+            start = time.perf_counter()
+            await asyncio.sleep(interval)
+            worst_stall = max(worst_stall, time.perf_counter() - start - interval)
+
+    monitor = asyncio.ensure_future(heartbeat())
+    start = time.perf_counter()
+    await pipeline.embed(texts)
+    elapsed = time.perf_counter() - start
+    running = False
+    await monitor
+    return elapsed, worst_stall * 1000
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=2000, help="Chunks to embed (~500-page PDF = 2000)")
+    parser.add_argument("--chars", type=int, default=500, help="Characters per chunk")
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.3, help="Simulated seconds per provider request")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--tpm", type=int, default=0, help="Tokens-per-minute limit (0 = unlimited)")
+    parser.add_argument("--dim", type=int, default=256)
+    args = parser.parse_args()
+
+    texts = [f"chunk {i} " + "x" * args.chars for i in range(args.chunks)]
+    print(
+        f"{args.chunks} chunks, batch size {args.batch_size}, "
+        f"{args.latency * 1000:.0f} ms/request, TPM limit: {args.tpm or 'none'}"
+    )
+    print()
+    print(f"{'concurrency':<13}{'seconds':>10}{'chunks/s':>12}{'max stall ms':>14}")
+
+    for concurrency in args.concurrency:
+        pipeline = EmbeddingPipeline(
+            FakeEmbeddingProvider(dim=args.dim, latency_seconds=args.latency),
+            batch_size=args.batch_size,
+            max_concurrency=concurrency,
+            tokens_per_minute=args.tpm or None,
+        )
+        elapsed, stall = asyncio.run(measure(pipeline, texts))
+        print(f"{concurrency:<13}{elapsed:>10.2f}{args.chunks / elapsed:>12.0f}{stall:>14.1f}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Load-test the LLM gateway against the local fake provider.
+
+Simulates sync agents (one thread per caller) and async callers hammering
+one LLMGateway whose FakeLLMProvider answers after --latency seconds and
+fails a fraction --failure-rate of calls with a retryable error. Reports
+throughput, latency percentiles, retries and the peak number of requests
+the provider saw at once (bounded by --concurrency).
+
+Usage:
+    python scripts/benchmark_llm_gateway.py
+    python scripts/benchmark_llm_gateway.py --callers 64 --calls 20 --concurrency 8 --latency 0.2 --failure-rate 0.05
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.services.llm_gateway import FakeLLMProvider, LLMGateway  # noqa: E402
+
+MESSAGES = [{"role": "user", "content": "What problem does the project solve?"}]
+
+
+def percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def run_sync(gateway: LLMGateway, callers: int, calls: int):
+    latencies, errors = [], []
+    lock = threading.Lock()
+
+    def caller():
+        for _ in range(calls):
+            started = time.perf_counter()
+            try:
+                gateway.complete(max_tokens=100, messages=MESSAGES)
+            except Exception as e:
+                with lock:
+                    errors.append(e)
+                continue
+            with lock:
+                latencies.append(time.perf_counter() - started)
+
+    threads = [threading.Thread(target=caller) for _ in range(callers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, errors
+
+
+def run_async(gateway: LLMGateway, callers: int, calls: int):
+    latencies, errors = [], []
+
+    async def caller():
+        for _ in range(calls):
+            started = time.perf_counter()
+            try:
+                await gateway.acomplete(max_tokens=100, messages=MESSAGES)
+            except Exception as e:
+                errors.append(e)
+                continue
+            latencies.append(time.perf_counter() - started)
+
+    async def main():
+        await asyncio.gather(*(caller() for _ in range(callers)))
+
+    asyncio.run(main())
+    return latencies, errors
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--callers", type=int, default=32, help="Concurrent callers")
+    parser.add_argument("--calls", type=int, default=10, help="Calls per caller")
+    parser.add_argument("--concurrency", type=int, default=8, help="Gateway requests in flight per provider")
+    parser.add_argument("--latency", type=float, default=0.1, help="Fake provider latency (seconds)")
+    parser.add_argument("--failure-rate", type=float, default=0.02, help="Fraction of calls failing transiently")
+    args = parser.parse_args()
+    logging.getLogger("app.services.llm_gateway").setLevel(logging.CRITICAL)
+
+    print(
+        f"{args.callers} callers x {args.calls} calls, concurrency {args.concurrency}, "
+        f"latency {args.latency * 1000:.0f} ms, failure rate {args.failure_rate:.0%}"
+    )
+    print()
+    print(f"{'mode':<8}{'calls/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'errors':>8}{'retries':>9}{'peak':>6}")
+    for mode, run in (("sync", run_sync), ("async", run_async)):
+        provider = FakeLLMProvider(latency_seconds=args.latency, failure_rate=args.failure_rate, seed=7)
+        gateway = LLMGateway(
+            {"fake": provider},
+            default_model="fake-model",
+            max_concurrency=args.concurrency,
+            backoff_base_seconds=0.05,
+            circuit_failure_threshold=1000,
+            usage_sink=None,
+        )
+        started = time.perf_counter()
+        latencies, errors = run(gateway, args.callers, args.calls)
+        elapsed = time.perf_counter() - started
+        stats = gateway.get_stats()["fake"]
+        gateway.close()
+
+        ms = [latency * 1000 for latency in latencies] or [0.0]
+        print(
+            f"{mode:<8}{len(latencies) / elapsed:>9.1f}{percentile(ms, 50):>9.0f}{percentile(ms, 95):>9.0f}"
+            f"{len(errors):>8}{stats['retries']:>9}{provider.max_in_flight:>6}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Benchmark time-to-first-token (TTFT) of streamed chat and question replies.
+
+Uses a fake Claude client that behaves like the streaming API: the first
+delta arrives after --first-token seconds, then one delta every
+--token-interval seconds. Compares, per reply, when the user first sees
+text and when the reply is complete:
+
+- blocking: NLUService.chat() / messages.create() (text appears at the end)
+- streamed: NLUService.chat_stream() / the question "text" field decoded
+  with JsonStringFieldStream (text appears at the first visible delta)
+
+Usage:
+    python scripts/benchmark_streaming.py
+    python scripts/benchmark_streaming.py --replies 20 --tokens 400 --first-token 0.8 --token-interval 0.015
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.core.llm_streaming import JsonStringFieldStream, stream_text  # noqa: E402
+from app.core.nlu_service import NLUService  # noqa: E402
+
+WORD = "spec "
+
+
+class FakeStream:
+    def __init__(self, deltas, first_token, interval):
+        self.deltas = deltas
+        self.first_token = first_token
+        self.interval = interval
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    @property
+    def text_stream(self):
+        time.sleep(self.first_token)
+        for index, delta in enumerate(self.deltas):
+            if index:
+                time.sleep(self.interval)
+            yield delta
+
+
+class FakeClaude:
+    """Streaming-capable fake; create() waits for the whole generation."""
+
+    def __init__(self, deltas, first_token, interval):
+        self.deltas = deltas
+        self.first_token = first_token
+        self.interval = interval
+        self.messages = self
+
+    def create(self, **kwargs):
+        time.sleep(self.first_token + self.interval * (len(self.deltas) - 1))
+        return SimpleNamespace(content=[SimpleNamespace(text="".join(self.deltas))])
+
+    def stream(self, **kwargs):
+        return FakeStream(self.deltas, self.first_token, self.interval)
+
+
+def question_deltas(tokens: int):
+    """A question JSON document split into ~4-character deltas."""
+    document = json.dumps({"category": "goals", "text": (WORD * tokens).strip() + "?", "context": "Scope"})
+    return [document[index:index + 4] for index in range(0, len(document), 4)]
+
+
+def time_blocking(call):
+    started = time.perf_counter()
+    call()
+    elapsed = time.perf_counter() - started
+    return elapsed, elapsed
+
+
+def time_streamed(deltas):
+    started = time.perf_counter()
+    first = None
+    for _ in deltas:
+        if first is None:
+            first = time.perf_counter() - started
+    return first, time.perf_counter() - started
+
+
+def percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--replies", type=int, default=10)
+    parser.add_argument("--tokens", type=int, default=200, help="Deltas per chat reply / words per question")
+    parser.add_argument("--first-token", type=float, default=0.6, help="Seconds until the first delta")
+    parser.add_argument("--token-interval", type=float, default=0.02, help="Seconds between deltas")
+    args = parser.parse_args()
+    logging.getLogger("actions").setLevel(logging.WARNING)
+
+    chat_client = FakeClaude([WORD] * args.tokens, args.first_token, args.token_interval)
+    nlu = NLUService(chat_client)
+    question_client = FakeClaude(question_deltas(args.tokens // 10), args.first_token, args.token_interval)
+    request = {"model": "m", "max_tokens": 500, "messages": [{"role": "user", "content": "q"}]}
+
+    def streamed_question():
+        field = JsonStringFieldStream("text")
+        for delta in stream_text(question_client, **request):
+            visible = field.feed(delta)
+            if visible:
+                yield visible
+
+    cases = (
+        ("chat", "blocking", lambda: time_blocking(lambda: nlu.chat("hi"))),
+        ("chat", "streamed", lambda: time_streamed(nlu.chat_stream("hi"))),
+        ("question", "blocking", lambda: time_blocking(lambda: question_client.create(**request))),
+        ("question", "streamed", lambda: time_streamed(streamed_question())),
+    )
+
+    print(
+        f"{args.replies} replies, {args.tokens} deltas/chat reply, first delta after "
+        f"{args.first_token * 1000:.0f} ms, then every {args.token_interval * 1000:.0f} ms"
+    )
+    print()
+    print(f"{'reply':<10}{'mode':<10}{'TTFT p50':>10}{'TTFT p95':>10}{'total p50':>11}")
+    for reply, mode, run in cases:
+        samples = [run() for _ in range(args.replies)]
+        first = [sample[0] * 1000 for sample in samples]
+        total = [sample[1] * 1000 for sample in samples]
+        print(f"{reply:<10}{mode:<10}{percentile(first, 50):>10.0f}{percentile(first, 95):>10.0f}{percentile(total, 50):>11.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Benchmark IVF approximate vector search against exact search.
+
+Builds a synthetic clustered corpus (embeddings of real documents are
+clustered by topic, unlike uniform random vectors), then reports recall@k
+and mean query latency for exact search and for IVF at several nprobe
+values. Use it to pick VECTOR_ANN_NPROBE / VECTOR_ANN_LISTS.
+
+Usage:
+    python scripts/benchmark_vector_search.py
+    python scripts/benchmark_vector_search.py --rows 200000 --dim 1536 --nprobe 4 8 16 32
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.services.vector_index import ProjectVectorIndex  # noqa: E402
+
+
+def make_corpus(rows: int, dim: int, topics: int, seed: int) -> np.ndarray:
+    """Gaussian blobs around random topic centres."""
+    rng = np.random.default_rng(seed)
+    centres = rng.normal(size=(topics, dim)).astype(np.float32)
+    labels = rng.integers(0, topics, size=rows)
+    noise = rng.normal(scale=1.5, size=(rows, dim)).astype(np.float32)
+    return centres[labels] + noise
+
+
+def run_queries(index: ProjectVectorIndex, queries: np.ndarray, top_k: int, **kwargs):
+    """Return (result chunk id lists, mean latency in ms)."""
+    results = []
+    start = time.perf_counter()
+    for query in queries:
+        hits = index.search(query, top_k=top_k, similarity_threshold=-1.0, **kwargs)
+        results.append([chunk_id for chunk_id, _, _ in hits])
+    elapsed = time.perf_counter() - start
+    return results, 1000 * elapsed / len(queries)
+
+
+def recall(approx, exact) -> float:
+    """Mean fraction of the exact top-k found by the approximate search."""
+    found = sum(len(set(a) & set(e)) for a, e in zip(approx, exact))
+    total = sum(len(e) for e in exact)
+    return found / total if total else 1.0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100000, help="Corpus size")
+    parser.add_argument("--dim", type=int, default=384, help="Embedding dimension")
+    parser.add_argument("--topics", type=int, default=500, help="Number of synthetic topics")
+    parser.add_argument("--queries", type=int, default=200, help="Number of queries")
+    parser.add_argument("--top-k", type=int, default=10, help="Results per query")
+    parser.add_argument("--lists", type=int, default=None, help="IVF lists (default ~sqrt(rows))")
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 4, 8, 16, 32, 64])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"Building corpus: {args.rows} rows x {args.dim} dims, {args.topics} topics")
+    corpus = make_corpus(args.rows + args.queries, args.dim, args.topics, args.seed)
+    vectors, queries = corpus[:args.rows], corpus[args.rows:]
+
+    index = ProjectVectorIndex("benchmark")
+    ids = [str(i) for i in range(args.rows)]
+    index.add(ids, ["doc"] * args.rows, vectors)
+
+    exact, exact_ms = run_queries(index, queries, args.top_k, exact=True)
+
+    start = time.perf_counter()
+    index.build_ann(n_lists=args.lists, seed=args.seed)
+    train_s = time.perf_counter() - start
+    sizes = index.ann.list_sizes()
+    print(
+        f"Trained {index.ann.n_lists} IVF lists in {train_s:.1f}s "
+        f"(list size min/median/max: {sizes.min()}/{int(np.median(sizes))}/{sizes.max()})"
+    )
+
+    print()
+    print(f"{'mode':<14}{'recall@' + str(args.top_k):>12}{'ms/query':>12}{'speedup':>10}")
+    print(f"{'exact':<14}{1.0:>12.3f}{exact_ms:>12.2f}{1.0:>10.1f}")
+    for nprobe in args.nprobe:
+        approx, approx_ms = run_queries(index, queries, args.top_k, nprobe=nprobe)
+        speedup = exact_ms / approx_ms if approx_ms else float("inf")
+        print(f"{'ivf nprobe=' + str(nprobe):<14}{recall(approx, exact):>12.3f}{approx_ms:>12.2f}{speedup:>10.1f}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+"""Tests for the set-based, watermarked daily analytics aggregation."""
+
+import asyncio
+import uuid
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from app.services.analytics_aggregation import (
+    aggregate_day,
+    aggregate_pending_windows,
+    get_watermark,
+)
+
+NOW = datetime(2026, 3, 10, 2, 0, tzinfo=timezone.utc)
+DAY = date(2026, 3, 8)
+
+
+@pytest.fixture
+def analytics(db_specs):
+    from app.models import AnalyticsEvent, JobWatermark, Project, ProjectMetrics
+
+    user_id = uuid.uuid4()
+    projects = [Project(name=f"Analytics {n}", creator_id=user_id, owner_id=user_id, user_id=user_id) for n in range(2)]
+    db_specs.add_all(projects)
+    db_specs.commit()
+
+    def add_event(event_type, project, at, raw_project_id=None):
+        db_specs.add(AnalyticsEvent(
+            user_id=user_id, event_type=event_type, timestamp=at,
+            event_data={"project_id": raw_project_id or (str(project.id) if project else None)},
+        ))
+
+    yield projects, add_event
+
+    for model in (ProjectMetrics, AnalyticsEvent, JobWatermark):
+        db_specs.query(model).delete()
+    db_specs.commit()
+
+
+def at(day, hour):
+    return datetime.combine(day, datetime.min.time(), tzinfo=timezone.utc) + timedelta(hours=hour)
+
+
+class TestAggregateDay:
+    """Test one window is aggregated by SQL and is idempotent."""
+
+    def test_counts_per_project_and_type(self, db_specs, analytics):
+        """Test counts per event type, window bounds and unknown projects."""
+        from app.models import ProjectMetrics
+
+        (first, second), add_event = analytics
+        for _ in range(3):
+            add_event("analysis_run", first, at(DAY, 1))
+        add_event("spec_added", first, at(DAY, 23))
+        add_event("session_created", second, at(DAY, 12))
+        add_event("spec_added", first, at(DAY + timedelta(days=1), 0))  # Next window
+        add_event("spec_added", None, at(DAY, 5), raw_project_id=str(uuid.uuid4()))  # Unknown project
+        add_event("spec_added", None, at(DAY, 5))  # No project
+        db_specs.commit()
+
+        assert aggregate_day(db_specs, DAY) == 2
+        assert aggregate_day(db_specs, DAY) == 2  # Re-run replaces, does not add
+        db_specs.commit()
+
+        rows = {row.project_id: row for row in db_specs.query(ProjectMetrics).filter_by(date=DAY)}
+        assert (rows[first.id].analyses_count, rows[first.id].specs_added) == (3, 1)
+        assert rows[second.id].sessions_created == 1
+        assert rows[first.id].user_id == first.user_id
+
+    def test_fallback_without_upsert(self, db_specs, analytics, monkeypatch):
+        """Test databases without ON CONFLICT get the same rows by DELETE + INSERT."""
+        from app.models import ProjectMetrics
+        from app.services import analytics_aggregation
+
+        (first, second), add_event = analytics
+        add_event("analysis_run", first, at(DAY, 1))
+        add_event("conflict_resolved", second, at(DAY, 2))
+        db_specs.commit()
+
+        monkeypatch.setattr(analytics_aggregation, "_upsert_insert", lambda dialect: None)
+        assert aggregate_day(db_specs, DAY) == 2
+        assert aggregate_day(db_specs, DAY) == 2
+        db_specs.commit()
+
+        rows = {row.project_id: row for row in db_specs.query(ProjectMetrics).filter_by(date=DAY)}
+        assert (rows[first.id].analyses_count, rows[first.id].specs_added) == (1, 0)
+        assert rows[second.id].conflicts_resolved == 1
+
+
+class TestPendingWindows:
+    """Test catch-up, watermark and resumption."""
+
+    def test_catch_up_is_resumable(self, db_specs, analytics):
+        """Test windows are capped per run and the next run continues."""
+        from app.models import ProjectMetrics
+
+        (project, _), add_event = analytics
+        for offset in range(5):
+            add_event("analysis_run", project, at(DAY - timedelta(days=offset), 6))
+        db_specs.commit()
+
+        first = aggregate_pending_windows(db_specs, now=NOW, max_windows=3)
+        assert (first["windows"], first["remaining_windows"]) == (3, 3)
+        assert get_watermark(db_specs) == at(DAY - timedelta(days=1), 0)
+
+        second = aggregate_pending_windows(db_specs, now=NOW, lookback_days=0)
+        assert (second["windows"], second["remaining_windows"]) == (3, 0)
+        assert get_watermark(db_specs) == at(NOW.date(), 0)
+        assert db_specs.query(ProjectMetrics).filter_by(project_id=project.id).count() == 5
+
+    def test_lookback_picks_up_late_events(self, db_specs, analytics):
+        """Test a late event of the last window is counted on the next run."""
+        from app.models import ProjectMetrics
+
+        (project, _), add_event = analytics
+        yesterday = NOW.date() - timedelta(days=1)
+        add_event("spec_added", project, at(yesterday, 3))
+        db_specs.commit()
+        aggregate_pending_windows(db_specs, now=NOW)
+
+        add_event("spec_added", project, at(yesterday, 4))
+        db_specs.commit()
+        result = aggregate_pending_windows(db_specs, now=NOW, lookback_days=1)
+
+        assert result["windows"] == 1
+        assert db_specs.query(ProjectMetrics).filter_by(project_id=project.id, date=yesterday).one().specs_added == 2
+
+    def test_job_without_events(self, db_specs, session_factory_specs, monkeypatch):
+        """Test the scheduled job succeeds when there is nothing to aggregate."""
+        from app.jobs.analytics_jobs import aggregate_daily_analytics
+
+        monkeypatch.setattr("app.core.database.SessionLocalSpecs", session_factory_specs)
+        result = asyncio.run(aggregate_daily_analytics())
+
+        assert result["status"] == "success"
+        assert result["windows"] == 0
@@ -0,0 +1,169 @@
+"""Tests for IVF approximate search over the vector index."""
+
+import uuid
+
+import numpy as np
+import pytest
+
+from app.services.ann_index import IVFPartition, default_n_lists, train_centroids
+from app.services.vector_index import ProjectVectorIndex, VectorIndexManager, normalize_rows
+
+
+def _clustered_vectors(n, dim=16, topics=8, seed=0):
+    rng = np.random.default_rng(seed)
+    centres = rng.normal(size=(topics, dim)) * 4
+    labels = rng.integers(0, topics, size=n)
+    return (centres[labels] + rng.normal(size=(n, dim))).astype(np.float32)
+
+
+def _partition_rows(partition):
+    return sorted(int(row) for buffer in partition._lists for row in buffer.view())
+
+
+class TestIVFPartition:
+    """Test k-means training and inverted list bookkeeping."""
+
+    def test_default_n_lists(self):
+        """Test list count heuristic is bounded by row count."""
+        assert default_n_lists(1) == 1
+        assert default_n_lists(10000) == 100
+
+    def test_train_centroids_unit_length(self):
+        """Test centroids are normalised and capped at the row count."""
+        matrix = normalize_rows(_clustered_vectors(20))
+        centroids = train_centroids(matrix, n_lists=50)
+        assert centroids.shape == (20, 16)
+        assert np.allclose(np.linalg.norm(centroids, axis=1), 1.0, atol=1e-5)
+
+    def test_every_row_assigned_once(self):
+        """Test training assigns each row to exactly one list."""
+        matrix = normalize_rows(_clustered_vectors(500))
+        partition = IVFPartition.train(matrix, n_lists=10)
+        assert _partition_rows(partition) == list(range(500))
+        assert partition.list_sizes().sum() == 500
+
+    def test_remove_and_move_rows(self):
+        """Test O(1) removal and relocation keep lists consistent."""
+        matrix = normalize_rows(_clustered_vectors(100))
+        partition = IVFPartition.train(matrix, n_lists=5)
+
+        partition.remove_row(10)
+        partition.move_row(99, 10)
+        assert _partition_rows(partition) == list(range(99))
+        assert partition.labels(99)[10] >= 0
+
+    def test_full_probe_equals_exact(self):
+        """Test scanning every list returns the exact top-k."""
+        matrix = normalize_rows(_clustered_vectors(300))
+        partition = IVFPartition.train(matrix, n_lists=8)
+        query = matrix[17]
+
+        rows, scores = partition.search(matrix, query, top_k=5, nprobe=8)
+        expected = np.argsort(-(matrix @ query))[:5]
+        assert list(rows) == list(expected)
+        assert scores[0] == pytest.approx(1.0, abs=1e-5)
+
+
+class TestProjectVectorIndexANN:
+    """Test IVF integration in ProjectVectorIndex."""
+
+    @pytest.fixture
+    def vectors(self):
+        return _clustered_vectors(2000)
+
+    @pytest.fixture
+    def index(self, vectors):
+        index = ProjectVectorIndex("p1")
+        index.add([f"c{i}" for i in range(len(vectors))], [f"d{i % 10}" for i in range(len(vectors))], vectors)
+        index.build_ann(n_lists=20)
+        return index
+
+    def test_recall_against_exact(self, index, vectors):
+        """Test approximate search finds most of the exact top-k."""
+        queries = _clustered_vectors(50, seed=1)
+        found = total = 0
+        for query in queries:
+            exact = {c for c, _, _ in index.search(query, top_k=10, similarity_threshold=-1.0, exact=True)}
+            approx = {c for c, _, _ in index.search(query, top_k=10, similarity_threshold=-1.0, nprobe=4)}
+            found += len(exact & approx)
+            total += len(exact)
+        assert found / total >= 0.9
+
+    def test_incremental_insert_is_searchable(self, index, vectors):
+        """Test rows added after training are assigned to a list."""
+        index.add(["new"], ["d-new"], [vectors[5] * 2])
+        assert index.ann.list_sizes().sum() == 2001
+        hits = index.search(vectors[5], top_k=2, nprobe=1)
+        assert "new" in [chunk_id for chunk_id, _, _ in hits]
+
+    def test_remove_document_updates_partition(self, index, vectors):
+        """Test swap-removal keeps inverted lists pointing at live rows."""
+        assert index.remove_document("d3") == 200
+        assert _partition_rows(index.ann) == list(range(1800))
+
+        hits = index.search(vectors[4], top_k=1, nprobe=4)
+        assert hits[0][0] == "c4"
+        results = index.search(vectors[3], top_k=50, similarity_threshold=-1.0, nprobe=20)
+        assert all(doc != "d3" for _, doc, _ in results)
+
+    def test_save_and_load_restores_partition(self, index, vectors, tmp_path):
+        """Test IVF sidecar round trip."""
+        prefix = str(tmp_path / "project_p1")
+        index.save(prefix)
+
+        loaded = ProjectVectorIndex.load(prefix)
+        assert loaded.ann is not None
+        assert loaded.ann.n_lists == 20
+        assert np.array_equal(loaded.ann.labels(len(loaded)), index.ann.labels(len(index)))
+
+        index.drop_ann()
+        index.save(prefix)
+        assert not (tmp_path / "project_p1.ivf.npz").exists()
+        assert ProjectVectorIndex.load(prefix).ann is None
+
+    def test_train_outside_lock_assigns_rows_added_meanwhile(self, vectors):
+        """Test a partition trained on a snapshot covers rows inserted during training."""
+        index = ProjectVectorIndex("p2")
+        index.add([f"c{i}" for i in range(1500)], ["d"] * 1500, vectors[:1500])
+        trained = index.train_ann(n_lists=20)
+        index.add([f"c{i}" for i in range(1500, 2000)], ["d"] * 500, vectors[1500:])
+
+        assert index.install_ann(trained)
+        assert _partition_rows(index.ann) == list(range(2000))
+        hits = index.search(vectors[1999], top_k=1, nprobe=20)
+        assert hits[0][0] == "c1999"
+
+    def test_partition_trained_across_removal_is_discarded(self, vectors):
+        """Test rows moved by a removal during training invalidate the partition."""
+        index = ProjectVectorIndex("p3")
+        index.add([f"c{i}" for i in range(1000)], [f"d{i % 10}" for i in range(1000)], vectors[:1000])
+        trained = index.train_ann(n_lists=20)
+        index.remove_document("d3")
+
+        assert not index.install_ann(trained)
+        assert index.ann is None
+
+
+class TestVectorIndexManagerANN:
+    """Test the manager enables IVF for large projects."""
+
+    def test_partition_built_past_threshold(self, db_specs):
+        """Test add_chunks trains IVF once ann_min_chunks is reached."""
+        manager = VectorIndexManager(ann_min_chunks=100)
+        project_id = str(uuid.uuid4())
+        vectors = _clustered_vectors(150)
+
+        manager.add_chunks(project_id, [f"a{i}" for i in range(50)], ["d"] * 50, vectors[:50], db=db_specs)
+        assert manager.get(project_id, db_specs).ann is None
+
+        manager.add_chunks(project_id, [f"b{i}" for i in range(100)], ["d"] * 100, vectors[50:], db=db_specs)
+        index = manager.get(project_id, db_specs)
+        assert index.ann is not None
+        assert manager.search(project_id, vectors[0], db_specs, top_k=1, nprobe=index.ann.n_lists)[0][0] == "a0"
+
+    def test_disabled_by_zero_threshold(self, db_specs):
+        """Test ann_min_chunks=0 keeps search exact."""
+        manager = VectorIndexManager(ann_min_chunks=0)
+        project_id = str(uuid.uuid4())
+        manager.add_chunks(project_id, ["x", "y"], ["d", "d"], [[1.0, 0.0], [0.0, 1.0]], db=db_specs)
+        assert manager.get(project_id, db_specs).ann is None
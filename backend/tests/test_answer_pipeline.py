@@ -0,0 +1,154 @@
+"""Tests for the shared-context answer pipeline."""
+
+import json
+import uuid
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import event
+
+
+class FakeClaude:
+    """Returns canned responses in order and records prompts."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.prompts = []
+        self.messages = self
+
+    def create(self, **kwargs):
+        self.prompts.append(kwargs["messages"][0]["content"])
+        return SimpleNamespace(content=[SimpleNamespace(text=self.responses.pop(0))])
+
+
+@pytest.fixture
+def answer_rows(db_specs):
+    """A project with one current and one superseded spec, plus a session and question."""
+    from app.models import Project, Question, Session, Specification
+
+    user_id = uuid.uuid4()
+    project = Project(name="Payments", creator_id=user_id, owner_id=user_id, user_id=user_id)
+    db_specs.add(project)
+    db_specs.flush()
+    session = Session(project_id=project.id, status="active", started_at=datetime.now(timezone.utc))
+    db_specs.add(session)
+    db_specs.flush()
+    question = Question(project_id=project.id, session_id=session.id, category="security", text="How do users log in?")
+    now = datetime.now(timezone.utc)
+    db_specs.add_all([
+        question,
+        Specification(
+            project_id=project.id, category="security", key="auth", value="passwords",
+            content="Users log in with passwords", source="user_input", is_current=False,
+            created_at=now - timedelta(days=1)
+        ),
+        Specification(
+            project_id=project.id, category="security", key="auth", value="SSO",
+            content="Users log in with SSO", source="user_input", created_at=now
+        ),
+    ])
+    db_specs.commit()
+    yield SimpleNamespace(project=project, session=session, question=question)
+
+    db_specs.query(Specification).delete()
+    db_specs.query(Question).delete()
+    db_specs.commit()
+
+
+@pytest.fixture
+def orchestrator(db_specs):
+    """Orchestrator with the context and conflict agents on the test database."""
+    from app.agents.conflict_detector import ConflictDetectorAgent
+    from app.agents.context import ContextAnalyzerAgent
+    from app.agents.orchestrator import AgentOrchestrator, reset_orchestrator, set_orchestrator
+    from app.core.dependencies import ServiceContainer
+
+    services = ServiceContainer()
+    services._db_session_specs = db_specs
+    orchestrator = AgentOrchestrator(services)
+    orchestrator.register_agent(ContextAnalyzerAgent("context", "Context Analyzer", services))
+    orchestrator.register_agent(ConflictDetectorAgent("conflict", "Conflict Detector", services))
+    set_orchestrator(orchestrator)
+    yield orchestrator
+    reset_orchestrator()
+
+
+class TestAnswerContext:
+    """Test loading the shared answer context."""
+
+    def test_loads_current_specs_newest_first(self, db_specs, answer_rows):
+        """Test superseded specs are left out and values are plain data."""
+        from app.agents.context import AnswerContext
+
+        context = AnswerContext.from_models(
+            db_specs, answer_rows.session, answer_rows.project, answer_rows.question
+        )
+
+        assert context.project_id == answer_rows.project.id
+        assert context.question_category == "security"
+        assert [spec["value"] for spec in context.existing_specs] == ["SSO"]
+        json.dumps(context.existing_specs)
+
+
+class TestSharedContextExtraction:
+    """Test agents reuse the context instead of re-querying."""
+
+    def test_no_context_queries_with_shared_context(self, db_specs, answer_rows, orchestrator, test_db_specs):
+        """Test extraction and conflict detection skip session/question/project/spec loads."""
+        from app.agents.context import AnswerContext
+
+        context = AnswerContext.from_models(
+            db_specs, answer_rows.session, answer_rows.project, answer_rows.question
+        )
+        # Same key as the existing spec, so the conflict pre-filter escalates to Claude
+        extracted = [{"category": "security", "key": "auth", "value": "SSO and TOTP", "content": "SSO plus TOTP MFA"}]
+        claude = FakeClaude(json.dumps(extracted), json.dumps({"conflicts_detected": False, "conflicts": []}))
+        orchestrator.services._claude_client = claude
+
+        selects = []
+
+        def record(conn, cursor, statement, parameters, context_, executemany):
+            if statement.lstrip().upper().startswith("SELECT"):
+                selects.append(statement)
+
+        event.listen(test_db_specs, "before_cursor_execute", record)
+        try:
+            result = orchestrator.route_request("context", "extract_specifications", {
+                "session_id": str(answer_rows.session.id),
+                "question_id": str(answer_rows.question.id),
+                "answer": "We add TOTP based MFA.",
+                "context": context,
+            })
+        finally:
+            event.remove(test_db_specs, "before_cursor_execute", record)
+
+        assert result["success"], result
+        assert result["specs_extracted"] == 1
+        assert len(claude.prompts) == 2
+        assert "Users log in with SSO" in claude.prompts[0]
+        assert not any("FROM sessions" in sql or "FROM questions" in sql for sql in selects)
+        # Both existing-spec loads (prompt context, conflict baseline) are LIMIT queries
+        assert not any("FROM specifications" in sql and "LIMIT" in sql for sql in selects)
+
+    def test_loads_context_when_not_supplied(self, db_specs, answer_rows, orchestrator):
+        """Test callers without a context (e.g. direct chat) still work."""
+        orchestrator.services._claude_client = FakeClaude("[]")
+
+        result = orchestrator.route_request("context", "extract_specifications", {
+            "session_id": answer_rows.session.id,
+            "question_id": answer_rows.question.id,
+            "answer": "Nothing new.",
+        })
+
+        assert result["success"], result
+        assert result["specs_extracted"] == 0
+
+    def test_missing_question(self, answer_rows, orchestrator):
+        """Test the loader still reports missing rows."""
+        result = orchestrator.route_request("context", "extract_specifications", {
+            "session_id": answer_rows.session.id,
+            "question_id": uuid.uuid4(),
+            "answer": "Hello",
+        })
+        assert result["error_code"] == "QUESTION_NOT_FOUND"
@@ -0,0 +1,408 @@
+"""Tests for cache service engines and decorators."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+from sqlalchemy.orm import Session
+
+import app.services.cache_service as cache_module
+from app.services.cache_service import (
+    CacheService,
+    InMemoryCacheEngine,
+    KeyTrie,
+    SQLiteCacheEngine,
+    cache_result,
+    cache_service,
+    cache_tag,
+    invalidate_cache,
+)
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+class TestInMemoryCacheEngine:
+    """Test bounded LRU/TTL engine."""
+
+    @pytest.fixture
+    def clock(self):
+        return FakeClock()
+
+    @pytest.fixture
+    def engine(self, clock):
+        engine = InMemoryCacheEngine(max_entries=3, max_bytes=10 ** 6, sweep_interval=0, clock=clock)
+        yield engine
+        engine.close()
+
+    def test_set_and_get(self, engine):
+        """Test basic set/get round trip."""
+        engine.set("a", {"x": 1}, 60)
+        assert engine.get("a") == (True, {"x": 1})
+        assert engine.get("missing") == (False, None)
+
+    def test_falsy_values_are_cached(self, engine):
+        """Test that 0/[] are distinguishable from misses."""
+        engine.set("zero", 0, 60)
+        assert engine.get("zero") == (True, 0)
+
+    def test_lru_eviction_by_entry_count(self, engine):
+        """Test least recently used entry is evicted first."""
+        engine.set("a", 1, 60)
+        engine.set("b", 2, 60)
+        engine.set("c", 3, 60)
+        engine.get("a")  # a becomes most recently used
+        engine.set("d", 4, 60)
+
+        assert engine.get("b") == (False, None)
+        assert engine.get("a") == (True, 1)
+        assert engine.stats()["evictions"] == 1
+        assert engine.stats()["total_entries"] == 3
+
+    def test_eviction_by_byte_budget(self, clock):
+        """Test entries are evicted when the byte budget is exceeded."""
+        engine = InMemoryCacheEngine(max_entries=100, max_bytes=2000, sweep_interval=0, clock=clock)
+        for i in range(10):
+            engine.set(f"k{i}", "x" * 500, 60)
+
+        stats = engine.stats()
+        assert stats["memory_usage"] <= 2000
+        assert stats["evictions"] > 0
+        assert engine.get("k9")[0] is True
+        assert engine.get("k0")[0] is False
+
+    def test_expired_entry_is_miss(self, engine, clock):
+        """Test entries expire after their TTL."""
+        engine.set("a", 1, 10)
+        clock.advance(11)
+        assert engine.get("a") == (False, None)
+        assert engine.stats()["expired_entries"] == 1
+
+    def test_sweep_removes_only_expired(self, engine, clock):
+        """Test TTL heap sweep removes expired entries and keeps fresh ones."""
+        engine.set("short", 1, 5)
+        engine.set("long", 2, 100)
+        clock.advance(10)
+
+        assert engine.sweep_expired() == 1
+        assert engine.stats()["total_entries"] == 1
+        assert engine.get("long") == (True, 2)
+
+    def test_overwrite_resets_ttl(self, engine, clock):
+        """Test stale heap items from an overwrite do not expire the new value."""
+        engine.set("a", 1, 5)
+        engine.set("a", 2, 100)
+        clock.advance(10)
+
+        assert engine.sweep_expired() == 0
+        assert engine.get("a") == (True, 2)
+
+    def test_stats_counters(self, engine):
+        """Test hit/miss counters and byte accounting."""
+        engine.set("a", "value", 60)
+        engine.get("a")
+        engine.get("a")
+        engine.get("b")
+
+        stats = engine.stats()
+        assert stats["hits"] == 2
+        assert stats["misses"] == 1
+        assert stats["hit_ratio"] == pytest.approx(2 / 3, rel=1e-3)
+        assert stats["memory_usage"] > 0
+
+        engine.delete("a")
+        assert engine.stats()["memory_usage"] == 0
+
+    def test_clear_prefix(self, engine):
+        """Test prefix invalidation."""
+        engine.set("project:1:a", 1, 60)
+        engine.set("project:1:b", 2, 60)
+        engine.set("project:2:a", 3, 60)
+
+        assert engine.clear_prefix("project:1:") == 2
+        assert engine.get("project:2:a") == (True, 3)
+
+    def test_clear_prefix_partial_segment(self, engine):
+        """Test prefixes that end mid-segment still match."""
+        engine.set("user:123:a", 1, 60)
+        engine.set("user:124:a", 2, 60)
+        engine.set("user:2:a", 3, 60)
+
+        assert engine.clear_prefix("user:12") == 2
+        assert engine.get("user:2:a") == (True, 3)
+
+    def test_clear_tags(self, engine):
+        """Test tag invalidation removes only tagged entries."""
+        engine.set("a", 1, 60, tags=["project_id:1"])
+        engine.set("b", 2, 60, tags=["project_id:1", "user_id:9"])
+        engine.set("c", 3, 60, tags=["project_id:2"])
+
+        assert engine.clear_tags(["project_id:1"]) == 2
+        assert engine.get("c") == (True, 3)
+        assert engine.stats()["indexed_tags"] == 1
+
+    def test_evicted_entries_leave_indexes(self, engine):
+        """Test LRU eviction also removes trie and tag entries."""
+        for i in range(5):
+            engine.set(f"k:{i}", i, 60, tags=["t"])
+        assert engine.clear_tags(["t"]) == 3
+        assert engine.clear_prefix("k:") == 0
+
+    def test_concurrent_access(self):
+        """Test engine stays consistent under concurrent writers."""
+        engine = InMemoryCacheEngine(max_entries=50, sweep_interval=0)
+
+        def worker(n):
+            for i in range(200):
+                engine.set(f"{n}:{i}", i, 60)
+                engine.get(f"{n}:{i // 2}")
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        stats = engine.stats()
+        assert stats["total_entries"] == 50
+        assert stats["hits"] + stats["misses"] == 8 * 200
+
+
+class TestSQLiteCacheEngine:
+    """Test the persistent SQLite engine."""
+
+    @pytest.fixture
+    def clock(self):
+        return FakeClock()
+
+    def test_persists_and_expires(self, tmp_path, clock):
+        """Test values survive reopening and expire by wall clock."""
+        path = str(tmp_path / "cache" / "llm.sqlite3")
+        engine = SQLiteCacheEngine(path, clock=clock)
+        engine.set("a", {"x": 1}, 60)
+        engine.set("b", [], 10)
+        engine.close()
+
+        engine = SQLiteCacheEngine(path, clock=clock)
+        assert engine.get("a") == (True, {"x": 1})
+        assert engine.get("b") == (True, [])
+        clock.advance(30)
+        assert engine.get("b") == (False, None)
+        engine.close()
+
+    def test_lru_eviction_and_invalidation(self, clock):
+        """Test least recently read rows go first; prefixes and tags are literal."""
+        engine = SQLiteCacheEngine(":memory:", max_entries=2, clock=clock)
+        engine.set("p_1:a", 1, 60, tags=["t"])
+        clock.advance(1)
+        engine.set("px1:b", 2, 60)
+        clock.advance(1)
+        engine.get("p_1:a")
+        clock.advance(1)
+        engine.set("c", 3, 60, tags=["t2"])
+
+        assert engine.get("px1:b") == (False, None)
+        assert engine.clear_prefix("p_1") == 1
+        assert engine.clear_tags(["t"]) == 0
+        assert engine.clear_tags(["t2"]) == 1
+        assert engine.stats()["evictions"] == 1
+        engine.close()
+
+
+class TestKeyTrie:
+    """Test segment trie used for prefix invalidation."""
+
+    def test_keys_with_prefix(self):
+        """Test prefix lookups over full and partial segments."""
+        trie = KeyTrie()
+        for key in ("project:1:a", "project:1:b", "project:10:a", "project:2", "user:1"):
+            trie.add(key)
+
+        assert sorted(trie.keys_with_prefix("project:1:")) == ["project:1:a", "project:1:b"]
+        assert sorted(trie.keys_with_prefix("project:1")) == sorted(["project:1:a", "project:1:b", "project:10:a"])
+        assert trie.keys_with_prefix("missing:") == []
+        assert len(trie.keys_with_prefix("")) == 5
+
+    def test_discard_prunes(self):
+        """Test discarded keys are no longer returned."""
+        trie = KeyTrie()
+        trie.add("a:b:c")
+        trie.add("a:b")
+        trie.discard("a:b:c")
+
+        assert trie.keys_with_prefix("a:") == ["a:b"]
+        assert len(trie) == 1
+
+
+class TestCacheDecorators:
+    """Test cache_result/invalidate_cache on top of the engine."""
+
+    @pytest.fixture(autouse=True)
+    def fresh_engine(self):
+        cache_service.configure(InMemoryCacheEngine(sweep_interval=0))
+        yield
+        cache_service.close()
+
+    def test_singleton(self):
+        """Test CacheService is a singleton sharing one engine."""
+        assert CacheService() is cache_service
+        assert CacheService().engine is cache_service.engine
+
+    def test_cache_result_caches_calls(self):
+        """Test decorated function is only called once per key."""
+        calls = []
+
+        @cache_result(ttl_seconds=60, key_prefix="project:p1:")
+        def load(x):
+            calls.append(x)
+            return {"value": x}
+
+        assert load(1) == {"value": 1}
+        assert load(1) == {"value": 1}
+        assert calls == [1]
+
+    def test_invalidate_cache(self):
+        """Test invalidation forces recomputation."""
+        calls = []
+
+        @cache_result(ttl_seconds=60, key_prefix="project:p1:")
+        def load(x):
+            calls.append(x)
+            return x
+
+        load(1)
+        invalidate_cache("project:p1:")
+        load(1)
+        assert calls == [1, 1]
+
+    def test_cache_result_ignores_session_argument(self):
+        """Test Session arguments do not make keys unique per request."""
+        calls = []
+
+        @cache_result(ttl_seconds=60)
+        def load(project_id, db):
+            calls.append(project_id)
+            return project_id
+
+        load("p1", Session())
+        load("p1", db=Session())
+        assert calls == ["p1"]
+
+    def test_cache_result_tags(self):
+        """Test tagged entries are invalidated by tag."""
+        calls = []
+
+        @cache_result(ttl_seconds=60, tags=("project_id",))
+        def load(project_id, limit=10):
+            calls.append(project_id)
+            return project_id
+
+        load("p1")
+        load("p2")
+        invalidate_cache(tags=[cache_tag("project_id", "p1")])
+        load("p1")
+        load("p2")
+        assert calls == ["p1", "p2", "p1"]
+
+    def test_cache_result_rejects_unknown_tag(self):
+        """Test tags must name function parameters."""
+        with pytest.raises(ValueError):
+            @cache_result(tags=("user_id",))
+            def load(project_id):
+                return project_id
+
+    def test_concurrent_misses_are_coalesced(self):
+        """Test single-flight: concurrent sync misses compute once."""
+        calls = []
+        barrier = threading.Barrier(6)
+
+        @cache_result(ttl_seconds=60)
+        def slow(x):
+            calls.append(x)
+            time.sleep(0.2)
+            return x * 2
+
+        results = []
+
+        def worker():
+            barrier.wait()
+            results.append(slow(21))
+
+        threads = [threading.Thread(target=worker) for _ in range(6)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert results == [42] * 6
+        assert calls == [21]
+        assert cache_service.get_stats()["coalesced"] >= 1
+
+    def test_single_flight_propagates_error(self):
+        """Test computation errors are raised, not cached."""
+        def leader_fails():
+            raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError):
+            cache_module.SingleFlight().do("k", leader_fails)
+
+    def test_async_misses_are_coalesced(self):
+        """Test single-flight for async functions."""
+        calls = []
+
+        @cache_result(ttl_seconds=60)
+        async def slow(x):
+            calls.append(x)
+            await asyncio.sleep(0.05)
+            return x + 1
+
+        async def run():
+            return await asyncio.gather(*(slow(1) for _ in range(5)))
+
+        assert asyncio.run(run()) == [2] * 5
+        assert calls == [1]
+
+    def test_stale_while_revalidate(self, monkeypatch):
+        """Test expired value is served while one background refresh runs."""
+        now = [1000.0]
+        monkeypatch.setattr(cache_module, "_wall_clock", lambda: now[0])
+        calls = []
+        refreshed = threading.Event()
+
+        @cache_result(ttl_seconds=10, stale_ttl_seconds=60)
+        def load(x):
+            calls.append(x)
+            if len(calls) > 1:
+                refreshed.set()
+            return len(calls)
+
+        assert load("a") == 1
+        now[0] += 20  # past freshness, inside stale window
+
+        assert load("a") == 1  # stale value served immediately
+        assert refreshed.wait(2)
+        for _ in range(50):
+            if load("a") == 2:
+                break
+            time.sleep(0.01)
+        assert load("a") == 2
+        assert calls == ["a", "a"]
+        assert cache_service.get_stats()["background_refreshes"] >= 1
+
+    def test_get_stats_shape(self):
+        """Test stats keep the legacy keys."""
+        cache_service.set("a", [1, 2, 3])
+        stats = cache_service.get_stats()
+        for key in ("total_entries", "expired_entries", "memory_usage", "hits", "misses", "evictions", "coalesced"):
+            assert key in stats
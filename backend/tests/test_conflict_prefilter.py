@@ -0,0 +1,160 @@
+"""Tests for the local conflict pre-filter in front of the LLM."""
+
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.conflict_prefilter import (
+    ConflictIndex,
+    ConflictRulePredicates,
+    compile_rule,
+    compile_rules,
+    normalize_key,
+)
+
+
+class FakeClaude:
+    """Returns a canned response and records prompts."""
+
+    def __init__(self, response):
+        self.response = response
+        self.prompts = []
+        self.messages = self
+
+    def create(self, **kwargs):
+        self.prompts.append(kwargs["messages"][0]["content"])
+        return SimpleNamespace(content=[SimpleNamespace(text=self.response)])
+
+
+def spec(category, key, value, spec_id=""):
+    return {"id": spec_id, "category": category, "key": key, "value": value}
+
+
+class TestRuleCompilation:
+    """Test rules.json conditions become operands."""
+
+    def test_structured_condition(self):
+        """Test connectives, operators and numbers are dropped."""
+        rule = compile_rule("arch", "architecture == monolithic AND required_users > 1000000")
+        assert rule.operands == (frozenset({"architecture"}), frozenset({"monolithic"}), frozenset({"user"}))
+
+    def test_natural_language_condition(self):
+        """Test identifiers stay whole and generic words are dropped."""
+        assert compile_rule("perf", "response_time specifications must not contradict each other").operands == (
+            frozenset({"response", "time"}),
+        )
+        assert compile_rule("gdpr", "GDPR, HIPAA, SOC2 and other standards must be respected").operands == (
+            frozenset({"gdpr"}), frozenset({"hipaa"}), frozenset({"soc2"}),
+        )
+        assert compile_rule("empty", "must align") is None
+
+    def test_domain_rules_compile(self):
+        """Test every shipped domain rule yields a usable predicate."""
+        from app.core.conflict_prefilter import get_rule_predicates, reset_rule_predicates
+        from app.domains.registry import get_domain_registry
+
+        reset_rule_predicates()
+        predicates = get_rule_predicates()
+        rules = [
+            rule
+            for domain in get_domain_registry().list_domains().values()
+            for rule in domain.get_conflict_rules()
+        ]
+        assert rules
+        assert len(predicates.rules) == len(rules)
+
+
+class TestConflictIndex:
+    """Test candidate pair selection."""
+
+    @pytest.fixture
+    def predicates(self):
+        return ConflictRulePredicates(compile_rules([
+            {"rule_id": "perf", "condition": "response_time specifications must not contradict each other"},
+            {"rule_id": "arch", "condition": "architecture == monolithic AND required_users > 1000000"},
+        ]))
+
+    def test_same_key_different_value(self, predicates):
+        """Test normalised keys collide and duplicates are not candidates."""
+        existing = [spec("tech_stack", "Primary Database", "PostgreSQL"), spec("tech_stack", "cache", "Redis")]
+        index = ConflictIndex(existing, predicates)
+
+        candidates = index.find_candidates([
+            spec("tech_stack", "primary-database", "MongoDB"),
+            spec("Tech_Stack", "cache", " redis "),
+        ])
+
+        assert normalize_key("Primary Database") == "primary_database"
+        assert candidates.pairs == [(0, 0, "key:tech_stack/primary_database")]
+        assert candidates.new_specs[0]["value"] == "MongoDB"
+        assert candidates.existing_specs == [existing[0]]
+
+    def test_rule_pairs_across_keys(self, predicates):
+        """Test specs on different keys pair up through a shared rule."""
+        existing = [
+            spec("scalability", "expected_users", "5 million monthly users"),
+            spec("performance", "api_response_time", "under 200ms"),
+            spec("goals", "mission", "Help teams plan"),
+        ]
+        index = ConflictIndex(existing, predicates)
+
+        candidates = index.find_candidates([
+            spec("architecture", "style", "monolithic"),
+            spec("performance", "page_response_time", "under 2s"),
+        ])
+
+        assert sorted(candidates.pairs) == [(0, 0, "rule:arch"), (1, 1, "rule:perf")]
+
+    def test_unrelated_specs_have_no_candidates(self, predicates):
+        """Test the common case: nothing shares a key or a rule."""
+        index = ConflictIndex([spec("goals", "mission", "Help teams plan")], predicates)
+        assert not index.find_candidates([spec("team", "size", "4 engineers")])
+
+
+class TestConflictDetectorPrefilter:
+    """Test the agent only calls Claude for candidates."""
+
+    @pytest.fixture
+    def agent(self):
+        from app.agents.conflict_detector import ConflictDetectorAgent
+        from app.core.dependencies import ServiceContainer
+
+        return ConflictDetectorAgent("conflict", "Conflict Detector", ServiceContainer())
+
+    def test_skips_claude_without_candidates(self, agent):
+        """Test no LLM call and a skipped counter when nothing can conflict."""
+        claude = FakeClaude("not used")
+        agent.services._claude_client = claude
+
+        result = agent.process_request("detect_conflicts", {
+            "project_id": "p1",
+            "new_specs": [spec("team", "size", "4 engineers")],
+            "existing_specs": [spec("goals", "mission", "Help teams plan", "s1")],
+        })
+
+        assert result["success"] and result["safe_to_save"]
+        assert claude.prompts == []
+        assert agent.get_stats()["stats"]["conflict_checks_skipped"] == 1
+        assert agent.get_stats()["stats"]["conflict_checks_escalated"] == 0
+
+    def test_escalates_only_candidates(self, agent):
+        """Test the prompt holds the candidate pair and not unrelated specs."""
+        claude = FakeClaude(json.dumps({"conflicts_detected": False, "conflicts": []}))
+        agent.services._claude_client = claude
+
+        result = agent.process_request("detect_conflicts", {
+            "project_id": "p1",
+            "new_specs": [spec("tech_stack", "database", "MongoDB"), spec("team", "size", "4 engineers")],
+            "existing_specs": [
+                spec("tech_stack", "database", "PostgreSQL", "s1"),
+                spec("goals", "mission", "Help teams plan", "s2"),
+            ],
+        })
+
+        assert result["success"]
+        assert len(claude.prompts) == 1
+        assert "PostgreSQL" in claude.prompts[0] and "MongoDB" in claude.prompts[0]
+        assert "Help teams plan" not in claude.prompts[0]
+        assert "4 engineers" not in claude.prompts[0]
+        assert agent.get_stats()["stats"]["conflict_checks_escalated"] == 1
@@ -0,0 +1,153 @@
+"""Tests for the content-addressed embedding cache."""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+import app.services.embedding_cache as embedding_cache_module
+from app.services.cache_service import InMemoryCacheEngine, cache_service
+from app.services.embedding_cache import (
+    EmbeddingCache,
+    decode_vector,
+    embedding_cache_key,
+    encode_vector,
+)
+from app.services.embedding_pipeline import (
+    EmbeddingPipeline,
+    EmbeddingProvider,
+    configure_embedding_pipeline,
+)
+from app.services.embedding_service import EmbeddingService
+
+
+@pytest.fixture
+def cache(session_factory_specs, monkeypatch):
+    from app.models import EmbeddingCacheEntry
+
+    cache_service.configure(InMemoryCacheEngine(sweep_interval=0))
+    cache = EmbeddingCache(session_factory=session_factory_specs)
+    monkeypatch.setattr(embedding_cache_module, "_embedding_cache", cache)
+    yield cache
+
+    db = session_factory_specs()
+    db.query(EmbeddingCacheEntry).delete()
+    db.commit()
+    db.close()
+    cache_service.close()
+
+
+def _fake_vector(text, dim=8):
+    rng = np.random.default_rng(abs(hash(text)) % (2 ** 32))
+    return rng.normal(size=dim).tolist()
+
+
+class RecordingProvider(EmbeddingProvider):
+    """Provider that records each request."""
+
+    model = "recording"
+
+    def __init__(self):
+        self.calls = []
+
+    async def embed(self, texts):
+        self.calls.append(list(texts))
+        return [_fake_vector(text) for text in texts]
+
+
+class TestEncoding:
+    """Test keys and vector blobs."""
+
+    def test_key_ignores_whitespace_but_not_model(self):
+        """Test keys are content-addressed per model."""
+        assert embedding_cache_key("m", "hello  world\n") == embedding_cache_key("m", "hello world")
+        assert embedding_cache_key("m", "hello") != embedding_cache_key("other", "hello")
+
+    def test_float16_round_trip(self):
+        """Test float16 blobs are half the size and close to the original."""
+        vector = _fake_vector("x", dim=1536)
+        blob = encode_vector(vector, "float16")
+        assert len(blob) == 1536 * 2
+        assert np.allclose(decode_vector(blob, "float16"), vector, atol=1e-2)
+        assert decode_vector(encode_vector(vector, "float32"), "float32") == pytest.approx(vector, abs=1e-6)
+
+    def test_rejects_unknown_dtype(self):
+        """Test only float16/float32 are accepted."""
+        with pytest.raises(ValueError):
+            EmbeddingCache(dtype="int8")
+
+
+class TestEmbeddingCache:
+    """Test persistent lookups and stats."""
+
+    def test_put_and_get_many(self, cache):
+        """Test batched lookup returns hits in order and None for misses."""
+        assert cache.put_many("m", ["a", "b"], [[1.0, 0.0], [0.0, 1.0]]) == 2
+        assert cache.put_many("m", ["a"], [[1.0, 0.0]]) == 0
+
+        results = cache.get_many("m", ["b", "missing", "a"])
+        assert results == [[0.0, 1.0], None, [1.0, 0.0]]
+
+        stats = cache.get_stats()
+        assert stats["hits"] == 2
+        assert stats["misses"] == 1
+        assert stats["saved_tokens"] == 2
+
+    def test_persists_across_instances(self, cache, session_factory_specs):
+        """Test entries survive without the in-process copy."""
+        cache.put_many("m", ["text"], [[0.5, 0.5]])
+        cache_service.clear_pattern("embedding:")
+
+        other = EmbeddingCache(session_factory=session_factory_specs, memory_ttl_seconds=0)
+        assert other.get_many("m", ["text"]) == [[0.5, 0.5]]
+
+    def test_disabled_cache_never_hits(self, session_factory_specs):
+        """Test disabled cache stores nothing."""
+        cache = EmbeddingCache(session_factory=session_factory_specs, enabled=False)
+        assert cache.put_many("m", ["a"], [[1.0]]) == 0
+        assert cache.get_many("m", ["a"]) == [None]
+
+    def test_database_errors_are_misses(self):
+        """Test a broken database does not break embedding."""
+        def broken_session():
+            raise RuntimeError("no database")
+
+        cache = EmbeddingCache(session_factory=broken_session, memory_ttl_seconds=0)
+        assert cache.get_many("m", ["a"]) == [None]
+        assert cache.put_many("m", ["a"], [[1.0]]) == 0
+        assert cache.get_stats()["errors"] == 2
+
+
+class TestEmbeddingServiceCaching:
+    """Test EmbeddingService only sends misses to the provider."""
+
+    @pytest.fixture
+    def provider(self):
+        provider = RecordingProvider()
+        configure_embedding_pipeline(EmbeddingPipeline(provider, batch_size=10, tokens_per_minute=None))
+        yield provider
+        configure_embedding_pipeline(None)
+
+    def test_embed_chunks_sends_only_distinct_misses(self, cache, provider):
+        """Test cached and duplicate chunks are not re-embedded."""
+        cache.put_many(provider.model, ["cached"], [_fake_vector("cached")])
+
+        chunks = ["cached", "new", "boiler  plate", "boiler plate", "new"]
+        embeddings = asyncio.run(EmbeddingService.embed_chunks(chunks))
+
+        assert provider.calls == [["new", "boiler  plate"]]
+        assert embeddings[1] == embeddings[4]
+        assert embeddings[2] == embeddings[3]
+        assert np.allclose(embeddings[0], _fake_vector("cached"), atol=1e-2)
+
+        asyncio.run(EmbeddingService.embed_chunks(chunks))
+        assert len(provider.calls) == 1
+
+    def test_embed_text_uses_cache(self, cache, provider):
+        """Test repeated queries only call the provider once."""
+        first = asyncio.run(EmbeddingService.embed_text("what is the auth flow?"))
+        second = asyncio.run(EmbeddingService.embed_text("what is the auth flow?"))
+
+        assert provider.calls == [["what is the auth flow?"]]
+        assert np.allclose(first, second, atol=1e-2)
+        assert EmbeddingService.get_cache_stats()["hit_ratio"] == pytest.approx(0.5)
@@ -0,0 +1,174 @@
+"""Tests for the async batch embedding pipeline."""
+
+import asyncio
+import time
+
+import pytest
+
+from app.services.embedding_pipeline import (
+    EmbeddingPipeline,
+    EmbeddingProvider,
+    FakeEmbeddingProvider,
+    TokenBucket,
+    create_embedding_provider,
+)
+
+
+class FlakyProvider(EmbeddingProvider):
+    """Fails the first `failures` requests, tracks peak concurrency."""
+
+    model = "flaky"
+
+    def __init__(self, failures=0, latency=0.0):
+        self.failures = failures
+        self.latency = latency
+        self.attempts = 0
+        self.active = 0
+        self.peak = 0
+
+    async def embed(self, texts):
+        self.attempts += 1
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.latency)
+            if self.attempts <= self.failures:
+                raise RuntimeError("rate limited")
+            return [[float(len(text))] for text in texts]
+        finally:
+            self.active -= 1
+
+
+class TestTokenBucket:
+    """Test token bucket pacing."""
+
+    def test_waits_when_empty(self):
+        """Test acquire sleeps until enough tokens have refilled."""
+        async def run():
+            bucket = TokenBucket(tokens_per_minute=6000, capacity=100)  # 100 tokens/s
+            await bucket.acquire(100)
+            start = time.monotonic()
+            await bucket.acquire(20)
+            return time.monotonic() - start
+
+        assert 0.15 <= asyncio.run(run()) < 1.0
+
+    def test_oversized_request_overdraws(self):
+        """Test requests above capacity still complete."""
+        async def run():
+            bucket = TokenBucket(tokens_per_minute=60000, capacity=10)
+            await bucket.acquire(50)
+
+        asyncio.run(asyncio.wait_for(run(), timeout=1))
+
+    def test_rejects_non_positive_rate(self):
+        """Test invalid limits are rejected."""
+        with pytest.raises(ValueError):
+            TokenBucket(tokens_per_minute=0)
+
+
+class TestEmbeddingPipeline:
+    """Test concurrency, ordering and retries."""
+
+    def test_results_in_input_order(self):
+        """Test batches are reassembled in order despite concurrency."""
+        provider = FakeEmbeddingProvider(dim=4, latency_seconds=0.01)
+        pipeline = EmbeddingPipeline(provider, batch_size=3, max_concurrency=4, tokens_per_minute=None)
+        texts = [f"text {i}" for i in range(20)]
+
+        embeddings = asyncio.run(pipeline.embed(texts))
+
+        assert embeddings == [provider.vector(text) for text in texts]
+        assert provider.requests == 7
+
+    def test_stream_yields_batches_in_order(self):
+        """Test stream yields (start, embeddings) for consecutive batches."""
+        pipeline = EmbeddingPipeline(FlakyProvider(), batch_size=2, tokens_per_minute=None)
+
+        async def run():
+            return [(start, len(batch)) async for start, batch in pipeline.stream(["a"] * 5)]
+
+        assert asyncio.run(run()) == [(0, 2), (2, 2), (4, 1)]
+
+    def test_concurrency_is_bounded(self):
+        """Test no more than max_concurrency requests are in flight."""
+        provider = FlakyProvider(latency=0.02)
+        pipeline = EmbeddingPipeline(provider, batch_size=1, max_concurrency=3, tokens_per_minute=None)
+
+        asyncio.run(pipeline.embed(["x"] * 12))
+        assert provider.peak == 3
+
+    def test_concurrent_batches_are_faster(self):
+        """Test concurrency overlaps provider latency."""
+        texts = ["x"] * 8
+
+        def elapsed(concurrency):
+            pipeline = EmbeddingPipeline(
+                FakeEmbeddingProvider(dim=2, latency_seconds=0.05),
+                batch_size=1,
+                max_concurrency=concurrency,
+                tokens_per_minute=None,
+            )
+            start = time.monotonic()
+            asyncio.run(pipeline.embed(texts))
+            return time.monotonic() - start
+
+        assert elapsed(8) < elapsed(1) / 2
+
+    def test_retries_with_backoff(self):
+        """Test failed batches are retried and counted."""
+        provider = FlakyProvider(failures=2)
+        pipeline = EmbeddingPipeline(provider, tokens_per_minute=None, backoff_base_seconds=0.001)
+
+        assert asyncio.run(pipeline.embed(["ab"])) == [[2.0]]
+        assert pipeline.get_stats()["retries"] == 2
+
+    def test_gives_up_after_max_retries(self):
+        """Test the provider error surfaces once retries are exhausted."""
+        provider = FlakyProvider(failures=10)
+        pipeline = EmbeddingPipeline(provider, max_retries=1, tokens_per_minute=None, backoff_base_seconds=0.001)
+
+        with pytest.raises(RuntimeError):
+            asyncio.run(pipeline.embed(["a", "b"]))
+        assert provider.attempts == 2
+        assert pipeline.get_stats()["failed_batches"] == 1
+
+    def test_event_loop_stays_responsive(self):
+        """Test other coroutines keep running during a long embedding job."""
+        pipeline = EmbeddingPipeline(
+            FakeEmbeddingProvider(dim=2, latency_seconds=0.01),
+            batch_size=1,
+            max_concurrency=2,
+            tokens_per_minute=None,
+        )
+
+        async def run():
+            ticks = 0
+
+            async def ticker():
+                nonlocal ticks
+                while True:
+                    ticks += 1
+                    await asyncio.sleep(0.005)
+
+            task = asyncio.ensure_future(ticker())
+            await pipeline.embed(["x"] * 20)
+            task.cancel()
+            return ticks
+
+        assert asyncio.run(run()) >= 5
+
+
+class TestProviders:
+    """Test provider factory."""
+
+    def test_fake_provider_is_deterministic(self):
+        """Test identical text gets identical vectors."""
+        provider = create_embedding_provider("fake")
+        assert provider.vector("a") == provider.vector("a")
+        assert provider.vector("a") != provider.vector("b")
+
+    def test_unknown_provider(self):
+        """Test unknown names are rejected."""
+        with pytest.raises(ValueError):
+            create_embedding_provider("nope")
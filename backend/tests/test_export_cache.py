@@ -0,0 +1,185 @@
+"""Tests for spec revisions, cached export artifacts and conditional exports."""
+
+import uuid
+from email.utils import format_datetime
+
+import pytest
+
+from app.core.http_cache import content_etag, is_not_modified, validator_headers
+from app.services.export_cache import ExportArtifactCache, artifact_key, last_modified
+
+
+@pytest.fixture
+def project(db_specs):
+    from app.models import Project
+
+    user_id = uuid.uuid4()
+    project = Project(name="Cached Export", creator_id=user_id, owner_id=user_id, user_id=user_id)
+    db_specs.add(project)
+    db_specs.commit()
+    return project
+
+
+def add_spec(db, project, key, value="v"):
+    from app.models import Specification
+
+    spec = Specification(project_id=project.id, category="goals", key=key, value=value, source="user_input")
+    db.add(spec)
+    return spec
+
+
+class TestSpecRevision:
+    """Test projects.spec_revision follows specification writes."""
+
+    def test_revision_moves_once_per_flush(self, db_specs, project):
+        """Test inserts, updates and deletes each bump the revision once per flush."""
+        from app.models import Project
+
+        other = Project(name="Untouched", creator_id=project.user_id, owner_id=project.user_id, user_id=project.user_id)
+        db_specs.add(other)
+        db_specs.commit()
+        assert project.spec_revision == 0
+
+        first = add_spec(db_specs, project, "a")
+        add_spec(db_specs, project, "b")
+        db_specs.commit()
+        assert project.spec_revision == 1
+
+        first.value = "changed"
+        db_specs.commit()
+        assert project.spec_revision == 2
+
+        db_specs.delete(first)
+        db_specs.commit()
+        assert project.spec_revision == 3
+        assert other.spec_revision == 0
+
+    def test_unchanged_spec_does_not_bump(self, db_specs, project):
+        """Test a spec set to its current value is not a change."""
+        spec = add_spec(db_specs, project, "a")
+        db_specs.commit()
+        revision = project.spec_revision
+
+        spec.value = spec.value
+        db_specs.commit()
+        assert project.spec_revision == revision
+
+
+class TestConditionalRequests:
+    """Test ETag/Last-Modified evaluation."""
+
+    def test_key_tracks_revision_and_options(self, db_specs, project):
+        """Test the key changes with specs and options, not with time."""
+        key = artifact_key(project, "json", gzip=False)
+        assert artifact_key(project, "json", gzip=False) == key
+        assert artifact_key(project, "json", gzip=True).version == key.version
+        assert artifact_key(project, "json", gzip=True).etag != key.etag
+
+        add_spec(db_specs, project, "a")
+        db_specs.commit()
+        assert artifact_key(project, "json", gzip=False).version != key.version
+
+    def test_if_none_match_and_if_modified_since(self, project):
+        """Test matching tags and timestamps yield 304, If-None-Match first."""
+        key = artifact_key(project, "markdown")
+        modified = last_modified(project)
+        headers = validator_headers(key.etag, modified)
+
+        assert is_not_modified(key.etag, modified, if_none_match=key.etag)
+        assert is_not_modified(key.etag, modified, if_none_match=f'"other", W/{key.etag}')
+        assert is_not_modified(key.etag, modified, if_none_match="*")
+        assert not is_not_modified(key.etag, modified, if_none_match='"stale"')
+
+        assert is_not_modified(key.etag, modified, if_modified_since=headers["Last-Modified"])
+        assert not is_not_modified(key.etag, modified, if_none_match='"stale"', if_modified_since=headers["Last-Modified"])
+        earlier = format_datetime(modified.replace(year=modified.year - 1), usegmt=True)
+        assert not is_not_modified(key.etag, modified, if_modified_since=earlier)
+        assert not is_not_modified(key.etag, modified, if_modified_since="yesterday")
+
+    def test_content_etag(self):
+        """Test content ETags follow the value, not its key order."""
+        assert content_etag({"a": 1, "b": [2]}) == content_etag({"b": [2], "a": 1})
+        assert content_etag({"a": 1}) != content_etag({"a": 2})
+        assert content_etag([]).startswith('"') and content_etag([]).endswith('"')
+
+
+class TestExportArtifactCache:
+    """Test artifacts on disk."""
+
+    def test_put_read_and_prune(self, tmp_path, project):
+        """Test a new project version replaces the old artifacts."""
+        cache = ExportArtifactCache(tmp_path)
+        key = artifact_key(project, "json")
+        assert cache.read(key) is None
+
+        cache.put(key, "{}")
+        cache.put(artifact_key(project, "csv"), "a,b\n")
+        assert cache.read(key) == b"{}"
+
+        project.spec_revision += 1
+        newer = artifact_key(project, "json")
+        cache.put(newer, '{"x": 1}')
+        assert cache.read(key) is None
+        assert [p.name for p in (tmp_path / str(project.id)).iterdir()] == [newer.name]
+        assert cache.get_stats()["writes"] == 3
+
+    def test_write_through_only_stores_complete_streams(self, tmp_path, project):
+        """Test failed or abandoned streams leave nothing behind."""
+        cache = ExportArtifactCache(tmp_path)
+        key = artifact_key(project, "csv")
+
+        def failing():
+            yield "a,b\n"
+            raise RuntimeError("database went away")
+
+        with pytest.raises(RuntimeError):
+            list(cache.write_through(key, failing()))
+        abandoned = cache.write_through(key, iter(["a,b\n", "1,2\n"]))
+        next(abandoned)
+        abandoned.close()
+        assert cache.read(key) is None
+        assert list((tmp_path / str(project.id)).iterdir()) == []
+
+        assert b"".join(cache.write_through(key, iter(["a,b\n", b"1,2\n"]))) == b"a,b\n1,2\n"
+        assert b"".join(cache.iter_file(cache.open(key), chunk_size=3)) == b"a,b\n1,2\n"
+
+
+class TestCachedAgentExport:
+    """Test the project export endpoints skip rendering when nothing changed."""
+
+    def test_render_cache_and_304(self, db_specs, project, tmp_path, monkeypatch):
+        """Test first call renders, repeats are served from cache, validators give 304."""
+        from app.api import export_endpoints
+        from app.services import export_cache
+
+        calls = []
+
+        class FakeOrchestrator:
+            def route_request(self, agent_id, action, data):
+                calls.append(action)
+                return {"success": True, "content": f"# render {len(calls)}", "filename": "cached_export_specs.md"}
+
+        monkeypatch.setattr(export_endpoints, "get_orchestrator", lambda: FakeOrchestrator())
+        export_cache.configure_export_cache(ExportArtifactCache(tmp_path))
+        try:
+            def export(**headers):
+                return export_endpoints.export_markdown(
+                    project_id=str(project.id), current_user=None, db=db_specs,
+                    if_none_match=headers.get("if_none_match"), if_modified_since=headers.get("if_modified_since")
+                )
+
+            first = export()
+            assert first.body == b"# render 1"
+            assert export().body == b"# render 1"
+            assert calls == ["export_markdown"]
+
+            assert export(if_none_match=first.headers["etag"]).status_code == 304
+            assert export(if_modified_since=first.headers["last-modified"]).status_code == 304
+
+            add_spec(db_specs, project, "new")
+            db_specs.commit()
+            changed = export(if_none_match=first.headers["etag"])
+            assert changed.status_code == 200 and changed.body == b"# render 2"
+            assert changed.headers["etag"] != first.headers["etag"]
+        finally:
+            export_cache.configure_export_cache(None)
@@ -0,0 +1,138 @@
+"""Tests for streaming specification exports."""
+
+import csv
+import gzip
+import json
+import uuid
+from io import StringIO
+
+import pytest
+import yaml
+
+from app.services.export_service import (
+    ExportService,
+    gzip_chunks,
+    iter_project_specifications,
+    stream_project_export,
+)
+
+SPECS = [
+    {"key": "auth", "value": "OAuth 2.0", "category": "Security", "priority": "critical"},
+    {"key": "api_limit", "value": "1000 req/min", "category": "API", "nested": {"a": [1, 2]}},
+    {"key": "tls", "value": "TLS 1.3\nonly", "category": "Security"},
+]
+
+
+def consume_once(items):
+    """A one-shot iterator that fails if consumed twice."""
+    yield from items
+
+
+@pytest.fixture
+def project_specs(db_specs, session_factory_specs, monkeypatch):
+    """A project with current and superseded specifications."""
+    from app.models import Project, Specification
+
+    monkeypatch.setattr("app.core.database.SessionLocalSpecs", session_factory_specs)
+    user_id = uuid.uuid4()
+    project = Project(name="Streaming Export", creator_id=user_id, owner_id=user_id, user_id=user_id)
+    db_specs.add(project)
+    db_specs.flush()
+    db_specs.add_all([
+        Specification(project_id=project.id, category=f"cat{n % 3}", key=f"key{n:03d}",
+                      value=f"value {n}", source="user_input", confidence=0.9)
+        for n in range(30)
+    ] + [
+        Specification(project_id=project.id, category="cat0", key="old", value="stale",
+                      source="user_input", is_current=False)
+    ])
+    db_specs.commit()
+
+    yield project
+
+    db_specs.query(Specification).filter(Specification.project_id == project.id).delete()
+    db_specs.commit()
+
+
+class TestExportGenerators:
+    """Test each format streams the same document as the to_* methods."""
+
+    @pytest.mark.parametrize("fmt", ["json", "csv", "yaml", "html"])
+    def test_stream_matches_export(self, fmt):
+        """Test joined chunks equal the string export (timestamps aside)."""
+        streamed = "".join(ExportService.stream(fmt, "P", "p1", consume_once(SPECS), total=len(SPECS)))
+        exported = ExportService.export(fmt, "P", "p1", SPECS)
+
+        if fmt == "json":
+            assert json.loads(streamed)["specifications"] == json.loads(exported)["specifications"] == SPECS
+        elif fmt == "yaml":
+            assert yaml.safe_load(streamed)["specifications"] == SPECS
+        elif fmt == "csv":
+            assert streamed == exported
+        else:
+            assert streamed.count("<tr>") == len(SPECS) + 1
+            assert "Total Specifications:</strong> 3" in streamed
+
+    def test_one_chunk_per_specification(self):
+        """Test specifications are emitted as they arrive."""
+        chunks = list(ExportService.iter_csv(consume_once(SPECS), ["key", "value"]))
+        assert len(chunks) == len(SPECS)
+        assert list(csv.reader(StringIO("".join(chunks))))[1:] == [
+            ["auth", "OAuth 2.0"], ["api_limit", "1000 req/min"], ["tls", "TLS 1.3\nonly"]
+        ]
+
+    def test_empty_exports_are_valid(self):
+        """Test empty streams still produce parseable documents."""
+        assert json.loads("".join(ExportService.iter_json("P", "p1", [])))["specifications"] == []
+        assert yaml.safe_load("".join(ExportService.iter_yaml("P", "p1", [])))["specifications"] == []
+        assert "".join(ExportService.iter_csv([])) == ""
+
+    def test_markdown_groups_ordered_input(self):
+        """Test category-ordered input streams like to_markdown's sorted grouping."""
+        ordered = sorted(SPECS, key=lambda spec: spec["category"])
+        streamed = "".join(ExportService.iter_markdown("P", consume_once(ordered)))
+        exported = ExportService.to_markdown("P", SPECS)
+
+        assert streamed.split("\n", 3)[3] == exported.split("\n", 3)[3]
+        assert streamed.count("### Security") == 1
+
+    def test_unsupported_format(self):
+        """Test unknown formats fail before streaming."""
+        with pytest.raises(ValueError):
+            ExportService.stream("pdf", "P", "p1", [])
+
+    def test_gzip_round_trip(self):
+        """Test on-the-fly gzip produces one valid gzip stream."""
+        chunks = list(gzip_chunks(ExportService.iter_json("P", "p1", SPECS * 200)))
+        document = gzip.decompress(b"".join(chunks)).decode("utf-8")
+        assert len(json.loads(document)["specifications"]) == 600
+
+
+class TestProjectExportStream:
+    """Test streaming specification rows from the database."""
+
+    def test_rows_are_current_and_ordered(self, db_specs, project_specs):
+        """Test only current specs are read, ordered by category and key."""
+        rows = list(iter_project_specifications(db_specs, project_specs.id, batch_size=7))
+
+        assert len(rows) == 30
+        assert [(r["category"], r["key"]) for r in rows] == sorted((r["category"], r["key"]) for r in rows)
+        assert rows[0]["confidence"] == pytest.approx(0.9)
+        assert "created_at" in rows[0]
+        assert "created_at" not in next(iter_project_specifications(
+            db_specs, project_specs.id, include_timestamps=False
+        ))
+
+    def test_stream_project_export(self, project_specs):
+        """Test the response body streams from its own session, optionally gzipped."""
+        body = stream_project_export("json", project_specs.name, project_specs.id, batch_size=4)
+        data = json.loads("".join(body))
+        assert data["project"]["name"] == "Streaming Export"
+        assert len(data["specifications"]) == 30
+
+        compressed = b"".join(stream_project_export("csv", project_specs.name, project_specs.id, compress=True))
+        lines = gzip.decompress(compressed).decode("utf-8").splitlines()
+        assert len(lines) == 31
+
+        with pytest.raises(ValueError):
+            stream_project_export("pdf", project_specs.name, project_specs.id)
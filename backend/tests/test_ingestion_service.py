@@ -0,0 +1,300 @@
+"""Tests for background document ingestion."""
+
+import asyncio
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import app.services.embedding_cache as embedding_cache_module
+import app.services.vector_index as vector_index_module
+from app.services.document_parser import DocumentParser
+from app.services.embedding_cache import EmbeddingCache
+from app.services.embedding_pipeline import (
+    EmbeddingPipeline,
+    FakeEmbeddingProvider,
+    configure_embedding_pipeline,
+)
+from app.services.ingestion_service import IngestionQueue, UploadTooLargeError
+from app.services.text_chunker import ChunkingConfig, TextChunker
+from app.services.vector_index import VectorIndexManager
+
+
+class FakeUpload:
+    """Minimal async UploadFile stand-in."""
+
+    def __init__(self, data):
+        self._data = data
+        self._pos = 0
+
+    async def read(self, size=-1):
+        chunk = self._data[self._pos:self._pos + size]
+        self._pos += len(chunk)
+        return chunk
+
+
+class TestStreamingParser:
+    """Test incremental parsing and chunking."""
+
+    def test_iter_chunks_matches_chunk_text(self):
+        """Test streamed chunks equal chunking the whole text."""
+        text = "".join(f"Sentence number {i} about the system. " for i in range(400))
+        segments = [text[i:i + 777] for i in range(0, len(text), 777)]
+        assert list(DocumentParser.iter_chunks(segments)) == DocumentParser.chunk_text(text)
+
+    def test_iter_chunks_whitespace_only(self):
+        """Test whitespace-only input yields nothing."""
+        assert list(DocumentParser.iter_chunks(["   ", "\n\n"])) == []
+
+    def test_text_blocks_stream_from_disk(self, tmp_path):
+        """Test text files are read in blocks."""
+        path = tmp_path / "spec.md"
+        path.write_text("# Title\n" + "x" * 200000, encoding="utf-8")
+        segments = list(DocumentParser.iter_segments("spec.md", str(path)))
+        assert len(segments) > 1
+        assert "".join(segments) == path.read_text(encoding="utf-8")
+
+    def test_unsupported_extension(self):
+        """Test unknown formats are rejected up front."""
+        assert not DocumentParser.is_supported("image.png")
+        with pytest.raises(ValueError):
+            DocumentParser.iter_segments("image.png", "/nonexistent")
+
+
+class TestIngestionQueue:
+    """Test the ingestion job lifecycle."""
+
+    @pytest.fixture(autouse=True)
+    def isolated_services(self, monkeypatch):
+        configure_embedding_pipeline(
+            EmbeddingPipeline(FakeEmbeddingProvider(dim=8), batch_size=16, tokens_per_minute=None)
+        )
+        monkeypatch.setattr(embedding_cache_module, "_embedding_cache", EmbeddingCache(enabled=False))
+        monkeypatch.setattr(vector_index_module, "_manager", VectorIndexManager())
+        yield
+        configure_embedding_pipeline(None)
+
+    @pytest.fixture
+    def queue(self, session_factory_specs, tmp_path):
+        from app.models import DocumentChunk, IngestionJob, KnowledgeBaseDocument
+
+        yield IngestionQueue(session_factory=session_factory_specs, batch_chunks=10, spool_dir=str(tmp_path))
+
+        db = session_factory_specs()
+        db.query(DocumentChunk).delete()
+        db.query(KnowledgeBaseDocument).delete()
+        db.query(IngestionJob).delete()
+        db.commit()
+        db.close()
+
+    def _submit(self, queue, session_factory_specs, filename, data):
+        project_id, user_id = uuid.uuid4(), uuid.uuid4()
+        path, size = asyncio.run(queue.spool(FakeUpload(data)))
+        db = session_factory_specs()
+        job = queue.create_job(db, project_id, user_id, filename, size)
+        job_id = job.id
+        db.close()
+        return job_id, path, project_id
+
+    def _job(self, session_factory_specs, job_id):
+        from app.models import IngestionJob
+
+        db = session_factory_specs()
+        job = db.query(IngestionJob).filter(IngestionJob.id == job_id).first().to_dict()
+        db.close()
+        return job
+
+    def test_process_streams_chunks_in_batches(self, queue, session_factory_specs):
+        """Test a document is chunked, embedded and bulk inserted."""
+        from app.models import DocumentChunk
+
+        text = "".join(f"Requirement {i}: the system shall do thing {i}. " for i in range(300))
+        job_id, path, project_id = self._submit(queue, session_factory_specs, "reqs.txt", text.encode())
+
+        asyncio.run(queue.process(job_id, path, "reqs.txt", "text/plain"))
+
+        job = self._job(session_factory_specs, job_id)
+        expected = TextChunker().chunk(text)
+        assert job["status"] == "completed"
+        assert job["embedding_status"] == "completed"
+        assert job["chunks_processed"] == len(expected) > 10
+        assert not os.path.exists(path)
+
+        db = session_factory_specs()
+        chunks = db.query(DocumentChunk).order_by(DocumentChunk.chunk_index).all()
+        assert [chunk.content for chunk in chunks] == expected
+        assert all(chunk.embedding_vector is not None for chunk in chunks)
+        index = vector_index_module.get_vector_index_manager().get(str(project_id), db)
+        assert len(index) == len(expected)
+        db.close()
+
+    def test_project_chunking_config_is_used(self, queue, session_factory_specs):
+        """Test per-project chunking overrides apply to new uploads."""
+        from app.models import DocumentChunk, Project
+
+        text = "".join(f"Requirement {i}: the system shall do thing {i}. " for i in range(100))
+        job_id, path, project_id = self._submit(queue, session_factory_specs, "reqs.txt", text.encode())
+        db = session_factory_specs()
+        owner = uuid.uuid4()
+        db.add(Project(
+            id=project_id, creator_id=owner, owner_id=owner, user_id=owner, name="Chunked",
+            chunking_config={"strategy": "fixed", "chunk_size": 200, "overlap": 0},
+        ))
+        db.commit()
+        db.close()
+
+        asyncio.run(queue.process(job_id, path, "reqs.txt"))
+
+        db = session_factory_specs()
+        chunks = [row.content for row in db.query(DocumentChunk).order_by(DocumentChunk.chunk_index)]
+        db.query(Project).delete()
+        db.commit()
+        db.close()
+        assert chunks == TextChunker(ChunkingConfig(strategy="fixed", chunk_size=200, overlap=0)).chunk(text)
+
+    def test_empty_document_fails_and_cleans_up(self, queue, session_factory_specs):
+        """Test a document without text fails and leaves no rows behind."""
+        from app.models import KnowledgeBaseDocument
+
+        job_id, path, _ = self._submit(queue, session_factory_specs, "blank.txt", b"   \n  ")
+        asyncio.run(queue.process(job_id, path, "blank.txt"))
+
+        job = self._job(session_factory_specs, job_id)
+        assert job["status"] == "failed"
+        assert job["error"] == "No text extracted from document"
+        assert job["document_id"] is None
+        db = session_factory_specs()
+        assert db.query(KnowledgeBaseDocument).count() == 0
+        db.close()
+
+    def test_embedding_failure_keeps_chunks(self, queue, session_factory_specs):
+        """Test chunks are stored without embeddings when the provider fails."""
+        class BrokenProvider(FakeEmbeddingProvider):
+            async def embed(self, texts):
+                raise RuntimeError("provider down")
+
+        configure_embedding_pipeline(
+            EmbeddingPipeline(BrokenProvider(), max_retries=0, tokens_per_minute=None)
+        )
+        job_id, path, _ = self._submit(queue, session_factory_specs, "notes.md", b"# Notes\n" + b"text " * 200)
+        asyncio.run(queue.process(job_id, path, "notes.md"))
+
+        job = self._job(session_factory_specs, job_id)
+        assert job["status"] == "completed"
+        assert job["embedding_status"] == "failed"
+        assert job["chunks_processed"] > 0
+        assert job["chunks_embedded"] == 0
+
+    def test_workers_process_submitted_jobs(self, queue, session_factory_specs):
+        """Test submit() hands jobs to background workers."""
+        job_id, path, _ = self._submit(queue, session_factory_specs, "a.txt", b"hello world " * 100)
+
+        async def run():
+            await queue.submit(job_id, path, "a.txt", "text/plain")
+            await queue.join()
+            await queue.stop()
+
+        asyncio.run(run())
+        assert self._job(session_factory_specs, job_id)["status"] == "completed"
+
+    def test_spool_enforces_size_limit(self, tmp_path):
+        """Test oversized uploads are rejected and not left on disk."""
+        queue = IngestionQueue(spool_dir=str(tmp_path), max_upload_bytes=10)
+        with pytest.raises(UploadTooLargeError):
+            asyncio.run(queue.spool(FakeUpload(b"x" * 100)))
+        assert os.listdir(tmp_path) == []
+
+    def test_fail_stale_jobs(self, queue, session_factory_specs):
+        """Test orphaned active jobs are marked failed."""
+        from app.models import IngestionJob
+
+        db = session_factory_specs()
+        stale = IngestionJob(
+            project_id=uuid.uuid4(),
+            user_id=uuid.uuid4(),
+            filename="old.pdf",
+            status="processing",
+            updated_at=datetime.now(timezone.utc) - timedelta(hours=2),
+        )
+        fresh = IngestionJob(project_id=uuid.uuid4(), user_id=uuid.uuid4(), filename="new.pdf", status="queued")
+        hours_ago = datetime.now(timezone.utc) - timedelta(hours=2)
+        orphaned = IngestionJob(
+            project_id=uuid.uuid4(),
+            user_id=uuid.uuid4(),
+            filename="lost.pdf",
+            status="queued",
+            created_at=hours_ago,
+            updated_at=hours_ago,
+        )
+        db.add_all([stale, fresh, orphaned])
+        db.commit()
+        stale_id, fresh_id, orphaned_id = stale.id, fresh.id, orphaned.id
+        db.close()
+
+        assert queue.fail_stale_jobs() == 2
+        assert self._job(session_factory_specs, stale_id)["status"] == "failed"
+        assert self._job(session_factory_specs, orphaned_id)["status"] == "failed"
+        assert self._job(session_factory_specs, fresh_id)["status"] == "queued"
+
+    def test_long_queued_job_is_not_failed(self, queue, session_factory_specs):
+        """Test a job waiting in this process's backlog is not treated as stale."""
+        from app.models import IngestionJob
+
+        job_id, path, _ = self._submit(queue, session_factory_specs, "a.txt", b"hello world " * 100)
+        db = session_factory_specs()
+        db.query(IngestionJob).filter(IngestionJob.id == job_id).update({
+            "updated_at": datetime.now(timezone.utc) - timedelta(hours=2),
+        }, synchronize_session=False)
+        db.commit()
+        db.close()
+
+        assert queue.fail_stale_jobs() == 0
+        asyncio.run(queue.process(job_id, path, "a.txt"))
+        assert self._job(session_factory_specs, job_id)["status"] == "completed"
+
+    def test_stale_failed_job_is_not_processed(self, queue, session_factory_specs):
+        """Test a job failed while queued is skipped when a worker dequeues it."""
+        from app.models import IngestionJob, KnowledgeBaseDocument
+
+        job_id, path, _ = self._submit(queue, session_factory_specs, "a.txt", b"hello world " * 100)
+        restarted = IngestionQueue(session_factory=session_factory_specs, spool_dir=queue.spool_dir)
+        db = session_factory_specs()
+        db.query(IngestionJob).filter(IngestionJob.id == job_id).update({
+            "created_at": datetime.now(timezone.utc) - timedelta(hours=2),
+            "updated_at": datetime.now(timezone.utc) - timedelta(hours=2),
+        }, synchronize_session=False)
+        db.commit()
+        db.close()
+        assert restarted.fail_stale_jobs() == 1
+
+        asyncio.run(queue.process(job_id, path, "a.txt"))
+
+        job = self._job(session_factory_specs, job_id)
+        assert job["status"] == "failed"
+        assert job["document_id"] is None
+        assert job["started_at"] is None
+        assert not os.path.exists(path)
+        db = session_factory_specs()
+        assert db.query(KnowledgeBaseDocument).count() == 0
+        db.close()
+
+    def test_stale_job_background_job(self, queue, session_factory_specs, monkeypatch):
+        """Test the startup/periodic job fails orphaned jobs through the shared queue."""
+        import app.services.ingestion_service as ingestion_module
+        from app.jobs import fail_stale_ingestion_jobs
+        from app.models import IngestionJob
+
+        monkeypatch.setattr(ingestion_module, "_queue", queue)
+        db = session_factory_specs()
+        db.add(IngestionJob(
+            project_id=uuid.uuid4(),
+            user_id=uuid.uuid4(),
+            filename="old.pdf",
+            status="processing",
+            updated_at=datetime.now(timezone.utc) - timedelta(hours=2),
+        ))
+        db.commit()
+        db.close()
+
+        assert asyncio.run(fail_stale_ingestion_jobs()) == {"status": "success", "failed_jobs": 1}
@@ -0,0 +1,118 @@
+"""Tests for the local intent classifier in front of NLUService.parse_intent."""
+
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.intent_classifier import IntentClassifier
+from app.core.nlu_service import NLUService
+
+
+class FakeClaude:
+    """Canned create() responses; records requests."""
+
+    def __init__(self, responses=()):
+        self.responses = list(responses)
+        self.requests = []
+        self.messages = self
+
+    def create(self, **kwargs):
+        self.requests.append(kwargs)
+        return SimpleNamespace(content=[SimpleNamespace(text=self.responses.pop(0))])
+
+
+CONTEXT = {'current_user': 'u1', 'current_project': 'p1', 'current_session': 's1'}
+
+
+class TestIntentClassifier:
+    """Test local classification and confidence levels."""
+
+    @pytest.fixture
+    def classifier(self):
+        return IntentClassifier(NLUService.AVAILABLE_OPERATIONS)
+
+    def test_commands_are_confident(self, classifier):
+        """Test imperative commands with known parameters classify locally."""
+        prediction = classifier.classify("Please list my projects.")
+        assert (prediction.operation, prediction.confidence) == ("list_projects", classifier.HIGH_CONFIDENCE)
+
+        prediction = classifier.classify("Can you create a new project called Billing API", CONTEXT)
+        assert prediction.operation == "create_project"
+        assert prediction.params == {"name": "Billing API"}
+        assert prediction.confidence == classifier.HIGH_CONFIDENCE
+
+        prediction = classifier.classify("export the project as PDF", CONTEXT)
+        assert prediction.params == {"project_id": "p1", "format": "pdf"}
+
+    def test_conversation_is_confident(self, classifier):
+        """Test plain conversation and command-like sentences stay conversation."""
+        for text in ("We want to plan goals", "show me the risks of using MongoDB"):
+            prediction = classifier.classify(text, CONTEXT)
+            assert prediction.operation is None
+            assert prediction.confidence == classifier.CONVERSATION_CONFIDENCE
+
+    def test_uncertain_cases_defer(self, classifier):
+        """Test missing parameters and loose operation words are low confidence."""
+        assert classifier.classify("log in as alice with password x").confidence == classifier.MISSING_PARAMS_CONFIDENCE
+        assert classifier.classify("view insights", {'current_project': 'None'}).confidence == (
+            classifier.MISSING_PARAMS_CONFIDENCE
+        )
+        assert classifier.classify("Our project should create invoices").confidence == classifier.AMBIGUOUS_CONFIDENCE
+
+
+class TestParseIntent:
+    """Test parse_intent only calls Claude when the local result is uncertain."""
+
+    def test_conversation_makes_no_call(self):
+        """Test a conversational message is decided locally."""
+        claude = FakeClaude()
+        nlu = NLUService(claude)
+
+        intent = nlu.parse_intent("We need offline support for field workers", CONTEXT)
+
+        assert not intent.is_operation
+        assert intent.source == "local"
+        assert claude.requests == []
+        assert nlu.intent_stats == {'local': 1, 'remote': 0, 'memo_hits': 0}
+
+    def test_low_confidence_calls_claude_and_memoizes(self):
+        """Test the remote parser result is remembered per session."""
+        claude = FakeClaude([json.dumps({
+            "is_operation": True, "operation": "login_user",
+            "params": {"username": "alice", "password": "x"}, "explanation": "Log in"
+        })])
+        nlu = NLUService(claude)
+
+        usage = {'user_id': 'u1', 'project_id': 'p1', 'session_id': 's1'}
+        first = nlu.parse_intent("log in as alice with password x", CONTEXT, usage_context=usage)
+        second = nlu.parse_intent("Log in as alice with password x!", CONTEXT)
+
+        assert first.operation == "login_user" and first.source == "remote"
+        assert second is first
+        assert len(claude.requests) == 1
+        assert claude.requests[0]["usage_context"] == usage
+        assert nlu.intent_stats == {'local': 0, 'remote': 1, 'memo_hits': 1}
+
+    def test_memo_is_per_session_and_bounded(self):
+        """Test another session misses the memo and old entries are evicted."""
+        nlu = NLUService(FakeClaude())
+        nlu.INTENT_MEMO_SIZE = 2
+
+        nlu.parse_intent("list projects", CONTEXT)
+        nlu.parse_intent("list projects", {**CONTEXT, 'current_session': 's2'})
+        nlu.parse_intent("hello there", CONTEXT)
+
+        assert nlu.intent_stats['memo_hits'] == 0
+        assert len(nlu._intent_memo) == 2
+
+    def test_unparseable_response_is_not_memoized(self):
+        """Test the rephrase fallback is returned but not remembered."""
+        claude = FakeClaude(["not json", "not json"])
+        nlu = NLUService(claude)
+
+        for _ in range(2):
+            intent = nlu.parse_intent("Our project should create invoices", CONTEXT)
+            assert intent.response.startswith("I didn't quite understand")
+
+        assert len(claude.requests) == 2
@@ -0,0 +1,149 @@
+"""Tests for the LLM response cache and its use by the gateway."""
+
+import threading
+import uuid
+
+from app.services.cache_service import InMemoryCacheEngine, SQLiteCacheEngine
+from app.services.llm_cache import LLMResponseCache, cache_key, llm_cache_mode
+from app.services.llm_gateway import FakeLLMProvider, LLMGateway
+
+MESSAGES = [{"role": "user", "content": "Which database fits?"}]
+
+
+class TestCacheKey:
+    """Test what distinguishes cached requests."""
+
+    def test_layout_differences_share_a_key(self):
+        """Test whitespace and line endings are normalised."""
+        a = {"model": "m", "max_tokens": 10, "messages": [{"role": "user", "content": "Hello\r\n  world  "}]}
+        b = {"model": "m", "max_tokens": 10, "messages": [{"role": "user", "content": "Hello\nworld"}]}
+        assert cache_key(a) == cache_key(b)
+
+    def test_model_prompt_and_params_change_the_key(self):
+        """Test model, wording and generation parameters are part of the key."""
+        base = {"model": "m", "max_tokens": 10, "messages": MESSAGES}
+        keys = {
+            cache_key(base),
+            cache_key({**base, "model": "other"}),
+            cache_key({**base, "max_tokens": 20}),
+            cache_key({**base, "system": "Be brief"}),
+            cache_key({**base, "messages": [{"role": "user", "content": "which database fits?"}]}),
+        }
+        assert len(keys) == 5
+        assert cache_key({**base, "metadata": {"user_id": "u1"}}) == cache_key(base)
+        assert cache_key(base).startswith("llm:m:")
+
+
+class TestResponseCache:
+    """Test the two cache tiers."""
+
+    def test_shared_tier_hits_are_promoted(self):
+        """Test a response stored by another worker is found and kept in memory."""
+        shared = SQLiteCacheEngine(":memory:")
+        writer = LLMResponseCache(InMemoryCacheEngine(sweep_interval=0), shared)
+        reader = LLMResponseCache(InMemoryCacheEngine(sweep_interval=0), shared)
+
+        writer.set("llm:m:1", {"text": "x", "model": "m", "tokens_input": 5, "tokens_output": 2})
+
+        assert reader.get("llm:m:1")["text"] == "x"
+        assert reader.get("llm:m:1")["text"] == "x"
+        stats = reader.get_stats()
+        assert (stats["shared_hits"], stats["memory_hits"], stats["saved_tokens"]) == (1, 1, 14)
+        reader.close()
+
+
+def make_gateway(provider, rows=None):
+    sink = rows.extend if rows is not None else None
+    return LLMGateway(
+        {"fake": provider},
+        default_model="fake-model",
+        usage_sink=sink,
+        response_cache=LLMResponseCache(InMemoryCacheEngine(sweep_interval=0)),
+    )
+
+
+class TestGatewayCaching:
+    """Test opt-in caching in the gateway."""
+
+    def test_only_opted_in_calls_are_cached(self):
+        """Test cache=True calls are reused and others always reach the provider."""
+        provider = FakeLLMProvider(response="PostgreSQL")
+        gateway = make_gateway(provider)
+        try:
+            first = gateway.complete(max_tokens=10, messages=MESSAGES, cache=True)
+            second = gateway.complete(max_tokens=10, messages=MESSAGES, cache=True)
+            gateway.complete(max_tokens=10, messages=MESSAGES)
+
+            assert (first.cached, second.cached) == (False, True)
+            assert second.text == "PostgreSQL"
+            assert provider.requests == 2
+            assert gateway.get_stats()["fake"]["cache_hits"] == 1
+        finally:
+            gateway.close()
+
+    def test_hits_are_recorded_as_zero_cost(self):
+        """Test the usage row of a cache hit has no tokens or cost."""
+        rows = []
+        gateway = make_gateway(FakeLLMProvider(response="a b c"), rows)
+        usage = {"user_id": str(uuid.uuid4())}
+        try:
+            gateway.complete(max_tokens=10, messages=MESSAGES, cache=True, usage_context=usage)
+            gateway.complete(max_tokens=10, messages=MESSAGES, cache=True, usage_context=usage)
+        finally:
+            gateway.close()  # Waits for the usage writes
+
+        miss, hit = sorted(rows, key=lambda row: row["cached"])
+        assert miss["tokens_total"] > 0
+        assert (hit["cached"], hit["tokens_total"], hit["cost_usd"]) == (True, 0, 0)
+
+    def test_bypass_and_refresh(self):
+        """Test debugging modes skip reads (and writes for bypass)."""
+        answers = iter(["first", "second", "third"])
+        provider = FakeLLMProvider(response=lambda request: next(answers))
+        gateway = make_gateway(provider)
+        try:
+            assert gateway.complete(max_tokens=10, messages=MESSAGES, cache=True).text == "first"
+            with llm_cache_mode("bypass"):
+                assert gateway.complete(max_tokens=10, messages=MESSAGES, cache=True).text == "second"
+            assert gateway.complete(max_tokens=10, messages=MESSAGES, cache=True).text == "first"
+            with llm_cache_mode("refresh"):
+                assert gateway.complete(max_tokens=10, messages=MESSAGES, cache=True).text == "third"
+            assert gateway.complete(max_tokens=10, messages=MESSAGES, cache=True).text == "third"
+            assert gateway.response_cache.get_stats()["bypassed"] == 1
+        finally:
+            gateway.close()
+
+    def test_identical_requests_in_flight_share_one_call(self):
+        """Test concurrent identical cached requests reach the provider once."""
+        provider = FakeLLMProvider(response="shared", latency_seconds=0.05)
+        gateway = make_gateway(provider)
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(
+                gateway.complete(max_tokens=10, messages=MESSAGES, cache=True)
+            ))
+            for _ in range(5)
+        ]
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            gateway.close()
+
+        assert provider.requests == 1
+        assert [result.text for result in results] == ["shared"] * 5
+        assert sum(result.cached for result in results) == 4
+
+    def test_streams_are_not_cached(self):
+        """Test messages.stream() ignores cache=True."""
+        provider = FakeLLMProvider(response="fresh text")
+        gateway = make_gateway(provider)
+        try:
+            for _ in range(2):
+                with gateway.client().messages.stream(max_tokens=10, messages=MESSAGES, cache=True) as stream:
+                    assert "".join(stream.text_stream) == "fresh text"
+            assert provider.requests == 2
+        finally:
+            gateway.close()
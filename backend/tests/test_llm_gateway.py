@@ -0,0 +1,244 @@
+"""Tests for the LLM gateway (pooling, limits, retries, breaker, usage)."""
+
+import asyncio
+import threading
+import uuid
+
+import pytest
+
+from app.services.llm_gateway import (
+    CircuitBreaker,
+    FakeLLMProvider,
+    LLMDeadlineExceededError,
+    LLMGateway,
+    LLMUnavailableError,
+    estimate_cost,
+)
+
+
+class FlakyProvider(FakeLLMProvider):
+    """Fails the first `failures` calls with the given error."""
+
+    def __init__(self, failures, error=ConnectionError("reset"), **kwargs):
+        super().__init__(**kwargs)
+        self.failures = failures
+        self.error = error
+
+    async def create(self, request):
+        if self.failures:
+            self.failures -= 1
+            self.requests += 1
+            raise self.error
+        return await super().create(request)
+
+
+def make_gateway(provider, **options):
+    options.setdefault("backoff_base_seconds", 0.001)
+    options.setdefault("usage_sink", None)
+    return LLMGateway({"fake": provider}, default_model="fake-model", **options)
+
+
+MESSAGES = [{"role": "user", "content": "Hello there"}]
+
+
+class TestGatewayCalls:
+    """Test sync, async and streamed calls."""
+
+    def test_client_is_messages_compatible(self):
+        """Test the facade returns Messages API shaped responses."""
+        gateway = make_gateway(FakeLLMProvider(response="Hi"))
+        try:
+            response = gateway.client().messages.create(max_tokens=10, messages=MESSAGES)
+            assert response.content[0].text == "Hi"
+            assert response.model == "fake-model"
+            assert response.usage.input_tokens > 0
+
+            with gateway.client().messages.stream(max_tokens=10, messages=MESSAGES) as stream:
+                assert "".join(stream.text_stream) == "Hi"
+        finally:
+            gateway.close()
+
+    def test_stream_yields_words(self):
+        """Test streamed deltas arrive in order and are counted."""
+        gateway = make_gateway(FakeLLMProvider(response="one two three"))
+        try:
+            assert list(gateway.stream(max_tokens=10, messages=MESSAGES)) == ["one", " two", " three"]
+            assert gateway.get_stats()["fake"]["succeeded"] == 1
+        finally:
+            gateway.close()
+
+    def test_async_callers_share_the_gateway_loop(self):
+        """Test acomplete() works from another event loop."""
+        gateway = make_gateway(FakeLLMProvider(response="async"))
+
+        async def run():
+            results = await asyncio.gather(*(
+                gateway.acomplete(max_tokens=10, messages=MESSAGES) for _ in range(3)
+            ))
+            return [result.text for result in results]
+
+        try:
+            assert asyncio.run(run()) == ["async"] * 3
+        finally:
+            gateway.close()
+
+    def test_concurrency_is_bounded(self):
+        """Test at most max_concurrency requests reach the provider at once."""
+        provider = FakeLLMProvider(latency_seconds=0.02)
+        gateway = make_gateway(provider, max_concurrency=3)
+        threads = [
+            threading.Thread(target=gateway.complete, kwargs={"max_tokens": 5, "messages": MESSAGES})
+            for _ in range(12)
+        ]
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            assert provider.requests == 12
+            assert provider.max_in_flight == 3
+        finally:
+            gateway.close()
+
+    def test_close_drains_calls_in_flight(self):
+        """Test close() lets a running call finish before closing the providers."""
+        gateway = make_gateway(FakeLLMProvider(response="late", latency_seconds=0.2))
+        results = []
+        caller = threading.Thread(
+            target=lambda: results.append(gateway.complete(max_tokens=5, messages=MESSAGES).text), daemon=True
+        )
+        caller.start()
+        while gateway.get_stats().get("fake", {}).get("in_flight") != 1:
+            threading.Event().wait(0.005)
+
+        gateway.close()
+        caller.join(5)
+        assert results == ["late"]
+
+    def test_close_llm_gateway_only_closes_a_created_gateway(self, monkeypatch):
+        """Test shutdown does not build a gateway that was never used."""
+        import app.services.llm_gateway as gateway_module
+
+        monkeypatch.setattr(gateway_module, "_gateway", None)
+        monkeypatch.setattr(gateway_module, "create_llm_gateway", lambda: pytest.fail("gateway created"))
+        gateway_module.close_llm_gateway()
+
+        gateway = make_gateway(FakeLLMProvider())
+        gateway.complete(max_tokens=5, messages=MESSAGES)
+        monkeypatch.setattr(gateway_module, "_gateway", gateway)
+        gateway_module.close_llm_gateway()
+        assert gateway._loop is None and gateway_module._gateway is None
+
+
+class TestResilience:
+    """Test retries, deadlines and the circuit breaker."""
+
+    def test_transient_errors_are_retried(self):
+        """Test a connection error is retried and counted."""
+        gateway = make_gateway(FlakyProvider(failures=2, response="ok"))
+        try:
+            result = gateway.complete(max_tokens=5, messages=MESSAGES)
+            assert result.text == "ok"
+            assert result.attempts == 3
+            assert gateway.get_stats()["fake"]["retries"] == 2
+        finally:
+            gateway.close()
+
+    def test_permanent_errors_are_not_retried(self):
+        """Test non-transient errors surface immediately."""
+        provider = FlakyProvider(failures=1, error=ValueError("bad request"))
+        gateway = make_gateway(provider)
+        try:
+            with pytest.raises(ValueError):
+                gateway.complete(max_tokens=5, messages=MESSAGES)
+            assert provider.requests == 1
+            assert gateway.breakers["fake"].state == "closed"
+        finally:
+            gateway.close()
+
+    def test_deadline(self):
+        """Test a slow provider is cut off at the call deadline."""
+        gateway = make_gateway(FakeLLMProvider(latency_seconds=1.0), max_retries=0)
+        try:
+            with pytest.raises(LLMDeadlineExceededError):
+                gateway.complete(timeout=0.05, max_tokens=5, messages=MESSAGES)
+        finally:
+            gateway.close()
+
+    def test_circuit_opens_and_recovers(self):
+        """Test the breaker rejects calls while open and closes after a good trial."""
+        now = [0.0]
+        breaker = CircuitBreaker(failure_threshold=2, reset_seconds=10, clock=lambda: now[0])
+
+        breaker.record_failure()
+        assert breaker.allow()
+        breaker.record_failure()
+        assert breaker.state == "open" and not breaker.allow()
+
+        now[0] = 10.0
+        assert breaker.allow()
+        assert not breaker.allow()  # One trial at a time
+        breaker.record_success()
+        assert breaker.state == "closed"
+
+    def test_open_circuit_fails_fast(self):
+        """Test calls are rejected without reaching the provider."""
+        provider = FlakyProvider(failures=10)
+        gateway = make_gateway(provider, max_retries=0, circuit_failure_threshold=2)
+        try:
+            for _ in range(2):
+                with pytest.raises(ConnectionError):
+                    gateway.complete(max_tokens=5, messages=MESSAGES)
+            with pytest.raises(LLMUnavailableError):
+                gateway.complete(max_tokens=5, messages=MESSAGES)
+            assert provider.requests == 2
+            assert gateway.get_stats()["fake"]["rejected"] == 1
+        finally:
+            gateway.close()
+
+
+class TestUsageTracking:
+    """Test usage rows are produced for attributed calls."""
+
+    def test_usage_rows(self):
+        """Test attributed calls are recorded and anonymous ones are not."""
+        rows = []
+        written = threading.Event()
+
+        def sink(batch):
+            rows.extend(batch)
+            written.set()
+
+        gateway = make_gateway(FakeLLMProvider(response="a b c d"), usage_sink=sink)
+        user_id = uuid.uuid4()
+        try:
+            gateway.complete(max_tokens=5, messages=MESSAGES)
+            gateway.complete(max_tokens=5, messages=MESSAGES, usage_context={"user_id": str(user_id)})
+            assert written.wait(2)
+        finally:
+            gateway.close()
+
+        assert len(rows) == 1
+        assert rows[0]["user_id"] == user_id
+        assert rows[0]["tokens_total"] == rows[0]["tokens_input"] + rows[0]["tokens_output"]
+        assert rows[0]["provider"] == "fake"
+
+    def test_usage_rows_insert(self, db_specs, session_factory_specs, monkeypatch):
+        """Test the default sink writes llm_usage_tracking rows."""
+        from app.models.llm_usage_daily import LLMUsageDaily
+        from app.models.llm_usage_tracking import LLMUsageTracking
+        from app.services import llm_gateway
+
+        monkeypatch.setattr("app.core.database.SessionLocalSpecs", session_factory_specs)
+        llm_gateway.record_usage_rows([{
+            "user_id": uuid.uuid4(), "project_id": None, "session_id": None, "provider": "anthropic",
+            "model": "claude-sonnet-4-5-20250929", "tokens_input": 1000, "tokens_output": 100,
+            "tokens_total": 1100, "cost_usd": estimate_cost("claude-sonnet-4-5-20250929", 1000, 100),
+            "latency_ms": 900,
+        }])
+
+        row = db_specs.query(LLMUsageTracking).one()
+        assert float(row.cost_usd) == pytest.approx(0.0045)
+        db_specs.query(LLMUsageTracking).delete()
+        db_specs.query(LLMUsageDaily).delete()
+        db_specs.commit()
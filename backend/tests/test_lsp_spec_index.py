@@ -0,0 +1,280 @@
+"""Tests for the LSP's local specification index and delta sync."""
+
+import asyncio
+import time
+import uuid
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from lsp.spec_index import ReferenceIndex, SpecIndex, SpecIndexStore, prefix_at, reference_at
+from lsp.text_document import TextDocument
+
+
+def spec(spec_id, key, value="v", category="goals"):
+    return SimpleNamespace(id=spec_id, key=key, value=value, category=category, created_at="", updated_at="")
+
+
+class TestReferenceAtCursor:
+    """Test reading references from one line."""
+
+    def test_reference_and_prefix(self):
+        line = "uses @security.auth_method. ✓ $db_engine"
+        assert reference_at(line, 10) == ("security.auth_method", 6, 26)
+        assert reference_at(line, 26) == ("security.auth_method", 6, 26)  # Cursor right after it
+        assert reference_at(line, 29) is None
+        assert reference_at(line, 33) == ("db_engine", 31, 40)
+        assert prefix_at(line, 18) == "security.aut"
+        assert prefix_at(line, 5) == ""
+
+
+class TestSpecIndex:
+    """Test key lookups, prefix completion and deltas."""
+
+    def test_complete_and_get(self):
+        index = SpecIndex()
+        index.replace([
+            spec("1", "auth.method"), spec("2", "Auth.Timeout"), spec("3", "database"),
+            spec("4", "auth.method", category="security"),
+        ])
+
+        assert [s.id for s in index.complete("AUTH")] == ["1", "4", "2"]
+        assert [s.id for s in index.complete("auth", limit=2)] == ["1", "4"]
+        assert [s.key for s in index.complete("")] == ["auth.method", "auth.method", "Auth.Timeout", "database"]
+        assert index.complete("x") == []
+        assert index.get("Auth.Timeout").id == "2"
+        assert index.get("auth.timeout").id == "2"  # Case-insensitive fallback
+        assert index.get("missing") is None
+
+    def test_apply_delta(self):
+        """Test changed specs replace old ones and absent IDs are dropped."""
+        index = SpecIndex()
+        index.replace([spec("1", "alpha"), spec("2", "beta"), spec("3", "Beta")])
+
+        changed = index.apply_delta([spec("1", "alpine"), spec("4", "gamma")], current_ids=["1", "3", "4"])
+        assert changed == 3
+        assert index.get("alpha") is None and index.get("alpine").id == "1"
+        assert index.get("beta").id == "3"  # Case variant takes over the removed key
+        assert [s.key for s in index.complete("")] == ["alpine", "Beta", "gamma"]
+        assert len(index) == 3
+
+        assert index.apply_delta([spec("4", "gamma", value="new")]) == 1
+        assert index.get("gamma").value == "new"
+        assert index.missing_ids(["1", "5", "4", "6"]) == ["5", "6"]
+
+    def test_completion_is_local_and_fast(self):
+        """Test prefix completion over a large project stays well under a millisecond."""
+        index = SpecIndex()
+        index.replace(spec(str(i), f"module_{i % 100}.setting_{i}") for i in range(50000))
+
+        started = time.perf_counter()
+        for _ in range(100):
+            results = index.complete("module_42.setting_1", limit=50)
+        elapsed = (time.perf_counter() - started) / 100
+        assert len(results) == 50
+        assert elapsed < 0.001
+
+
+class FakeSpecApi:
+    """Delta specification endpoint."""
+
+    def __init__(self, specs):
+        self.specs = {s.id: s for s in specs}
+        self.revision = 1
+        self.changed = set(self.specs)
+        self.calls = []
+
+    async def fetch(self, project_id, updated_since, etag):
+        self.calls.append((updated_since, etag))
+        await asyncio.sleep(0.01)
+        if etag == f'"{self.revision}"':
+            return None, etag
+        changed = [self.specs[i] for i in sorted(self.changed)] if updated_since else list(self.specs.values())
+        self.changed = set()
+        return {
+            "specifications": changed,
+            "current_ids": list(self.specs),
+            "synced_at": f"t{self.revision}",
+        }, f'"{self.revision}"'
+
+    def put(self, new_spec):
+        self.specs[new_spec.id] = new_spec
+        self.changed.add(new_spec.id)
+        self.revision += 1
+
+
+class TestSpecIndexStore:
+    """Test warm-up, background refresh and push invalidation."""
+
+    def test_warm_once_then_delta_sync(self):
+        api = FakeSpecApi([spec("1", "alpha"), spec("2", "beta")])
+        now = [0.0]
+        store = SpecIndexStore(api.fetch, refresh_interval=60, clock=lambda: now[0])
+
+        async def run():
+            store.warm("p")
+            first = await asyncio.gather(*(store.get("p") for _ in range(3)))
+            assert all(index is first[0] for index in first)
+            assert api.calls == [(None, None)]
+
+            api.put(spec("3", "gamma"))
+            store.invalidate("p")
+            index = await store.get("p")  # Served at once, sync runs behind
+            assert index.get("gamma") is None
+            await asyncio.sleep(0.05)
+            assert index.get("gamma").id == "3"
+            assert api.calls[-1] == ("t1", '"1"')
+
+            now[0] = 61.0
+            await store.get("p")
+            await asyncio.sleep(0.05)
+            assert api.calls[-1] == ("t2", '"2"')  # Unchanged: 304
+
+        asyncio.run(run())
+        stats = store.get_stats()
+        assert stats["not_modified"] == 1 and stats["specifications"] == 3
+
+    def test_late_commit_reloads(self):
+        """Test a spec committed behind the cursor (absent from the delta) triggers a reload."""
+        api = FakeSpecApi([spec("1", "alpha")])
+        store = SpecIndexStore(api.fetch)
+
+        async def run():
+            await store.get("p")
+            api.specs["2"] = spec("2", "late")  # Listed in current_ids, not in the delta
+            api.revision += 1
+            assert await store.sync("p") == 2
+            return await store.get("p")
+
+        index = asyncio.run(run())
+        assert index.get("late").id == "2" and len(index) == 2
+        assert api.calls[-2:] == [("t1", '"1"'), (None, None)]
+        assert store.get_stats()["reloads"] == 1
+
+    def test_failed_warm_up(self):
+        """Test a project that cannot be loaded yields no index, then retries."""
+        calls = []
+
+        async def failing(project_id, updated_since, etag):
+            calls.append(project_id)
+            raise ConnectionError("backend down")
+
+        store = SpecIndexStore(failing)
+
+        async def run():
+            assert await store.get("p") is None
+            assert await store.get("p") is None
+
+        asyncio.run(run())
+        assert calls == ["p", "p"]
+
+
+class TestReferenceIndex:
+    """Test find-references across open documents."""
+
+    def test_find_after_edits(self):
+        references = ReferenceIndex()
+        a = TextDocument("use @auth.method\nand auth.method.\n")
+        b = TextDocument("é auth.method")
+        references.update("file:///a.md", a)
+        references.update("file:///b.md", b)
+
+        assert references.find("auth.method") == [
+            ("file:///a.md", 0, 5, 16), ("file:///a.md", 1, 4, 15), ("file:///b.md", 0, 2, 13),
+        ]
+
+        a.apply_change({"range": {"start": {"line": 0, "character": 0}, "end": {"line": 1, "character": 0}}, "text": ""})
+        references.update("file:///a.md", a)
+        references.remove("file:///b.md")
+        assert references.find("auth.method") == [("file:///a.md", 0, 4, 15)]
+        assert references.find("use") == []
+
+
+class TestSpecificationDeltaEndpoint:
+    """Test the specifications list supports delta sync and ETags."""
+
+    @pytest.fixture
+    def project(self, db_specs):
+        from app.models import Project
+
+        user_id = uuid.uuid4()
+        project = Project(name="Indexed", creator_id=user_id, owner_id=user_id, user_id=user_id)
+        db_specs.add(project)
+        db_specs.commit()
+        return project
+
+    def test_delta_and_not_modified(self, db_auth, db_specs, project):
+        from fastapi import Response
+
+        from app.api.specifications import list_project_specifications
+        from app.models import Specification
+        from app.repositories import RepositoryService
+
+        for key in ("a", "b"):
+            db_specs.add(Specification(project_id=project.id, category="goals", key=key, value="v", source="user_input"))
+        db_specs.commit()
+        project_id, user = str(project.id), SimpleNamespace(id=project.user_id)  # The endpoint closes the session
+
+        def list_specs(updated_since=None, if_none_match=None):
+            response = Response()
+            result = list_project_specifications(
+                project_id=project_id, response=response, skip=0, limit=100, category=None,
+                is_current=True, updated_since=updated_since, current_user=user,
+                service=RepositoryService(db_auth, db_specs), if_none_match=if_none_match
+            )
+            return result, response
+
+        full, response = list_specs(updated_since=datetime(1970, 1, 1))
+        data = full["data"]
+        assert sorted(s["key"] for s in data["specifications"]) == ["a", "b"]
+        assert len(data["current_ids"]) == 2
+        assert list_specs(updated_since=datetime(1970, 1, 1), if_none_match=response.headers["etag"])[0].status_code == 304
+        # Full list and delta are different representations
+        synced_at = datetime.fromisoformat(data["synced_at"])
+        assert "data" in list_specs(updated_since=synced_at, if_none_match=response.headers["etag"])[0]
+        # Without changes the cursor stays put, so its ETag revalidates
+        delta, delta_response = list_specs(updated_since=synced_at)
+        assert delta["data"]["synced_at"] == data["synced_at"]
+        assert list_specs(updated_since=synced_at, if_none_match=delta_response.headers["etag"])[0].status_code == 304
+
+        stale = db_specs.query(Specification).filter_by(project_id=uuid.UUID(project_id), key="a").one()
+        stale_id = str(stale.id)
+        db_specs.delete(stale)
+        db_specs.commit()
+        delta = list_specs(updated_since=datetime.fromisoformat(data["synced_at"]))[0]["data"]
+        assert stale_id not in delta["current_ids"] and len(delta["current_ids"]) == 1
+        assert len(delta["specifications"]) <= 1
+
+    def test_late_update_is_resent(self, db_auth, db_specs, project):
+        """Test an update committed with an updated_at behind the cursor is in the next delta."""
+        from fastapi import Response
+
+        from app.api.specifications import list_project_specifications
+        from app.models import Specification
+        from app.repositories import RepositoryService
+
+        for key in ("a", "b"):
+            db_specs.add(Specification(project_id=project.id, category="goals", key=key, value="v", source="user_input"))
+        db_specs.commit()
+        project_id, user = str(project.id), SimpleNamespace(id=project.user_id)
+
+        def list_specs(updated_since):
+            return list_project_specifications(
+                project_id=project_id, response=Response(), skip=0, limit=100, category=None,
+                is_current=True, updated_since=updated_since, current_user=user,
+                service=RepositoryService(db_auth, db_specs), if_none_match=None
+            )["data"]
+
+        synced_at = datetime.fromisoformat(list_specs(datetime(1970, 1, 1))["synced_at"])
+
+        # Transaction started before the newest row was written, committed after the sync
+        specs = db_specs.query(Specification).filter_by(project_id=uuid.UUID(project_id))
+        newest = max(spec.updated_at for spec in specs)
+        late = specs.filter_by(key="a").one()
+        late.value = "changed"
+        late.updated_at = newest - timedelta(seconds=1)
+        db_specs.commit()
+
+        delta = list_specs(synced_at)
+        assert [(s["key"], s["value"]) for s in delta["specifications"] if s["key"] == "a"] == [("a", "changed")]
@@ -0,0 +1,273 @@
+"""Tests for incremental document sync, debounced diagnostics and the conflict cache."""
+
+import asyncio
+import random
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+
+from lsp import text_document
+from lsp.diagnostics import ConflictCache, DiagnosticsScheduler
+from lsp.text_document import TextDocument, index_to_utf16, split_lines
+
+
+def edit(start, end, text):
+    return {
+        "range": {
+            "start": {"line": start[0], "character": start[1]},
+            "end": {"line": end[0], "character": end[1]},
+        },
+        "text": text,
+    }
+
+
+class TestTextDocument:
+    """Test ranged edits against plain string splicing."""
+
+    def test_ranged_and_full_changes(self):
+        """Test insert, multi-line replace, delete and full replacement."""
+        doc = TextDocument("goals:\n  - fast\n  - safe\n")
+
+        doc.apply_change(edit((1, 8), (1, 8), "er"))
+        doc.apply_change(edit((1, 4), (2, 8), "cheap\n  - secure"))
+        doc.apply_change(edit((0, 0), (0, 0), "# spec\n"))
+        assert doc.text == "# spec\ngoals:\n  - cheap\n  - secure\n"
+        assert doc.line_count == 5 and doc.line(3) == "  - secure" and doc.line(4) == ""
+
+        doc.apply_change(edit((0, 0), (1, 0), ""))
+        assert doc.text == "goals:\n  - cheap\n  - secure\n"
+
+        doc.apply_change({"text": "new"})
+        assert list(doc.lines()) == ["new"]
+
+    def test_utf16_positions_and_clamping(self):
+        """Test characters count UTF-16 units and out-of-range positions clamp."""
+        doc = TextDocument("é𝄞x\r\nend")
+        assert index_to_utf16("é𝄞x", 3) == 4
+
+        doc.apply_change(edit((0, 3), (0, 4), "y"))  # After the surrogate pair
+        assert doc.line(0) == "é𝄞y"
+        doc.apply_change(edit((0, 99), (0, 99), "!"))  # Past the line: before "\r\n"
+        doc.apply_change(edit((9, 0), (9, 0), "?"))  # Past the document: at the end
+        assert doc.text == "é𝄞y!\r\nend?"
+        assert doc.end_position() == {"line": 1, "character": 4}
+
+    def test_joined_line_breaks(self):
+        """Test deleting text between "\\r" and "\\n" leaves one line break."""
+        doc = TextDocument("a\rX\nb")
+        doc.apply_change(edit((1, 0), (1, 1), ""))
+        assert doc.text == "a\r\nb" and doc.line_count == 2
+
+    def test_random_edits_across_blocks(self, monkeypatch):
+        """Test random edits on a many-block document match string splicing."""
+        monkeypatch.setattr(text_document, "BLOCK_SIZE", 4)
+        rng = random.Random(7)
+        alphabet = "ab \n\n\r\né𝄞"
+
+        text = "".join(rng.choice(alphabet) for _ in range(200))
+        doc = TextDocument(text)
+        for _ in range(500):
+            lines = split_lines(text)
+
+            def position():
+                number = rng.randrange(len(lines))
+                return number, rng.randint(0, len(lines[number].rstrip("\r\n")))
+
+            start, end = sorted([position(), position()])
+            new_text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 12)))
+
+            def offset(pos):
+                return sum(len(line) for line in lines[:pos[0]]) + pos[1]
+
+            text = text[:offset(start)] + new_text + text[offset(end):]
+            doc.apply_change(edit(
+                (start[0], index_to_utf16(lines[start[0]], start[1])),
+                (end[0], index_to_utf16(lines[end[0]], end[1])),
+                new_text,
+            ))
+
+        assert doc.text == text
+        assert list(doc.lines()) == [line.rstrip("\r\n") for line in split_lines(text)]
+        assert len(doc._blocks) > 1 and all(doc._blocks)
+
+
+class TestDiagnosticsScheduler:
+    """Test per-document debouncing and coalescing."""
+
+    def test_burst_publishes_once(self):
+        """Test a burst of edits publishes once per document, after it ends."""
+        published = []
+
+        async def publish(uri):
+            published.append(uri)
+
+        async def run():
+            scheduler = DiagnosticsScheduler(publish, delay=0.1)
+            for _ in range(10):
+                scheduler.schedule("file:///a.md")
+                await asyncio.sleep(0.005)
+            scheduler.schedule("file:///b.md")
+            scheduler.schedule("file:///c.md")
+            scheduler.cancel("file:///c.md")
+            assert published == []
+            await asyncio.sleep(0.25)
+            return scheduler.get_stats()
+
+        stats = asyncio.run(run())
+        assert sorted(published) == ["file:///a.md", "file:///b.md"]
+        assert stats["coalesced"] == 9 and stats["published"] == 2
+
+    def test_edit_during_publish_queues_one_more(self):
+        """Test publishes of one document never overlap."""
+        running = []
+        overlaps = []
+
+        async def publish(uri):
+            if running:
+                overlaps.append(uri)
+            running.append(uri)
+            await asyncio.sleep(0.05)
+            running.pop()
+
+        async def run():
+            scheduler = DiagnosticsScheduler(publish, delay=0)
+            scheduler.schedule("file:///a.md")
+            await asyncio.sleep(0.01)
+            for _ in range(3):
+                scheduler.schedule("file:///a.md")
+                await asyncio.sleep(0.005)
+            await asyncio.sleep(0.15)
+            await scheduler.close()
+            return scheduler.get_stats()
+
+        stats = asyncio.run(run())
+        assert overlaps == []
+        assert stats["published"] == 2
+
+
+class FakeConflictApi:
+    """Conditional conflict endpoint."""
+
+    def __init__(self):
+        self.conflicts = ["c1"]
+        self.calls = []
+        self.fail = False
+
+    async def fetch(self, project_id, etag):
+        self.calls.append(etag)
+        await asyncio.sleep(0.01)
+        if self.fail:
+            raise ConnectionError("backend down")
+        current = f'"{len(self.conflicts)}"'
+        if etag == current:
+            return None, current
+        return list(self.conflicts), current
+
+
+class TestConflictCache:
+    """Test conflicts are fetched once and revalidated by ETag."""
+
+    def test_hits_invalidation_and_etag(self):
+        """Test fresh entries skip the API, invalidated ones send If-None-Match."""
+        api = FakeConflictApi()
+        now = [0.0]
+        cache = ConflictCache(api.fetch, ttl=30, clock=lambda: now[0])
+
+        async def run():
+            assert await cache.get("p") == ["c1"]
+            assert await cache.get("p") == ["c1"]
+            assert api.calls == [None]
+
+            cache.invalidate("p")
+            assert await cache.get("p") == ["c1"]  # 304
+            assert api.calls == [None, '"1"']
+
+            api.conflicts.append("c2")
+            now[0] = 31.0  # Expired
+            assert await cache.get("p") == ["c1", "c2"]
+
+            api.fail = True
+            cache.invalidate()
+            assert await cache.get("p") == ["c1", "c2"]  # Stale beats nothing
+            with pytest.raises(ConnectionError):
+                await cache.get("other")
+
+        asyncio.run(run())
+        stats = cache.get_stats()
+        assert stats["hits"] == 1 and stats["not_modified"] == 1 and stats["errors"] == 2
+
+    def test_concurrent_lookups_share_one_request(self):
+        """Test documents of one project asking together cause one fetch."""
+        api = FakeConflictApi()
+        cache = ConflictCache(api.fetch)
+
+        async def run():
+            return await asyncio.gather(*(cache.get("p") for _ in range(5)))
+
+        assert asyncio.run(run()) == [["c1"]] * 5
+        assert api.calls == [None]
+        assert cache.get_stats()["shared"] == 4
+
+    def test_invalidated_during_fetch_stays_stale(self):
+        """Test a push arriving mid-request forces another check."""
+        api = FakeConflictApi()
+        cache = ConflictCache(api.fetch)
+
+        async def run():
+            lookup = asyncio.ensure_future(cache.get("p"))
+            await asyncio.sleep(0.001)
+            cache.invalidate("p")
+            await lookup
+            await cache.get("p")
+
+        asyncio.run(run())
+        assert api.calls == [None, '"1"']
+
+
+class TestConflictsEndpointETag:
+    """Test the conflicts endpoint ETags the project's conflict rows."""
+
+    def test_not_modified_until_conflicts_change(self, db_auth, db_specs):
+        from fastapi import Response
+
+        from app.api import projects
+        from app.models import Conflict, Project
+        from app.models.conflict import ConflictSeverity, ConflictStatus, ConflictType
+        from app.repositories import RepositoryService
+
+        user_id = uuid.uuid4()
+        project = Project(name="Conflicted", creator_id=user_id, owner_id=user_id, user_id=user_id)
+        db_specs.add(project)
+        db_specs.commit()
+        project_id, user = project.id, type("U", (), {"id": user_id})()
+
+        def get(if_none_match=None):
+            response = Response()
+            result = projects.get_project_conflicts(
+                project_id=str(project_id), response=response, current_user=user,
+                service=RepositoryService(db_auth, db_specs), if_none_match=if_none_match
+            )
+            return result, response
+
+        first, response = get()
+        etag = response.headers["etag"]
+        assert first["data"]["conflicts"] == []
+        assert get(if_none_match=etag)[0].status_code == 304
+        assert get(if_none_match='"other"')[1].headers["etag"] == etag
+
+        conflict = Conflict(
+            project_id=project_id, type=ConflictType.TECHNOLOGY, description="SQLite vs PostgreSQL",
+            spec_ids=[], severity=ConflictSeverity.HIGH, status=ConflictStatus.OPEN,
+            detected_at=datetime.now(timezone.utc)
+        )
+        db_specs.add(conflict)
+        db_specs.commit()
+        detected, response = get(if_none_match=etag)
+        assert [c["description"] for c in detected["data"]["conflicts"]] == ["SQLite vs PostgreSQL"]
+        assert response.headers["etag"] != etag
+
+        conflict.status = ConflictStatus.RESOLVED
+        db_specs.commit()
+        resolved, _ = get(if_none_match=response.headers["etag"])
+        assert resolved["data"]["conflicts"][0]["status"] == "resolved"
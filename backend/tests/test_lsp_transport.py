@@ -0,0 +1,169 @@
+"""Tests for the LSP stdio transport, concurrent dispatch and latency metrics."""
+
+import asyncio
+
+import pytest
+
+from lsp.dispatcher import CONTENT_MODIFIED, METHOD_NOT_FOUND, REQUEST_CANCELLED, RequestDispatcher
+from lsp.metrics import LatencyHistogram
+from lsp.transport import MessageWriter, ProtocolError, encode_message, read_message
+
+
+class BufferWriter:
+    """Stream writer collecting framed output."""
+
+    def __init__(self):
+        self.data = b""
+
+    def write(self, data):
+        self.data += data
+
+    async def drain(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def feed(*messages, raw=b""):
+    reader = asyncio.StreamReader()
+    reader.feed_data(b"".join(encode_message(m) for m in messages) + raw)
+    reader.feed_eof()
+    return reader
+
+
+async def decode_all(data):
+    reader = feed(raw=data)
+    messages = []
+    while (message := await read_message(reader)) is not None:
+        messages.append(message)
+    return messages
+
+
+class TestFraming:
+    """Test Content-Length framing on raw bytes."""
+
+    def test_round_trip_counts_bytes(self):
+        """Test multi-byte text survives framing (length is in bytes)."""
+        message = {"jsonrpc": "2.0", "method": "x", "params": {"text": "naïve — ✓"}}
+        assert encode_message(message).startswith(b"Content-Length: ")
+        assert asyncio.run(decode_all(encode_message(message) * 2)) == [message, message]
+
+    def test_extra_headers_and_eof(self):
+        """Test Content-Type is ignored and a truncated body is end of stream."""
+        body = b'{"id":1}'
+        raw = b"Content-Type: application/vscode-jsonrpc; charset=utf-8\r\nContent-Length: 8\r\n\r\n" + body
+        assert asyncio.run(decode_all(raw + b"Content-Length: 99\r\n\r\n{")) == [{"id": 1}]
+
+    def test_malformed_headers(self):
+        """Test missing or invalid Content-Length is a protocol error."""
+        async def read(raw):
+            return await read_message(feed(raw=raw))
+
+        with pytest.raises(ProtocolError):
+            asyncio.run(read(b"Content-Type: x\r\n\r\n{}"))
+        with pytest.raises(ProtocolError):
+            asyncio.run(read(b"Content-Length: ten\r\n\r\n"))
+
+
+async def serve(handlers, notifications, messages, delay_eof=0.2):
+    """Serve messages, then close the stream after delay_eof seconds."""
+    reader = asyncio.StreamReader()
+    output = BufferWriter()
+    dispatcher = RequestDispatcher(handlers, notifications, histogram=LatencyHistogram())
+
+    async def client():
+        for message in messages:
+            if isinstance(message, (int, float)):
+                await asyncio.sleep(message)
+            else:
+                reader.feed_data(encode_message(message))
+        await asyncio.sleep(delay_eof)
+        reader.feed_eof()
+
+    await asyncio.gather(client(), dispatcher.serve(reader, MessageWriter(output)))
+    return await decode_all(output.data), dispatcher
+
+
+def request(request_id, method, uri="file:///a.md", **params):
+    return {"jsonrpc": "2.0", "id": request_id, "method": method, "params": {"textDocument": {"uri": uri}, **params}}
+
+
+def notification(method, **params):
+    return {"jsonrpc": "2.0", "method": method, "params": params}
+
+
+class TestDispatcher:
+    """Test requests run concurrently and are dropped when cancelled or stale."""
+
+    def test_slow_request_does_not_block_others(self):
+        """Test a fast hover is answered while a slow request is still running."""
+        async def slow(params):
+            await asyncio.sleep(0.15)
+            return "slow"
+
+        async def fast(params):
+            return "fast"
+
+        responses, dispatcher = asyncio.run(serve(
+            {"textDocument/references": slow, "textDocument/hover": fast},
+            {},
+            [request(1, "textDocument/references"), request(2, "textDocument/hover"), request(3, "nope")],
+        ))
+
+        assert [r["id"] for r in responses] == [2, 3, 1]
+        assert responses[1]["error"]["code"] == METHOD_NOT_FOUND
+        assert "error" not in responses[0] and responses[0]["result"] == "fast"
+        assert dispatcher.histogram.snapshot()["textDocument/references"]["count"] == 1
+
+    def test_cancel_supersede_and_content_modified(self):
+        """Test $/cancelRequest, newer completions and document edits drop running requests."""
+        changes = []
+
+        async def wait(params):
+            await asyncio.sleep(1)
+            return "late"
+
+        async def did_change(params):
+            changes.append(params["textDocument"]["uri"])
+
+        responses, dispatcher = asyncio.run(serve(
+            {"textDocument/hover": wait, "textDocument/completion": wait, "textDocument/definition": wait},
+            {"textDocument/didChange": did_change},
+            [
+                request(1, "textDocument/hover"),
+                request(2, "textDocument/completion"),
+                request(3, "textDocument/completion"),  # Supersedes 2
+                request(4, "textDocument/definition", uri="file:///b.md"),
+                0.01,
+                notification("$/cancelRequest", id=1),
+                notification("textDocument/didChange", textDocument={"uri": "file:///a.md", "version": 2}),
+            ],
+        ))
+
+        codes = {r["id"]: r.get("error", {}).get("code") for r in responses}
+        assert codes[1] == REQUEST_CANCELLED
+        assert codes[2] == REQUEST_CANCELLED
+        assert codes[3] == CONTENT_MODIFIED
+        assert 4 not in codes  # Other document, still running when the stream closed
+        assert changes == ["file:///a.md"]
+        assert dispatcher.histogram.snapshot()["textDocument/completion"]["outcomes"] == {"cancelled": 1, "stale": 1}
+        assert dispatcher.pending_count() == 0
+
+
+class TestLatencyHistogram:
+    """Test bucketed latency percentiles."""
+
+    def test_percentiles(self):
+        histogram = LatencyHistogram(buckets_ms=(1, 10, 100))
+        for seconds in [0.0005] * 90 + [0.05] * 9 + [0.4]:
+            histogram.observe("textDocument/hover", seconds)
+
+        stats = histogram.snapshot()["textDocument/hover"]
+        assert stats["count"] == 100
+        assert stats["p50_ms"] == 1.0
+        assert stats["p95_ms"] == 100.0
+        assert stats["p99_ms"] == 100.0
+        assert histogram.percentile("textDocument/hover", 1.0) == pytest.approx(400.0)
+        assert stats["buckets"] == {"le_1ms": 90, "le_10ms": 0, "le_100ms": 9, "le_inf": 1}
+        assert histogram.percentile("unknown", 0.5) is None
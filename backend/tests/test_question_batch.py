@@ -0,0 +1,152 @@
+"""Tests for batch question generation (one Claude call per batch)."""
+
+import json
+import uuid
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.models import ProjectData, QuestionData
+from app.core.question_engine import QUESTION_CATEGORIES, QuestionGenerator
+
+
+class FakeClaude:
+    """Canned create() responses; records requests."""
+
+    def __init__(self, responses=()):
+        self.responses = list(responses)
+        self.requests = []
+        self.messages = self
+
+    def create(self, **kwargs):
+        self.requests.append(kwargs)
+        return SimpleNamespace(content=[SimpleNamespace(text=self.responses.pop(0))])
+
+
+class TestBatchQuestionEngine:
+    """Test category selection, prompt and parsing of batches."""
+
+    def test_categories_spread_over_lowest_coverage(self):
+        """Test a batch takes distinct categories, weakest first, and wraps around."""
+        generator = QuestionGenerator()
+        coverage = {category: 50.0 for category in QUESTION_CATEGORIES}
+        coverage.update(security=0.0, testing=10.0)
+
+        assert generator.select_batch_categories(coverage, 3)[:2] == ["security", "testing"]
+        assert len(set(generator.select_batch_categories(coverage, 10))) == 10
+        assert generator.select_batch_categories(coverage, 12)[10:] == ["security", "testing"]
+
+    def test_prompt_lists_focus_areas(self):
+        """Test the batch prompt asks for one question per category."""
+        project = ProjectData(id="p", name="Shop", description=None, current_phase="discovery",
+                              maturity_score=0.0, user_id="u")
+        prompt = QuestionGenerator().build_batch_question_prompt(project, [], [], ["goals", "security"])
+
+        assert "1. goals\n2. security" in prompt
+        assert "Generate 2 different questions" in prompt
+        assert '"questions"' in prompt
+
+    def test_parse_drops_empty_and_repeated_questions(self):
+        """Test duplicates within the batch and of previous questions are skipped."""
+        response = "```json\n" + json.dumps({"questions": [
+            {"text": "Who are the users?", "category": "goals"},
+            {"text": "who are the users"},
+            {"text": ""},
+            {"text": "What data must be encrypted?"},
+            {"text": "How is the system tested?", "context": "Quality"},
+        ]}) + "\n```"
+        previous = [QuestionData(id="q", text="How is the system tested?", category="testing", context="", quality_score=1.0)]
+
+        questions = QuestionGenerator().parse_batch_question_response(
+            response, ["goals", "requirements", "tech_stack", "security", "testing"], previous
+        )
+
+        assert questions == [
+            {"text": "Who are the users?", "category": "goals", "context": ""},
+            {"text": "What data must be encrypted?", "category": "security", "context": ""},
+        ]
+        with pytest.raises(ValueError):
+            QuestionGenerator().parse_batch_question_response('{"text": "one"}', ["goals"])
+
+
+@pytest.fixture
+def batch_rows(db_specs):
+    from app.models import Project, QualityMetric, Question, Session
+
+    user_id = uuid.uuid4()
+    project = Project(name="Batch", creator_id=user_id, owner_id=user_id, user_id=user_id)
+    db_specs.add(project)
+    db_specs.flush()
+    session = Session(project_id=project.id, status="active", mode="socratic", started_at=datetime.now(timezone.utc))
+    db_specs.add(session)
+    db_specs.commit()
+    yield SimpleNamespace(project=project, session=session)
+
+    db_specs.query(QualityMetric).filter_by(project_id=project.id).delete()
+    db_specs.query(Question).filter_by(project_id=project.id).delete()
+    db_specs.commit()
+
+
+@pytest.fixture
+def services(db_specs):
+    from app.agents.orchestrator import AgentOrchestrator, reset_orchestrator, set_orchestrator
+    from app.core.dependencies import ServiceContainer
+
+    services = ServiceContainer()
+    services._db_session_specs = db_specs
+    set_orchestrator(AgentOrchestrator(services))
+    yield services
+    reset_orchestrator()
+
+
+class TestGenerateQuestionsBatch:
+    """Test the agent makes one call and one save per batch."""
+
+    def test_one_call_bias_checked_and_saved(self, db_specs, batch_rows, services):
+        """Test all questions come from one call and biased ones are rejected."""
+        from app.agents.socratic import SocraticCounselorAgent
+        from app.models import QualityMetric, Question
+
+        services._claude_client = FakeClaude([json.dumps({"questions": [
+            {"text": "What problem does the product solve?", "category": "goals", "context": "Scope"},
+            {"text": "Obviously you need the best framework, clearly the only way?", "category": "tech_stack"},
+            {"text": "Which data is sensitive?", "category": "security", "context": "Risk"},
+        ]})])
+        agent = SocraticCounselorAgent("socratic", "Socratic Counselor", services)
+
+        result = agent._generate_questions_batch({
+            "project_id": batch_rows.project.id, "session_id": batch_rows.session.id, "count": 3
+        })
+
+        assert result["success"] and result["count"] == 2
+        assert [q["text"] for q in result["questions"]] == [
+            "What problem does the product solve?", "Which data is sensitive?"
+        ]
+        assert len(result["rejected"]) == 1 and result["rejected"][0]["category"] == "tech_stack"
+        assert len(services._claude_client.requests) == 1
+        assert "cache" not in services._claude_client.requests[0]
+
+        saved = db_specs.query(Question).filter_by(project_id=batch_rows.project.id).all()
+        assert {str(q.id) for q in saved} == {q["id"] for q in result["questions"]}
+        metrics = db_specs.query(QualityMetric).filter_by(project_id=batch_rows.project.id, metric_type="question_bias")
+        assert metrics.count() == 3
+
+    def test_errors(self, db_specs, batch_rows, services):
+        """Test validation and unparseable responses fail without saving."""
+        from app.agents.socratic import SocraticCounselorAgent
+        from app.models import Question
+
+        services._claude_client = FakeClaude(["not json"])
+        agent = SocraticCounselorAgent("socratic", "Socratic Counselor", services)
+
+        assert agent._generate_questions_batch({"project_id": batch_rows.project.id})["error_code"] == "VALIDATION_ERROR"
+        invalid_count = agent._generate_questions_batch({
+            "project_id": batch_rows.project.id, "session_id": batch_rows.session.id, "count": "many"
+        })
+        assert invalid_count["error_code"] == "VALIDATION_ERROR"
+        result = agent._generate_questions_batch({
+            "project_id": batch_rows.project.id, "session_id": batch_rows.session.id
+        })
+        assert result["error_code"] == "PARSE_ERROR"
+        assert db_specs.query(Question).filter_by(project_id=batch_rows.project.id).count() == 0
@@ -0,0 +1,66 @@
+"""Tests for RAG spec extraction."""
+
+import asyncio
+import json
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.llm_gateway import FakeLLMProvider, LLMGateway
+from app.services.rag_service import RAGService
+
+SPECS = [{"title": "Login", "description": "Redirect to the dashboard", "priority": "high", "measurable": True}]
+
+
+class RawClient:
+    """Plain Anthropic-style client: rejects gateway-only arguments."""
+
+    def __init__(self):
+        self.requests = []
+        self.messages = self
+
+    def create(self, model, max_tokens, messages):
+        self.requests.append({"model": model, "max_tokens": max_tokens, "messages": messages})
+        return SimpleNamespace(content=[SimpleNamespace(text=json.dumps(SPECS))])
+
+
+@pytest.fixture(autouse=True)
+def no_retrieval(monkeypatch):
+    async def augment(question, answer, project_id, top_k=5, db=None):
+        return {"augmented_prompt": f"Q: {question}\nA: {answer}", "chunk_count": 0, "has_context": False}
+
+    monkeypatch.setattr(RAGService, "augment_spec_extraction", staticmethod(augment))
+
+
+def extract(client, user_id=None):
+    return asyncio.run(RAGService.extract_specs_with_rag(
+        question="What happens on login?", answer="Show the dashboard", project_id=str(uuid.uuid4()),
+        spec_type="functional", claude_client=client, user_id=user_id
+    ))
+
+
+class TestExtractSpecsWithRag:
+    """Test the extraction call for gateway and plain clients."""
+
+    def test_gateway_call_is_attributed(self):
+        """Test the gateway records the call against the user."""
+        rows = []
+        gateway = LLMGateway(
+            {"fake": FakeLLMProvider(response=json.dumps(SPECS))}, default_model="fake-model",
+            usage_sink=rows.extend
+        )
+        user_id = str(uuid.uuid4())
+        try:
+            assert extract(gateway.client(), user_id=user_id)["specs"] == SPECS
+        finally:
+            gateway.close()
+
+        assert [str(row["user_id"]) for row in rows] == [user_id]
+
+    def test_plain_client_gets_no_gateway_arguments(self):
+        """Test a plain Anthropic client is not passed usage_context or cache."""
+        client = RawClient()
+
+        assert extract(client, user_id=str(uuid.uuid4()))["specs"] == SPECS
+        assert len(client.requests) == 1
@@ -0,0 +1,177 @@
+"""Tests for database-side full-text search."""
+
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.services.search_index import SearchIndex, query_terms
+
+
+@pytest.fixture
+def owner():
+    return uuid.uuid4()
+
+
+@pytest.fixture
+def seeded(db_specs, owner):
+    """Two projects for `owner` and one for someone else."""
+    from app.models import Project, Question, Specification
+
+    def project(name, description, user_id):
+        row = Project(
+            name=name, description=description, creator_id=user_id, owner_id=user_id, user_id=user_id
+        )
+        db_specs.add(row)
+        db_specs.flush()
+        return row
+
+    api = project("Payments API", "Handles card payments and refunds", owner)
+    mobile = project("Mobile app", "Offline-first client that syncs with the payments service", owner)
+    other = project("Payments for someone else", "Not visible", uuid.uuid4())
+
+    def spec(project_row, category, content):
+        return Specification(
+            project_id=project_row.id, category=category, key=category, value="",
+            content=content, source="user_input"
+        )
+
+    db_specs.add_all([
+        spec(api, "security", "Tokens are rotated every 24 hours"),
+        spec(api, "performance", "Refunds complete within 2 seconds"),
+        spec(mobile, "security", "Authentication uses short-lived tokens"),
+        spec(other, "security", "Tokens for another owner"),
+        Question(
+            project_id=api.id, session_id=uuid.uuid4(), category="security", text="How are payment tokens stored?"
+        ),
+    ])
+    db_specs.commit()
+    yield {"api": api, "mobile": mobile, "other": other}
+
+    db_specs.query(Specification).delete()
+    db_specs.query(Question).delete()
+    db_specs.commit()
+
+
+class TestQueryTerms:
+    """Test query tokenization."""
+
+    def test_operators_are_dropped(self):
+        """Test FTS syntax in user input is neutralised."""
+        assert query_terms('Payments AND "refund*" -x NEAR(') == ["payments", "and", "refund", "x", "near"]
+
+
+class TestSqliteFullTextSearch:
+    """Test the FTS5 backend used on SQLite."""
+
+    def test_ranks_and_filters_by_owner(self, db_specs, seeded, owner):
+        """Test only the owner's data is returned, best match first."""
+        results, counts = SearchIndex().search(db_specs, owner, "payments")
+
+        assert counts == {"projects": 2, "specifications": 0, "questions": 1}
+        assert results[0]["id"] == str(seeded["api"].id)  # name match outranks description match
+        assert all(result["relevance_score"] > 0 for result in results)
+        assert str(seeded["other"].id) not in {result["project_id"] for result in results}
+
+    def test_prefix_and_stemming(self, db_specs, seeded, owner):
+        """Test terms are prefix matched and stemmed."""
+        results, counts = SearchIndex().search(db_specs, owner, "token rotat")
+        assert counts["specifications"] == 1
+        assert results[0]["preview"] == "Tokens are rotated every 24 hours"
+        assert results[0]["title"].startswith("[security]")
+
+    def test_pagination_happens_in_sql(self, db_specs, seeded, owner):
+        """Test skip/limit page through the ranked matches."""
+        index = SearchIndex()
+        everything, counts = index.search(db_specs, owner, "tokens", limit=10)
+        assert sum(counts.values()) == len(everything) == 3
+
+        pages = [index.search(db_specs, owner, "tokens", skip=skip, limit=1)[0] for skip in range(3)]
+        assert [page[0]["id"] for page in pages] == [result["id"] for result in everything]
+
+    def test_type_and_category_filters(self, db_specs, seeded, owner):
+        """Test resource_type and category narrow the results."""
+        index = SearchIndex()
+        results, counts = index.search(db_specs, owner, "tokens", resource_type="questions")
+        assert [result["resource_type"] for result in results] == ["question"]
+        assert counts == {"projects": 0, "specifications": 0, "questions": 1}
+
+        _, counts = index.search(db_specs, owner, "refunds", category="performance")
+        assert counts == {"projects": 1, "specifications": 1, "questions": 0}
+
+    def test_index_follows_writes(self, db_specs, seeded, owner):
+        """Test inserts, updates and deletes are reflected immediately."""
+        from app.models import Specification
+
+        index = SearchIndex()
+        assert index.search(db_specs, owner, "latency")[1]["specifications"] == 0
+
+        spec = Specification(
+            project_id=seeded["api"].id, category="performance", key="latency", value="",
+            content="p99 latency under 50ms", source="user_input"
+        )
+        db_specs.add(spec)
+        db_specs.commit()
+        assert index.search(db_specs, owner, "latency")[1]["specifications"] == 1
+
+        spec.content = "p99 response time under 50ms"
+        db_specs.commit()
+        assert index.search(db_specs, owner, "latency")[1]["specifications"] == 0
+        assert index.search(db_specs, owner, "response")[1]["specifications"] == 1
+
+        db_specs.delete(spec)
+        db_specs.commit()
+        assert index.search(db_specs, owner, "response")[1]["specifications"] == 0
+
+    def test_query_without_terms(self, db_specs, seeded, owner):
+        """Test punctuation-only queries match nothing."""
+        assert SearchIndex().search(db_specs, owner, "***") == (
+            [], {"projects": 0, "specifications": 0, "questions": 0}
+        )
+
+
+class TestLikeFallback:
+    """Test the portable ILIKE backend."""
+
+    def test_like_search_paginates(self, db_specs, seeded, owner):
+        """Test the fallback returns the same matches with SQL pagination."""
+        index = SearchIndex()
+        index._sqlite_ready[db_specs.get_bind()] = False
+
+        results, counts = index.search(db_specs, owner, "payment", limit=2)
+        assert counts == {"projects": 2, "specifications": 0, "questions": 1}
+        assert len(results) == 2
+        assert {result["relevance_score"] for result in results} == {1.0}
+
+
+class TestPostgresQuery:
+    """Test the PostgreSQL statement uses the indexed expressions."""
+
+    def test_statement_uses_tsvector_expressions(self, owner):
+        """Test the compiled query matches the migration's index expressions."""
+        from app.models import Project
+
+        captured = []
+
+        class RecordingSession:
+            def get_bind(self):
+                return SimpleNamespace(dialect=SimpleNamespace(name="postgresql"))
+
+            def execute(self, statement, *args):
+                captured.append(str(statement.compile(dialect=postgresql.dialect())))
+
+                class Result:
+                    def all(self):
+                        return []
+                return Result()
+
+        results, counts = SearchIndex().search(RecordingSession(), owner, "payment tokens", skip=40, limit=20)
+
+        assert results == []
+        page_sql = captured[0]
+        assert "to_tsvector('english', coalesce(projects.name, ''))" in page_sql
+        assert "@@ to_tsquery('english'" in page_sql
+        assert "ts_rank(" in page_sql
+        assert "LIMIT" in page_sql and "OFFSET" in page_sql
+        assert Project.__tablename__ in captured[1]
@@ -0,0 +1,141 @@
+"""Tests for incrementally maintained specification aggregates."""
+
+import asyncio
+import uuid
+from decimal import Decimal
+
+import pytest
+
+from app.services.spec_stats import get_category_stats, rebuild_spec_stats
+
+
+@pytest.fixture
+def project(db_specs):
+    from app.models import Project, ProjectSpecStats, Specification
+
+    user_id = uuid.uuid4()
+    row = Project(name="Stats", creator_id=user_id, owner_id=user_id, user_id=user_id)
+    db_specs.add(row)
+    db_specs.commit()
+    yield row
+
+    db_specs.query(Specification).delete()
+    db_specs.query(ProjectSpecStats).delete()
+    db_specs.commit()
+
+
+def make_spec(project, category, confidence=None, **kwargs):
+    from app.models import Specification
+
+    return Specification(
+        project_id=project.id, category=category, key=category, value="v", content="c",
+        source="user_input", confidence=confidence, **kwargs
+    )
+
+
+def full_scan(db, project_id):
+    """The aggregate computed the old way, from every current spec."""
+    from app.models import Specification
+
+    stats = {}
+    for spec in db.query(Specification).filter(
+        Specification.project_id == project_id, Specification.is_current.is_(True)
+    ):
+        entry = stats.setdefault(spec.category, {"count": 0, "confidence_sum": 0.0})
+        entry["count"] += 1
+        entry["confidence_sum"] += float(spec.confidence) if spec.confidence else 0.9
+    return {category: {**entry, "confidence_sum": round(entry["confidence_sum"], 2)} for category, entry in stats.items()}
+
+
+class TestIncrementalMaintenance:
+    """Test the aggregates follow ORM writes."""
+
+    def test_insert_update_supersede_delete(self, db_specs, project):
+        """Test every kind of write keeps the aggregate equal to a full scan."""
+        first = make_spec(project, "security", Decimal("0.80"))
+        second = make_spec(project, "security")
+        third = make_spec(project, "goals", Decimal("1.00"))
+        db_specs.add_all([first, second, third])
+        db_specs.commit()
+        assert get_category_stats(db_specs, project.id) == {
+            "security": {"count": 2, "confidence_sum": 1.7},
+            "goals": {"count": 1, "confidence_sum": 1.0},
+        }
+
+        first.confidence = Decimal("0.50")
+        third.category = "requirements"
+        db_specs.commit()
+        assert get_category_stats(db_specs, project.id) == full_scan(db_specs, project.id)
+
+        second.is_current = False
+        db_specs.commit()
+        assert get_category_stats(db_specs, project.id) == {
+            "security": {"count": 1, "confidence_sum": 0.5},
+            "requirements": {"count": 1, "confidence_sum": 1.0},
+        }
+
+        db_specs.delete(first)
+        db_specs.delete(second)  # superseded: no change
+        db_specs.commit()
+        assert get_category_stats(db_specs, project.id) == {"requirements": {"count": 1, "confidence_sum": 1.0}}
+
+    def test_rollback_discards_delta(self, db_specs, project):
+        """Test the aggregate is written in the spec's transaction."""
+        db_specs.add(make_spec(project, "testing", Decimal("0.70")))
+        db_specs.flush()
+        db_specs.rollback()
+        assert get_category_stats(db_specs, project.id) == {}
+
+    def test_maturity_uses_aggregates(self, db_specs, project):
+        """Test the agent's maturity matches the old full-scan formula."""
+        from app.agents.context import ContextAnalyzerAgent, maturity_from_category_scores
+        from app.core.dependencies import ServiceContainer
+
+        db_specs.add_all([make_spec(project, "goals", Decimal("0.90")) for _ in range(12)])
+        db_specs.add_all([make_spec(project, "security") for _ in range(3)])
+        db_specs.commit()
+
+        agent = ContextAnalyzerAgent("context", "Context Analyzer", ServiceContainer())
+        expected = maturity_from_category_scores(
+            {category: entry["confidence_sum"] for category, entry in full_scan(db_specs, project.id).items()}
+        )
+        assert agent._calculate_maturity(project.id, db_specs) == expected == 14
+
+
+class TestRebuild:
+    """Test the GROUP BY repair path."""
+
+    def test_rebuild_repairs_bulk_changes(self, db_specs, project):
+        """Test bulk updates (which skip mapper events) are repaired."""
+        from app.models import Specification
+
+        db_specs.add_all([make_spec(project, "performance", Decimal("0.60")) for _ in range(4)])
+        db_specs.commit()
+        db_specs.query(Specification).filter(Specification.project_id == project.id).update(
+            {"category": "monitoring"}, synchronize_session=False
+        )
+        db_specs.commit()
+        assert "performance" in get_category_stats(db_specs, project.id)
+
+        assert rebuild_spec_stats(db_specs, project.id) == 1
+        db_specs.commit()
+        assert get_category_stats(db_specs, project.id) == {"monitoring": {"count": 4, "confidence_sum": 2.4}}
+
+    def test_maintenance_job(self, db_specs, project, session_factory_specs, monkeypatch):
+        """Test the job rebuilds aggregates and refreshes maturity."""
+        from app.core import database
+        from app.jobs.maintenance_jobs import rebuild_spec_stats as rebuild_job
+        from app.models import ProjectSpecStats
+
+        db_specs.add_all([make_spec(project, "goals", Decimal("1.00")) for _ in range(9)])
+        db_specs.commit()
+        db_specs.query(ProjectSpecStats).delete()
+        db_specs.commit()
+
+        monkeypatch.setattr(database, "SessionLocalSpecs", session_factory_specs)
+        result = asyncio.run(rebuild_job(str(project.id)))
+
+        assert result == {"status": "success", "aggregate_rows": 1, "updated_projects": 1}
+        db_specs.expire_all()
+        assert get_category_stats(db_specs, project.id) == {"goals": {"count": 9, "confidence_sum": 9.0}}
+        assert project.maturity_score == 10
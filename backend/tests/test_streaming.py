@@ -0,0 +1,267 @@
+"""Tests for streamed chat and question generation."""
+
+import json
+import uuid
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.llm_streaming import JsonStringFieldStream, StreamLatency, StreamTimer, stream_text
+
+
+class FakeStream:
+    """Context manager mimicking the Anthropic MessageStream."""
+
+    def __init__(self, deltas, on_delta=None):
+        self.deltas = deltas
+        self.on_delta = on_delta
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    @property
+    def text_stream(self):
+        for delta in self.deltas:
+            if self.on_delta:
+                self.on_delta(delta)
+            yield delta
+
+
+class FakeStreamingClient:
+    """Canned create() responses and streamed deltas; records requests."""
+
+    def __init__(self, responses=(), streams=(), on_delta=None):
+        self.responses = list(responses)
+        self.streams = list(streams)
+        self.on_delta = on_delta
+        self.requests = []
+        self.messages = self
+
+    def create(self, **kwargs):
+        self.requests.append(("create", kwargs))
+        return SimpleNamespace(content=[SimpleNamespace(text=self.responses.pop(0))])
+
+    def stream(self, **kwargs):
+        self.requests.append(("stream", kwargs))
+        return FakeStream(self.streams.pop(0), self.on_delta)
+
+
+class TestJsonStringFieldStream:
+    """Test incremental decoding of the streamed question text."""
+
+    def test_decodes_field_across_split_escapes(self):
+        """Test escapes split between deltas are decoded once complete."""
+        document = json.dumps({"text": "Who \"owns\" the data?\nWhy é?", "category": "goals"})
+        field = JsonStringFieldStream("text")
+
+        decoded = "".join(field.feed(document[index:index + 3]) for index in range(0, len(document), 3))
+
+        assert decoded == "Who \"owns\" the data?\nWhy é?"
+        assert field.done
+
+    def test_waits_for_field(self):
+        """Test nothing is emitted before the field and after it ends."""
+        field = JsonStringFieldStream("text")
+        assert field.feed('```json\n{"category": "goals", "te') == ""
+        assert field.feed('xt": "Hi') == "Hi"
+        assert field.feed('", "context": "ignored"}') == ""
+
+
+class TestStreamingPrimitives:
+    """Test provider streaming and latency bookkeeping."""
+
+    def test_stream_text_falls_back_to_create(self):
+        """Test clients without messages.stream yield one full delta."""
+        client = SimpleNamespace(messages=SimpleNamespace(
+            create=lambda **kwargs: SimpleNamespace(content=[SimpleNamespace(text="whole")])
+        ))
+        assert list(stream_text(client, model="m", max_tokens=5, messages=[])) == ["whole"]
+
+    def test_timer_records_ttft(self):
+        """Test TTFT is recorded and summarized."""
+        latency = StreamLatency()
+        timer = StreamTimer("test stream")
+        timer.mark()
+        timer.mark()
+        timing = timer.finish(latency)
+
+        assert timing["ttft_ms"] is not None and timing["ttft_ms"] <= timing["total_ms"]
+        assert timer.deltas == 2
+        summary = latency.summary()
+        assert summary["streams"] == 1
+        assert summary["ttft_ms_p50"] == timing["ttft_ms"]
+
+    def test_nlu_chat_stream(self):
+        """Test chat_stream uses the streaming API with chat() arguments."""
+        from app.core.nlu_service import NLUService
+
+        client = FakeStreamingClient(streams=[["Hel", "lo"]])
+        nlu = NLUService(client)
+
+        assert list(nlu.chat_stream("hi", system_prompt="sys")) == ["Hel", "lo"]
+        kind, request = client.requests[0]
+        assert kind == "stream"
+        assert request["system"] == "sys"
+        assert request["messages"][-1] == {"role": "user", "content": "hi"}
+        assert "usage_context" not in request  # Plain Anthropic clients reject it
+
+
+@pytest.fixture
+def chat_rows(db_specs):
+    from app.models import ConversationHistory, Project, Question, Session
+
+    user_id = uuid.uuid4()
+    project = Project(name="Streaming", creator_id=user_id, owner_id=user_id, user_id=user_id)
+    db_specs.add(project)
+    db_specs.flush()
+    session = Session(
+        project_id=project.id, status="active", mode="direct_chat", started_at=datetime.now(timezone.utc)
+    )
+    db_specs.add(session)
+    db_specs.commit()
+    yield SimpleNamespace(project=project, session=session, user_id=user_id)
+
+    db_specs.query(ConversationHistory).delete()
+    db_specs.query(Question).delete()
+    db_specs.commit()
+
+
+@pytest.fixture
+def services(db_specs):
+    from app.agents.orchestrator import AgentOrchestrator, reset_orchestrator, set_orchestrator
+    from app.core.dependencies import ServiceContainer
+
+    services = ServiceContainer()
+    services._db_session_specs = db_specs
+    set_orchestrator(AgentOrchestrator(services))
+    yield services
+    reset_orchestrator()
+
+
+class TestStreamingAgents:
+    """Test agents stream first and persist after the stream closes."""
+
+    def test_chat_streams_then_persists(self, db_specs, chat_rows, services):
+        """Test tokens arrive before the turn is saved, then a done event."""
+        from app.agents.direct_chat import DirectChatAgent
+        from app.models import ConversationHistory
+
+        saved_while_streaming = []
+        services._claude_client = FakeStreamingClient(
+            streams=[["Let us ", "talk about ", "goals."]],
+            on_delta=lambda delta: saved_while_streaming.append(db_specs.query(ConversationHistory).count()),
+        )
+        agent = DirectChatAgent("direct_chat", "Direct Chat", services)
+
+        events = list(agent.stream_chat_message({
+            "session_id": chat_rows.session.id,
+            "user_id": chat_rows.user_id,
+            "message": "We want to plan goals",
+            "project_id": chat_rows.project.id,
+        }))
+
+        assert [event["text"] for event in events[:-1]] == ["Let us ", "talk about ", "goals."]
+        done = events[-1]
+        assert done["event"] == "done" and done["success"]
+        assert done["response"] == "Let us talk about goals."
+        assert done["timing"]["ttft_ms"] is not None
+        assert saved_while_streaming == [0, 0, 0]
+        # Intent decided locally: the reply stream is the only LLM call
+        assert [kind for kind, _ in services._claude_client.requests] == ["stream"]
+        assert services._claude_client.requests[0][1]["usage_context"] == {
+            "user_id": chat_rows.user_id, "project_id": chat_rows.project.id, "session_id": chat_rows.session.id
+        }
+        history = db_specs.query(ConversationHistory).order_by(ConversationHistory.role.desc()).all()
+        assert [(row.role, row.content) for row in history] == [
+            ("user", "We want to plan goals"), ("assistant", "Let us talk about goals.")
+        ]
+        assert agent.get_stats()["stats"]["streaming"]["streams"] == 1
+
+    def test_chat_stream_reports_errors(self, db_specs, chat_rows, services):
+        """Test a wrong session mode ends the stream with an error event."""
+        from app.agents.direct_chat import DirectChatAgent
+
+        chat_rows.session.mode = "socratic"
+        db_specs.commit()
+        agent = DirectChatAgent("direct_chat", "Direct Chat", services)
+
+        events = list(agent.stream_chat_message({
+            "session_id": chat_rows.session.id, "user_id": chat_rows.user_id, "message": "hi"
+        }))
+
+        assert events == [{"event": "error", "success": False, "error": "Session is in socratic mode, not direct_chat mode"}]
+
+    def test_question_text_streams_from_json(self, db_specs, chat_rows, services):
+        """Test only the question text is streamed and the question is saved."""
+        from app.agents.socratic import SocraticCounselorAgent
+        from app.models import Question
+
+        document = json.dumps({"text": "What problem does it solve?", "category": "goals", "context": "Scope"})
+        services._claude_client = FakeStreamingClient(
+            streams=[[document[index:index + 7] for index in range(0, len(document), 7)]]
+        )
+        agent = SocraticCounselorAgent("socratic", "Socratic Counselor", services)
+
+        events = list(agent.stream_question({"project_id": chat_rows.project.id, "session_id": chat_rows.session.id}))
+
+        tokens = [event["text"] for event in events if event["event"] == "token"]
+        assert "".join(tokens) == "What problem does it solve?"
+        done = events[-1]
+        assert done["event"] == "done"
+        assert done["question"]["text"] == "What problem does it solve?"
+        question = db_specs.query(Question).one()
+        assert str(question.id) == done["question_id"]
+        assert question.context == "Scope"
+
+    def test_chat_disconnect_saves_partial_reply(self, db_specs, chat_rows, services):
+        """Test closing the stream mid-reply still saves the turn as streamed so far."""
+        from app.agents.direct_chat import DirectChatAgent
+        from app.models import ConversationHistory
+
+        services._claude_client = FakeStreamingClient(streams=[["Let us ", "talk about ", "goals."]])
+        agent = DirectChatAgent("direct_chat", "Direct Chat", services)
+        detached = []
+        agent._run_detached = lambda name, target: detached.append(target)
+
+        events = agent.stream_chat_message({
+            "session_id": chat_rows.session.id,
+            "user_id": chat_rows.user_id,
+            "message": "We want to plan goals",
+            "project_id": chat_rows.project.id,
+        })
+        assert next(events)["text"] == "Let us "
+        assert next(events)["text"] == "talk about "
+        events.close()  # Client disconnected
+        assert db_specs.query(ConversationHistory).count() == 0  # Not on the closing thread
+
+        for target in detached:
+            target()
+        history = db_specs.query(ConversationHistory).order_by(ConversationHistory.role.desc()).all()
+        assert [(row.role, row.content) for row in history] == [
+            ("user", "We want to plan goals"), ("assistant", "Let us talk about ")
+        ]
+
+    def test_question_disconnect_still_saves_question(self, db_specs, chat_rows, services):
+        """Test closing the stream mid-question reads the rest and saves it."""
+        from app.agents.socratic import SocraticCounselorAgent
+        from app.models import Question
+
+        document = json.dumps({"text": "What problem does it solve?", "category": "goals"})
+        services._claude_client = FakeStreamingClient(
+            streams=[[document[index:index + 7] for index in range(0, len(document), 7)]]
+        )
+        agent = SocraticCounselorAgent("socratic", "Socratic Counselor", services)
+        detached = []
+        agent._run_detached = lambda name, target: detached.append(target)
+
+        events = agent.stream_question({"project_id": chat_rows.project.id, "session_id": chat_rows.session.id})
+        assert next(events)["event"] == "token"
+        events.close()
+
+        assert len(detached) == 1
+        detached[0]()
+        assert db_specs.query(Question).one().text == "What problem does it solve?"
@@ -0,0 +1,121 @@
+"""Tests for the token- and sentence-aware text chunker."""
+
+import random
+
+import pytest
+
+from app.services.document_parser import DocumentParser
+from app.services.text_chunker import ChunkingConfig, TextChunker, estimate_chunk_tokens
+
+WORDS = "system user shall must data the requirement api endpoint token latency e.g. 3.14 naïve 数据".split()
+
+
+def make_document(sections, seed=0):
+    rng = random.Random(seed)
+
+    def sentence():
+        text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 40)))
+        return text[0].upper() + text[1:] + rng.choice([".", "?", "!", '."'])
+
+    parts = []
+    for section in range(sections):
+        parts.append(rng.choice([f"## Section {section}\n\n", f"# Part {section}\n", ""]))
+        for _ in range(rng.randint(1, 4)):
+            parts.append(" ".join(sentence() for _ in range(rng.randint(1, 8))) + rng.choice(["\n\n", "\n", " "]))
+    return "".join(parts)
+
+
+class TestChunkingConfig:
+    """Test config validation and merging."""
+
+    def test_from_dict_merges_over_base(self):
+        """Test partial overrides keep the base values."""
+        base = ChunkingConfig(max_tokens=300)
+        config = ChunkingConfig.from_dict({"overlap_tokens": 10}, base=base)
+        assert config.max_tokens == 300
+        assert config.overlap_tokens == 10
+
+    @pytest.mark.parametrize("data", [
+        {"strategy": "semantic"},
+        {"max_tokens": 2},
+        {"max_tokens": 50, "overlap_tokens": 50},
+        {"unknown": 1},
+    ])
+    def test_invalid_config(self, data):
+        """Test invalid options are rejected."""
+        with pytest.raises(ValueError):
+            ChunkingConfig.from_dict(data)
+
+
+class TestTextChunker:
+    """Test boundary-aware chunking."""
+
+    def test_empty_text(self):
+        """Test blank input yields no chunks."""
+        assert TextChunker(ChunkingConfig()).chunk("  \n\n ") == []
+
+    def test_respects_token_budget(self):
+        """Test no chunk exceeds max_tokens."""
+        config = ChunkingConfig(max_tokens=64, overlap_tokens=8)
+        chunks = TextChunker(config).chunk(make_document(100))
+        assert chunks
+        assert max(estimate_chunk_tokens(chunk) for chunk in chunks) <= 64
+
+    def test_ends_on_sentence_boundaries(self):
+        """Test chunks end at sentence ends rather than mid-word."""
+        text = " ".join(f"Requirement {i} states that the service shall log event {i}." for i in range(200))
+        chunks = TextChunker(ChunkingConfig(max_tokens=100, overlap_tokens=0)).chunk(text)
+        assert len(chunks) > 5
+        assert all(chunk.endswith(".") and chunk.startswith("Requirement") for chunk in chunks)
+        assert " ".join(chunks) == text
+
+    def test_overlap_repeats_previous_sentence(self):
+        """Test overlap restarts at a sentence inside the overlap window."""
+        text = " ".join(f"Short sentence number {i}." for i in range(100))
+        chunks = TextChunker(ChunkingConfig(max_tokens=60, overlap_tokens=10)).chunk(text)
+        for previous, current in zip(chunks, chunks[1:]):
+            first_sentence = current.split(".")[0] + "."
+            assert first_sentence in previous
+
+    def test_headings_start_new_chunks(self):
+        """Test a chunk never runs across a Markdown heading."""
+        body = " ".join(f"Sentence {i} about the topic." for i in range(12))
+        text = f"# Intro\n\n{body}\n\n## Scope\n\n{body}\n\n## Risks\n\n{body}\n"
+        chunks = TextChunker(ChunkingConfig(max_tokens=400)).chunk(text)
+        assert [chunk.split("\n")[0] for chunk in chunks] == ["# Intro", "## Scope", "## Risks"]
+
+    def test_headings_ignored_when_disabled(self):
+        """Test respect_headings=False packs sections together."""
+        body = " ".join(f"Sentence {i} about the topic." for i in range(12))
+        text = f"# Intro\n\n{body}\n\n## Scope\n\n{body}\n"
+        chunks = TextChunker(ChunkingConfig(max_tokens=400, respect_headings=False)).chunk(text)
+        assert len(chunks) == 1
+
+    def test_long_run_without_boundaries_is_split(self):
+        """Test text with no spaces is hard-cut within budget."""
+        chunks = TextChunker(ChunkingConfig(max_tokens=32, overlap_tokens=0)).chunk("x" * 5000)
+        assert "".join(chunks) == "x" * 5000
+        # Measured on its own, a cut piece gains one word-start weight
+        assert max(estimate_chunk_tokens(chunk) for chunk in chunks) < 33
+
+    def test_fewer_chunks_than_fixed_windows(self):
+        """Test the default config does not inflate chunk counts."""
+        text = make_document(200, seed=3)
+        assert len(TextChunker(ChunkingConfig()).chunk(text)) < len(DocumentParser.chunk_text(text))
+
+    @pytest.mark.parametrize("seed,segment_size", [(1, 1), (2, 333), (3, 4096), (4, 100000)])
+    def test_streaming_matches_whole_text(self, seed, segment_size):
+        """Test iter_chunks produces exactly what chunk() produces."""
+        text = make_document(400, seed=seed)
+        if segment_size == 1:
+            text = text[:30000]
+        chunker = TextChunker(ChunkingConfig(max_tokens=96, overlap_tokens=12))
+        segments = [text[i:i + segment_size] for i in range(0, len(text), segment_size)]
+        assert list(chunker.iter_chunks(segments)) == chunker.chunk(text)
+
+    def test_fixed_strategy_matches_legacy_chunker(self):
+        """Test strategy=fixed keeps the original character windows."""
+        text = make_document(50)
+        chunker = TextChunker(ChunkingConfig(strategy="fixed", chunk_size=300, overlap=30))
+        assert chunker.chunk(text) == DocumentParser.chunk_text(text, 300, 30)
+        assert list(chunker.iter_chunks([text])) == DocumentParser.chunk_text(text, 300, 30)
@@ -0,0 +1,156 @@
+"""Tests for batched LLM usage writes, daily rollups and LLMRouter usage stats."""
+
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+
+from app.core.llm_router import LLMRouter
+from app.services.usage_writer import UsageWriter
+
+
+def usage_row(user_id, tokens_input=100, tokens_output=10, model="claude-3.5-sonnet", timestamp=None):
+    return {
+        "user_id": user_id, "project_id": None, "session_id": None, "provider": "anthropic", "model": model,
+        "tokens_input": tokens_input, "tokens_output": tokens_output,
+        "tokens_total": tokens_input + tokens_output, "cost_usd": Decimal("0.001"), "timestamp": timestamp,
+    }
+
+
+@pytest.fixture
+def specs_tables(db_specs, session_factory_specs, monkeypatch):
+    """Point the default usage sink at the test database and clean up after."""
+    from app.models.llm_usage_daily import LLMUsageDaily
+    from app.models.llm_usage_tracking import LLMUsageTracking
+
+    monkeypatch.setattr("app.core.database.SessionLocalSpecs", session_factory_specs)
+    yield db_specs
+    db_specs.query(LLMUsageTracking).delete()
+    db_specs.query(LLMUsageDaily).delete()
+    db_specs.commit()
+
+
+class TestUsageWriter:
+    """Test buffering, batching and failure handling."""
+
+    def test_full_batch_wakes_the_writer(self):
+        """Test rows are written in batch_size batches without waiting for the interval."""
+        batches = []
+        written = threading.Event()
+
+        def sink(batch):
+            batches.append(batch)
+            if sum(len(b) for b in batches) == 4:
+                written.set()
+
+        writer = UsageWriter(sink, batch_size=2, flush_interval_seconds=60)
+        try:
+            for _ in range(4):
+                writer.add(usage_row(uuid.uuid4()))
+            assert written.wait(2)
+            assert [len(batch) for batch in batches] == [2, 2]
+            assert all(row["timestamp"] is not None for batch in batches for row in batch)
+        finally:
+            writer.close()
+
+    def test_close_flushes_partial_batch(self):
+        """Test rows below batch_size are written on close."""
+        rows = []
+        writer = UsageWriter(rows.extend, batch_size=100, flush_interval_seconds=60)
+        writer.add(usage_row(uuid.uuid4()))
+        writer.close()
+
+        assert len(rows) == 1
+        assert writer.get_stats()["pending"] == 0
+        with pytest.raises(RuntimeError):
+            writer.add(usage_row(uuid.uuid4()))
+
+    def test_failed_batches_are_kept_and_bounded(self):
+        """Test a failing sink keeps rows for retry and drops the oldest past max_buffer."""
+        rows = []
+        failing = [True]
+
+        def sink(batch):
+            if failing[0]:
+                raise ConnectionError("database down")
+            rows.extend(batch)
+
+        writer = UsageWriter(sink, batch_size=2, flush_interval_seconds=60, max_buffer=3)
+        try:
+            writer.add_many([usage_row(uuid.uuid4(), tokens_input=n) for n in range(4)])
+            assert not writer.flush()
+            stats = writer.get_stats()
+            assert stats["dropped"] == 1 and stats["pending"] == 3 and stats["failed_batches"] >= 1
+
+            failing[0] = False
+            assert writer.flush()
+            assert [row["tokens_input"] for row in rows] == [1, 2, 3]
+        finally:
+            writer.close()
+
+
+class TestUsageRollups:
+    """Test rollups are maintained with the usage rows."""
+
+    def test_batch_updates_rollups(self, specs_tables):
+        """Test one batch inserts raw rows and sums them per user/day/model."""
+        from app.models.llm_usage_daily import LLMUsageDaily
+        from app.models.llm_usage_tracking import LLMUsageTracking
+        from app.services.llm_gateway import record_usage_rows
+
+        user_id = uuid.uuid4()
+        yesterday = datetime.now(timezone.utc) - timedelta(days=1)
+        record_usage_rows([usage_row(user_id), usage_row(user_id), usage_row(user_id, timestamp=yesterday)])
+        record_usage_rows([usage_row(user_id, tokens_input=50)])
+
+        assert specs_tables.query(LLMUsageTracking).filter_by(user_id=user_id).count() == 4
+        rollups = specs_tables.query(LLMUsageDaily).filter_by(user_id=user_id).order_by(LLMUsageDaily.day).all()
+        assert [(r.request_count, r.tokens_input) for r in rollups] == [(1, 100), (3, 250)]
+        assert float(rollups[1].cost_usd) == pytest.approx(0.003)
+
+
+class TestRouterUsage:
+    """Test LLMRouter persists usage and reads stats from the rollups."""
+
+    def test_track_and_report(self, specs_tables):
+        """Test tracked calls show up in the stats once written."""
+        router = LLMRouter()
+        writer = UsageWriter(batch_size=100, flush_interval_seconds=60)
+        user_id = str(uuid.uuid4())
+
+        from app.services import usage_writer
+        usage_writer.configure_usage_writer(writer)
+        try:
+            assert router.track_usage(user_id, "anthropic", "claude-3.5-sonnet", 1000, 500)["success"]
+            assert router.track_usage(user_id, "openai", "gpt-3.5-turbo", 2000, 0)["success"]
+            assert not router.track_usage("not-a-uuid", "openai", "gpt-3.5-turbo", 1, 1)["success"]
+            assert writer.flush()
+
+            stats = router.get_usage_stats(user_id, "day", db=specs_tables)["data"]
+            assert stats["overall"]["request_count"] == 2
+            assert stats["overall"]["total_tokens"] == 3500
+            assert stats["by_model"]["anthropic/claude-3.5-sonnet"]["cost"] == pytest.approx(0.0105)
+            assert stats["by_provider"]["openai"]["calls"] == 1
+
+            other = router.get_usage_stats(str(uuid.uuid4()), "month", db=specs_tables)["data"]
+            assert other["overall"]["request_count"] == 0
+            assert not router.get_usage_stats(user_id, "decade")["success"]
+        finally:
+            usage_writer.configure_usage_writer(None)
+
+    def test_period_is_a_day_range(self, specs_tables):
+        """Test older rollups fall outside shorter periods."""
+        from app.services.llm_gateway import record_usage_rows
+
+        user_id = uuid.uuid4()
+        now = datetime.now(timezone.utc)
+        record_usage_rows([usage_row(user_id, timestamp=now), usage_row(user_id, timestamp=now - timedelta(days=10))])
+
+        router = LLMRouter()
+        counts = {
+            period: router.get_usage_stats(str(user_id), period, db=specs_tables)["data"]["overall"]["request_count"]
+            for period in ("day", "week", "month", "all")
+        }
+        assert counts == {"day": 1, "week": 1, "month": 2, "all": 2}
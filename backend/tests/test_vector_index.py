@@ -0,0 +1,317 @@
+"""Tests for the in-process document chunk vector index."""
+
+import uuid
+
+import numpy as np
+import pytest
+
+from app.services.vector_index import (
+    ProjectVectorIndex,
+    VectorIndexManager,
+    normalize_rows,
+    top_k_indices,
+)
+
+
+def _random_vectors(n, dim=16, seed=0):
+    return np.random.default_rng(seed).normal(size=(n, dim)).astype(np.float32)
+
+
+def _brute_force(vectors, query, top_k):
+    matrix = normalize_rows(vectors)
+    q = normalize_rows(query)[0]
+    scores = matrix @ q
+    return list(np.argsort(-scores)[:top_k])
+
+
+class TestHelpers:
+    """Test vector helpers."""
+
+    def test_normalize_rows_unit_length(self):
+        """Test rows are normalised and zero rows stay zero."""
+        matrix = normalize_rows([[3.0, 4.0], [0.0, 0.0]])
+        assert matrix.dtype == np.float32
+        assert np.allclose(np.linalg.norm(matrix[0]), 1.0)
+        assert np.allclose(matrix[1], 0.0)
+
+    def test_top_k_indices_sorted(self):
+        """Test argpartition top-k returns best first."""
+        scores = np.array([0.1, 0.9, 0.5, 0.7], dtype=np.float32)
+        assert list(top_k_indices(scores, 2)) == [1, 3]
+        assert list(top_k_indices(scores, 10)) == [1, 3, 2, 0]
+
+
+class TestProjectVectorIndex:
+    """Test exact cosine index."""
+
+    @pytest.fixture
+    def vectors(self):
+        return _random_vectors(200)
+
+    @pytest.fixture
+    def index(self, vectors):
+        index = ProjectVectorIndex("p1")
+        ids = [f"c{i}" for i in range(len(vectors))]
+        docs = [f"d{i % 4}" for i in range(len(vectors))]
+        index.add(ids, docs, vectors.tolist())
+        return index
+
+    def test_search_matches_brute_force(self, index, vectors):
+        """Test results equal an exact brute-force ranking."""
+        query = _random_vectors(1, seed=42)[0]
+        results = index.search(query.tolist(), top_k=5, similarity_threshold=-1.0)
+        expected = [f"c{i}" for i in _brute_force(vectors, query, 5)]
+        assert [chunk_id for chunk_id, _, _ in results] == expected
+
+    def test_search_threshold(self, index, vectors):
+        """Test similarity threshold filters results."""
+        results = index.search(vectors[7].tolist(), top_k=5, similarity_threshold=0.99)
+        assert [chunk_id for chunk_id, _, _ in results] == ["c7"]
+        assert results[0][2] == pytest.approx(1.0, abs=1e-5)
+
+    def test_add_skips_missing_and_duplicate_embeddings(self, index):
+        """Test None embeddings and already indexed chunks are ignored."""
+        assert index.add(["c0", "new"], ["d0", "d0"], [[1.0] * 16, None]) == 0
+        assert len(index) == 200
+
+    def test_dimension_mismatch(self, index):
+        """Test vectors of the wrong dimension are rejected."""
+        with pytest.raises(ValueError):
+            index.add(["x"], ["d"], [[1.0, 2.0]])
+
+    def test_remove_document(self, index, vectors):
+        """Test removing a document drops its rows and keeps others searchable."""
+        assert index.remove_document("d1") == 50
+        assert len(index) == 150
+        assert not index.contains("c1")
+
+        results = index.search(vectors[2].tolist(), top_k=1)
+        assert results[0][0] == "c2"
+        assert all(doc != "d1" for _, doc, _ in index.search(vectors[5].tolist(), top_k=150, similarity_threshold=-1.0))
+
+    def test_save_and_load_memory_mapped(self, index, vectors, tmp_path):
+        """Test sidecar round trip is memory-mapped and still mutable."""
+        prefix = str(tmp_path / "project_p1")
+        index.save(prefix)
+
+        loaded = ProjectVectorIndex.load(prefix)
+        assert isinstance(loaded.matrix, np.memmap)
+        assert len(loaded) == 200
+        assert loaded.search(vectors[3].tolist(), top_k=1)[0][0] == "c3"
+
+        loaded.add(["extra"], ["d9"], [vectors[3].tolist()])
+        assert len(loaded) == 201
+        assert loaded.remove_document("d0") == 50
+
+    def test_load_missing_sidecar(self, tmp_path):
+        """Test loading a missing sidecar returns None."""
+        assert ProjectVectorIndex.load(str(tmp_path / "nothing")) is None
+
+
+class TestVectorIndexManager:
+    """Test lazy per-project index loading."""
+
+    @pytest.fixture
+    def stored_chunks(self, db_specs):
+        from app.models import DocumentChunk, KnowledgeBaseDocument
+
+        project_id = uuid.uuid4()
+        doc = KnowledgeBaseDocument(
+            project_id=project_id,
+            user_id=uuid.uuid4(),
+            filename="spec.md",
+            file_size=10,
+            content_type="text/markdown",
+        )
+        db_specs.add(doc)
+        db_specs.flush()
+
+        vectors = _random_vectors(10)
+        for i, vector in enumerate(vectors):
+            db_specs.add(DocumentChunk(
+                id=str(uuid.uuid4()),
+                document_id=doc.id,
+                chunk_index=i,
+                content=f"chunk {i}",
+                embedding_vector=vector.tolist(),
+            ))
+        db_specs.commit()
+        yield str(project_id), str(doc.id), vectors
+
+        db_specs.query(DocumentChunk).delete()
+        db_specs.query(KnowledgeBaseDocument).delete()
+        db_specs.commit()
+
+    def test_build_from_db_and_persist(self, db_specs, stored_chunks, tmp_path):
+        """Test index is built lazily from the DB and written to a sidecar."""
+        project_id, doc_id, vectors = stored_chunks
+        manager = VectorIndexManager(storage_dir=str(tmp_path))
+
+        index = manager.get(project_id, db_specs)
+        assert len(index) == 10
+        assert (tmp_path / f"project_{project_id}.npy").exists()
+
+        # A second manager (another worker) loads the sidecar instead of the DB
+        other = VectorIndexManager(storage_dir=str(tmp_path))
+        assert len(other.get(project_id, db=None)) == 10
+
+    def test_incremental_updates(self, db_specs, stored_chunks):
+        """Test add_chunks/remove_document keep the index current."""
+        project_id, doc_id, vectors = stored_chunks
+        manager = VectorIndexManager()
+
+        added = manager.add_chunks(project_id, ["new"], ["other-doc"], [vectors[0].tolist()], db=db_specs)
+        assert added == 1
+        assert len(manager.get(project_id, db_specs)) == 11
+
+        assert manager.remove_document(project_id, doc_id, db=db_specs) == 10
+        assert len(manager.get(project_id, db_specs)) == 1
+
+    def test_rebuild_keeps_changes_made_while_building(self, db_specs, stored_chunks, monkeypatch):
+        """Test chunks added and documents removed during a rebuild survive the swap."""
+        project_id, doc_id, vectors = stored_chunks
+        manager = VectorIndexManager()
+        manager.get(project_id, db_specs)
+        build_from_db = manager.build_from_db
+
+        def racing_build(pid, db):
+            snapshot = build_from_db(pid, db)  # Sees the 10 stored chunks
+            manager.add_chunks(project_id, ["late"], ["other-doc"], [vectors[1].tolist()], db=db)
+            manager.remove_document(project_id, doc_id, db=db)
+            return snapshot
+
+        monkeypatch.setattr(manager, "build_from_db", racing_build)
+        index = manager.rebuild(project_id, db_specs)
+
+        assert len(index) == 1
+        assert manager.get(project_id, db_specs) is index
+        assert manager._rebuild_journals == {}
+
+    def test_lru_bound(self, db_specs):
+        """Test only max_projects indexes stay in memory."""
+        manager = VectorIndexManager(max_projects=2)
+        project_ids = [str(uuid.uuid4()) for _ in range(3)]
+        for project_id in project_ids:
+            manager.add_chunks(project_id, ["x"], ["d"], [[1.0, 0.0]], db=db_specs)
+        assert list(manager._indexes) == project_ids[1:]
+
+    def test_sidecar_writes_are_batched(self, db_specs, stored_chunks, tmp_path):
+        """Test incremental changes rewrite the sidecar once per flush, not per change."""
+        project_id, doc_id, vectors = stored_chunks
+        manager = VectorIndexManager(storage_dir=str(tmp_path), persist_delay_seconds=3600)
+        manager.get(project_id, db_specs)
+        sidecar = tmp_path / f"project_{project_id}.npy"
+        written_at = sidecar.stat().st_mtime_ns
+
+        for i in range(3):
+            manager.add_chunks(project_id, [f"new-{i}"], ["other-doc"], [vectors[i].tolist()], db=db_specs)
+        assert sidecar.stat().st_mtime_ns == written_at
+        assert len(ProjectVectorIndex.load(str(tmp_path / f"project_{project_id}"))) == 10
+
+        assert manager.flush() == 1
+        assert len(ProjectVectorIndex.load(str(tmp_path / f"project_{project_id}"))) == 13
+        assert manager.flush() == 0
+        manager.close()
+
+    def test_reload_replays_unsaved_changes(self, db_specs, stored_chunks, tmp_path):
+        """Test a sidecar rewritten by another worker does not drop changes not yet written."""
+        project_id, doc_id, vectors = stored_chunks
+        manager = VectorIndexManager(storage_dir=str(tmp_path), persist_delay_seconds=3600)
+        other = VectorIndexManager(storage_dir=str(tmp_path), persist_delay_seconds=0)
+        manager.get(project_id, db_specs)
+
+        manager.add_chunks(project_id, ["mine"], ["other-doc"], [vectors[0].tolist()], db=db_specs)
+        other.add_chunks(project_id, ["theirs"], ["other-doc"], [vectors[1].tolist()], db=None)
+
+        index = manager.get(project_id, db=None)
+        assert index.contains("mine") and index.contains("theirs")
+        manager.close()
+        assert len(ProjectVectorIndex.load(str(tmp_path / f"project_{project_id}"))) == 12
+
+    def test_stale_sidecar_is_rebuilt(self, db_specs, stored_chunks, tmp_path):
+        """Test a sidecar missing chunks (unsaved when a worker died) is rebuilt from the DB."""
+        project_id, doc_id, vectors = stored_chunks
+        VectorIndexManager(storage_dir=str(tmp_path)).get(project_id, db_specs).remove_document(doc_id)
+        stale = ProjectVectorIndex(project_id)
+        stale.add(["gone"], ["other-doc"], [vectors[0].tolist()])
+        stale.save(str(tmp_path / f"project_{project_id}"))
+
+        index = VectorIndexManager(storage_dir=str(tmp_path)).get(project_id, db_specs)
+        assert len(index) == 10 and not index.contains("gone")
+
+    def test_cold_build_does_not_block_other_projects(self, db_specs, stored_chunks, monkeypatch):
+        """Test building one project's index holds only that project's lock."""
+        import threading
+
+        project_id, doc_id, vectors = stored_chunks
+        manager = VectorIndexManager()
+        warm = str(uuid.uuid4())
+        manager.add_chunks(warm, ["x"], ["d"], [[1.0, 0.0]], db=db_specs)
+        building, release = threading.Event(), threading.Event()
+        build_from_db = manager.build_from_db
+
+        def slow_build(pid, db):
+            building.set()
+            release.wait(5)
+            return build_from_db(pid, db)
+
+        monkeypatch.setattr(manager, "build_from_db", slow_build)
+        cold = threading.Thread(target=manager.get, args=(project_id, db_specs))
+        cold.start()
+        assert building.wait(5)
+        try:
+            results = []
+            search = threading.Thread(
+                target=lambda: results.append(manager.search(warm, [1.0, 0.0], db=db_specs, top_k=1))
+            )
+            search.start()
+            search.join(2)
+            assert results and results[0][0][0] == "x"  # Answered while the cold build runs
+        finally:
+            release.set()
+            cold.join(5)
+        assert len(manager.get(project_id, db_specs)) == 10
+
+    def test_document_insert_does_not_block_searches(self, db_specs, stored_chunks):
+        """Test chunks streamed from the DB are read without the manager lock."""
+        import threading
+
+        project_id, doc_id, vectors = stored_chunks
+        manager = VectorIndexManager()
+        manager.get(project_id, db_specs)
+        streaming, release = threading.Event(), threading.Event()
+
+        class SlowQuery:
+            """Chunk query whose rows arrive slowly (a large document)."""
+
+            def query(self, *columns):
+                return self
+
+            def filter(self, *criteria):
+                return self
+
+            def yield_per(self, count):
+                return self
+
+            def __iter__(self):
+                yield "late-1", vectors[0].tolist()
+                streaming.set()
+                release.wait(5)
+                yield "late-2", vectors[1].tolist()
+
+        ingest = threading.Thread(target=manager.add_document_from_db, args=(project_id, "late-doc", SlowQuery()))
+        ingest.start()
+        assert streaming.wait(5)
+        try:
+            results = []
+            search = threading.Thread(
+                target=lambda: results.append(manager.search(project_id, vectors[2], db=db_specs, top_k=1))
+            )
+            search.start()
+            search.join(2)
+            assert results  # Answered while the document is still streaming
+        finally:
+            release.set()
+            ingest.join(5)
+        index = manager.get(project_id, db_specs)
+        assert len(index) == 12 and index.contains("late-1") and index.contains("late-2")
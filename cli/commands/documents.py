@@ -1,17 +1,27 @@
 """Document and knowledge base management commands.
 
 /document upload - Upload file to knowledge base
+/document status - Show progress of an upload
 /document list - List project documents
 /document search - Semantic search documents
 /document delete - Delete document
 """
 
-from typing import List
+import time
+from typing import Any, Dict, List, Optional
 from pathlib import Path
 from cli.base import CommandHandler
 from cli.utils import prompts, table_formatter
 
 
+# Uploads are processed by a background ingestion job; the CLI polls the
+# job until it finishes or this many seconds have passed.
+UPLOAD_POLL_INTERVAL = 1.0
+UPLOAD_POLL_TIMEOUT = 300.0
+
+JOB_TERMINAL_STATUSES = ("completed", "failed")
+
+
 class DocumentCommandHandler(CommandHandler):
     """Handler for document management commands"""
 
@@ -20,6 +30,7 @@ class DocumentCommandHandler(CommandHandler):
     help_text = """
 [bold cyan]Document Commands:[/bold cyan]
   [yellow]/document upload <file>[/yellow]   Upload file to knowledge base
+  [yellow]/document status <job_id>[/yellow] Show progress of an upload
   [yellow]/document list[/yellow]            List project documents
   [yellow]/document search <query>[/yellow]  Semantic search documents
   [yellow]/document delete <id>[/yellow]     Delete document
@@ -35,6 +46,8 @@ class DocumentCommandHandler(CommandHandler):
 
         if subcommand == "upload":
             self.upload(args[1:])
+        elif subcommand == "status":
+            self.status(args[1:])
         elif subcommand == "list":
             self.list()
         elif subcommand == "search":
@@ -63,20 +76,85 @@ class DocumentCommandHandler(CommandHandler):
         try:
             self.console.print(f"[cyan]Uploading {file_path.name}...[/cyan]")
 
-            with open(file_path, "rb") as f:
-                result = self.api.upload_document(project.get("id"), f)
+            result = self.api.upload_document(project.get("id"), str(file_path))
 
-            if result.get("success"):
-                self.print_success(f"Document uploaded: {file_path.name}")
-                self.console.print(f"[cyan]Document ID: {result.get('document_id')}[/cyan]")
-                self.console.print(f"[cyan]Chunks: {result.get('chunks')}[/cyan]")
-            else:
-                error = result.get("error") or "Unknown error"
+            if not result.get("success"):
+                error = result.get("error") or result.get("data", {}).get("detail") or "Unknown error"
                 self.print_error(f"Failed: {error}")
+                return
+
+            job_id = result.get("data", {}).get("job_id")
+            self.print_success(f"Document uploaded: {file_path.name}")
+            self.console.print(f"[cyan]Job ID: {job_id}[/cyan]")
+            self.console.print("[cyan]Processing...[/cyan]")
+
+            job = self._wait_for_job(job_id)
+            if job is None:
+                self.console.print(
+                    "[yellow]Still processing. Check progress with "
+                    f"/document status {job_id}[/yellow]"
+                )
+                return
 
+            self._print_job(job)
+
+        except KeyboardInterrupt:
+            self.console.print(
+                "[yellow]Stopped waiting; the upload continues in the background[/yellow]"
+            )
         except Exception as e:
             self.print_error(f"Error: {e}")
 
+    def status(self, args: List[str]) -> None:
+        """Show progress of a document ingestion job"""
+        if not args:
+            self.console.print("[yellow]Usage: /document status <job_id>[/yellow]")
+            return
+
+        try:
+            result = self.api.get_document_job(args[0])
+
+            if not result.get("success"):
+                self.print_error("Upload job not found")
+                return
+
+            self._print_job(result.get("data", {}))
+
+        except Exception as e:
+            self.print_error(f"Error: {e}")
+
+    def _wait_for_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Poll an ingestion job until it finishes.
+
+        Returns:
+            Final job status, or None if the job is still running after
+            UPLOAD_POLL_TIMEOUT seconds
+        """
+        deadline = time.monotonic() + UPLOAD_POLL_TIMEOUT
+        while True:
+            result = self.api.get_document_job(job_id)
+            job = result.get("data", {}) if result.get("success") else {}
+            if job.get("status") in JOB_TERMINAL_STATUSES:
+                return job
+            if time.monotonic() >= deadline:
+                return None
+            time.sleep(UPLOAD_POLL_INTERVAL)
+
+    def _print_job(self, job: Dict[str, Any]) -> None:
+        """Print ingestion job status"""
+        status = job.get("status", "unknown")
+
+        if status == "completed":
+            self.print_success(f"Document processed: {job.get('filename')}")
+            self.console.print(f"[cyan]Document ID: {job.get('document_id')}[/cyan]")
+            self.console.print(f"[cyan]Chunks: {job.get('chunks_processed')}[/cyan]")
+            self.console.print(f"[cyan]Embeddings: {job.get('embedding_status')}[/cyan]")
+        elif status == "failed":
+            self.print_error(f"Processing failed: {job.get('error') or 'Unknown error'}")
+        else:
+            self.console.print(f"[yellow]Status: {status}[/yellow]")
+            self.console.print(f"[cyan]Chunks processed: {job.get('chunks_processed', 0)}[/cyan]")
+
     def list(self) -> None:
         """List project documents"""
         project = self.ensure_project_selected()
@@ -28,7 +28,7 @@ import argparse
 import subprocess
 import signal
 import time
-from typing import Optional, Dict, Any, List, TYPE_CHECKING
+from typing import Optional, Dict, Any, Iterator, List, Tuple, TYPE_CHECKING
 from datetime import datetime
 from pathlib import Path
 
@@ -57,6 +57,8 @@ try:
     from rich.prompt import Prompt, Confirm
     from rich.syntax import Syntax
     from rich.progress import Progress, SpinnerColumn, TextColumn
+    from rich.live import Live
+    from rich.spinner import Spinner
     from prompt_toolkit import PromptSession, prompt
     from prompt_toolkit.history import FileHistory
     from prompt_toolkit.auto_suggest import AutoSuggestFromHistory
@@ -335,6 +337,54 @@ class SocratesAPI(SocratesAPIExtension):
                 "response_text": response.text[:100] if response.text else "Empty response"
             }
 
+    def _stream_events(self, method: str, endpoint: str, **kwargs) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Make a Server-Sent Events request and yield (event, data) pairs.
+
+        Servers that answer with plain JSON (no streaming support) produce a
+        single ("done", body) pair, or ("error", body) for HTTP errors.
+        """
+        headers = self._headers()
+        headers["Accept"] = "text/event-stream"
+        response = self._request(method, endpoint, headers=headers, stream=True, **kwargs)
+
+        with response:
+            if "text/event-stream" not in response.headers.get("Content-Type", ""):
+                try:
+                    body = response.json()
+                except Exception:
+                    body = {"success": False, "error": response.text or f"HTTP {response.status_code}"}
+                if response.status_code >= 400:
+                    body.setdefault("success", False)
+                    body.setdefault("error", body.get("detail", f"HTTP {response.status_code}"))
+                    yield "error", body
+                else:
+                    yield "done", body
+                return
+
+            event, data_lines = "message", []
+            for line in response.iter_lines(decode_unicode=True):
+                if line is None:
+                    continue
+                if line == "":
+                    if data_lines:
+                        yield event, json.loads("\n".join(data_lines))
+                    event, data_lines = "message", []
+                elif line.startswith("event:"):
+                    event = line[6:].strip()
+                elif line.startswith("data:"):
+                    data_lines.append(line[5:].lstrip())
+
+    def stream_next_question(self, session_id: str) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Stream the next Socratic question ("token" events, then "done" or "error")"""
+        return self._stream_events("GET", f"/api/v1/sessions/{session_id}/next-question")
+
+    def stream_chat_message(self, session_id: str, message: str) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Stream a direct chat reply ("token" events, then "done" or "error")"""
+        return self._stream_events("POST", f"/api/v1/sessions/{session_id}/chat", json={
+            "message": message
+        })
+
     def get_session_mode(self, session_id: str) -> Dict[str, Any]:
         """Get current session mode"""
         response = self._request("GET", f"/api/v1/sessions/{session_id}/mode")
@@ -2436,6 +2486,38 @@ Updated: {p.get('updated_at', 'N/A')}
         except Exception as e:
             self.console.print(f"Error: {e}")
 
+    def _render_stream(self, events: Iterator[Tuple[str, Dict[str, Any]]], waiting: str) -> Dict[str, Any]:
+        """
+        Render streamed text in a panel as it arrives.
+
+        Shows a spinner until the first token, then grows the panel with
+        every "token" event.
+
+        Returns:
+            Payload of the final "done" or "error" event
+        """
+        text = ""
+        result: Dict[str, Any] = {"success": False, "error": "Stream ended unexpectedly"}
+
+        with Live(Spinner("dots", text=waiting), console=self.console, refresh_per_second=15) as live:
+            for event, data in events:
+                if event == "token":
+                    text += data.get("text", "")
+                elif event == "done":
+                    result = data
+                    # Servers without streaming send everything in "done"
+                    payload = data.get("data") if isinstance(data.get("data"), dict) else data
+                    question = payload.get("question")
+                    text = payload.get("response") or (question.get("text") if isinstance(question, dict) else question) or text
+                elif event == "error":
+                    result = {**data, "success": False}
+                live.update(Panel(text, border_style="cyan", padding=(1, 2)) if text else "")
+
+        if self.debug and result.get("timing"):
+            timing = result["timing"]
+            self.console.print(f"[DEBUG] time to first token: {timing.get('ttft_ms')} ms, total: {timing.get('total_ms')} ms")
+        return result
+
     def get_next_question(self):
         """Get next Socratic question"""
         if not self.current_session:
@@ -2449,20 +2531,17 @@ Updated: {p.get('updated_at', 'N/A')}
                     self.console.print(f"[DEBUG] current_session: {self.current_session}")
                 self.console.print("[ERROR] Invalid session data - missing ID")
                 return
-            with Progress(SpinnerColumn(), TextColumn("{task.description}"),
-                          console=self.console, transient=True) as progress:
-                progress.add_task("Generating question...", total=None)
-                result = self.api.get_next_question(session_id)
+            self.console.print(f"Socrates:")
+            result = self._render_stream(self.api.stream_next_question(session_id), "Generating question...")
 
             if result.get("success"):
-                # Extract from data wrapper
-                data = result.get("data", {})
-                # Handle both response formats
-                question_data = data.get("question") if isinstance(data, dict) else None
+                # Extract from data wrapper (non-streaming servers), handle both response formats
+                data = result.get("data") if isinstance(result.get("data"), dict) else result
+                question_data = data.get("question")
                 if isinstance(question_data, dict):
                     # If question is an object, extract fields
                     question_text = question_data.get("text") or question_data.get("question")
-                    question_id = question_data.get("id") or question_data.get("question_id")
+                    question_id = question_data.get("id") or question_data.get("question_id") or data.get("question_id")
                 else:
                     # If question is a string, assume it's the text
                     question_text = data.get("text") or data.get("question") or question_data
@@ -2478,9 +2557,6 @@ Updated: {p.get('updated_at', 'N/A')}
                     "text": question_text,
                     **(data if isinstance(data, dict) else {})  # Include all other fields from data
                 }
-
-                self.console.print(f"Socrates:")
-                self.console.print(Panel(question_text, border_style="cyan", padding=(1, 2)))
                 self.console.print()
             else:
                 # Error getting question (result.get('success') is False)
@@ -2618,16 +2694,11 @@ Updated: {p.get('updated_at', 'N/A')}
 
                 self.chat_mode = "direct_chat"
 
-            # Send direct chat message
-            with Progress(SpinnerColumn(), TextColumn("{task.description}"),
-                          console=self.console, transient=True) as progress:
-                progress.add_task("Thinking...", total=None)
-                result = self.api.send_chat_message(session_id, message)
+            # Send direct chat message; the reply is rendered as it streams in
+            self.console.print(f"\nSocrates:")
+            result = self._render_stream(self.api.stream_chat_message(session_id, message), "Thinking...")
 
             if result.get("success"):
-                response_text = result.get("response", "")
-                self.console.print(f"\nSocrates:")
-                self.console.print(Panel(response_text, border_style="cyan", padding=(1, 2)))
                 self.console.print()
 
                 # Show any extracted specs (backend returns count as integer)
@@ -3184,14 +3255,16 @@ Updated: {p.get('updated_at', 'N/A')}
             result = self.api.upload_document(self.current_project, file_path)
 
             if result.get("success"):
-                doc_data = result.get("data", {})
-                self.console.print("[OK] Document uploaded successfully")
-                if doc_data.get("id"):
-                    self.console.print(f"    ID: {doc_data['id']}")
-                if doc_data.get("filename"):
-                    self.console.print(f"    File: {doc_data['filename']}")
-                if doc_data.get("size"):
-                    self.console.print(f"    Size: {doc_data['size']} bytes")
+                job_data = result.get("data", {})
+                self.console.print("[OK] Document uploaded, processing in background")
+                if job_data.get("job_id"):
+                    self.console.print(f"    Job ID: {job_data['job_id']}")
+                if job_data.get("filename"):
+                    self.console.print(f"    File: {job_data['filename']}")
+                if job_data.get("file_size"):
+                    self.console.print(f"    Size: {job_data['file_size']} bytes")
+                if job_data.get("status"):
+                    self.console.print(f"    Status: {job_data['status']}")
             else:
                 self.console.print(f"[ERROR] Upload failed: {result.get('error', 'Unknown error')}")
         except Exception as e:
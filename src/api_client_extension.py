@@ -207,7 +207,22 @@ class SocratesAPIExtension:
         try:
             with open(file_path, 'rb') as f:
                 files = {'file': f}
-                response = self._request("POST", f"/api/v1/projects/{project_id}/documents/upload", files=files)
+                # Let requests set the multipart Content-Type boundary
+                headers = {k: v for k, v in self._headers().items() if k != "Content-Type"}
+                response = self._request(
+                    "POST", "/api/v1/documents/upload",
+                    params={"project_id": project_id}, files=files, headers=headers
+                )
+            # Processing happens in a background job; the response carries
+            # job_id and status_url instead of the document.
+            return {"success": response.status_code in (200, 202), "data": response.json()}
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+
+    def get_document_job(self, job_id: str) -> Dict[str, Any]:
+        """Get progress of a document upload job"""
+        try:
+            response = self._request("GET", f"/api/v1/documents/jobs/{job_id}")
             return {"success": response.status_code == 200, "data": response.json()}
         except Exception as e:
             return {"success": False, "error": str(e)}
@@ -189,6 +189,10 @@ class SocratesCLI:
         """Upload document"""
         return self.api.upload_document(project_id, file_path)
 
+    def get_document_job(self, job_id: str) -> Dict[str, Any]:
+        """Get document upload job status"""
+        return self.api.get_document_job(job_id)
+
     def list_documents(self, project_id: str) -> Dict[str, Any]:
         """List documents"""
         return self.api.list_documents(project_id)